@@ -7,6 +7,7 @@ import boto3
 import json
 from collections import defaultdict
 from src.project_manager import ProjectManager
+from src.record_types import is_timesheet_row
 
 DYNAMODB_TABLE = "TimesheetOCR-dev"
 
@@ -28,6 +29,9 @@ def analyze_existing_projects():
         response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
         items.extend(response.get('Items', []))
 
+    # Rollup, registry, cache and journal items share the table
+    items = [item for item in items if is_timesheet_row(item)]
+
     print(f"✓ Found {len(items)} timesheet entries\n")
 
     # Extract unique projects
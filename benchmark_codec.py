@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the low-level DynamoDB codec against the boto3 resource path.
+
+Decodes synthetic wire-format timesheet rows (no AWS access needed) both ways:
+  - resource path: TypeDeserializer -> Decimal, then a Decimal -> float pass
+  - codec path: dynamo_codec.decode_item() straight to int/float
+
+Usage:
+  python benchmark_codec.py                 # 100k items
+  python benchmark_codec.py --items 250000
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import argparse
+import time
+from decimal import Decimal
+from boto3.dynamodb.types import TypeDeserializer
+from dynamo_codec import decode_item
+
+
+def make_wire_items(count):
+    """Build wire-format items shaped like day-layout timesheet rows."""
+    items = []
+    for i in range(count):
+        day = f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}"
+        code = f"PJ{20000 + i % 500:06d}"
+        items.append({
+            'ResourceName': {'S': f"Person_{i % 80}"},
+            'DateProjectCode': {'S': f"{day}#{code}"},
+            'Date': {'S': day},
+            'ProjectCode': {'S': code},
+            'ProjectCodeGSI': {'S': code},
+            'ProjectName': {'S': f"Project {i % 500}"},
+            'Hours': {'N': str(7.5 if i % 3 else 4)},
+            'ResourceNameDisplay': {'S': f"Person {i % 80}"},
+            'IsZeroHourTimesheet': {'BOOL': False},
+            'SourceImage': {'S': f"scan_{i // 20}.png"},
+            'ProcessingTimestamp': {'S': '2025-10-01T12:00:00.000000Z'},
+            'ProcessingTimeSeconds': {'N': '12.345'},
+            'ModelId': {'S': 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'},
+            'InputTokens': {'N': '3120'},
+            'OutputTokens': {'N': '842'},
+            'CostEstimateUSD': {'N': '0.021996'},
+            'OCRVersion': {'S': '2.1.0'},
+            'WeekStartDate': {'S': day},
+            'WeekEndDate': {'S': day},
+            'YearMonth': {'S': day[:7]},
+        })
+    return items
+
+
+def resource_path(items):
+    """What table.scan() + the web app's Decimal -> float pass did per item."""
+    deserializer = TypeDeserializer()
+    rows = []
+    for item in items:
+        row = {k: deserializer.deserialize(v) for k, v in item.items()}
+        rows.append({k: float(v) if isinstance(v, Decimal) else v for k, v in row.items()})
+    return rows
+
+
+def codec_path(items):
+    return [decode_item(item) for item in items]
+
+
+def timed(func, items):
+    start = time.process_time()
+    result = func(items)
+    return time.process_time() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DynamoDB item decoding')
+    parser.add_argument('--items', type=int, default=100000, help='Number of items to decode')
+    args = parser.parse_args()
+
+    print(f"📦 Building {args.items:,} wire-format items...")
+    items = make_wire_items(args.items)
+
+    resource_seconds, resource_rows = timed(resource_path, items)
+    codec_seconds, codec_rows = timed(codec_path, items)
+
+    if resource_rows != codec_rows:
+        print("❌ Decoded rows differ between paths")
+        return 1
+
+    print(f"TypeDeserializer + float pass: {resource_seconds:.3f}s CPU")
+    print(f"dynamo_codec.decode_item:      {codec_seconds:.3f}s CPU")
+    if codec_seconds:
+        print(f"✅ {resource_seconds / codec_seconds:.1f}x faster "
+              f"({(resource_seconds - codec_seconds) * 1000 / args.items * 1000:.1f}ms saved per 1k items)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,7 @@ import json
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from project_manager import ProjectManager
+from record_types import is_timesheet_row
 
 # AWS Configuration
 DYNAMODB_TABLE = "TimesheetOCR-dev"
@@ -34,7 +35,7 @@ def scan_all_projects():
 
     # Scan entire table
     scan_kwargs = {
-        'ProjectionExpression': 'ProjectCode, ProjectName'
+        'ProjectionExpression': 'ResourceName, RecordType, ProjectCode, ProjectName'
     }
 
     done = False
@@ -52,7 +53,8 @@ def scan_all_projects():
             code = item.get('ProjectCode')
             name = item.get('ProjectName')
 
-            if code and name:
+            # Project rollups carry ProjectCode/ProjectName too
+            if code and name and is_timesheet_row(item):
                 project_data[code]['names'][name] += 1
                 project_data[code]['total_entries'] += 1
                 item_count += 1
@@ -8,8 +8,14 @@ This script:
 """
 import boto3
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from bulk_delete import BulkDeleter, segmented_scan
+from record_types import is_timesheet_row
+
 # AWS Configuration
 REGION = 'us-east-1'
 TABLE_NAME = 'TimesheetOCR-dev'
@@ -31,42 +37,26 @@ def delete_entries_for_image(image_name):
     """Delete all DynamoDB entries for a specific source image."""
     print(f"\n🗑️  Deleting entries for: {image_name}")
 
-    # Scan for entries with this SourceImage
-    scan_kwargs = {
-        'TableName': TABLE_NAME,
-        'FilterExpression': 'SourceImage = :img',
-        'ExpressionAttributeValues': {
-            ':img': {'S': image_name}
-        }
-    }
-
-    deleted_count = 0
-
     try:
-        response = dynamodb.scan(**scan_kwargs)
-        items = response.get('Items', [])
+        # Every page of the table; only timesheet rows carry a SourceImage worth deleting
+        items = [
+            item for item in segmented_scan(
+                TABLE_NAME, client=dynamodb, keys_only=False,
+                FilterExpression='SourceImage = :img',
+                ExpressionAttributeValues={':img': {'S': image_name}}
+            )
+            if is_timesheet_row(item)
+        ]
 
         print(f"   Found {len(items)} entries to delete")
 
         for item in items:
-            # Extract key attributes
-            resource_name = item['ResourceName']['S']
-            date_project_code = item['DateProjectCode']['S']
-            date = item['Date']['S']
-            project_code = item.get('ProjectCode', {}).get('S', 'N/A')
-            project_name = item.get('ProjectName', {}).get('S', 'N/A')
-
-            print(f"   - Deleting: {resource_name} | {date} | {project_code}")
-
-            # Delete the item using correct composite key
-            dynamodb.delete_item(
-                TableName=TABLE_NAME,
-                Key={
-                    'ResourceName': {'S': resource_name},
-                    'DateProjectCode': {'S': date_project_code}
-                }
-            )
-            deleted_count += 1
+            print(f"   - Deleting: {item['ResourceName']} | {item.get('Date', 'N/A')} | "
+                  f"{item.get('ProjectCode', 'N/A')}")
+
+        # Batched delete; rollups, registry and the delete journal follow the removed rows
+        report = BulkDeleter(TABLE_NAME, client=dynamodb).delete(items, maintain_rollups=True)
+        deleted_count = report['deleted']
 
         print(f"   ✅ Deleted {deleted_count} entries")
         return deleted_count
@@ -2,7 +2,12 @@
 """
 Delete NTCS124690 duplicate entries for Gareth Jones.
 """
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
 import boto3
+from bulk_delete import BulkDeleter, query_partition
 
 # AWS Configuration
 REGION = 'us-east-1'
@@ -33,28 +38,21 @@ def delete_ntcs_entries():
     deleted_count = 0
 
     try:
-        response = dynamodb.query(**query_kwargs)
-        items = response.get('Items', [])
+        # Every page of the partition (decoded items)
+        items = list(query_partition(
+            TABLE_NAME, 'Gareth_Jones', client=dynamodb,
+            FilterExpression='ProjectCode = :code',
+            ExpressionAttributeValues={':code': {'S': 'NTCS124690'}}
+        ))
 
         print(f"   Found {len(items)} NTCS124690 entries to delete\n")
 
         for item in items:
-            resource_name = item['ResourceName']['S']
-            date_project_code = item['DateProjectCode']['S']
-            date = item['Date']['S']
-            project_code = item.get('ProjectCode', {}).get('S', 'N/A')
-
-            print(f"   🗑️  Deleting: {date} | {project_code}")
-
-            # Delete the item
-            dynamodb.delete_item(
-                TableName=TABLE_NAME,
-                Key={
-                    'ResourceName': {'S': resource_name},
-                    'DateProjectCode': {'S': date_project_code}
-                }
-            )
-            deleted_count += 1
+            print(f"   🗑️  Deleting: {item['Date']} | {item.get('ProjectCode', 'N/A')}")
+
+        # Batched parallel delete; rollups follow the removed rows
+        report = BulkDeleter(TABLE_NAME, client=dynamodb).delete(items, maintain_rollups=True)
+        deleted_count = report['deleted']
 
         print(f"\n   ✅ Deleted {deleted_count} entries")
 
@@ -1,18 +1,33 @@
 #!/usr/bin/env python3
 """
 Export DynamoDB data to S3 in a format QuickSight can read.
-This creates a CSV file that Athena can query.
+
+By default this writes Parquet partitioned by YearMonth (see
+src/parquet_export.py) and an Athena table over it, so queries only read the
+months they filter on. Runs after the first only rewrite the months changed
+since the last run (src/incremental_export.py); --full re-exports
+everything. --csv keeps the old single-CSV export.
 """
 import boto3
 import csv
 import json
+import os
+import sys
+import tempfile
 from datetime import datetime
-from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from week_document import expand_items
+from dynamo_codec import scan_items
+from record_types import is_timesheet_row
+from incremental_export import export_changes
+from parquet_export import athena_ddl
 
 # Configuration
 DYNAMODB_TABLE = 'TimesheetOCR-dev'
 S3_BUCKET = 'timesheetocr-input-dev-016164185850'  # Reusing existing bucket
 S3_KEY_PREFIX = 'quicksight-data/'
+PARQUET_KEY_PREFIX = f'{S3_KEY_PREFIX}timesheet_parquet/'
 AWS_REGION = 'us-east-1'
 
 # AWS clients
@@ -21,29 +36,15 @@ s3_client = boto3.client('s3', region_name=AWS_REGION)
 table = dynamodb.Table(DYNAMODB_TABLE)
 
 
-def decimal_to_float(obj):
-    """Convert Decimal to float for JSON/CSV compatibility."""
-    if isinstance(obj, Decimal):
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {k: decimal_to_float(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [decimal_to_float(item) for item in obj]
-    return obj
-
-
 def export_dynamodb_to_csv():
     """Export all DynamoDB data to CSV file."""
     print(f"📊 Exporting DynamoDB table: {DYNAMODB_TABLE}")
 
-    # Scan DynamoDB table
-    response = table.scan()
-    items = response.get('Items', [])
+    # Scan DynamoDB table (low-level codec: numbers arrive as int/float, no Decimal pass)
+    items = list(scan_items(DYNAMODB_TABLE, client=dynamodb.meta.client))
 
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        items.extend(response.get('Items', []))
+    # Expand week documents into per-day rows (rollups, registry etc. are not timesheet rows)
+    items = [item for item in expand_items(items) if is_timesheet_row(item)]
 
     print(f"✓ Found {len(items)} entries")
 
@@ -51,9 +52,6 @@ def export_dynamodb_to_csv():
         print("❌ No data found in DynamoDB table")
         return
 
-    # Convert Decimals to floats
-    items = [decimal_to_float(item) for item in items]
-
     # Define CSV columns (QuickSight-friendly format)
     csv_columns = [
         'ResourceName',
@@ -110,8 +108,41 @@ def export_dynamodb_to_csv():
     return s3_key
 
 
+def export_dynamodb_to_parquet(full=False):
+    """Export the changed months (or, with full=True, the whole table) as partitioned Parquet."""
+    print(f"📊 Exporting DynamoDB table: {DYNAMODB_TABLE} (Parquet)")
+
+    with tempfile.TemporaryDirectory(prefix='timesheet_parquet_') as directory:
+        result = export_changes(
+            DYNAMODB_TABLE,
+            S3_BUCKET,
+            PARQUET_KEY_PREFIX,
+            directory,
+            s3_client,
+            client=dynamodb.meta.client,
+            full=full
+        )
+
+    print(f"\n📍 S3 Location: s3://{S3_BUCKET}/{PARQUET_KEY_PREFIX}")
+    return result
+
+
 def create_athena_table():
-    """Create Athena table DDL statement."""
+    """Create the Athena DDL for the partitioned Parquet table."""
+    ddl = athena_ddl(f"s3://{S3_BUCKET}/{PARQUET_KEY_PREFIX}")
+
+    athena_file = '/tmp/create_athena_table.sql'
+    with open(athena_file, 'w') as f:
+        f.write(ddl)
+
+    print(f"\n📝 Athena DDL saved to: {athena_file}")
+    print(f"\n{ddl}")
+
+    return ddl
+
+
+def create_athena_csv_table():
+    """Create Athena table DDL statement for the CSV export."""
     s3_location = f"s3://{S3_BUCKET}/{S3_KEY_PREFIX}"
 
     ddl = f"""
@@ -158,11 +189,12 @@ if __name__ == "__main__":
     print("="*60)
 
     try:
-        # Export to CSV
-        s3_key = export_dynamodb_to_csv()
-
-        # Create Athena table DDL
-        create_athena_table()
+        if '--csv' in sys.argv:
+            export_dynamodb_to_csv()
+            create_athena_csv_table()
+        else:
+            export_dynamodb_to_parquet(full='--full' in sys.argv)
+            create_athena_table()
 
         print("\n" + "="*60)
         print("✅ EXPORT COMPLETE!")
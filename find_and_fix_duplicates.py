@@ -12,10 +12,16 @@ Strategy:
 - If multiple entries exist, keep the MOST RECENT one (by ProcessingTimestamp)
 - Delete older duplicates
 """
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
 import boto3
 from datetime import datetime
 from collections import defaultdict
 import time
+from bulk_delete import BulkDeleter
+from resource_registry import list_resources, scan_resources
 
 # AWS Configuration
 REGION = 'us-east-1'
@@ -26,26 +32,14 @@ dynamodb = boto3.client('dynamodb', region_name=REGION)
 
 
 def get_all_resources():
-    """Get all unique ResourceName values."""
-    print("📋 Scanning for all unique resources...")
-
-    # Use scan with projection to get only ResourceName
-    resources = set()
-    scan_kwargs = {
-        'TableName': TABLE_NAME,
-        'ProjectionExpression': 'ResourceName'
-    }
-
-    while True:
-        response = dynamodb.scan(**scan_kwargs)
-        for item in response.get('Items', []):
-            resources.add(item['ResourceName']['S'])
+    """Get all unique ResourceName values (from the resource registry)."""
+    print("📋 Reading the resource registry...")
+    registered = list_resources(TABLE_NAME)
+    if registered is not None:
+        return sorted(resource['resource_key'] for resource in registered)
 
-        if 'LastEvaluatedKey' not in response:
-            break
-        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
-
-    return sorted(resources)
+    print("⚠️  Registry not seeded - scanning for all unique resources...")
+    return sorted(resource['resource_key'] for resource in scan_resources(TABLE_NAME))
 
 
 def get_all_entries_for_resource(resource_name):
@@ -131,6 +125,7 @@ def delete_duplicate_entries(resource_name, duplicates, dry_run=True):
     """
     kept_count = 0
     deleted_count = 0
+    to_delete_all = []
 
     for (date_str, project_code), items in duplicates.items():
         # Sort by timestamp (newest first)
@@ -152,26 +147,21 @@ def delete_duplicate_entries(resource_name, duplicates, dry_run=True):
             old_timestamp = get_item_timestamp(old_item)
             old_hours = old_item.get('Hours', {}).get('N', '0')
 
-            if dry_run:
-                print(f"   🗑️  WOULD DELETE: {old_hours}h from '{old_source}' @ {old_timestamp}")
-                deleted_count += 1
-            else:
-                print(f"   🗑️  DELETING: {old_hours}h from '{old_source}' @ {old_timestamp}")
-
-                try:
-                    dynamodb.delete_item(
-                        TableName=TABLE_NAME,
-                        Key={
-                            'ResourceName': {'S': resource_name},
-                            'DateProjectCode': old_item['DateProjectCode']
-                        }
-                    )
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"      ❌ Failed to delete: {e}")
+            verb = 'WOULD DELETE' if dry_run else 'DELETING'
+            print(f"   🗑️  {verb}: {old_hours}h from '{old_source}' @ {old_timestamp}")
+            to_delete_all.append({**old_item, 'ResourceName': {'S': resource_name}})
 
         kept_count += 1
 
+    # One batched, parallel delete for the whole person (rollups kept in step)
+    if to_delete_all:
+        report = BulkDeleter(TABLE_NAME, client=dynamodb, log_func=lambda msg: None).delete(
+            to_delete_all, dry_run=dry_run, maintain_rollups=True
+        )
+        deleted_count = report['requested'] if dry_run else report['deleted']
+        for key in report['failed_keys']:
+            print(f"      ❌ Failed to delete: {key[1]}")
+
     return kept_count, deleted_count
 
 
@@ -14,6 +14,7 @@ import boto3
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from team_manager import TeamManager
+from record_types import is_timesheet_row
 
 # AWS Configuration
 DYNAMODB_TABLE = "TimesheetOCR-dev"
@@ -63,7 +64,7 @@ def get_submitted_weeks_by_resource() -> dict:
 
     # Scan all items
     response = table.scan(
-        ProjectionExpression='ResourceName, WeekStartDate, IsZeroHourTimesheet'
+        ProjectionExpression='ResourceName, RecordType, WeekStartDate, IsZeroHourTimesheet'
     )
 
     items = response.get('Items', [])
@@ -71,11 +72,14 @@ def get_submitted_weeks_by_resource() -> dict:
     # Handle pagination
     while 'LastEvaluatedKey' in response:
         response = table.scan(
-            ProjectionExpression='ResourceName, WeekStartDate, IsZeroHourTimesheet',
+            ProjectionExpression='ResourceName, RecordType, WeekStartDate, IsZeroHourTimesheet',
             ExclusiveStartKey=response['LastEvaluatedKey']
         )
         items.extend(response.get('Items', []))
 
+    # Rollup, registry, cache and journal items share the table
+    items = [item for item in items if is_timesheet_row(item)]
+
     print(f"Found {len(items)} entries in database")
 
     # Group by resource and week
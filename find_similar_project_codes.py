@@ -11,9 +11,14 @@ Strategy:
 - Check if any two codes are "similar" (Levenshtein distance <= 2)
 - These are likely OCR errors of the same project
 """
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
 import boto3
 from collections import defaultdict
 from difflib import SequenceMatcher
+from resource_registry import list_resources, scan_resources
 
 # AWS Configuration
 REGION = 'us-east-1'
@@ -46,25 +51,14 @@ def levenshtein_distance(s1, s2):
 
 
 def get_all_resources():
-    """Get all unique ResourceName values."""
-    print("📋 Scanning for all unique resources...")
-
-    resources = set()
-    scan_kwargs = {
-        'TableName': TABLE_NAME,
-        'ProjectionExpression': 'ResourceName'
-    }
-
-    while True:
-        response = dynamodb.scan(**scan_kwargs)
-        for item in response.get('Items', []):
-            resources.add(item['ResourceName']['S'])
-
-        if 'LastEvaluatedKey' not in response:
-            break
-        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
-
-    return sorted(resources)
+    """Get all unique ResourceName values (from the resource registry)."""
+    print("📋 Reading the resource registry...")
+    registered = list_resources(TABLE_NAME)
+    if registered is not None:
+        return sorted(resource['resource_key'] for resource in registered)
+
+    print("⚠️  Registry not seeded - scanning for all unique resources...")
+    return sorted(resource['resource_key'] for resource in scan_resources(TABLE_NAME))
 
 
 def get_all_entries_for_resource(resource_name):
@@ -7,9 +7,14 @@ Variations found:
 - Diego_Diego (133) → Diogo_Diogo
 - Gary_Manderacas (7) → Gary_Mandaracas
 """
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
 import boto3
 import json
 import time
+from bulk_delete import BulkDeleter, query_partition
 
 # AWS Configuration
 REGION = 'us-east-1'
@@ -52,33 +57,15 @@ def get_all_images_for_person(resource_name):
 
 def delete_all_entries_for_person(resource_name):
     """Delete all DynamoDB entries for a person."""
-    query_kwargs = {
-        'TableName': TABLE_NAME,
-        'KeyConditionExpression': 'ResourceName = :rn',
-        'ExpressionAttributeValues': {
-            ':rn': {'S': resource_name}
-        }
-    }
-
-    deleted_count = 0
     try:
-        response = dynamodb.query(**query_kwargs)
-        items = response.get('Items', [])
-
-        for item in items:
-            resource_name_key = item['ResourceName']['S']
-            date_project_code = item['DateProjectCode']['S']
-
-            dynamodb.delete_item(
-                TableName=TABLE_NAME,
-                Key={
-                    'ResourceName': {'S': resource_name_key},
-                    'DateProjectCode': {'S': date_project_code}
-                }
-            )
-            deleted_count += 1
-
-        return deleted_count
+        # Every page of the partition, deleted with parallel batch writers
+        report = BulkDeleter(TABLE_NAME, client=dynamodb, log_func=lambda msg: None).delete(
+            query_partition(TABLE_NAME, resource_name, client=dynamodb),
+            maintain_rollups=True
+        )
+        if report['failed']:
+            print(f"   ⚠️  {report['failed']} entries could not be deleted")
+        return report['deleted']
     except Exception as e:
         print(f"   ❌ Error: {e}")
         return 0
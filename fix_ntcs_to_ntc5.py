@@ -4,8 +4,14 @@ Delete NTCS entries and rescan with NTC5 correction.
 """
 import boto3
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from bulk_delete import BulkDeleter, segmented_scan
+from record_types import is_timesheet_row
+
 # AWS Configuration
 REGION = 'us-east-1'
 TABLE_NAME = 'TimesheetOCR-dev'
@@ -19,45 +25,41 @@ IMAGE = '2025-10-15_20h40_56.png'
 dynamodb = boto3.client('dynamodb', region_name=REGION)
 lambda_client = boto3.client('lambda', region_name=REGION)
 
+
+def _timesheet_items(items):
+    """Drop rollup/registry/cache/journal items (low-level client, so wire format)."""
+    return [
+        item for item in items
+        if is_timesheet_row({
+            'ResourceName': item['ResourceName']['S'],
+            'RecordType': item.get('RecordType', {}).get('S'),
+        })
+    ]
+
 def delete_ntcs_entries():
     """Delete all DynamoDB entries with NTCS124690."""
     print(f"\n🗑️  Deleting NTCS124690 entries...")
 
-    # Scan for entries with EXACTLY NTCS124690 project code
-    scan_kwargs = {
-        'TableName': TABLE_NAME,
-        'FilterExpression': 'ProjectCode = :code',
-        'ExpressionAttributeValues': {
-            ':code': {'S': 'NTCS124690'}
-        }
-    }
-
-    deleted_count = 0
-
     try:
-        response = dynamodb.scan(**scan_kwargs)
-        items = response.get('Items', [])
+        # Every page of the table; project rollups carry ProjectCode too - never delete those here
+        items = [
+            item for item in segmented_scan(
+                TABLE_NAME, client=dynamodb, keys_only=False,
+                FilterExpression='ProjectCode = :code',
+                ExpressionAttributeValues={':code': {'S': 'NTCS124690'}}
+            )
+            if is_timesheet_row(item)
+        ]
 
         print(f"   Found {len(items)} entries to delete")
 
         for item in items:
-            # Extract key attributes
-            resource_name = item['ResourceName']['S']
-            date_project_code = item['DateProjectCode']['S']
-            date = item['Date']['S']
-            project_code = item.get('ProjectCode', {}).get('S', 'N/A')
-
-            print(f"   - Deleting: {resource_name} | {date} | {project_code}")
-
-            # Delete the item
-            dynamodb.delete_item(
-                TableName=TABLE_NAME,
-                Key={
-                    'ResourceName': {'S': resource_name},
-                    'DateProjectCode': {'S': date_project_code}
-                }
-            )
-            deleted_count += 1
+            print(f"   - Deleting: {item['ResourceName']} | {item.get('Date', 'N/A')} | "
+                  f"{item.get('ProjectCode', 'N/A')}")
+
+        # Batched delete; rollups, registry and the delete journal follow the removed rows
+        report = BulkDeleter(TABLE_NAME, client=dynamodb).delete(items, maintain_rollups=True)
+        deleted_count = report['deleted']
 
         print(f"   ✅ Deleted {deleted_count} entries")
         return deleted_count
@@ -132,12 +134,12 @@ def main():
     }
 
     response = dynamodb.scan(**scan_kwargs)
-    ntcs_items = response.get('Items', [])
+    ntcs_items = _timesheet_items(response.get('Items', []))
 
     # Check for NTC5 entries (should exist)
     scan_kwargs['ExpressionAttributeValues'][':code']['S'] = 'NTC5124690'
     response = dynamodb.scan(**scan_kwargs)
-    ntc5_items = response.get('Items', [])
+    ntc5_items = _timesheet_items(response.get('Items', []))
 
     print(f"   NTCS124690 entries remaining: {len(ntcs_items)} (should be 0)")
     print(f"   NTC5124690 entries present: {len(ntc5_items)} (should be 7+)")
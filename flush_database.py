@@ -2,8 +2,15 @@
 """
 Flush DynamoDB database - Delete all timesheet entries
 """
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import json
 import boto3
 from datetime import datetime
+from decimal import Decimal
+from bulk_delete import BulkDeleter, segmented_scan
 
 DYNAMODB_TABLE = "TimesheetOCR-dev"
 REGION = "us-east-1"
@@ -28,65 +35,33 @@ def flush_database():
     print("Creating backup before deletion...")
     
     # Backup first
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    table = dynamodb.Table(DYNAMODB_TABLE)
-    
+    client = boto3.client('dynamodb', region_name=REGION)
+
     backup_file = f"backup_before_flush_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    
-    # Scan all items
-    response = table.scan()
-    items = response['Items']
-    
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        items.extend(response['Items'])
-    
+
+    # Scan all items (parallel segments, numbers already decoded to int/float)
+    items = list(segmented_scan(DYNAMODB_TABLE, client=client, keys_only=False))
+
     print(f"Found {len(items)} entries to delete")
-    
-    # Save backup
-    import json
-    from decimal import Decimal
-    
-    # Convert Decimal to float for JSON
-    def decimal_to_float(obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        elif isinstance(obj, dict):
-            return {k: decimal_to_float(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [decimal_to_float(item) for item in obj]
-        return obj
-    
-    items_serializable = [decimal_to_float(item) for item in items]
-    
+
     with open(backup_file, 'w') as f:
-        json.dump(items_serializable, f, indent=2)
-    
+        json.dump(items, f, indent=2, default=lambda value: float(value) if isinstance(value, Decimal) else str(value))
+
     print(f"✓ Backup saved to: {backup_file}")
     print()
     print("Deleting all entries...")
-    
-    # Delete all items
-    deleted_count = 0
-    with table.batch_writer() as batch:
-        for item in items:
-            batch.delete_item(
-                Key={
-                    'ResourceName': item['ResourceName'],
-                    'DateProjectCode': item['DateProjectCode']
-                }
-            )
-            deleted_count += 1
-            
-            if deleted_count % 100 == 0:
-                print(f"  Deleted {deleted_count}/{len(items)}...")
-    
+
+    # Delete all items with parallel batch writers
+    report = BulkDeleter(DYNAMODB_TABLE, client=client).delete(items, dedupe=False)
+    deleted_count = report['deleted']
+
     print()
     print("=" * 80)
     print("✓ DATABASE FLUSHED")
     print("=" * 80)
-    print(f"Deleted: {deleted_count} entries")
+    print(f"Deleted: {deleted_count} entries ({report['deletes_per_second']:.0f}/s)")
+    if report['failed']:
+        print(f"⚠️  Not deleted: {report['failed']} entries (run again to retry)")
     print(f"Backup: {backup_file}")
     print()
     print("You can now start fresh imports!")
@@ -17,6 +17,7 @@ from project_code_correction import (
     extract_code_from_project_name,
     generate_code_variations
 )
+from record_types import is_timesheet_row
 
 # AWS Configuration
 DYNAMODB_TABLE = "TimesheetOCR-dev"
@@ -44,7 +45,7 @@ def scan_and_analyze_quality():
 
     # Scan entire table
     scan_kwargs = {
-        'ProjectionExpression': 'ResourceName, #d, ProjectCode, ProjectName, SourceImage',
+        'ProjectionExpression': 'ResourceName, RecordType, #d, ProjectCode, ProjectName, SourceImage',
         'ExpressionAttributeNames': {
             '#d': 'Date'
         }
@@ -61,6 +62,8 @@ def scan_and_analyze_quality():
         items = response.get('Items', [])
 
         for item in items:
+            if not is_timesheet_row(item):
+                continue
             stats['total_records'] += 1
             resource = item.get('ResourceName', '')
             date = item.get('Date', '')  # Date is already extracted, just reference it
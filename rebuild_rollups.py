@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the materialized weekly/monthly rollups and the resource
+registry.
+
+Rollups are maintained incrementally on every write and delete, the
+registry on every write. This script recomputes both from the raw timesheet
+rows so drift (e.g. from scripts that delete items directly) can be
+detected and repaired, and seeds the registry on an existing table.
+
+Usage:
+  python rebuild_rollups.py --check     # Report mismatches, exit 1 if any
+  python rebuild_rollups.py             # Rewrite all rollup items
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import argparse
+import boto3
+from rollups import (
+    ROLLUP_TYPES,
+    compute_rollup_deltas,
+    find_rollup_mismatches,
+    query_rollups,
+    rollup_items
+)
+from resource_registry import (
+    REGISTRY_PARTITION,
+    REGISTRY_SEEDED_KEY,
+    query_registry,
+    registry_items,
+    seeded_marker
+)
+from week_document import expand_items
+
+# AWS Configuration
+REGION = 'us-east-1'
+TABLE_NAME = 'TimesheetOCR-dev'
+
+dynamodb = boto3.resource('dynamodb', region_name=REGION)
+
+
+def scan_timesheet_rows(table):
+    """Scan the table and return day-layout rows."""
+    print("📋 Scanning timesheet rows...")
+    items = []
+    scan_kwargs = {}
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return expand_items(items)
+
+
+def load_stored_rollups(table):
+    """Read every stored rollup item."""
+    stored = []
+    for rollup_type in ROLLUP_TYPES:
+        stored.extend(query_rollups(TABLE_NAME, rollup_type, table=table))
+    return stored
+
+
+def find_registry_mismatches(expected, stored):
+    """Compare rebuilt registry items with the stored ones."""
+    fields = ('FirstWeek', 'LastWeek', 'EntryCount', 'ZeroHourCount')
+    stored_by_key = {item['DateProjectCode']: item for item in stored}
+    mismatches = []
+    for item in expected:
+        current = stored_by_key.pop(item['DateProjectCode'], {})
+        if any(current.get(field) != item[field] for field in fields):
+            mismatches.append(item['DateProjectCode'])
+    return mismatches + sorted(stored_by_key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild or verify materialized rollups')
+    parser.add_argument('--check', action='store_true',
+                        help='Only compare stored rollups with the raw rows')
+    args = parser.parse_args()
+
+    table = dynamodb.Table(TABLE_NAME)
+
+    rows = scan_timesheet_rows(table)
+    expected = compute_rollup_deltas(rows)
+    stored = load_stored_rollups(table)
+    print(f"✅ {len(rows)} rows -> {len(expected)} rollups ({len(stored)} stored)")
+
+    mismatches = find_rollup_mismatches(expected, stored)
+
+    expected_registry = registry_items(rows)
+    stored_registry = [item for item in query_registry(TABLE_NAME, table=table)
+                       if item['DateProjectCode'] != REGISTRY_SEEDED_KEY]
+    registry_mismatches = find_registry_mismatches(expected_registry, stored_registry)
+    print(f"✅ {len(expected_registry)} registered resources ({len(stored_registry)} stored)")
+
+    if args.check:
+        for mismatch in mismatches:
+            partition, sort_key = mismatch['key']
+            print(f"⚠️  {partition} / {sort_key}: expected {mismatch['expected']}, stored {mismatch['stored']}")
+
+        for resource in registry_mismatches:
+            print(f"⚠️  {REGISTRY_PARTITION} / {resource}: out of date")
+
+        if mismatches or registry_mismatches:
+            print(f"\n❌ {len(mismatches)} rollup and {len(registry_mismatches)} registry mismatches found")
+            return 1
+
+        print("\n✅ Rollups and registry match the raw rows")
+        return 0
+
+    # Remove rollups that no longer have any rows, then rewrite the rest
+    stale_keys = {
+        (item['ResourceName'], item['DateProjectCode']) for item in stored
+    } - set(expected)
+    stale_keys |= {
+        (REGISTRY_PARTITION, item['DateProjectCode']) for item in stored_registry
+    } - {(REGISTRY_PARTITION, item['DateProjectCode']) for item in expected_registry}
+
+    with table.batch_writer() as batch:
+        for partition, sort_key in stale_keys:
+            batch.delete_item(Key={'ResourceName': partition, 'DateProjectCode': sort_key})
+        for item in rollup_items(expected):
+            batch.put_item(Item=item)
+        for item in expected_registry:
+            batch.put_item(Item=item)
+        # Readers trust the registry (and stop scanning) from here on
+        batch.put_item(Item=seeded_marker())
+
+    print(f"🗑️  Deleted {len(stale_keys)} stale rollup/registry items")
+    print(f"✅ Wrote {len(expected)} rollups ({len(mismatches)} were out of date)")
+    print(f"✅ Wrote {len(expected_registry)} registry items ({len(registry_mismatches)} were out of date)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,9 +5,14 @@ This will use the improved OCR prompt and normalization rules
 """
 import boto3
 import json
+import os
+import sys
 import time
 from botocore.exceptions import ClientError
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from record_types import is_timesheet_row
+
 DYNAMODB_TABLE = "TimesheetOCR-dev"
 S3_BUCKET = "timesheetocr-input-dev-016164185850"
 LAMBDA_FUNCTION = "TimesheetOCR-ocr-dev"
@@ -29,7 +34,11 @@ def flush_dynamodb():
         response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
         items.extend(response.get('Items', []))
 
-    print(f"Found {len(items)} items to delete")
+    # Rollups, registry, cache and journal go too - reprocessing rebuilds
+    # them, and stale counters would double up on top of the new rows
+    timesheet_count = sum(1 for item in items if is_timesheet_row(item))
+    print(f"Found {len(items)} items to delete "
+          f"({timesheet_count} timesheet entries, {len(items) - timesheet_count} derived items)")
 
     if len(items) == 0:
         print("✓ Table is already empty")
@@ -0,0 +1,373 @@
+"""
+Persistent approval queue backed by SQLite.
+
+load_pending_images() used to rebuild the queue from scratch on every
+reload: one unpaginated list_objects_v2 call (so it stopped at 1,000 images)
+plus a full scan of the ProcessedImages table, with the result held in
+module globals. ApprovalQueue keeps the queue on disk instead:
+
+  - Incremental sync: list_objects_v2 with StartAfter=<last key seen>,
+    following ContinuationToken, so a reload only lists new keys
+  - Full sync: lists the whole bucket (paginated), drops rows whose object
+    is gone and imports ProcessedImages once - on first use, on demand and
+    every APPROVAL_FULL_SYNC_SECONDS (keys that sort before the last seen
+    key are only picked up here, or when the web app's own upload adds them)
+  - Processed state is tracked per key as the reviewer approves / rejects
+  - Multiple reviewers: claim_next() leases an image to one reviewer for
+    APPROVAL_LEASE_SECONDS; an expired lease makes it claimable again
+
+Statuses: pending, claimed, approved, rejected, submitted (sent for async
+OCR by auto-approve), failed. Rejected / submitted / failed images go back
+to pending on reload, as the old in-memory queue did.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+APPROVAL_QUEUE_DB = os.environ.get('APPROVAL_QUEUE_DB', 'approval_queue.db')
+APPROVAL_LEASE_SECONDS = int(os.environ.get('APPROVAL_LEASE_SECONDS', '600'))
+APPROVAL_FULL_SYNC_SECONDS = int(os.environ.get('APPROVAL_FULL_SYNC_SECONDS', '3600'))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+OPEN_STATUSES = ('pending', 'claimed')
+DONE_STATUSES = ('approved', 'rejected', 'submitted', 'failed')
+RESET_ON_RELOAD = ('rejected', 'submitted', 'failed')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    image_key TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    added_at REAL NOT NULL,
+    decided_at REAL
+);
+CREATE INDEX IF NOT EXISTS images_status ON images (status, image_key);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _is_image(key: str) -> bool:
+    return key.lower().endswith(IMAGE_EXTENSIONS)
+
+
+class ApprovalQueue:
+    """Disk-backed queue of S3 images awaiting review, with reviewer leases."""
+
+    def __init__(
+        self,
+        bucket: str,
+        s3_client,
+        processed_table=None,
+        db_path: str = APPROVAL_QUEUE_DB,
+        lease_seconds: int = APPROVAL_LEASE_SECONDS,
+        full_sync_seconds: int = APPROVAL_FULL_SYNC_SECONDS,
+        log_func=print
+    ):
+        """
+        Args:
+            bucket: S3 input bucket
+            s3_client: boto3 S3 client
+            processed_table: boto3 Table for ProcessedImages (imported on full sync)
+            db_path: SQLite file (':memory:' for a throwaway queue)
+            lease_seconds: How long a claimed image stays reserved for its reviewer
+            full_sync_seconds: Age after which sync() does a full resync
+            log_func: Logger for sync messages
+        """
+        self.bucket = bucket
+        self.s3 = s3_client
+        self.processed_table = processed_table
+        self.lease_seconds = lease_seconds
+        self.full_sync_seconds = full_sync_seconds
+        self.log = log_func
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        if db_path != ':memory:':
+            self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Meta values
+    # ------------------------------------------------------------------
+
+    def _get_meta(self, key: str, default: str = None) -> Optional[str]:
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, key: str, value):
+        self._db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    # ------------------------------------------------------------------
+    # Syncing from S3
+    # ------------------------------------------------------------------
+
+    def _list_keys(self, start_after: str = None) -> Iterable[str]:
+        kwargs = {'Bucket': self.bucket}
+        if start_after:
+            kwargs['StartAfter'] = start_after
+        while True:
+            response = self.s3.list_objects_v2(**kwargs)
+            for obj in response.get('Contents', []):
+                if _is_image(obj['Key']):
+                    yield obj['Key']
+            if not response.get('IsTruncated'):
+                break
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+    def _processed_keys(self) -> Iterable[str]:
+        if self.processed_table is None:
+            return
+        kwargs = {'ProjectionExpression': 'ImageKey'}
+        while True:
+            response = self.processed_table.scan(**kwargs)
+            for item in response.get('Items', []):
+                yield item['ImageKey']
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def needs_full_sync(self) -> bool:
+        """True if the queue has never been fully synced or the last full sync is stale."""
+        last = float(self._get_meta('full_synced_at', '0'))
+        return time.time() - last >= self.full_sync_seconds
+
+    def sync(self, full: bool = None) -> Dict:
+        """
+        Bring the queue up to date with the bucket.
+
+        Args:
+            full: Force (True) or skip (False) a full resync; None decides by age
+
+        Returns:
+            Dict with mode, listed, added, removed, processed and seconds
+        """
+        start = time.time()
+        if full is None:
+            full = self.needs_full_sync()
+
+        # Network reads happen before taking the lock, so reviewers are not blocked
+        with self._lock:
+            last_key = self._get_meta('last_key', '')
+        keys = list(self._list_keys(None if full else last_key))
+        processed_keys = list(self._processed_keys()) if full else []
+        now = time.time()
+
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                added = self._db.executemany(
+                    'INSERT OR IGNORE INTO images (image_key, added_at) VALUES (?, ?)',
+                    ((key, now) for key in keys)
+                ).rowcount
+
+                removed = processed = 0
+                if full:
+                    self._db.execute('CREATE TEMP TABLE IF NOT EXISTS listed (image_key TEXT PRIMARY KEY)')
+                    self._db.execute('DELETE FROM listed')
+                    self._db.executemany('INSERT OR IGNORE INTO listed VALUES (?)', ((k,) for k in keys))
+                    removed = self._db.execute(
+                        'DELETE FROM images WHERE image_key NOT IN (SELECT image_key FROM listed)'
+                    ).rowcount
+
+                    # Approved elsewhere (or before this queue existed) - not part of this pass
+                    processed = self._db.executemany(
+                        "UPDATE images SET status = 'approved', decided_at = NULL, "
+                        "lease_owner = NULL, lease_expires = NULL "
+                        "WHERE image_key = ? AND status IN ('pending', 'claimed')",
+                        ((key,) for key in processed_keys)
+                    ).rowcount
+                    self._set_meta('full_synced_at', now)
+
+                if keys:
+                    self._set_meta('last_key', max(max(keys), last_key))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+        result = {
+            'mode': 'full' if full else 'incremental',
+            'listed': len(keys),
+            'added': added,
+            'removed': removed,
+            'processed': processed,
+            'seconds': round(time.time() - start, 3),
+        }
+        self.log(f"🔄 Approval queue {result['mode']} sync: {result['listed']} listed, "
+                 f"{added} added, {removed} removed ({result['seconds']}s)")
+        return result
+
+    def reload(self, full: bool = None) -> Dict:
+        """
+        Start a new review pass: skipped images become pending again, then sync.
+
+        Returns:
+            sync() result plus the open count before and after
+        """
+        with self._lock:
+            old_open = self._count(OPEN_STATUSES)
+            placeholders = ','.join('?' * len(RESET_ON_RELOAD))
+            self._db.execute(
+                f"UPDATE images SET status = 'pending', decided_at = NULL WHERE status IN ({placeholders})",
+                RESET_ON_RELOAD
+            )
+            self._set_meta('pass_started_at', time.time())
+
+        result = self.sync(full)
+        result['old_count'] = old_open
+        result['new_count'] = self.counts()['open']
+        return result
+
+    def add(self, keys: Iterable[str]) -> int:
+        """Add newly uploaded keys as pending (no S3 listing needed). Returns the number added."""
+        now = time.time()
+        with self._lock:
+            return self._db.executemany(
+                'INSERT OR IGNORE INTO images (image_key, added_at) VALUES (?, ?)',
+                ((key, now) for key in keys if _is_image(key))
+            ).rowcount
+
+    # ------------------------------------------------------------------
+    # Reviewing
+    # ------------------------------------------------------------------
+
+    def claim_next(self, reviewer: str) -> Optional[str]:
+        """
+        Lease the next image to a reviewer.
+
+        A reviewer who already holds an unexpired lease gets the same image
+        back (e.g. after a page refresh); otherwise the first pending image,
+        or one whose lease has expired, is claimed.
+
+        Returns:
+            Image key, or None when nothing is left to review
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._db.execute(
+                    "SELECT image_key FROM images WHERE status = 'claimed' AND lease_owner = ? "
+                    "AND lease_expires > ? ORDER BY image_key LIMIT 1",
+                    (reviewer, now)
+                ).fetchone()
+                if row is None:
+                    row = self._db.execute(
+                        "SELECT image_key FROM images WHERE status = 'pending' "
+                        "OR (status = 'claimed' AND lease_expires <= ?) ORDER BY image_key LIMIT 1",
+                        (now,)
+                    ).fetchone()
+
+                image_key = row['image_key'] if row else None
+                if image_key:
+                    self._db.execute(
+                        "UPDATE images SET status = 'claimed', lease_owner = ?, lease_expires = ? "
+                        "WHERE image_key = ?",
+                        (reviewer, now + self.lease_seconds, image_key)
+                    )
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return image_key
+
+    def claim(self, image_key: str, reviewer: str) -> bool:
+        """
+        Lease one specific image (used by bulk jobs working through open_keys()).
+
+        Returns:
+            True if the image is now leased to the reviewer, False if it was
+            decided or is leased to someone else in the meantime
+        """
+        now = time.time()
+        with self._lock:
+            return self._db.execute(
+                "UPDATE images SET status = 'claimed', lease_owner = ?, lease_expires = ? "
+                "WHERE image_key = ? AND (status = 'pending' "
+                "OR (status = 'claimed' AND (lease_owner = ? OR lease_expires <= ?)))",
+                (reviewer, now + self.lease_seconds, image_key, reviewer, now)
+            ).rowcount == 1
+
+    def peek(self, after: str, count: int) -> List[str]:
+        """Next pending (unclaimed) keys after a given key - the prefetch window."""
+        if count <= 0:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT image_key FROM images WHERE status = 'pending' AND image_key > ? "
+                "ORDER BY image_key LIMIT ?",
+                (after or '', count)
+            ).fetchall()
+        return [row['image_key'] for row in rows]
+
+    def open_keys(self, reviewer: str = None) -> List[str]:
+        """Pending keys plus keys leased to this reviewer or with an expired lease."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT image_key FROM images WHERE status = 'pending' "
+                "OR (status = 'claimed' AND (lease_owner = ? OR lease_expires <= ?)) ORDER BY image_key",
+                (reviewer, time.time())
+            ).fetchall()
+        return [row['image_key'] for row in rows]
+
+    def complete(self, image_key: str, status: str):
+        """Record a decision for an image and release its lease."""
+        if status not in DONE_STATUSES:
+            raise ValueError(f"Unknown queue status: {status}")
+        with self._lock:
+            self._db.execute(
+                "UPDATE images SET status = ?, decided_at = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE image_key = ?",
+                (status, time.time(), image_key)
+            )
+
+    def release(self, image_key: str):
+        """Put a claimed image back to pending."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE images SET status = 'pending', lease_owner = NULL, lease_expires = NULL "
+                "WHERE image_key = ? AND status = 'claimed'",
+                (image_key,)
+            )
+
+    def remove(self, image_key: str):
+        """Forget an image (deleted from S3)."""
+        with self._lock:
+            self._db.execute('DELETE FROM images WHERE image_key = ?', (image_key,))
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def _count(self, statuses) -> int:
+        placeholders = ','.join('?' * len(statuses))
+        return self._db.execute(
+            f'SELECT COUNT(*) FROM images WHERE status IN ({placeholders})', tuple(statuses)
+        ).fetchone()[0]
+
+    def counts(self) -> Dict:
+        """
+        Get queue counts.
+
+        Returns:
+            Dict with a count per status, plus open (pending + claimed) and
+            reviewed (decided since the current pass started)
+        """
+        with self._lock:
+            counts = {status: 0 for status in OPEN_STATUSES + DONE_STATUSES}
+            for row in self._db.execute('SELECT status, COUNT(*) AS n FROM images GROUP BY status'):
+                counts[row['status']] = row['n']
+            pass_started = float(self._get_meta('pass_started_at', '0'))
+            counts['reviewed'] = self._db.execute(
+                'SELECT COUNT(*) FROM images WHERE decided_at >= ?', (pass_started,)
+            ).fetchone()[0]
+        counts['open'] = counts['pending'] + counts['claimed']
+        return counts
@@ -0,0 +1,285 @@
+"""
+Parallel bulk-delete engine for the timesheet table.
+
+The web app's flush, flush_database.py and the duplicate-fix scripts each
+deleted serially - a scan followed by one batch_writer, or a delete_item
+per row. BulkDeleter is the one engine they share now:
+
+  - Takes any stream of items or keys: a segmented parallel scan
+    (segmented_scan()), a partition query (query_partition()) or an
+    explicit list. The stream is consumed lazily, and with dedupe=False
+    (for segmented_scan(), whose keys are unique) nothing grows with the
+    number of keys, so a full-table flush never holds the table in memory
+  - Sends BatchWriteItem requests of 25 keys from BULK_DELETE_WRITERS
+    threads, retrying UnprocessedItems with exponential backoff
+  - Dry run counts what would be deleted without writing
+  - Optionally keeps rollups in step for the rows it deleted
+  - Records the months it deleted from in the tombstone journal
+    (change_journal.py), so incremental exports see the deletes; months
+    are counted as keys stream past
+  - Reports deletes per second (logged as it goes and in the result)
+
+Usage:
+    deleter = BulkDeleter(table_name, log_func=log_message)
+    report = deleter.delete(segmented_scan(table_name))
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+from bulk_jobs import is_throttle_error
+from collections import Counter
+from change_journal import months_of_key, record_month_deletions
+from dynamo_codec import decode_item, dynamodb_client, query_items, scan_items
+from resource_registry import update_resources
+from rollups import update_rollups
+from week_document import expand_items
+
+BULK_DELETE_WRITERS = int(os.environ.get('BULK_DELETE_WRITERS', '4'))
+BULK_DELETE_SCAN_SEGMENTS = int(os.environ.get('BULK_DELETE_SCAN_SEGMENTS', '4'))
+
+# BatchWriteItem accepts at most 25 requests
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_MAX_RETRIES = 8
+
+# Log a progress line every this many deletes
+PROGRESS_EVERY = 1000
+
+# Items buffered between the scan segment threads and the consumer
+SCAN_QUEUE_SIZE = 10000
+
+KEY_FIELDS = ('ResourceName', 'DateProjectCode')
+
+
+def segmented_scan(table_name: str, client=None, segments: int = BULK_DELETE_SCAN_SEGMENTS,
+                   keys_only: bool = True, **scan_kwargs) -> Iterator[Dict]:
+    """
+    Scan a table with parallel segments, yielding decoded items as they arrive.
+
+    Args:
+        table_name: DynamoDB table name
+        client: Optional low-level DynamoDB client
+        segments: Parallel scan segments (TotalSegments)
+        keys_only: Project only the key attributes (enough for a flush)
+        **scan_kwargs: Extra Scan parameters in wire format (FilterExpression, ...)
+
+    Yields:
+        Decoded items, in no particular order. Closing the generator early
+        stops the segment threads.
+    """
+    if keys_only:
+        scan_kwargs.setdefault('ProjectionExpression', ', '.join(KEY_FIELDS))
+
+    segments = max(1, segments)
+    items = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+    done = object()
+    errors = []
+    stop = threading.Event()
+
+    def put(value) -> bool:
+        # Never block for good on a full queue once the consumer has gone
+        while not stop.is_set():
+            try:
+                items.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_segment(segment):
+        try:
+            for item in scan_items(table_name, client=client, Segment=segment,
+                                   TotalSegments=segments, **dict(scan_kwargs)):
+                if not put(item):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    for segment in range(segments):
+        threading.Thread(target=scan_segment, args=(segment,), daemon=True).start()
+
+    try:
+        finished = 0
+        while finished < segments:
+            item = items.get()
+            if item is done:
+                finished += 1
+            else:
+                yield item
+    finally:
+        stop.set()
+    if errors:
+        raise errors[0]
+
+
+def query_partition(table_name: str, resource_name: str, client=None, **query_kwargs) -> Iterator[Dict]:
+    """
+    Yield every item of one ResourceName partition (all pages).
+
+    Args:
+        table_name: DynamoDB table name
+        resource_name: Partition key value
+        client: Optional low-level DynamoDB client
+        **query_kwargs: Extra Query parameters in wire format (FilterExpression, ...)
+    """
+    values = dict(query_kwargs.pop('ExpressionAttributeValues', {}))
+    values[':bulk_pk'] = {'S': resource_name}
+    return query_items(
+        table_name,
+        client=client,
+        KeyConditionExpression='ResourceName = :bulk_pk',
+        ExpressionAttributeValues=values,
+        **query_kwargs
+    )
+
+
+def _plain_key(item: Dict) -> Tuple[str, str]:
+    # Accept decoded items and wire-format items from scripts using the low-level client
+    values = []
+    for field in KEY_FIELDS:
+        value = item[field]
+        values.append(value['S'] if isinstance(value, dict) else value)
+    return tuple(values)
+
+
+class BulkDeleter:
+    """Deletes a stream of items with parallel BatchWriteItem writers."""
+
+    def __init__(self, table_name: str, client=None, writers: int = BULK_DELETE_WRITERS,
+                 log_func=print, sleep=time.sleep, journal: bool = True):
+        """
+        Args:
+            table_name: DynamoDB table name
+            client: Optional low-level DynamoDB client (defaults to dynamo_codec's client)
+            writers: BatchWriteItem requests in flight at once
+            log_func: Logger for progress messages
+            sleep: Sleep function for unprocessed-item backoff (replaced in tests)
+            journal: Write tombstones for the deleted items
+        """
+        self.table_name = table_name
+        self.client = client or dynamodb_client
+        self.writers = max(1, writers)
+        self.log = log_func
+        self.sleep = sleep
+        self.journal = journal
+
+    def _write_batch(self, keys: List[Tuple[str, str]]) -> Tuple[int, List[Tuple[str, str]], int]:
+        requests = [
+            {'DeleteRequest': {'Key': {'ResourceName': {'S': pk}, 'DateProjectCode': {'S': sk}}}}
+            for pk, sk in keys
+        ]
+        retries = 0
+        while requests:
+            try:
+                response = self.client.batch_write_item(RequestItems={self.table_name: requests})
+                requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self.log(f"⚠️  Batch delete failed: {e}")
+                    break
+            if not requests or retries >= BATCH_WRITE_MAX_RETRIES:
+                break
+            retries += 1
+            self.sleep(min(10.0, 0.05 * 2 ** retries))
+
+        failed = [
+            (r['DeleteRequest']['Key']['ResourceName']['S'], r['DeleteRequest']['Key']['DateProjectCode']['S'])
+            for r in requests
+        ]
+        return len(keys) - len(failed), failed, retries
+
+    def delete(self, items: Iterable[Dict], dry_run: bool = False, maintain_rollups: bool = False,
+               dedupe: bool = True) -> Dict:
+        """
+        Delete every item in a stream.
+
+        Args:
+            items: Decoded (or wire-format) items or key dicts; duplicates are
+                   deleted once
+            dry_run: Count what would be deleted without writing
+            dedupe: Remember every key to skip duplicates; pass False for
+                    streams whose keys are already unique (segmented_scan()),
+                    so memory stays flat however large the table
+            maintain_rollups: Subtract the deleted rows from the rollups and the
+                              resource registry (items must then carry their
+                              attributes, not just keys)
+
+        Returns:
+            Dict with requested, deleted, failed, failed_keys, batches,
+            retries, seconds, deletes_per_second and dry_run
+        """
+        start = time.time()
+        report = {'requested': 0, 'deleted': 0, 'failed': 0, 'failed_keys': [],
+                  'batches': 0, 'retries': 0, 'dry_run': dry_run}
+        seen = set()
+        month_counts = Counter()
+        rows_by_key = {}
+        lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(self.writers * 2)
+        next_progress = [PROGRESS_EVERY]
+
+        def finished(future):
+            try:
+                deleted, failed, retries = future.result()
+                with lock:
+                    report['deleted'] += deleted
+                    report['failed'] += len(failed)
+                    report['failed_keys'].extend(failed)
+                    report['retries'] += retries
+                    if report['deleted'] >= next_progress[0]:
+                        next_progress[0] += PROGRESS_EVERY
+                        rate = report['deleted'] / max(time.time() - start, 1e-6)
+                        self.log(f"  🗑️  {report['deleted']} deleted ({rate:.0f}/s)")
+            finally:
+                in_flight.release()
+
+        def submit(pool, batch):
+            report['batches'] += 1
+            if dry_run:
+                return
+            in_flight.acquire()
+            pool.submit(self._write_batch, batch).add_done_callback(finished)
+
+        with ThreadPoolExecutor(max_workers=self.writers) as pool:
+            batch = []
+            for item in items:
+                key = _plain_key(item)
+                if dedupe:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                report['requested'] += 1
+                month_counts.update(months_of_key(*key))
+                if maintain_rollups:
+                    rows_by_key[key] = decode_item(item) if isinstance(item['ResourceName'], dict) else item
+                batch.append(key)
+                if len(batch) == BATCH_WRITE_SIZE:
+                    submit(pool, batch)
+                    batch = []
+            if batch:
+                submit(pool, batch)
+
+        if not dry_run:
+            failed = set(report['failed_keys'])
+            if self.journal and report['deleted']:
+                for key in failed:
+                    month_counts.subtract(months_of_key(*key))
+                record_month_deletions(self.table_name, month_counts, source='bulk_delete', client=self.client)
+            if maintain_rollups:
+                removed = [row for key, row in rows_by_key.items() if key not in failed]
+                if removed:
+                    removed = expand_items(removed)
+                    update_rollups(self.table_name, removed=removed)
+                    update_resources(self.table_name, removed=removed)
+
+        report['seconds'] = round(time.time() - start, 3)
+        count = report['requested'] if dry_run else report['deleted']
+        report['deletes_per_second'] = round(count / report['seconds'], 1) if report['seconds'] else float(count)
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.log(f"✓ {verb} {count} items in {report['seconds']:.1f}s "
+                 f"({report['deletes_per_second']:.0f}/s, {report['failed']} failed, {report['retries']} retries)")
+        return report
@@ -0,0 +1,266 @@
+"""
+Background bulk jobs with a bounded concurrency window.
+
+/api/approval/auto-approve-all used to invoke the OCR Lambda for every
+remaining image inside the HTTP request, so large queues timed out the
+request and could exhaust Lambda concurrency. BulkJobManager runs such a
+batch in a background thread instead and returns a job id at once:
+
+  - At most BULK_JOB_CONCURRENCY items are in flight (one worker each)
+  - A throttle (TooManyRequestsException, SlowDown, ...) pauses every
+    worker for an exponentially growing backoff with jitter and retries the
+    item, up to BULK_JOB_MAX_RETRIES times; a success resets the backoff
+  - Per-item outcomes and progress counters are kept in memory for the
+    status endpoint (the last BULK_JOB_HISTORY jobs)
+
+Usage:
+    jobs = BulkJobManager(log_func=log_message)
+    job_id = jobs.start('auto-approve', keys, process_one)
+    jobs.get(job_id)
+"""
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+BULK_JOB_CONCURRENCY = int(os.environ.get('BULK_JOB_CONCURRENCY', '4'))
+BULK_JOB_MAX_RETRIES = int(os.environ.get('BULK_JOB_MAX_RETRIES', '6'))
+BULK_JOB_BACKOFF_SECONDS = float(os.environ.get('BULK_JOB_BACKOFF_SECONDS', '1'))
+BULK_JOB_MAX_BACKOFF_SECONDS = float(os.environ.get('BULK_JOB_MAX_BACKOFF_SECONDS', '60'))
+BULK_JOB_HISTORY = 20
+
+THROTTLE_ERROR_CODES = {
+    'TooManyRequestsException',
+    'ThrottlingException',
+    'Throttling',
+    'SlowDown',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+}
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Check whether an exception is an AWS throttling error."""
+    response = getattr(error, 'response', None) or {}
+    code = response.get('Error', {}).get('Code', '')
+    return code in THROTTLE_ERROR_CODES or type(error).__name__ in THROTTLE_ERROR_CODES
+
+
+class _Pacer:
+    """Pause shared by all workers of a job after a throttle."""
+
+    def __init__(self, base: float, cap: float, sleep=time.sleep):
+        self.base = base
+        self.cap = cap
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self._consecutive = 0
+
+    def wait(self):
+        delay = self._resume_at - time.time()
+        if delay > 0:
+            self.sleep(delay)
+
+    def throttled(self) -> float:
+        with self._lock:
+            self._consecutive += 1
+            delay = min(self.cap, self.base * 2 ** (self._consecutive - 1))
+            delay *= random.uniform(0.5, 1.0)
+            self._resume_at = max(self._resume_at, time.time() + delay)
+            return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._consecutive = 0
+
+
+class BulkJobManager:
+    """Runs bulk jobs in the background and tracks their progress."""
+
+    def __init__(
+        self,
+        concurrency: int = BULK_JOB_CONCURRENCY,
+        max_retries: int = BULK_JOB_MAX_RETRIES,
+        backoff_seconds: float = BULK_JOB_BACKOFF_SECONDS,
+        max_backoff_seconds: float = BULK_JOB_MAX_BACKOFF_SECONDS,
+        history: int = BULK_JOB_HISTORY,
+        log_func=print,
+        sleep=time.sleep
+    ):
+        """
+        Args:
+            concurrency: Items processed at the same time per job
+            max_retries: Throttle retries per item before it is marked failed
+            backoff_seconds: First backoff after a throttle (doubles each time)
+            max_backoff_seconds: Upper bound of a single backoff
+            history: Finished jobs kept for the status endpoint
+            log_func: Logger for progress messages
+            sleep: Sleep function (replaced in tests)
+        """
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.history = history
+        self.log = log_func
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()   # job_id -> job dict
+        self._threads = {}
+
+    def start(self, name: str, items: Iterable[str], work_func: Callable[[str], Optional[Dict]],
+              concurrency: int = None) -> str:
+        """
+        Start a job in the background.
+
+        Args:
+            name: Job type shown in status (e.g. 'auto-approve')
+            items: Item keys to process
+            work_func: Processes one item; returns an optional dict merged into
+                       the item's outcome (a 'status' key overrides 'succeeded')
+                       and raises on failure
+            concurrency: Override of the manager's concurrency for this job
+
+        Returns:
+            Job id
+        """
+        items = list(items)
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'job_id': job_id,
+            'name': name,
+            'status': 'running',
+            'total': len(items),
+            'done': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'skipped': 0,
+            'throttles': 0,
+            'concurrency': max(1, concurrency or self.concurrency),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'finished_at': None,
+            'cancel_requested': False,
+            'results': OrderedDict((item, {'status': 'queued'}) for item in items),
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]['status'] == 'running':
+                    break
+                self._jobs.pop(oldest)
+
+        thread = threading.Thread(target=self._run, args=(job, items, work_func), daemon=True)
+        self._threads[job_id] = thread
+        thread.start()
+        self.log(f"🚀 Started {name} job {job_id}: {len(items)} items, {job['concurrency']} at a time")
+        return job_id
+
+    def _process(self, job: Dict, item: str, work_func, pacer: _Pacer):
+        outcome = job['results'][item]
+        start = time.time()
+        attempts = 0
+
+        while True:
+            if job['cancel_requested']:
+                outcome['status'] = 'cancelled'
+                break
+            pacer.wait()
+            attempts += 1
+            outcome['status'] = 'running'
+            try:
+                extra = work_func(item) or {}
+                pacer.succeeded()
+                outcome.update({'status': 'succeeded'})
+                outcome.update(extra)
+                break
+            except Exception as e:
+                if is_throttle_error(e) and attempts <= self.max_retries:
+                    delay = pacer.throttled()
+                    with self._lock:
+                        job['throttles'] += 1
+                    self.log(f"⏳ Throttled on {item}, backing off {delay:.1f}s (attempt {attempts})")
+                    continue
+                outcome.update({'status': 'failed', 'error': str(e)})
+                self.log(f"✗ {job['name']} failed for {item}: {e}")
+                break
+
+        outcome.update({'attempts': attempts, 'seconds': round(time.time() - start, 3)})
+        with self._lock:
+            job['done'] += 1
+            if outcome['status'] == 'succeeded':
+                job['succeeded'] += 1
+            elif outcome['status'] == 'failed':
+                job['failed'] += 1
+            else:
+                job['skipped'] += 1
+
+    def _run(self, job: Dict, items: List[str], work_func):
+        pacer = _Pacer(self.backoff_seconds, self.max_backoff_seconds, self.sleep)
+        with ThreadPoolExecutor(max_workers=job['concurrency'], thread_name_prefix=f"bulk-{job['job_id']}") as pool:
+            list(pool.map(lambda item: self._process(job, item, work_func, pacer), items))
+
+        with self._lock:
+            job['status'] = 'cancelled' if job['cancel_requested'] else 'completed'
+            job['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self._threads.pop(job['job_id'], None)
+        self.log(f"✓ {job['name']} job {job['job_id']} {job['status']}: {job['succeeded']} succeeded, "
+                 f"{job['failed']} failed, {job['skipped']} skipped, {job['throttles']} throttles")
+
+    def get(self, job_id: str, include_results: bool = True) -> Optional[Dict]:
+        """
+        Get a job's progress.
+
+        Args:
+            job_id: Id returned by start()
+            include_results: Include the per-item outcomes
+
+        Returns:
+            Job dict (a copy), or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {k: v for k, v in job.items() if k not in ('results', 'cancel_requested')}
+            status['percent'] = round(100 * job['done'] / job['total'], 1) if job['total'] else 100.0
+            if include_results:
+                status['results'] = {item: dict(outcome) for item, outcome in job['results'].items()}
+        return status
+
+    def running(self, name: str = None) -> Optional[str]:
+        """Id of a running job (of the given type), if any."""
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['status'] == 'running' and (name is None or job['name'] == name):
+                    return job_id
+        return None
+
+    def list_jobs(self) -> List[Dict]:
+        """Progress of every tracked job, newest first (without per-item outcomes)."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.get(job_id, include_results=False) for job_id in reversed(job_ids)]
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a running job to stop; items already in flight finish. Returns False if not running."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != 'running':
+                return False
+            job['cancel_requested'] = True
+        return True
+
+    def wait(self, job_id: str, timeout: float = None):
+        """Block until a job has finished (used by tests and scripts)."""
+        thread = self._threads.get(job_id)
+        if thread:
+            thread.join(timeout)
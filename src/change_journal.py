@@ -0,0 +1,150 @@
+"""
+Tombstone journal of deleted timesheet items.
+
+Every write leaves a trace (ProcessingTimestamp on the row, LastUpdated on
+its rollups), but a delete leaves nothing to look for, so a consumer working
+from "what changed since T" - the incremental export - could never tell that
+a month lost rows. Delete paths record tombstones in a dedicated partition:
+
+  Partition Key (ResourceName)   Sort Key (DateProjectCode)
+  JOURNAL#DELETES                <DeletedAt ISO>#<YYYY-MM>#<id>
+
+  Attributes:
+    - RecordType: TOMBSTONE
+    - DeletedYearMonth: Month the deleted rows belonged to
+    - DeletedCount: Items deleted from that month by the call
+    - Source: Delete path that wrote the tombstone
+    - ExpiresAt: Epoch seconds, for the table's TTL
+
+Consumers rewrite whole months, so one tombstone per month per delete call
+is enough - a full flush writes a few dozen items, not one per row. The
+month is derived from the key alone, so key-only deletes are covered too.
+"""
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Set, Tuple, Union
+from dynamo_codec import dynamodb_client, query_items
+from record_types import TOMBSTONE, is_system_partition
+from week_document import WEEK_KEY_PREFIX
+
+JOURNAL_PARTITION = 'JOURNAL#DELETES'
+JOURNAL_RETENTION_DAYS = int(os.environ.get('JOURNAL_RETENTION_DAYS', '35'))
+
+
+def _is_year_month(value: str) -> bool:
+    return len(value) == 7 and value[4] == '-' and value[:4].isdigit() and value[5:].isdigit()
+
+
+def months_of_key(resource_name: str, sort_key: str) -> Set[str]:
+    """
+    Get the month(s) a stored item holds rows for.
+
+    Args:
+        resource_name: Partition key value
+        sort_key: DateProjectCode ("YYYY-MM-DD#CODE" or "WEEK#<monday>")
+
+    Returns:
+        Set of YYYY-MM strings (two for a week spanning a month end, none for system items)
+    """
+    if is_system_partition(resource_name):
+        return set()
+    if sort_key.startswith(WEEK_KEY_PREFIX):
+        try:
+            monday = datetime.strptime(sort_key[len(WEEK_KEY_PREFIX):][:10], '%Y-%m-%d')
+        except ValueError:
+            return set()
+        return {monday.strftime('%Y-%m'), (monday + timedelta(days=6)).strftime('%Y-%m')}
+    return {sort_key[:7]} if _is_year_month(sort_key[:7]) else set()
+
+
+def _key(item: Union[Dict, Tuple[str, str]]) -> Tuple[str, str]:
+    if isinstance(item, tuple):
+        return item
+    return (item['ResourceName'], item['DateProjectCode'])
+
+
+def record_deletions(table_name: str, keys: Iterable[Union[Dict, Tuple[str, str]]], source: str = '',
+                     client=None) -> int:
+    """
+    Write tombstones for deleted items.
+
+    Failures are logged but never raised - the delete itself already happened.
+
+    Args:
+        table_name: DynamoDB table name
+        keys: Deleted items, key dicts or (ResourceName, DateProjectCode) tuples
+        source: Delete path, stored for auditing
+        client: Optional low-level DynamoDB client
+
+    Returns:
+        Number of tombstones written
+    """
+    counts = Counter()
+    for item in keys:
+        for month in months_of_key(*_key(item)):
+            counts[month] += 1
+    return record_month_deletions(table_name, counts, source=source, client=client)
+
+
+def record_month_deletions(table_name: str, counts: Dict[str, int], source: str = '', client=None) -> int:
+    """
+    Write tombstones from per-month delete counts (for callers that count as they go).
+
+    Args:
+        table_name: DynamoDB table name
+        counts: Mapping of YYYY-MM -> items deleted from that month
+        source: Delete path, stored for auditing
+        client: Optional low-level DynamoDB client
+
+    Returns:
+        Number of tombstones written
+    """
+    counts = {month: count for month, count in counts.items() if count > 0}
+    if not counts:
+        return 0
+
+    client = client or dynamodb_client
+    deleted_at = datetime.utcnow().isoformat()
+    expires_at = int(time.time()) + JOURNAL_RETENTION_DAYS * 86400
+    written = 0
+    try:
+        for month, count in sorted(counts.items()):
+            client.put_item(TableName=table_name, Item={
+                'ResourceName': {'S': JOURNAL_PARTITION},
+                'DateProjectCode': {'S': f"{deleted_at}#{month}#{uuid.uuid4().hex[:8]}"},
+                'RecordType': {'S': TOMBSTONE},
+                'DeletedYearMonth': {'S': month},
+                'DeletedCount': {'N': str(count)},
+                'DeletedAt': {'S': deleted_at},
+                'Source': {'S': source or 'unknown'},
+                'ExpiresAt': {'N': str(expires_at)},
+            })
+            written += 1
+    except Exception as e:
+        print(f"⚠️  Tombstone journal write failed (non-fatal): {e}")
+    return written
+
+
+def deleted_months_since(table_name: str, since: str, client=None) -> Set[str]:
+    """
+    Get the months that lost rows after a timestamp.
+
+    Args:
+        table_name: DynamoDB table name
+        since: ISO timestamp (utcnow().isoformat() format)
+        client: Optional low-level DynamoDB client
+
+    Returns:
+        Set of YYYY-MM strings
+    """
+    items = query_items(
+        table_name,
+        client=client,
+        KeyConditionExpression='ResourceName = :pk AND DateProjectCode > :since',
+        ExpressionAttributeValues={':pk': {'S': JOURNAL_PARTITION}, ':since': {'S': since}},
+        ProjectionExpression='DeletedYearMonth'
+    )
+    return {item['DeletedYearMonth'] for item in items if item.get('DeletedYearMonth')}
@@ -0,0 +1,433 @@
+"""
+Batched, parallel import of correction CSVs.
+
+The web app and the Tk UI used to import a corrected export row by row: a
+get_item, a local compare and an update_item per row, one after another.
+CorrectionsImporter splits the work into two phases instead:
+
+  plan()   - reads the CSV rows, fetches the current items with BatchGetItem
+             (100 keys per request, chunks fetched in parallel, unprocessed
+             keys retried) and computes each row's diff locally
+  apply()  - sends the changed rows through a bounded pool of update_item
+             writers, then applies the rollup deltas of the changes in one go
+
+A plan can be shown as a dry-run diff before anything is written. Rows that
+cannot be imported (missing key, no matching item, write error) are kept
+with an ImportError column so they can be fixed and re-imported as a CSV.
+
+Rows exported from a week-layout table (StorageLayout "week") carry the
+expanded YYYY-MM-DD#CODE sort key, which is not stored: they are looked up
+through their WEEK# document (storage_keys()) and compared with the expanded
+day, and their Hours / ProjectName are written into the document's Projects
+map. Other attributes are shared by the whole week document and cannot be
+corrected from a single row.
+
+Usage:
+    importer = CorrectionsImporter(table_name, log_func=log_message)
+    plan = importer.plan(csv.DictReader(f))
+    report = importer.apply(plan)
+    failed_csv = failed_rows_csv(report['failed_rows'])
+"""
+import csv
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import boto3
+from resource_registry import update_resources
+from rollups import update_rollups
+from week_document import STORAGE_LAYOUT_WEEK, expand_week_document, is_week_document, storage_keys
+
+CORRECTIONS_WORKERS = int(os.environ.get('CORRECTIONS_WORKERS', '8'))
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
+BATCH_GET_MAX_RETRIES = 8
+
+KEY_FIELDS = ('ResourceName', 'DateProjectCode')
+
+# Column added to failed rows; ignored when the file is imported again
+ERROR_FIELD = 'ImportError'
+
+BOOLEAN_FIELDS = ('IsZeroHourTimesheet',)
+NUMBER_FIELDS = ('Hours',)
+
+# Attributes a week-layout row can correct (stored per project-day / project)
+WEEK_ROW_FIELDS = ('Hours', 'ProjectName')
+
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+
+
+def _row_key(row: Dict) -> Optional[Tuple[str, str]]:
+    resource_name = (row.get('ResourceName') or '').strip()
+    date_project_code = (row.get('DateProjectCode') or '').strip()
+    if not resource_name or not date_project_code:
+        return None
+    return (resource_name, date_project_code)
+
+
+def _storage_key(row: Dict, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+    """Key of the stored item behind a row: its WEEK# document for week-layout rows (None if unknown)."""
+    if (row.get('StorageLayout') or '').strip() != STORAGE_LAYOUT_WEEK:
+        return key
+    week_start = (row.get('WeekStartDate') or '').strip()
+    if not week_start:
+        return None
+    stored, = storage_keys([{'ResourceName': key[0], 'DateProjectCode': key[1],
+                             'StorageLayout': STORAGE_LAYOUT_WEEK, 'WeekStartDate': week_start}])
+    return (stored['ResourceName'], stored['DateProjectCode'])
+
+
+def _current_row(stored: Optional[Dict], key: Tuple[str, str]) -> Optional[Dict]:
+    """The stored item, or the expanded day a week document holds for the row's key."""
+    if stored is None or not is_week_document(stored) or stored['DateProjectCode'] == key[1]:
+        return stored
+    for row in expand_week_document(stored):
+        if row['DateProjectCode'] == key[1]:
+            return row
+    return None
+
+
+def convert_value(field: str, csv_value: str):
+    """
+    Convert a CSV cell to the type stored in DynamoDB.
+
+    Raises:
+        ValueError: For a number field that is not a number
+    """
+    csv_value = (csv_value or '').strip()
+    if field in NUMBER_FIELDS:
+        try:
+            return Decimal(csv_value) if csv_value else Decimal('0')
+        except InvalidOperation:
+            raise ValueError(f"{field} is not a number: {csv_value!r}")
+    if field in BOOLEAN_FIELDS:
+        return csv_value.lower() in ('true', '1', 'yes')
+    return csv_value
+
+
+def compute_changes(current: Dict, row: Dict) -> Dict[str, Tuple]:
+    """
+    Compare a CSV row with the stored item.
+
+    Numbers compare numerically (7.5 == 7.50), booleans by truth value and
+    everything else as text; an empty cell for an attribute the item does
+    not have is not a change.
+
+    Args:
+        current: Stored item
+        row: CSV row (strings)
+
+    Returns:
+        Dict mapping field -> (old value, new value) for changed fields
+
+    Raises:
+        ValueError: If a cell cannot be converted
+    """
+    changes = {}
+    for field, csv_value in row.items():
+        if not field or field in KEY_FIELDS or field == ERROR_FIELD:
+            continue
+        new_value = convert_value(field, csv_value)
+        old_value = current.get(field)
+
+        if field in NUMBER_FIELDS:
+            if old_value is None:
+                same = not (csv_value or '').strip()
+            else:
+                try:
+                    same = Decimal(str(old_value)) == new_value
+                except InvalidOperation:
+                    same = False
+        elif field in BOOLEAN_FIELDS:
+            same = bool(old_value) == new_value
+        else:
+            same = ('' if old_value is None else str(old_value)) == new_value
+
+        if not same:
+            changes[field] = (old_value, new_value)
+    return changes
+
+
+def failed_rows_csv(failed_rows: List[Dict]) -> str:
+    """Render failed rows (original columns plus ImportError) as CSV text."""
+    fieldnames = []
+    for row in failed_rows:
+        for field in row:
+            if field and field not in fieldnames:
+                fieldnames.append(field)
+    if ERROR_FIELD in fieldnames:
+        fieldnames.remove(ERROR_FIELD)
+    fieldnames.append(ERROR_FIELD)
+
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(failed_rows)
+    return output.getvalue()
+
+
+class CorrectionsImporter:
+    """Plans and applies correction CSV imports with batched reads and parallel writes."""
+
+    def __init__(
+        self,
+        table_name: str,
+        resource=None,
+        workers: int = CORRECTIONS_WORKERS,
+        log_func=print,
+        progress_func: Optional[Callable[[str, int, int], None]] = None,
+        sleep=time.sleep
+    ):
+        """
+        Args:
+            table_name: DynamoDB table name
+            resource: Optional boto3 DynamoDB service resource
+            workers: Parallel BatchGetItem requests / update_item writers
+            log_func: Logger for progress messages
+            progress_func: Called with (phase, done, total) as work completes
+            sleep: Sleep function for unprocessed-key backoff (replaced in tests)
+        """
+        self.table_name = table_name
+        self.resource = resource or dynamodb
+        self.table = self.resource.Table(table_name)
+        self.workers = max(1, workers)
+        self.log = log_func
+        self.progress_func = progress_func
+        self.sleep = sleep
+
+    def _progress(self, phase: str, done: int, total: int, state: Dict):
+        if self.progress_func:
+            self.progress_func(phase, done, total)
+        step = done * 10 // total if total else 10
+        if step > state.get(phase, 0):
+            state[phase] = step
+            self.log(f"  {phase}: {done}/{total} ({step * 10}%)")
+
+    def _batch_get(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        request = {self.table_name: {'Keys': [{'ResourceName': r, 'DateProjectCode': d} for r, d in keys]}}
+        found = {}
+        attempt = 0
+        while request:
+            response = self.resource.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(self.table_name, []):
+                found[(item['ResourceName'], item['DateProjectCode'])] = item
+            request = response.get('UnprocessedKeys') or {}
+            if request:
+                attempt += 1
+                if attempt > BATCH_GET_MAX_RETRIES:
+                    raise RuntimeError(f"BatchGetItem left {len(request[self.table_name]['Keys'])} keys unprocessed")
+                self.sleep(min(5.0, 0.05 * 2 ** attempt))
+        return found
+
+    def _fetch(self, keys: List[Tuple[str, str]], state: Dict) -> Dict[Tuple[str, str], Dict]:
+        chunks = [keys[i:i + BATCH_GET_SIZE] for i in range(0, len(keys), BATCH_GET_SIZE)]
+        current = {}
+        done = 0
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks) or 1)) as pool:
+            for chunk, found in zip(chunks, pool.map(self._batch_get, chunks)):
+                current.update(found)
+                done += len(chunk)
+                self._progress('fetch', done, len(keys), state)
+        return current
+
+    def plan(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Fetch current items and diff every CSV row against them (no writes).
+
+        Args:
+            rows: CSV rows as dicts (e.g. a csv.DictReader)
+
+        Returns:
+            Plan dict with rows, changes (list of {row, key, storage_key,
+            changes, current, values}), unchanged, failed_rows and counters
+        """
+        start = time.time()
+        rows = list(rows)
+        state = {}
+
+        keyed = []
+        failed_rows = []
+        for row_num, row in enumerate(rows, start=2):
+            key = _row_key(row)
+            if key is None:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: missing ResourceName or DateProjectCode"})
+                continue
+            stored_key = _storage_key(row, key)
+            if stored_key is None:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: week-layout row without WeekStartDate"})
+                continue
+            keyed.append((row_num, key, stored_key, row))
+
+        # BatchGetItem rejects duplicate keys in one request (rows of one week share a key)
+        unique_keys = list(dict.fromkeys(stored_key for _, _, stored_key, _ in keyed))
+        self.log(f"📥 Fetching {len(unique_keys)} items in {-(-len(unique_keys) // BATCH_GET_SIZE)} batches...")
+        current_items = self._fetch(unique_keys, state)
+
+        changes = []
+        unchanged = 0
+        checked = 0
+        first_row = {}
+        for row_num, key, stored_key, row in keyed:
+            if first_row.setdefault(key, row_num) != row_num:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: duplicate of row {first_row[key]}"})
+                continue
+            current = _current_row(current_items.get(stored_key), key)
+            if current is None:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: no matching record for {key[0]} / {key[1]}"})
+                continue
+            checked += 1
+            try:
+                diff = compute_changes(current, row)
+            except ValueError as e:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: {e}"})
+                continue
+            shared = [field for field in diff if field not in WEEK_ROW_FIELDS]
+            if stored_key != key and shared:
+                failed_rows.append({**row, ERROR_FIELD: f"Row {row_num}: {', '.join(shared)} is shared by the "
+                                                        f"week document and cannot be corrected per row"})
+                continue
+            if diff:
+                changes.append({'row': row_num, 'key': key, 'storage_key': stored_key, 'changes': diff,
+                                'current': current, 'values': row})
+            else:
+                unchanged += 1
+
+        self.log(f"🔍 {len(rows)} rows: {len(changes)} changed, {unchanged} unchanged, {len(failed_rows)} failed")
+        return {
+            'rows': len(rows),
+            'checked': checked,
+            'changed': len(changes),
+            'unchanged': unchanged,
+            'changes': changes,
+            'failed_rows': failed_rows,
+            'seconds': round(time.time() - start, 3),
+        }
+
+    def _update(self, change: Dict) -> Optional[str]:
+        if change['storage_key'] != change['key']:
+            return self._update_week_day(change)
+        resource_name, date_project_code = change['key']
+        fields = list(change['changes'])
+        try:
+            self.table.update_item(
+                Key={'ResourceName': resource_name, 'DateProjectCode': date_project_code},
+                UpdateExpression='SET ' + ', '.join(f"#f{i} = :v{i}" for i in range(len(fields))),
+                ConditionExpression='attribute_exists(ResourceName)',
+                ExpressionAttributeNames={f"#f{i}": field for i, field in enumerate(fields)},
+                ExpressionAttributeValues={f":v{i}": change['changes'][field][1] for i, field in enumerate(fields)}
+            )
+            return None
+        except Exception as e:
+            return str(e)
+
+    def _update_week_day(self, change: Dict) -> Optional[str]:
+        """Write a week-layout row's Hours / ProjectName into its document's Projects map."""
+        resource_name, week_key = change['storage_key']
+        date_str, project_code = change['key'][1].split('#', 1)
+        set_clauses = []
+        values = {}
+        if 'Hours' in change['changes']:
+            set_clauses.append('Projects.#code.Hours.#date = :hours')
+            values[':hours'] = change['changes']['Hours'][1]
+        if 'ProjectName' in change['changes']:
+            # Stored once per project, so the name changes for the whole week
+            set_clauses.append('Projects.#code.ProjectName = :name')
+            values[':name'] = change['changes']['ProjectName'][1]
+        try:
+            self.table.update_item(
+                Key={'ResourceName': resource_name, 'DateProjectCode': week_key},
+                UpdateExpression='SET ' + ', '.join(set_clauses),
+                ConditionExpression='attribute_exists(Projects.#code.Hours.#date)',
+                ExpressionAttributeNames={'#code': project_code, '#date': date_str},
+                ExpressionAttributeValues=values
+            )
+            return None
+        except Exception as e:
+            return str(e)
+
+    def apply(self, plan: Dict) -> Dict:
+        """
+        Write a plan's changes through the parallel writer pool.
+
+        Args:
+            plan: Output of plan()
+
+        Returns:
+            Report with updated, failed (plan failures included), failed_rows,
+            updated_keys and seconds
+        """
+        start = time.time()
+        changes = plan['changes']
+        failed_rows = list(plan['failed_rows'])
+        state = {}
+        applied = []
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(changes) or 1)) as pool:
+            for done, (change, error) in enumerate(zip(changes, pool.map(self._update, changes)), start=1):
+                if error:
+                    failed_rows.append({**change['values'], ERROR_FIELD: f"Row {change['row']}: {error}"})
+                else:
+                    applied.append(change)
+                self._progress('update', done, len(changes), state)
+
+        # Keep rollups and the resource registry in step with corrected hours / projects
+        if applied:
+            added = [{**c['current'], **{f: new for f, (_, new) in c['changes'].items()}} for c in applied]
+            removed = [c['current'] for c in applied]
+            # Corrections that leave every counter unchanged still move LastUpdated
+            update_rollups(self.table_name, added=added, removed=removed, touched=added)
+            update_resources(self.table_name, added=added, removed=removed)
+
+        self.log(f"✓ Import complete: {len(applied)} rows updated, {len(failed_rows)} failed")
+        return {
+            'rows': plan['rows'],
+            'checked': plan['checked'],
+            'unchanged': plan['unchanged'],
+            'updated': len(applied),
+            'failed': len(failed_rows),
+            'failed_rows': failed_rows,
+            'updated_keys': [{'ResourceName': c['key'][0], 'DateProjectCode': c['key'][1]} for c in applied],
+            'seconds': round(plan['seconds'] + time.time() - start, 3),
+        }
+
+    def run(self, rows: Iterable[Dict], dry_run: bool = False) -> Dict:
+        """
+        Plan and (unless dry_run) apply an import.
+
+        Returns:
+            apply() report, or for a dry run the plan summary with a
+            JSON-ready diff per changed row
+        """
+        plan = self.plan(rows)
+        if not dry_run:
+            return self.apply(plan)
+        return {
+            'dry_run': True,
+            'rows': plan['rows'],
+            'checked': plan['checked'],
+            'changed': plan['changed'],
+            'unchanged': plan['unchanged'],
+            'failed': len(plan['failed_rows']),
+            'failed_rows': plan['failed_rows'],
+            'diffs': diff_summary(plan),
+            'seconds': plan['seconds'],
+        }
+
+
+def diff_summary(plan: Dict) -> List[Dict]:
+    """JSON-ready list of {row, ResourceName, DateProjectCode, changes: {field: {old, new}}}."""
+    def plain(value):
+        return str(value) if isinstance(value, Decimal) else value
+
+    return [
+        {
+            'row': change['row'],
+            'ResourceName': change['key'][0],
+            'DateProjectCode': change['key'][1],
+            'changes': {field: {'old': plain(old), 'new': plain(new)} for field, (old, new) in change['changes'].items()},
+        }
+        for change in plan['changes']
+    ]
@@ -17,6 +17,7 @@ import boto3
 from datetime import datetime, timedelta
 from typing import List, Set, Dict
 from decimal import Decimal
+from record_types import is_system_partition
 
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
 
@@ -122,6 +123,62 @@ def update_coverage(
         }
 
 
+def update_coverage_weeks(
+    table_name: str,
+    resource_name: str,
+    clarity_month: str,
+    weeks: Set[str]
+) -> Dict:
+    """
+    Add several weeks to one coverage record in a single UpdateItem.
+
+    Used by the batch write pipeline to coalesce coverage updates from many
+    timesheets for the same person and Clarity month.
+
+    Args:
+        table_name: DynamoDB table name (main timesheet table)
+        resource_name: Person's name (e.g., "Nik_Coultas")
+        clarity_month: YYYY-MM format
+        weeks: Week-commencing dates (YYYY-MM-DD)
+
+    Returns:
+        Updated coverage information
+    """
+    table = dynamodb.Table(table_name)
+    coverage_key = f"{resource_name}#COVERAGE#{clarity_month}"
+
+    try:
+        response = table.update_item(
+            Key={
+                'ResourceName': resource_name,
+                'DateProjectCode': coverage_key
+            },
+            UpdateExpression='ADD WeeksSubmitted :weeks SET LastUpdated = :now, ClarityMonth = :month, RecordType = :type',
+            ExpressionAttributeValues={
+                ':weeks': set(weeks),
+                ':now': datetime.utcnow().isoformat(),
+                ':month': clarity_month,
+                ':type': 'COVERAGE_TRACKER'
+            },
+            ReturnValues='ALL_NEW'
+        )
+
+        return {
+            'success': True,
+            'resource_name': resource_name,
+            'clarity_month': clarity_month,
+            'weeks_added': sorted(weeks),
+            'total_weeks': len(response['Attributes'].get('WeeksSubmitted', set()))
+        }
+
+    except Exception as e:
+        print(f"⚠️  Coverage tracker update failed: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
 def get_coverage_for_person(
     table_name: str,
     resource_name: str,
@@ -207,6 +264,8 @@ def get_all_coverage_for_month(
         for item in response.get('Items', []):
             # Extract resource name from the composite key
             resource_name = item.get('ResourceName', '')
+            if is_system_partition(resource_name):
+                continue
             weeks = item.get('WeeksSubmitted', set())
 
             results.append({
@@ -230,6 +289,8 @@ def get_all_coverage_for_month(
 
             for item in response.get('Items', []):
                 resource_name = item.get('ResourceName', '')
+                if is_system_partition(resource_name):
+                    continue
                 weeks = item.get('WeeksSubmitted', set())
 
                 results.append({
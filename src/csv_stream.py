@@ -0,0 +1,139 @@
+"""
+Streaming CSV helpers for the web app exports.
+
+Exports used to build the whole file in an io.StringIO on top of a fully
+loaded table. These helpers turn row iterators into response chunks
+instead, so peak memory is one DynamoDB page plus one output chunk, and the
+header goes out before the first page has been read:
+
+    chunks = csv_chunks(DETAILED_FIELDS, (detailed_row(r) for r in rows))
+    Response(gzip_chunks(chunks) if gzip else chunks, mimetype='text/csv')
+"""
+import csv
+import io
+import zlib
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+# Flush the CSV buffer once it holds this many characters
+CHUNK_SIZE = 64 * 1024
+
+DETAILED_FIELDS = [
+    'ResourceName', 'ResourceNameDisplay', 'Date', 'WeekStartDate', 'WeekEndDate',
+    'ProjectCode', 'ProjectName', 'Hours', 'IsZeroHourTimesheet', 'ZeroHourReason',
+    'SourceImage', 'ProcessingTimestamp', 'YearMonth', 'DateProjectCode'
+]
+
+# Full export: the detailed columns, then every other attribute the writers
+# store (dynamodb_handler.py, week_document.py, image_metadata.py)
+FULL_EXPORT_FIELDS = DETAILED_FIELDS + [
+    'ProjectCodeGSI', 'StorageLayout',
+    'ProcessingTimeSeconds', 'ModelId', 'InputTokens', 'OutputTokens', 'CostEstimateUSD',
+    'OCRVersion', 'OCRBuildDate', 'OCRDescription', 'OCRFullVersion',
+    'ImageWidth', 'ImageHeight', 'ImageFormat', 'ImageMode', 'AspectRatio', 'Megapixels',
+    'QualityCategory', 'FileSizeBytes', 'FileSizeKB', 'BytesPerPixel', 'DPI_X', 'DPI_Y',
+    'ResolutionCategory', 'MetadataError'
+]
+
+
+def detailed_row(item: Dict) -> List:
+    """Format a timesheet row for the detailed export (DETAILED_FIELDS order)."""
+    return [
+        item.get('ResourceName', ''),
+        item.get('ResourceNameDisplay', ''),
+        item.get('Date', ''),
+        item.get('WeekStartDate', ''),
+        item.get('WeekEndDate', ''),
+        item.get('ProjectCode', ''),
+        item.get('ProjectName', ''),
+        float(item.get('Hours', 0)),
+        item.get('IsZeroHourTimesheet', False),
+        item.get('ZeroHourReason', '') or '',
+        item.get('SourceImage', ''),
+        item.get('ProcessingTimestamp', ''),
+        item.get('YearMonth', ''),
+        item.get('DateProjectCode', ''),
+    ]
+
+
+def csv_chunks(header: Sequence[str], rows: Iterable[Sequence], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Encode rows as CSV, yielding the text in chunks.
+
+    The header is yielded on its own straight away so the client sees the
+    first byte before any rows have been read.
+
+    Args:
+        header: Column names
+        rows: Iterable of row sequences
+        chunk_size: Characters buffered before a chunk is yielded
+
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(header)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def dict_csv_chunks(rows: Iterable[Dict], fieldnames: Sequence[str] = FULL_EXPORT_FIELDS,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Encode dict rows as CSV under a fixed header.
+
+    The columns no longer depend on whichever row happens to come first:
+    missing attributes are written empty and attributes outside
+    fieldnames are ignored (DictWriter's extrasaction='ignore').
+
+    Args:
+        rows: Iterable of dict rows
+        fieldnames: Column names (defaults to FULL_EXPORT_FIELDS)
+        chunk_size: Characters buffered before a chunk is yielded
+
+    Yields:
+        CSV text chunks, starting with the header even for no rows
+    """
+    values = ([row.get(name, '') for name in fieldnames] for row in rows)
+    yield from csv_chunks(fieldnames, values, chunk_size)
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip a stream of text chunks on the fly (for Content-Encoding: gzip).
+
+    Yields:
+        Compressed bytes; empty compressor output is skipped
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # 31 = gzip header
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if first:
+            # Push the header out now instead of waiting for a full deflate block
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header allows gzip."""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0')
+    return False
@@ -0,0 +1,338 @@
+"""
+Server-side paging, filtering and sorting for the /api/data viewer.
+
+Each request reads one bounded page straight from DynamoDB instead of the
+whole table. The filters pick the cheapest access path:
+
+  - resource       -> base table query (PK ResourceName, SK date range),
+                      then the WEEK# range for week documents / zero-hour markers
+  - project        -> ProjectCodeIndex query (SK date range; day rows only,
+                      like query_timesheet_by_project())
+  - start/end date -> YearMonthIndex query, one YearMonth partition per month
+  - nothing keyed  -> paginated scan (table order, not sorted)
+
+`order` (asc/desc) applies to the key order of the chosen path.
+
+Remaining filters are applied to the (expanded) rows. A page holds at most
+`limit` rows (capped at MAX_PAGE_SIZE; a week document is never split, so a
+page can run over by one document) and reads at most MAX_ITEMS_READ items,
+so a selective filter returns a short page with a cursor rather than
+scanning the whole table in one request.
+
+iter_rows() walks the same access paths to the end, one DynamoDB page at a
+time, for exports that stream every matching row.
+
+The cursor is opaque to the browser: base64 JSON holding the access-path
+segment, the DynamoDB LastEvaluatedKey and a fingerprint of the filters.
+"""
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from dynamo_codec import decode_item, dynamodb_client, query_items, scan_items
+from record_types import is_timesheet_row
+from week_document import WEEK_KEY_PREFIX, expand_items
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('DATA_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('DATA_MAX_PAGE_SIZE', '500'))
+MAX_ITEMS_READ = int(os.environ.get('DATA_MAX_ITEMS_READ', '5000'))
+
+# YearMonth partitions queried for a date-range request before falling back to a scan
+MAX_MONTH_PARTITIONS = 24
+
+FILTER_FIELDS = ('resource', 'start', 'end', 'project', 'source_image', 'order')
+
+# What each access path's key order sorts rows by
+SORT_ORDER = {
+    'resource': 'date',
+    'project': 'date',
+    'month': 'month, resource',
+    'scan': None,
+}
+
+
+def _check_date(value: str, name: str):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD, got {value!r}")
+
+
+def normalize_filters(args: Dict) -> Dict:
+    """
+    Validate request parameters into a filter dict.
+
+    Args:
+        args: Request args (resource, start, end, project, source_image, order)
+
+    Returns:
+        Dict with only the filters that were given; resource uses the
+        ResourceName key format (spaces -> underscores)
+
+    Raises:
+        ValueError: For malformed dates or order
+    """
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = (args.get(field) or '').strip()
+        if value:
+            filters[field] = value
+
+    if 'resource' in filters:
+        filters['resource'] = filters['resource'].replace(' ', '_')
+    if 'project' in filters:
+        filters['project'] = filters['project'].upper()
+    for field in ('start', 'end'):
+        if field in filters:
+            _check_date(filters[field], field)
+    if filters.get('start', '') > filters.get('end', '9999'):
+        raise ValueError("start must not be after end")
+
+    order = filters.pop('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    filters['order'] = order
+    return filters
+
+
+def _fingerprint(filters: Dict) -> str:
+    return hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def encode_cursor(segment: int, last_key: Optional[Dict], filters: Dict) -> str:
+    """Encode a page position as an opaque URL-safe token."""
+    payload = {'s': segment, 'k': last_key, 'f': _fingerprint(filters)}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor: str, filters: Dict):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Returns:
+        (segment index, ExclusiveStartKey or None)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for other filters
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        segment, last_key, fingerprint = payload['s'], payload['k'], payload['f']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if fingerprint != _fingerprint(filters):
+        raise ValueError("Cursor does not match the current filters")
+    return int(segment), last_key
+
+
+def _months(start: str, end: str) -> List[str]:
+    months = []
+    year, month = int(start[:4]), int(start[5:7])
+    while f"{year:04d}-{month:02d}" <= end[:7]:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _day_range(filters: Dict):
+    return filters.get('start', '0000-00-00'), f"{filters.get('end', '9999-12-31')}#~"
+
+
+def plan_segments(filters: Dict) -> Tuple[str, List[Dict]]:
+    """
+    Pick the access path for a set of filters.
+
+    Returns:
+        (access path name, list of low-level Query/Scan kwargs, one per segment
+        in result order)
+    """
+    forward = filters['order'] == 'asc'
+    low, high = _day_range(filters)
+
+    if 'resource' in filters:
+        # Week documents and zero-hour markers live under WEEK#<monday>, so the
+        # first week that can overlap the range starts up to 6 days earlier
+        week_low = WEEK_KEY_PREFIX + '0000-00-00'
+        if 'start' in filters:
+            week_low = WEEK_KEY_PREFIX + (
+                datetime.strptime(filters['start'], '%Y-%m-%d') - timedelta(days=6)
+            ).strftime('%Y-%m-%d')
+        week_high = WEEK_KEY_PREFIX + filters.get('end', '9999-12-31')
+
+        segments = [
+            {'op': 'query', 'KeyConditionExpression': 'ResourceName = :pk AND DateProjectCode BETWEEN :low AND :high',
+             'ExpressionAttributeValues': {':pk': {'S': filters['resource']}, ':low': {'S': low}, ':high': {'S': high}}},
+            {'op': 'query', 'KeyConditionExpression': 'ResourceName = :pk AND DateProjectCode BETWEEN :low AND :high',
+             'ExpressionAttributeValues': {':pk': {'S': filters['resource']}, ':low': {'S': week_low},
+                                           ':high': {'S': week_high}}},
+        ]
+        path = 'resource'
+
+    elif 'project' in filters:
+        segments = [
+            {'op': 'query', 'IndexName': 'ProjectCodeIndex',
+             'KeyConditionExpression': 'ProjectCodeGSI = :pk AND DateProjectCode BETWEEN :low AND :high',
+             'ExpressionAttributeValues': {':pk': {'S': filters['project']}, ':low': {'S': low}, ':high': {'S': high}}},
+        ]
+        path = 'project'
+
+    elif 'start' in filters and 'end' in filters:
+        # Week documents carry the YearMonth of their Monday, which can be the
+        # month before the range starts
+        first = (datetime.strptime(filters['start'], '%Y-%m-%d') - timedelta(days=6)).strftime('%Y-%m-%d')
+        months = _months(first, filters['end'])
+        if len(months) > MAX_MONTH_PARTITIONS:
+            return 'scan', [{'op': 'scan'}]
+        segments = [
+            {'op': 'query', 'IndexName': 'YearMonthIndex', 'KeyConditionExpression': 'YearMonth = :pk',
+             'ExpressionAttributeValues': {':pk': {'S': month}}}
+            for month in months
+        ]
+        path = 'month'
+
+    else:
+        return 'scan', [{'op': 'scan'}]
+
+    if not forward:
+        segments.reverse()
+    for segment in segments:
+        segment['ScanIndexForward'] = forward
+    return path, segments
+
+
+def _row_matches(row: Dict, filters: Dict) -> bool:
+    if not is_timesheet_row(row):
+        return False
+    date_str = row.get('Date') or row.get('WeekStartDate', '')
+    if date_str < filters.get('start', '') or date_str > filters.get('end', '9999-12-31'):
+        return False
+    if 'resource' in filters and row.get('ResourceName') != filters['resource']:
+        return False
+    if 'project' in filters and row.get('ProjectCode') != filters['project']:
+        return False
+    if 'source_image' in filters and row.get('SourceImage') != filters['source_image']:
+        return False
+    return True
+
+
+def fetch_page(
+    table_name: str,
+    args: Dict,
+    client=None,
+    max_items_read: int = None
+) -> Dict:
+    """
+    Read one page of timesheet rows.
+
+    Args:
+        table_name: DynamoDB table name
+        args: Request args - the filters plus optional limit and cursor
+        client: Optional low-level DynamoDB client (defaults to dynamo_codec's client)
+        max_items_read: Override for MAX_ITEMS_READ
+
+    Returns:
+        Dict with data (JSON-safe rows), count, next_cursor (None on the last
+        page), access_path, sorted_by (None for scans), items_read and limit
+
+    Raises:
+        ValueError: For invalid filters, limit or cursor
+    """
+    client = client or dynamodb_client
+    max_items_read = max_items_read or MAX_ITEMS_READ
+    filters = normalize_filters(args)
+
+    try:
+        limit = int(args.get('limit') or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    path, segments = plan_segments(filters)
+    segment, last_key = 0, None
+    if args.get('cursor'):
+        segment, last_key = decode_cursor(args['cursor'], filters)
+        if not 0 <= segment < len(segments):
+            raise ValueError("Invalid cursor")
+
+    rows = []
+    items_read = 0
+    reverse_rows = filters['order'] == 'desc'
+
+    while segment < len(segments) and len(rows) < limit and items_read < max_items_read:
+        kwargs = {k: v for k, v in segments[segment].items() if k != 'op'}
+        kwargs['TableName'] = table_name
+        kwargs['Limit'] = min(limit - len(rows), max_items_read - items_read)
+        if last_key:
+            kwargs['ExclusiveStartKey'] = last_key
+        if segments[segment]['op'] == 'scan':
+            kwargs.pop('ScanIndexForward', None)
+            response = client.scan(**kwargs)
+        else:
+            response = client.query(**kwargs)
+
+        items = [decode_item(item) for item in response.get('Items', [])]
+        items_read += len(items)
+        for item in items:
+            expanded = expand_items([item])
+            if reverse_rows and len(expanded) > 1:
+                expanded.reverse()
+            rows.extend(row for row in expanded if _row_matches(row, filters))
+
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            segment += 1
+
+    next_cursor = encode_cursor(segment, last_key, filters) if segment < len(segments) else None
+
+    return {
+        'data': rows,
+        'count': len(rows),
+        'next_cursor': next_cursor,
+        'access_path': path,
+        'sorted_by': SORT_ORDER[path],
+        'items_read': items_read,
+        'limit': limit,
+    }
+
+
+def iter_rows(table_name: str, args: Dict, client=None) -> Iterator[Dict]:
+    """
+    Stream every row matching the filters (no page limit, no cursor).
+
+    Only one DynamoDB page is held at a time, so memory does not grow with
+    the number of rows.
+
+    Args:
+        table_name: DynamoDB table name
+        args: Filters as accepted by normalize_filters()
+        client: Optional low-level DynamoDB client (defaults to dynamo_codec's client)
+
+    Returns:
+        Iterator of expanded timesheet rows in the access path's key order
+
+    Raises:
+        ValueError: For invalid filters (checked before any row is read)
+    """
+    filters = normalize_filters(args)
+    _, segments = plan_segments(filters)
+    return _iter_segments(table_name, filters, segments, client)
+
+
+def _iter_segments(table_name: str, filters: Dict, segments: List[Dict], client) -> Iterator[Dict]:
+    reverse_rows = filters['order'] == 'desc'
+    for segment in segments:
+        kwargs = {k: v for k, v in segment.items() if k != 'op'}
+        if segment['op'] == 'scan':
+            items = scan_items(table_name, client=client, **kwargs)
+        else:
+            items = query_items(table_name, client=client, **kwargs)
+
+        for item in items:
+            expanded = expand_items([item])
+            if reverse_rows and len(expanded) > 1:
+                expanded.reverse()
+            for row in expanded:
+                if _row_matches(row, filters):
+                    yield row
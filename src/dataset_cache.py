@@ -0,0 +1,309 @@
+"""
+Process-wide dataset cache for the web app.
+
+load_all_data() used to scan the whole table, expand, sort and rebuild every
+item on every /api/data call, export and approval action. DatasetCache keeps
+the decoded items in memory and keeps them fresh cheaply:
+
+  - Full refresh: one low-level scan (on first use, on demand, and every
+    DATASET_CACHE_FULL_REFRESH_SECONDS to pick up deletes made by other processes)
+  - Delta refresh: finds the person-weeks that changed since the watermark
+    (minus an overlap window for writers whose clocks or commits lag) and
+    re-queries only those, so rows the Lambda deleted when replacing a
+    timesheet disappear as well. Every write and rollup-maintaining delete
+    moves the PERSON_WEEK rollup's LastUpdated, so the changed weeks come
+    from one Query of the ROLLUP#PERSON_WEEK partition; months in the
+    tombstone journal (deletes that skipped the rollups) re-read the
+    cached person-weeks of that month. Until the rollups exist
+    (rebuild_rollups.py), a filtered scan on ProcessingTimestamp /
+    LastUpdated is used instead.
+  - Local writes: the web app calls discard()/update()/invalidate() for its
+    own deletes and updates, so they show up immediately.
+
+Between refreshes (DATASET_CACHE_REFRESH_SECONDS) requests are served from
+memory, so the dashboard loads instantly regardless of table size.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+from change_journal import JOURNAL_PARTITION
+from coverage_tracker import get_week_commencing
+from dynamo_codec import query_items, scan_items
+from rollups import PERSON_WEEK, rollup_partition
+from week_document import expand_items, week_document_key
+
+DATASET_CACHE_REFRESH_SECONDS = int(os.environ.get('DATASET_CACHE_REFRESH_SECONDS', '30'))
+DATASET_CACHE_FULL_REFRESH_SECONDS = int(os.environ.get('DATASET_CACHE_FULL_REFRESH_SECONDS', '900'))
+DATASET_CACHE_OVERLAP_SECONDS = int(os.environ.get('DATASET_CACHE_OVERLAP_SECONDS', '120'))
+
+
+def _item_key(item: Dict) -> Tuple[str, str]:
+    return (item['ResourceName'], item['DateProjectCode'])
+
+
+def _item_timestamp(item: Dict) -> str:
+    return item.get('ProcessingTimestamp') or item.get('LastUpdated') or ''
+
+
+def _item_week(item: Dict) -> str:
+    date_str = item.get('WeekStartDate') or item.get('Date')
+    if date_str and len(date_str) == 10:
+        return get_week_commencing(date_str)
+    return ''
+
+
+class DatasetCache:
+    """In-memory copy of the table with watermark-based delta refresh."""
+
+    def __init__(self, table_name: str, client=None,
+                 refresh_seconds: int = DATASET_CACHE_REFRESH_SECONDS,
+                 full_refresh_seconds: int = DATASET_CACHE_FULL_REFRESH_SECONDS,
+                 overlap_seconds: int = DATASET_CACHE_OVERLAP_SECONDS,
+                 log_func=print):
+        """
+        Args:
+            table_name: DynamoDB table name
+            client: Low-level DynamoDB client (defaults to dynamo_codec's client)
+            refresh_seconds: Minimum seconds between delta refreshes
+            full_refresh_seconds: Seconds after which a full rescan is done instead
+            overlap_seconds: How far before the watermark a delta looks back
+            log_func: Logger for refresh messages
+        """
+        self.table_name = table_name
+        self.client = client
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self.overlap_seconds = overlap_seconds
+        self.log = log_func
+
+        self._lock = threading.RLock()
+        self._items = {}          # (ResourceName, DateProjectCode) -> decoded item
+        self._rows = None         # expanded + sorted view, rebuilt lazily
+        self._watermark = ''
+        self._rollups_seeded = False  # PERSON_WEEK rollups seen by the last full refresh
+        self._loaded_at = None    # time of last full refresh
+        self._checked_at = None   # time of last refresh of any kind
+
+        self.stats = {
+            'full_refreshes': 0,
+            'delta_refreshes': 0,
+            'delta_items': 0,
+            'delta_scans': 0,
+            'weeks_requeried': 0,
+            'served_from_cache': 0,
+            'last_refresh_seconds': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_rows(self, force: str = None) -> List[Dict]:
+        """
+        Get all rows (week documents expanded), sorted by Date then ResourceName.
+
+        Args:
+            force: "full" or "delta" to refresh regardless of age
+
+        Returns:
+            Shared list of rows - callers must not mutate it
+        """
+        with self._lock:
+            now = time.time()
+            if force == 'full' or self._loaded_at is None or now - self._loaded_at >= self.full_refresh_seconds:
+                self._full_refresh()
+            elif force == 'delta' or now - self._checked_at >= self.refresh_seconds:
+                self._delta_refresh()
+            else:
+                self.stats['served_from_cache'] += 1
+
+            if self._rows is None:
+                rows = expand_items(list(self._items.values()))
+                rows.sort(key=lambda x: (x.get('Date', ''), x.get('ResourceName', '')))
+                self._rows = rows
+            return self._rows
+
+    def _full_refresh(self):
+        start = time.time()
+        items = {}
+        watermark = ''
+        person_week_partition = rollup_partition(PERSON_WEEK)
+        rollups_seeded = False
+        for item in scan_items(self.table_name, client=self.client):
+            items[_item_key(item)] = item
+            watermark = max(watermark, _item_timestamp(item))
+            rollups_seeded = rollups_seeded or item['ResourceName'] == person_week_partition
+
+        self._items = items
+        self._rows = None
+        self._watermark = watermark
+        self._rollups_seeded = rollups_seeded
+        self._loaded_at = self._checked_at = time.time()
+        self.stats['full_refreshes'] += 1
+        self.stats['last_refresh_seconds'] = round(time.time() - start, 3)
+        self.log(f"📦 Dataset cache loaded {len(items)} items ({self.stats['last_refresh_seconds']}s)")
+
+    def _delta_refresh(self):
+        start = time.time()
+        since = self._since()
+        if self._rollups_seeded:
+            changed, weeks = self._changed_weeks(since)
+        else:
+            changed, weeks = self._scan_changed(since)
+
+        # Re-read every touched person-week so rows deleted by a replacing
+        # timesheet (Lambda dedupe) are dropped, not just new rows added
+        for resource_key, week_start in weeks:
+            self._requery_week(resource_key, week_start)
+
+        if changed:
+            self._rows = None
+        self._checked_at = time.time()
+        self.stats['delta_refreshes'] += 1
+        self.stats['delta_items'] += len(changed)
+        self.stats['weeks_requeried'] += len(weeks)
+        self.stats['last_refresh_seconds'] = round(time.time() - start, 3)
+        if changed:
+            self.log(f"📦 Dataset cache delta: {len(changed)} changed items, {len(weeks)} person-weeks re-read")
+
+    def _changed_weeks(self, since: str) -> Tuple[List[Dict], Set[Tuple[str, str]]]:
+        """Changed person-weeks from the PERSON_WEEK rollups and the tombstone journal."""
+        changed = list(query_items(
+            self.table_name,
+            client=self.client,
+            KeyConditionExpression='ResourceName = :pk',
+            FilterExpression='LastUpdated > :wm',
+            ExpressionAttributeValues={
+                ':pk': {'S': rollup_partition(PERSON_WEEK)},
+                ':wm': {'S': since}
+            }
+        ))
+        weeks = set()
+        for item in changed:
+            self._items[_item_key(item)] = item
+            self._watermark = max(self._watermark, item.get('LastUpdated', ''))
+            weeks.add((item['Resource'], item['WeekStart']))
+
+        tombstones = list(query_items(
+            self.table_name,
+            client=self.client,
+            KeyConditionExpression='ResourceName = :pk AND DateProjectCode > :wm',
+            ExpressionAttributeValues={':pk': {'S': JOURNAL_PARTITION}, ':wm': {'S': since}},
+            ProjectionExpression='DeletedYearMonth, DeletedAt'
+        ))
+        months = set()
+        for item in tombstones:
+            self._watermark = max(self._watermark, item.get('DeletedAt', ''))
+            if item.get('DeletedYearMonth'):
+                months.add(item['DeletedYearMonth'])
+        if months:
+            # Tombstones only name the month, so re-read what the cache holds for it
+            for item in list(self._items.values()):
+                date_str = item.get('WeekStartDate') or item.get('Date') or ''
+                week_start = _item_week(item)
+                if week_start and (date_str[:7] in months or week_start[:7] in months):
+                    weeks.add((item['ResourceName'], week_start))
+
+        return changed + tombstones, weeks
+
+    def _scan_changed(self, since: str) -> Tuple[List[Dict], Set[Tuple[str, str]]]:
+        """Changed person-weeks from a filtered scan (before the rollups are seeded)."""
+        changed = list(scan_items(
+            self.table_name,
+            client=self.client,
+            FilterExpression='ProcessingTimestamp > :wm OR LastUpdated > :wm',
+            ExpressionAttributeValues={':wm': {'S': since}}
+        ))
+        self.stats['delta_scans'] += 1
+        weeks = set()
+        for item in changed:
+            self._items[_item_key(item)] = item
+            self._watermark = max(self._watermark, _item_timestamp(item))
+            week_start = _item_week(item)
+            if week_start:
+                weeks.add((item['ResourceName'], week_start))
+        return changed, weeks
+
+    def _since(self) -> str:
+        if not self._watermark:
+            return ''
+        try:
+            watermark = datetime.fromisoformat(self._watermark.rstrip('Z'))
+        except ValueError:
+            return self._watermark
+        return (watermark - timedelta(seconds=self.overlap_seconds)).isoformat()
+
+    def _requery_week(self, resource_key: str, week_start: str):
+        sunday = (datetime.strptime(week_start, '%Y-%m-%d') + timedelta(days=6)).strftime('%Y-%m-%d')
+        week_key = week_document_key(week_start)
+        low, high = week_start, f"{sunday}#~"
+
+        for key in [k for k in self._items if k[0] == resource_key and (low <= k[1] <= high or k[1] == week_key)]:
+            del self._items[key]
+
+        for start, end in ((low, high), (week_key, week_key)):
+            for item in query_items(
+                self.table_name,
+                client=self.client,
+                KeyConditionExpression='ResourceName = :rn AND DateProjectCode BETWEEN :start AND :end',
+                ExpressionAttributeValues={
+                    ':rn': {'S': resource_key},
+                    ':start': {'S': start},
+                    ':end': {'S': end}
+                }
+            ):
+                self._items[_item_key(item)] = item
+
+    # ------------------------------------------------------------------
+    # Local writes
+    # ------------------------------------------------------------------
+
+    def discard(self, keys: Iterable[Dict]):
+        """Drop items the app has just deleted."""
+        with self._lock:
+            for key in keys:
+                if self._items.pop((key['ResourceName'], key['DateProjectCode']), None) is not None:
+                    self._rows = None
+
+    def update(self, items: Iterable[Dict]):
+        """Store items the app has just rewritten (e.g. a week document minus one image)."""
+        with self._lock:
+            for item in items:
+                self._items[_item_key(item)] = item
+                self._rows = None
+
+    def invalidate(self):
+        """Force a full refresh on next read (after updates the watermark cannot see)."""
+        with self._lock:
+            self._loaded_at = None
+
+    def clear(self):
+        """Empty the cache (e.g. after the table was flushed)."""
+        with self._lock:
+            self._items = {}
+            self._rows = None
+            self._watermark = ''
+            self._loaded_at = self._checked_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def get_status(self) -> Dict:
+        """Get cache age, size and refresh counters."""
+        with self._lock:
+            now = time.time()
+            status = dict(self.stats)
+            status.update({
+                'loaded': self._loaded_at is not None,
+                'items': len(self._items),
+                'rows': len(self._rows) if self._rows is not None else None,
+                'watermark': self._watermark,
+                'age_seconds': round(now - self._checked_at, 1) if self._checked_at else None,
+                'full_age_seconds': round(now - self._loaded_at, 1) if self._loaded_at else None,
+                'refresh_seconds': self.refresh_seconds,
+                'full_refresh_seconds': self.full_refresh_seconds,
+            })
+            return status
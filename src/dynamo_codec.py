@@ -0,0 +1,163 @@
+"""
+Low-level DynamoDB codec for read-only analytics paths.
+
+The resource API decodes every number through TypeDeserializer into a
+Decimal, and the web app / exports then walk every attribute again to turn
+those Decimals into floats for JSON and CSV. This codec decodes the
+low-level client's wire format ({'N': '7.5'}, {'S': ...}, ...) straight into
+plain Python values:
+
+  - N  -> int for integral values, float otherwise
+          (Decimal only when the value has more digits than a float holds exactly)
+  - SS / NS / BS -> list (JSON-ready, unlike set)
+  - M / L -> dict / list, decoded recursively
+
+Writes still go through Decimal (the resource API requires it), so this is
+only meant for paths that read, aggregate and serialize.
+"""
+import boto3
+from decimal import Decimal
+from typing import Dict, Iterator, List
+
+dynamodb_client = boto3.client('dynamodb', region_name='us-east-1')
+
+# Strings up to this length (sign and '.' included) have at most 15
+# significant digits, which always round-trip through a float
+_FLOAT_SAFE_LENGTH = 16
+
+
+def decode_number(value: str):
+    """
+    Decode a DynamoDB number string.
+
+    Args:
+        value: Wire-format number (e.g. "7.5", "40", "1E+2")
+
+    Returns:
+        int, float, or Decimal for values a float cannot hold exactly
+    """
+    if '.' in value or 'e' in value or 'E' in value:
+        if len(value) <= _FLOAT_SAFE_LENGTH:
+            return float(value)
+        return Decimal(value)
+    return int(value)
+
+
+def _decode_list(values: List[Dict]) -> List:
+    return [decode_value(v) for v in values]
+
+
+def _decode_map(values: Dict) -> Dict:
+    return {k: decode_value(v) for k, v in values.items()}
+
+
+def _decode_number_set(values: List[str]) -> List:
+    return [decode_number(v) for v in values]
+
+
+_DECODERS = {
+    'S': lambda v: v,
+    'N': decode_number,
+    'BOOL': lambda v: v,
+    'NULL': lambda v: None,
+    'M': _decode_map,
+    'L': _decode_list,
+    'SS': list,
+    'NS': _decode_number_set,
+    'B': lambda v: v,
+    'BS': list,
+}
+
+
+def decode_value(attribute: Dict):
+    """
+    Decode one wire-format attribute value.
+
+    Args:
+        attribute: Single-key dict such as {'N': '7.5'}
+
+    Returns:
+        Plain Python value
+    """
+    for type_code, value in attribute.items():
+        return _DECODERS[type_code](value)
+    raise ValueError("Empty attribute value")
+
+
+def decode_item(item: Dict) -> Dict:
+    """
+    Decode a wire-format item into plain Python values.
+
+    Top-level strings and numbers (almost every attribute in the timesheet
+    table) are handled inline to avoid a function call per attribute.
+
+    Args:
+        item: Item as returned by the low-level client
+
+    Returns:
+        Dict of attribute name -> plain value
+    """
+    decoded = {}
+    for name, attribute in item.items():
+        if 'S' in attribute:
+            decoded[name] = attribute['S']
+        elif 'N' in attribute:
+            decoded[name] = decode_number(attribute['N'])
+        else:
+            decoded[name] = decode_value(attribute)
+    return decoded
+
+
+def scan_items(table_name: str, client=None, **scan_kwargs) -> Iterator[Dict]:
+    """
+    Scan a table with the low-level client, yielding decoded items.
+
+    Args:
+        table_name: DynamoDB table name
+        client: Optional low-level DynamoDB client (defaults to module client)
+        **scan_kwargs: Extra Scan parameters (ProjectionExpression, Segment, ...)
+
+    Yields:
+        Decoded items, one page at a time
+    """
+    client = client or dynamodb_client
+    scan_kwargs['TableName'] = table_name
+
+    while True:
+        response = client.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            yield decode_item(item)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def scan_all(table_name: str, client=None, **scan_kwargs) -> List[Dict]:
+    """Scan a whole table into a list of decoded items (see scan_items())."""
+    return list(scan_items(table_name, client=client, **scan_kwargs))
+
+
+def query_items(table_name: str, client=None, **query_kwargs) -> Iterator[Dict]:
+    """
+    Query a table with the low-level client, yielding decoded items.
+
+    Args:
+        table_name: DynamoDB table name
+        client: Optional low-level DynamoDB client (defaults to module client)
+        **query_kwargs: Query parameters in wire format (KeyConditionExpression, ...)
+
+    Yields:
+        Decoded items, one page at a time
+    """
+    client = client or dynamodb_client
+    query_kwargs['TableName'] = table_name
+
+    while True:
+        response = client.query(**query_kwargs)
+        for item in response.get('Items', []):
+            yield decode_item(item)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -1,10 +1,11 @@
 """
 DynamoDB handler for storing timesheet data.
 """
+import os
 import boto3
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from botocore.config import Config
 from utils import (
     parse_date_range,
@@ -16,8 +17,22 @@ from utils import (
     validate_timesheet_data
 )
 from bank_holidays import is_bank_holiday
-from coverage_tracker import update_coverage, get_week_commencing
+from coverage_tracker import get_clarity_month, get_week_commencing
 from ocr_version import OCR_VERSION
+from write_pipeline import BatchWritePipeline
+from query_cache import get_person_week_items
+from week_document import (
+    STORAGE_LAYOUT_DAY,
+    STORAGE_LAYOUT_WEEK,
+    WEEK_KEY_PREFIX,
+    build_week_document,
+    expand_items,
+    is_week_document,
+    merge_week_projects,
+    remove_image_entries,
+    storage_keys,
+    week_document_key
+)
 
 # Configure boto3 with retries for transient errors
 boto_config = Config(
@@ -29,6 +44,9 @@ boto_config = Config(
 )
 dynamodb = boto3.resource('dynamodb', config=boto_config)
 
+# Storage layout: "day" (one item per person/day/project) or "week" (one item per person-week)
+STORAGE_LAYOUT = os.environ.get('STORAGE_LAYOUT', STORAGE_LAYOUT_DAY).lower()
+
 
 def convert_float_to_decimal(obj):
     """Convert float values to Decimal for DynamoDB."""
@@ -41,7 +59,8 @@ def convert_float_to_decimal(obj):
     return obj
 
 
-def check_existing_entries(table, resource_key: str, date_str: str) -> Dict[str, Dict]:
+def check_existing_entries(table, resource_key: str, date_str: str,
+                           pipeline: BatchWritePipeline = None) -> Dict[str, Dict]:
     """
     Check for existing entries for a person on a specific date.
 
@@ -49,29 +68,34 @@ def check_existing_entries(table, resource_key: str, date_str: str) -> Dict[str,
         table: DynamoDB table resource
         resource_key: ResourceName (e.g., "Neil_Pomfret")
         date_str: Date in YYYY-MM-DD format
+        pipeline: Optional write pipeline whose queued writes are not in the table yet
 
     Returns:
         Dict mapping project_code -> existing item data
     """
     try:
-        response = table.query(
-            KeyConditionExpression='ResourceName = :rn AND begins_with(DateProjectCode, :date)',
-            ExpressionAttributeValues={
-                ':rn': resource_key,
-                ':date': date_str
-            }
-        )
+        # One cached person-week read serves all seven days of a timesheet
+        week_items = get_person_week_items(table, resource_key, get_week_commencing(date_str))
 
         existing = {}
-        for item in response.get('Items', []):
+        for item in week_items:
             # Extract project code from DateProjectCode (format: "YYYY-MM-DD#PJXXXXXX")
             date_project = item.get('DateProjectCode', '')
-            if '#' in date_project:
+            if date_project.startswith(f"{date_str}#"):
                 parts = date_project.split('#')
                 if len(parts) == 2:
                     project_code = parts[1]
                     existing[project_code] = item
 
+        # Writes queued by earlier timesheets in the same pipeline win over the table
+        if pipeline is not None:
+            for date_project, queued in pipeline.pending_writes(resource_key, f"{date_str}#").items():
+                project_code = date_project.split('#', 1)[1]
+                if queued is None:
+                    existing.pop(project_code, None)
+                else:
+                    existing[project_code] = queued
+
         return existing
 
     except Exception as e:
@@ -88,7 +112,9 @@ def store_timesheet_entries(
     output_tokens: int = 0,
     cost_estimate: float = 0.0,
     table_name: str = None,
-    image_metadata: dict = None
+    image_metadata: dict = None,
+    storage_layout: str = None,
+    pipeline: BatchWritePipeline = None
 ) -> Dict:
     """
     Store timesheet entries in DynamoDB.
@@ -98,6 +124,14 @@ def store_timesheet_entries(
     - Sort Key: Date#ProjectCode (e.g., "2025-09-29#PJ021931")
     - For zero-hour timesheets: Sort Key is "WEEK#YYYY-MM-DD" to track submission
 
+    With storage_layout="week" the whole timesheet is written as a single
+    week document under "WEEK#YYYY-MM-DD" instead (see week_document.py).
+
+    Writes go through a BatchWritePipeline. Without a pipeline argument a
+    private one is created and flushed before returning; bulk callers pass a
+    shared pipeline so items from many timesheets fill 25-item batches and
+    coverage/rollup updates are coalesced until the pipeline is flushed.
+
     This allows efficient queries:
     - Get all entries for a resource
     - Get all entries for a resource in a date range
@@ -114,6 +148,8 @@ def store_timesheet_entries(
         cost_estimate: Estimated cost in USD
         table_name: DynamoDB table name (from environment)
         image_metadata: Optional image metadata (resolution, format, size, etc.)
+        storage_layout: "day" or "week" (defaults to STORAGE_LAYOUT env setting)
+        pipeline: Optional shared BatchWritePipeline (caller flushes it)
 
     Returns:
         Dictionary with summary of stored entries
@@ -126,6 +162,14 @@ def store_timesheet_entries(
     table = dynamodb.Table(table_name)
     print(f"[DEBUG store_timesheet_entries] Created table object: {table.name}")
 
+    layout = (storage_layout or STORAGE_LAYOUT).lower()
+    if layout not in (STORAGE_LAYOUT_DAY, STORAGE_LAYOUT_WEEK):
+        raise ValueError(f"Unknown storage layout: {layout}")
+
+    owns_pipeline = pipeline is None
+    if owns_pipeline:
+        pipeline = BatchWritePipeline(table_name)
+
     # Extract basic info
     resource_name = timesheet_data.get('resource_name', 'Unknown')
     date_range_str = timesheet_data.get('date_range', '')
@@ -187,9 +231,20 @@ def store_timesheet_entries(
         if image_metadata:
             item.update(image_metadata)
 
-        table.put_item(Item=item)
+        if layout == STORAGE_LAYOUT_WEEK:
+            item = build_week_document(item, [])
+
+        # Keep weekly/monthly rollups in step (a resubmitted week replaces the old marker)
+        previous = pipeline.current_item(item)
+        pipeline.put(item)
+        added, removed = expand_items([item]), expand_items([previous] if previous else [])
+        pipeline.add_rollups(added=added, removed=removed)
+        pipeline.add_resources(added=added, removed=removed)
         entries_stored = 1
 
+        if owns_pipeline:
+            pipeline.flush()
+
         return {
             'entries_stored': entries_stored,
             'resource_name': resource_name,
@@ -211,6 +266,9 @@ def store_timesheet_entries(
     duplicates_skipped = 0
     duplicates_updated = 0
 
+    # Existing rows overwritten by newer entries (their hours leave the rollups)
+    replaced_items = []
+
     for project in timesheet_data.get('projects', []):
         project_name = project.get('project_name', '')
         project_code = project.get('project_code', '')
@@ -259,9 +317,12 @@ def store_timesheet_entries(
                 continue
 
             # Check if entry already exists in DATABASE (cross-scan deduplication)
-            if date_str not in existing_db_entries_by_date:
+            # The week layout merges with the stored week document instead (one read)
+            if layout == STORAGE_LAYOUT_WEEK:
+                existing_db_entries_by_date[date_str] = {}
+            elif date_str not in existing_db_entries_by_date:
                 # Load existing entries for this date
-                existing_db_entries_by_date[date_str] = check_existing_entries(table, resource_key, date_str)
+                existing_db_entries_by_date[date_str] = check_existing_entries(table, resource_key, date_str, pipeline)
 
             existing_for_date = existing_db_entries_by_date[date_str]
 
@@ -285,6 +346,7 @@ def store_timesheet_entries(
                     print(f"   ✅ UPDATING to newer entry (replacing old data)")
                     # We'll insert the new entry (it will overwrite via put_item with same key)
                     duplicates_updated += 1
+                    replaced_items.append(existing_item)
                 else:
                     print(f"   ⏭️  SKIPPING - existing entry is newer")
                     duplicates_skipped += 1
@@ -343,26 +405,35 @@ def store_timesheet_entries(
         print(f"[DEBUG] No entries to write - skipping batch operation")
     else:
         try:
-            with table.batch_writer() as batch:
+            if layout == STORAGE_LAYOUT_WEEK:
+                replaced, document, previous = _put_week_document(pipeline, unique_entries.values(), start_date)
+                duplicates_updated += replaced
+                entries_stored = len(unique_entries)
+                print(f"[DEBUG] Week document queued - {entries_stored} entries in 1 item")
+                written_rows = expand_items([document])
+                replaced_items = expand_items([previous] if previous else [])
+            else:
                 for idx, item in enumerate(unique_entries.values()):
                     print(f"[DEBUG] Adding item {idx+1}/{len(unique_entries)} to batch")
-                    batch.put_item(Item=item)
+                    pipeline.put(item)
                     entries_stored += 1
-            print(f"[DEBUG] Batch write completed successfully - {entries_stored} entries written")
-
-            # Update coverage tracker - mark this week as submitted for this person/month
-            try:
-                # Get first date from the timesheet to determine the week
-                if week_dates and len(week_dates) > 0:
-                    first_date = format_date_for_csv(week_dates[0])
-                    week_monday = get_week_commencing(first_date)
-                    coverage_result = update_coverage(table_name, resource_key, first_date)
-                    if coverage_result.get('success'):
-                        print(f"📅 Coverage tracker updated: {resource_name} - {coverage_result.get('clarity_month')} - Week {week_monday}")
-                    else:
-                        print(f"⚠️  Coverage tracker update failed: {coverage_result.get('error', 'Unknown')}")
-            except Exception as e:
-                print(f"⚠️  Coverage tracker error (non-fatal): {e}")
+                written_rows = list(unique_entries.values())
+
+            # Weekly/monthly rollups (non-fatal; rebuild_rollups.py repairs drift)
+            pipeline.add_rollups(added=written_rows, removed=replaced_items)
+            pipeline.add_resources(added=written_rows, removed=replaced_items)
+
+            # Coverage tracker - mark this week as submitted for this person/month
+            if week_dates and len(week_dates) > 0:
+                first_date = format_date_for_csv(week_dates[0])
+                pipeline.add_coverage(resource_key, first_date)
+
+            if owns_pipeline:
+                metrics = pipeline.flush()
+                print(f"[DEBUG] Batch write completed successfully - {entries_stored} entries written")
+                print(f"📈 Rollups updated: {metrics['rollup_updates']} items")
+                if metrics['coverage_updates'] and week_dates:
+                    print(f"📅 Coverage tracker updated: {resource_name} - {get_clarity_month(first_date)} - Week {get_week_commencing(first_date)}")
 
         except Exception as e:
             print(f"[DEBUG] Batch write FAILED with error: {type(e).__name__}: {str(e)}")
@@ -391,6 +462,90 @@ def store_timesheet_entries(
     }
 
 
+def _put_week_document(pipeline: BatchWritePipeline, rows, start_date: datetime) -> Tuple[int, Dict, Dict]:
+    """
+    Queue a timesheet's per-day rows as a single week document.
+
+    The stored (or already queued) document for the same person-week is
+    merged so that days missing from the new scan are kept, matching the
+    day layout.
+
+    Args:
+        pipeline: Write pipeline the document is queued on
+        rows: Per-day items built by store_timesheet_entries()
+        start_date: Week start date
+
+    Returns:
+        Tuple of (project-days that replaced existing values, document written,
+        previous stored item or None)
+    """
+    rows = list(rows)
+    week_start = start_date.strftime('%Y-%m-%d')
+    row_only = ('DateProjectCode', 'Date', 'ProjectCode', 'ProjectName', 'Hours', 'ProjectCodeGSI', 'YearMonth')
+
+    metadata = {k: v for k, v in rows[0].items() if k not in row_only}
+    metadata.update({
+        'DateProjectCode': week_document_key(week_start),
+        'Date': week_start,
+        'YearMonth': week_start[:7],
+    })
+    document = build_week_document(metadata, rows)
+
+    replaced = 0
+    existing = pipeline.current_item(document)
+    if existing and is_week_document(existing) and not existing.get('IsZeroHourTimesheet'):
+        document['Projects'], replaced = merge_week_projects(
+            existing.get('Projects', {}), document['Projects'], existing.get('SourceImage', ''))
+
+    pipeline.put(document)
+    return replaced, document, existing
+
+
+def release_image_entries(table_name: str, image_key: str, rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Work out how to delete the entries one image wrote.
+
+    Day rows, and week documents holding nothing but this image's days, are
+    returned as keys to delete. Week documents that also hold days from
+    other scans are rewritten without this image's days instead (only if
+    no newer scan has replaced the document since it was read).
+
+    Args:
+        table_name: DynamoDB table name
+        image_key: SourceImage whose entries are removed
+        rows: Expanded rows carrying that SourceImage
+
+    Returns:
+        Tuple of (keys to delete, week documents rewritten)
+    """
+    table = dynamodb.Table(table_name)
+    keys = []
+    rewritten = []
+
+    for key in storage_keys(rows):
+        if not key['DateProjectCode'].startswith(WEEK_KEY_PREFIX):
+            keys.append(key)
+            continue
+
+        document = table.get_item(Key=key).get('Item')
+        remaining = None
+        if document and is_week_document(document):
+            remaining, _ = remove_image_entries(document, image_key)
+        if remaining is None:
+            # Day-layout zero-hour marker, or a document left empty
+            keys.append(key)
+            continue
+
+        table.put_item(
+            Item=remaining,
+            ConditionExpression='ProcessingTimestamp = :ts',
+            ExpressionAttributeValues={':ts': document.get('ProcessingTimestamp', '')}
+        )
+        rewritten.append(remaining)
+
+    return keys, rewritten
+
+
 def query_timesheet_by_resource(
     resource_name: str,
     start_date: str = None,
@@ -425,6 +580,24 @@ def query_timesheet_by_resource(
                 ':end': f"{end_date}#ZZZZZZ"
             }
         )
+        items = response.get('Items', [])
+
+        # Week documents live under WEEK#<monday>, which can start up to 6 days before start_date
+        week_floor = (datetime.strptime(start_date, '%Y-%m-%d') - timedelta(days=6)).strftime('%Y-%m-%d')
+        week_response = table.query(
+            KeyConditionExpression='ResourceName = :rn AND DateProjectCode BETWEEN :start AND :end',
+            ExpressionAttributeValues={
+                ':rn': resource_key,
+                ':start': week_document_key(week_floor),
+                ':end': week_document_key(end_date)
+            }
+        )
+        week_documents = [item for item in week_response.get('Items', []) if is_week_document(item)]
+        items.extend(
+            row for row in expand_items(week_documents)
+            if not row.get('IsZeroHourTimesheet') and start_date <= row['Date'] <= end_date
+        )
+        return items
     else:
         response = table.query(
             KeyConditionExpression='ResourceName = :rn',
@@ -433,7 +606,7 @@ def query_timesheet_by_resource(
             }
         )
 
-    return response.get('Items', [])
+    return expand_items(response.get('Items', []))
 
 
 def query_timesheet_by_project(
@@ -443,6 +616,8 @@ def query_timesheet_by_project(
     """
     Query timesheet entries for a specific project using GSI.
 
+    Week documents have no ProjectCodeGSI attribute and are not in the index.
+
     Args:
         project_code: Project code (e.g., "PJ021931")
         table_name: DynamoDB table name
@@ -489,7 +664,7 @@ def scan_all_timesheets(table_name: str = None) -> List[Dict]:
         response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
         items.extend(response.get('Items', []))
 
-    return items
+    return expand_items(items)
 
 
 def store_rejected_timesheet(
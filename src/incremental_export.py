@@ -0,0 +1,194 @@
+"""
+Incremental (change-only) Parquet export.
+
+A full export reads every item in the table, even when a night's changes
+touched one person's week. export_changes() keeps a watermark next to the
+export and rewrites only the month partitions that changed since it:
+
+  - Writes: every write path stores rows with a ProcessingTimestamp and
+    updates the rows' rollups in the same step, setting LastUpdated. The
+    ROLLUP#PERSON_MONTH_PROJECT items with LastUpdated after the watermark
+    name the months that gained or changed rows - one small partition is
+    read instead of the table (there is no index on ProcessingTimestamp).
+    Corrections touch the rollups of every row they change, so a month whose
+    counters did not move (e.g. a ProjectName fix) is still picked up
+  - Deletes: the months in the tombstone journal (change_journal.py) after
+    the watermark, which also covers flushes that do not maintain rollups
+  - Each changed month is read through YearMonthIndex (data_pages.iter_rows)
+    and its partition rewritten; a month left without rows has its file removed
+
+The watermark is the run's start time, less EXPORT_WATERMARK_OVERLAP_SECONDS
+for clock skew between writers - re-exporting a month twice is harmless,
+missing one is not. The first run, a run with --full, or a table whose
+rollups are not seeded yet falls back to a full export.
+
+State object (S3, EXPORT_STATE_KEY):
+  {"watermark": "...", "mode": "incremental", "months": [...], "finished_at": "..."}
+"""
+import calendar
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from bulk_delete import segmented_scan
+from change_journal import deleted_months_since
+from data_pages import iter_rows
+from dynamo_codec import dynamodb_client, query_items
+from parquet_export import ParquetExporter, partition_of, upload_partitions
+from rollups import PERSON_MONTH_PROJECT, rollup_partition
+from week_document import expand_items
+
+EXPORT_STATE_KEY = os.environ.get('EXPORT_STATE_KEY', 'quicksight-data/timesheet_parquet_state.json')
+EXPORT_WATERMARK_OVERLAP_SECONDS = int(os.environ.get('EXPORT_WATERMARK_OVERLAP_SECONDS', '300'))
+
+
+def load_state(s3_client, bucket: str, key: str = EXPORT_STATE_KEY) -> Optional[Dict]:
+    """Get the last run's export state, or None before the first run."""
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=key)
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    return json.loads(response['Body'].read())
+
+
+def save_state(s3_client, bucket: str, key: str, state: Dict):
+    """Store the export state (only after the partitions are uploaded)."""
+    s3_client.put_object(Bucket=bucket, Key=key, Body=json.dumps(state, indent=2).encode('utf-8'),
+                         ContentType='application/json')
+
+
+def rollups_seeded(table_name: str, client=None) -> bool:
+    """Check whether the PERSON_MONTH_PROJECT rollups exist (rebuild_rollups.py has run)."""
+    response = (client or dynamodb_client).query(
+        TableName=table_name,
+        KeyConditionExpression='ResourceName = :pk',
+        ExpressionAttributeValues={':pk': {'S': rollup_partition(PERSON_MONTH_PROJECT)}},
+        Select='COUNT',
+        Limit=1
+    )
+    return response.get('Count', 0) > 0
+
+
+def written_months_since(table_name: str, since: str, client=None) -> Set[str]:
+    """
+    Get the months whose rows were written or changed after a timestamp.
+
+    Args:
+        table_name: DynamoDB table name
+        since: ISO timestamp (rollups' LastUpdated format)
+        client: Optional low-level DynamoDB client
+
+    Returns:
+        Set of YYYY-MM strings
+    """
+    items = query_items(
+        table_name,
+        client=client,
+        KeyConditionExpression='ResourceName = :pk',
+        FilterExpression='LastUpdated > :since',
+        ExpressionAttributeValues={
+            ':pk': {'S': rollup_partition(PERSON_MONTH_PROJECT)},
+            ':since': {'S': since},
+        },
+        ProjectionExpression='YearMonth'
+    )
+    return {item['YearMonth'] for item in items if item.get('YearMonth')}
+
+
+def _month_range(month: str) -> Dict:
+    year, month_number = int(month[:4]), int(month[5:7])
+    last_day = calendar.monthrange(year, month_number)[1]
+    return {'start': f"{month}-01", 'end': f"{month}-{last_day:02d}"}
+
+
+def export_changes(
+    table_name: str,
+    bucket: str,
+    prefix: str,
+    directory: str,
+    s3_client,
+    client=None,
+    state_key: str = EXPORT_STATE_KEY,
+    full: bool = False,
+    writer_factory=None,
+    log_func=print,
+    now: datetime = None
+) -> Dict:
+    """
+    Export the month partitions changed since the last run (or everything).
+
+    Args:
+        table_name: DynamoDB table name
+        bucket: Export bucket
+        prefix: Table location prefix of the Parquet partitions
+        directory: Local working directory for partition files
+        s3_client: boto3 S3 client
+        client: Optional low-level DynamoDB client
+        state_key: S3 key of the watermark state
+        full: Re-export the whole table regardless of the watermark
+        writer_factory: Parquet writer factory (replaced in tests)
+        log_func: Logger for progress messages
+        now: Run start time (replaced in tests)
+
+    Returns:
+        Dict with mode (full / incremental / unchanged), months, rows,
+        changed_rows, partitions, uploaded, deleted and watermark
+    """
+    started = now or datetime.utcnow()
+    watermark = started.isoformat()
+    state = None if full else load_state(s3_client, bucket, state_key)
+    exporter = ParquetExporter(directory, writer_factory=writer_factory, log_func=log_func)
+
+    if state is None or not rollups_seeded(table_name, client):
+        reason = 'requested' if full else ('first run' if state is None else 'rollups not seeded')
+        log_func(f"📦 Full export ({reason})")
+
+        def rows():
+            for item in segmented_scan(table_name, client=client, keys_only=False):
+                yield from expand_items([item])
+
+        report = exporter.export(rows())
+        uploaded = upload_partitions(report, s3_client, bucket, prefix, log_func=log_func)
+        result = {'mode': 'full', 'months': sorted(report['partitions']), 'rows': report['rows'],
+                  'changed_rows': report['rows']}
+    else:
+        since = (datetime.fromisoformat(state['watermark'])
+                 - timedelta(seconds=EXPORT_WATERMARK_OVERLAP_SECONDS)).isoformat()
+        written = written_months_since(table_name, since, client)
+        deleted = deleted_months_since(table_name, since, client)
+        months = sorted(written | deleted)
+        log_func(f"🔎 Changes since {since}: {len(written)} months written, {len(deleted)} with deletes")
+
+        changed_rows = 0
+        for month in months:
+            for row in iter_rows(table_name, _month_range(month), client):
+                if partition_of(row) != month:
+                    continue
+                exporter.add(row)
+                if str(row.get('ProcessingTimestamp', '')) > since:
+                    changed_rows += 1
+        report = exporter.close()
+
+        if months:
+            uploaded = upload_partitions(report, s3_client, bucket, prefix, months=months, log_func=log_func)
+        else:
+            uploaded = {'uploaded': [], 'deleted': []}
+        result = {'mode': 'incremental' if months else 'unchanged', 'months': months,
+                  'rows': report['rows'], 'changed_rows': changed_rows}
+
+    result.update({
+        'partitions': len(report['partitions']),
+        'uploaded': uploaded['uploaded'],
+        'deleted': uploaded['deleted'],
+        'watermark': watermark,
+        'previous_watermark': state['watermark'] if state else None,
+    })
+    save_state(s3_client, bucket, state_key, {
+        'watermark': watermark,
+        'mode': result['mode'],
+        'months': result['months'],
+        'finished_at': datetime.utcnow().isoformat(),
+    })
+    log_func(f"✓ {result['mode'].capitalize()} export: {result['rows']} rows in "
+             f"{len(result['months'])} months ({result['changed_rows']} changed)")
+    return result
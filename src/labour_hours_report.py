@@ -3,14 +3,30 @@ Labour Hours Report Generator for Clarity Months.
 
 Generates a grid showing total hours worked by each team member per week,
 with monthly totals. Similar layout to coverage report but with numeric hours.
+
+The report reads only the YearMonth partitions its period touches (via the
+YearMonthIndex) instead of scanning the whole table, and buckets each entry
+into its week from the date's ordinal - (ordinal - first Monday) // 7 - in a
+single pass into a person x week grid, rather than parsing every date and
+walking the week list per entry.
+
+The HTML comes from report_templates/labour_hours.html; stream_html_report()
+yields it in chunks, one table row at a time.
 """
 import json
+import os
 import boto3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from collections import defaultdict
-from decimal import Decimal
+from week_document import expand_items
+from rollups import get_person_week_totals
+from data_pages import iter_rows
+from report_render import stream
+
+# Read weekly totals from the materialized PERSON_WEEK rollups instead of scanning
+USE_ROLLUPS = os.environ.get('USE_ROLLUPS', 'false').lower() == 'true'
 
 
 def load_clarity_months():
@@ -79,16 +95,30 @@ def parse_clarity_month(month_str: str) -> Tuple[datetime, datetime, str]:
     return start_date, end_date, display
 
 
-def fetch_timesheet_data(table_name: str = 'TimesheetOCR-dev', profile_name: str = None, region: str = 'us-east-1'):
-    """Fetch all timesheet data from DynamoDB."""
+def fetch_timesheet_data(table_name: str = 'TimesheetOCR-dev', profile_name: str = None, region: str = 'us-east-1',
+                         start_date: datetime = None, end_date: datetime = None):
+    """
+    Fetch timesheet data from DynamoDB.
+
+    With start_date and end_date, only the YearMonth partitions covering the
+    period are queried (plus the month before, for week documents filed under
+    their Monday) and rows outside the period are dropped. Without them the
+    whole table is scanned.
+    """
     try:
         if profile_name:
             session = boto3.Session(profile_name=profile_name, region_name=region)
-            dynamodb = session.resource('dynamodb')
         else:
-            dynamodb = boto3.resource('dynamodb', region_name=region)
+            session = boto3.Session(region_name=region)
+
+        if start_date and end_date:
+            return list(iter_rows(
+                table_name,
+                {'start': start_date.strftime('%Y-%m-%d'), 'end': end_date.strftime('%Y-%m-%d')},
+                client=session.client('dynamodb')
+            ))
 
-        table = dynamodb.Table(table_name)
+        table = session.resource('dynamodb').Table(table_name)
 
         # Scan entire table
         response = table.scan()
@@ -99,16 +129,68 @@ def fetch_timesheet_data(table_name: str = 'TimesheetOCR-dev', profile_name: str
             response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
             items.extend(response.get('Items', []))
 
-        return items
+        return expand_items(items)
     except Exception as e:
         print(f"Error fetching data from DynamoDB: {e}")
         return []
 
 
+def fetch_weekly_hours_from_rollups(weeks: List[datetime], table_name: str = 'TimesheetOCR-dev',
+                                    profile_name: str = None, region: str = 'us-east-1') -> Tuple[Dict, Dict]:
+    """
+    Read weekly hours from PERSON_WEEK rollups (one Query for the whole period).
+
+    Rollups hold whole-week totals, so this is only equivalent to
+    calculate_weekly_hours() for periods that start on a Monday and end on a Sunday.
+
+    Returns:
+        Same (weekly_hours, zero_hour_weeks) tuple as calculate_weekly_hours()
+    """
+    if profile_name:
+        session = boto3.Session(profile_name=profile_name, region_name=region)
+        dynamodb = session.resource('dynamodb')
+    else:
+        dynamodb = boto3.resource('dynamodb', region_name=region)
+
+    table = dynamodb.Table(table_name)
+
+    weekly_hours = defaultdict(float)
+    zero_hour_weeks = {}
+    if not weeks:
+        return weekly_hours, zero_hour_weeks
+
+    totals = get_person_week_totals(
+        table_name,
+        weeks[0].strftime('%Y-%m-%d'),
+        weeks[-1].strftime('%Y-%m-%d'),
+        table=table
+    )
+
+    for (resource_key, week_str), total in totals.items():
+        person = resource_key.replace('_', ' ')
+        if total['zero_hour']:
+            zero_hour_weeks[(person, week_str)] = True
+        if total['hours']:
+            weekly_hours[(person, week_str)] += total['hours']
+
+    return weekly_hours, zero_hour_weeks
+
+
+def _date_ordinal(date_str) -> Optional[int]:
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+    except (ValueError, TypeError):
+        return None
+
+
 def calculate_weekly_hours(items: List[Dict], start_date: datetime, end_date: datetime, weeks: List[datetime]) -> Tuple[Dict, Dict]:
     """
     Calculate weekly hours for each person.
 
+    Weeks are consecutive Mondays, so an entry's week index is
+    (date ordinal - first Monday's ordinal) // 7. Each distinct date string is
+    parsed once, and hours are summed into a person x week grid in one pass.
+
     Returns:
         Tuple of:
         - weekly_hours: Dict with {(person, week_start_str): total_hours}
@@ -117,74 +199,65 @@ def calculate_weekly_hours(items: List[Dict], start_date: datetime, end_date: da
     weekly_hours = defaultdict(float)
     zero_hour_weeks = {}
 
-    for item in items:
-        # Check if this is a zero-hour timesheet
-        is_zero_hour = item.get('IsZeroHourTimesheet', False)
-
-        # Get person name (convert underscores to spaces)
-        person = item.get('ResourceName', '').replace('_', ' ')
-
-        if is_zero_hour:
-            # Zero-hour timesheets use Date field for week start
-            date_str = item.get('Date')
-            if not date_str:
-                continue
-
-            try:
-                entry_date = datetime.strptime(date_str, '%Y-%m-%d')
-            except (ValueError, TypeError):
-                continue
+    first_monday = weeks[0].toordinal() if weeks else 0
+    week_count = len(weeks)
+    start_ordinal = start_date.toordinal()
+    end_ordinal = end_date.toordinal()
 
-            # Check if in our period
-            if entry_date < start_date or entry_date > end_date:
-                continue
-
-            # Mark this week as zero-hour for this person
-            week_start_str = entry_date.strftime('%Y-%m-%d')
-            zero_hour_weeks[(person, week_start_str)] = True
-            # Don't add hours - it's a zero-hour timesheet
-            continue
+    ordinals = {}    # date string -> ordinal (None if unparseable)
+    names = {}       # ResourceName -> person display name
+    grid = {}        # person -> hours per week (None where nothing was logged)
 
-        # Regular timesheet processing
+    for item in items:
         date_str = item.get('Date')
         if not date_str:
             continue
 
-        try:
-            entry_date = datetime.strptime(date_str, '%Y-%m-%d')
-        except (ValueError, TypeError):
-            continue
+        if date_str in ordinals:
+            ordinal = ordinals[date_str]
+        else:
+            ordinal = ordinals[date_str] = _date_ordinal(date_str)
 
         # Check if entry is in our period
-        if entry_date < start_date or entry_date > end_date:
+        if ordinal is None or ordinal < start_ordinal or ordinal > end_ordinal:
             continue
 
-        # Find which week this entry belongs to
-        week_start = None
-        for week in weeks:
-            week_end = week + timedelta(days=6)
-            if week <= entry_date <= week_end:
-                week_start = week.strftime('%Y-%m-%d')
-                break
+        # Get person name (convert underscores to spaces)
+        resource_name = item.get('ResourceName', '')
+        person = names.get(resource_name)
+        if person is None:
+            person = names[resource_name] = resource_name.replace('_', ' ')
+
+        if item.get('IsZeroHourTimesheet', False):
+            # Zero-hour timesheets use Date field for week start - mark the week, add no hours
+            week_start_str = datetime.fromordinal(ordinal).strftime('%Y-%m-%d')
+            zero_hour_weeks[(person, week_start_str)] = True
+            continue
 
-        if not week_start:
+        week = (ordinal - first_monday) // 7
+        if week < 0 or week >= week_count:
             continue
 
-        # Get hours (handle both Decimal and float/int)
-        hours_value = item.get('Hours', 0)
-        if isinstance(hours_value, Decimal):
-            hours = float(hours_value)
-        else:
-            hours = float(hours_value)
+        row = grid.get(person)
+        if row is None:
+            row = grid[person] = [None] * week_count
+
+        # Hours may be Decimal (DynamoDB) or float/int
+        hours = float(item.get('Hours', 0))
+        row[week] = hours if row[week] is None else row[week] + hours
 
-        # Add to weekly total
-        weekly_hours[(person, week_start)] += hours
+    week_strs = [week.strftime('%Y-%m-%d') for week in weeks]
+    for person, row in grid.items():
+        for week, hours in enumerate(row):
+            if hours is not None:
+                weekly_hours[(person, week_strs[week])] = hours
 
     return weekly_hours, zero_hour_weeks
 
 
 def generate_labour_hours_report(clarity_month: str, table_name: str = 'TimesheetOCR-dev',
-                                  profile_name: str = None, region: str = 'us-east-1') -> Dict:
+                                  profile_name: str = None, region: str = 'us-east-1',
+                                  use_rollups: bool = None) -> Dict:
     """
     Generate labour hours report for a Clarity month.
 
@@ -193,6 +266,7 @@ def generate_labour_hours_report(clarity_month: str, table_name: str = 'Timeshee
         table_name: DynamoDB table name
         profile_name: AWS profile name (optional)
         region: AWS region
+        use_rollups: Read PERSON_WEEK rollups instead of scanning (defaults to USE_ROLLUPS)
 
     Returns:
         Dict with:
@@ -215,19 +289,39 @@ def generate_labour_hours_report(clarity_month: str, table_name: str = 'Timeshee
     # Load team roster
     team_members = load_team_roster()
 
-    # Fetch data from DynamoDB
-    items = fetch_timesheet_data(table_name, profile_name, region)
+    if use_rollups is None:
+        use_rollups = USE_ROLLUPS
 
-    # Calculate weekly hours
-    weekly_hours, zero_hour_weeks = calculate_weekly_hours(items, start_date, end_date, weeks)
+    # Rollups are whole-week totals - only use them when the period is week-aligned
+    if use_rollups and start_date.weekday() == 0 and end_date.weekday() == 6:
+        weekly_hours, zero_hour_weeks = fetch_weekly_hours_from_rollups(weeks, table_name, profile_name, region)
+    else:
+        # Fetch only the months this period covers
+        items = fetch_timesheet_data(table_name, profile_name, region, start_date, end_date)
 
+        # Calculate weekly hours
+        weekly_hours, zero_hour_weeks = calculate_weekly_hours(items, start_date, end_date, weeks)
+
+    return summarize_weekly_hours(clarity_month, period_display, start_date, end_date, weeks,
+                                  team_members, weekly_hours, zero_hour_weeks)
+
+
+def summarize_weekly_hours(clarity_month: str, period_display: str, start_date: datetime, end_date: datetime,
+                           weeks: List[datetime], team_members: List[str], weekly_hours: Dict,
+                           zero_hour_weeks: Dict) -> Dict:
+    """
+    Build the report dict (per-person totals and statistics) from weekly hours.
+
+    Returns:
+        Same dict as generate_labour_hours_report()
+    """
     # Calculate month totals for each person
     month_totals = {}
     month_totals_days = {}
+    week_strs = [week.strftime('%Y-%m-%d') for week in weeks]
     for person in team_members:
         total = 0.0
-        for week in weeks:
-            week_str = week.strftime('%Y-%m-%d')
+        for week_str in week_strs:
             total += weekly_hours.get((person, week_str), 0.0)
         month_totals[person] = total
         # Convert hours to days (7.5 hours = 1 day)
@@ -260,279 +354,58 @@ def generate_labour_hours_report(clarity_month: str, table_name: str = 'Timeshee
     }
 
 
-def generate_html_report(report_data: Dict) -> str:
-    """Generate HTML for the labour hours report."""
-
-    clarity_month = report_data['clarity_month']
-    period_display = report_data['period_display']
-    weeks = report_data['weeks']
-    team_members = report_data['team_members']
+def _labour_rows(report_data: Dict) -> Iterator[Dict]:
+    """Table rows for the labour hours template, built one person at a time."""
+    week_strs = [week.strftime('%Y-%m-%d') for week in report_data['weeks']]
     weekly_hours = report_data['weekly_hours']
     zero_hour_weeks = report_data['zero_hour_weeks']
-    month_totals = report_data['month_totals']
-    month_totals_days = report_data['month_totals_days']
-    stats = report_data['statistics']
-
-    # Generate week headers
-    week_headers = []
-    for week in weeks:
-        week_str = week.strftime('%d %b')
-        week_headers.append(f'<th class="week-header">{week_str}</th>')
-    week_headers_html = '\n                    '.join(week_headers)
-
-    # Generate table rows
-    rows_html = []
-    for person in team_members:
-        cells = [f'<td class="person-name">{person}</td>']
 
-        # Add weekly hour cells
-        for week in weeks:
-            week_str = week.strftime('%Y-%m-%d')
-            is_zero_hour = (person, week_str) in zero_hour_weeks
+    for person in report_data['team_members']:
+        cells = []
+        for week_str in week_strs:
             hours = weekly_hours.get((person, week_str), 0.0)
-
-            if is_zero_hour:
+            if (person, week_str) in zero_hour_weeks:
                 # Zero-hour timesheet (annual leave/absence)
-                cell_class = "hours-cell zero-hours"
-                cell_value = "0.0"
+                cells.append(('zero-hours', '0.0'))
             elif hours > 0:
                 # Regular hours logged
-                cell_class = "hours-cell has-hours"
-                cell_value = f"{hours:.1f}"
+                cells.append(('has-hours', f"{hours:.1f}"))
             else:
                 # Missing timesheet
-                cell_class = "hours-cell no-hours"
-                cell_value = "-"
-
-            cells.append(f'<td class="{cell_class}">{cell_value}</td>')
-
-        # Add month totals (hours and days)
-        total_hours = month_totals.get(person, 0.0)
-        total_days = month_totals_days.get(person, 0.0)
-        cells.append(f'<td class="month-total"><strong>{total_hours:.1f}</strong></td>')
-        cells.append(f'<td class="month-total"><strong>{total_days:.1f}</strong></td>')
-
-        row_html = '\n                    '.join(cells)
-        rows_html.append(f'''
-                <tr>
-                    {row_html}
-                </tr>''')
-
-    rows_html_str = ''.join(rows_html)
-
-    # Generate HTML
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Labour Hours Report - {clarity_month}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-
-        .header h1 {{
-            font-size: 32px;
-            font-weight: 700;
-            margin-bottom: 8px;
-        }}
-
-        .header p {{
-            font-size: 16px;
-            opacity: 0.9;
-        }}
-
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 30px;
-            background: #f8f9fa;
-        }}
-
-        .stat-card {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            text-align: center;
-        }}
-
-        .stat-value {{
-            font-size: 32px;
-            font-weight: 700;
-            color: #667eea;
-            margin-bottom: 8px;
-        }}
-
-        .stat-label {{
-            font-size: 14px;
-            color: #6c757d;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-
-        .table-container {{
-            overflow-x: auto;
-            padding: 30px;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            background: white;
-        }}
-
-        th {{
-            background: #667eea;
-            color: white;
-            padding: 15px 12px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 14px;
-            position: sticky;
-            top: 0;
-            z-index: 10;
-        }}
-
-        th.week-header {{
-            text-align: center;
-        }}
-
-        td {{
-            padding: 12px;
-            border-bottom: 1px solid #e9ecef;
-        }}
-
-        td.person-name {{
-            font-weight: 600;
-            color: #2d3748;
-            position: sticky;
-            left: 0;
-            background: white;
-            z-index: 5;
-        }}
-
-        td.hours-cell {{
-            text-align: center;
-            font-weight: 500;
-        }}
-
-        td.has-hours {{
-            color: #22c55e;
-            background-color: #f0fdf4;
-        }}
-
-        td.zero-hours {{
-            color: #f59e0b;
-            background-color: #fffbeb;
-            font-style: italic;
-        }}
-
-        td.no-hours {{
-            color: #9ca3af;
-            background-color: #f9fafb;
-        }}
-
-        td.month-total {{
-            text-align: center;
-            background: #f8f9fa;
-            font-size: 16px;
-            color: #1e293b;
-            border-left: 2px solid #667eea;
-        }}
-
-        tr:hover {{
-            background-color: #f8f9fa;
-        }}
-
-        @media print {{
-            body {{
-                background: white;
-                padding: 0;
-            }}
-
-            .container {{
-                box-shadow: none;
-            }}
-
-            .stats {{
-                page-break-after: avoid;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📊 Labour Hours Report - {clarity_month}</h1>
-            <p>Period: {period_display}</p>
-        </div>
-
-        <div class="stats">
-            <div class="stat-card">
-                <div class="stat-value">{stats['total_team_members']}</div>
-                <div class="stat-label">Team Members</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">{stats['total_weeks']}</div>
-                <div class="stat-label">Weeks</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">{stats['total_hours_logged']:.1f}</div>
-                <div class="stat-label">Total Hours</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">{stats['average_hours_per_person']:.1f}</div>
-                <div class="stat-label">Avg Hours/Person</div>
-            </div>
-        </div>
-
-        <div class="table-container">
-            <table>
-                <thead>
-                    <tr>
-                        <th>Name</th>
-                        {week_headers_html}
-                        <th class="week-header">Month Total (Hours)</th>
-                        <th class="week-header">Month Total (Days)</th>
-                    </tr>
-                </thead>
-                <tbody>{rows_html_str}
-                </tbody>
-            </table>
-        </div>
-    </div>
-</body>
-</html>'''
-
-    return html
+                cells.append(('no-hours', '-'))
+
+        yield {
+            'person': person,
+            'cells': cells,
+            'total_hours': report_data['month_totals'].get(person, 0.0),
+            'total_days': report_data['month_totals_days'].get(person, 0.0),
+        }
+
+
+def stream_html_report(report_data: Dict, asset_base: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream the labour hours report HTML in chunks.
+
+    Args:
+        report_data: Output of generate_labour_hours_report()
+        asset_base: URL prefix the CSS assets are served under (None inlines the CSS)
+
+    Returns:
+        Iterator of HTML strings
+    """
+    return stream('labour_hours.html', {
+        'clarity_month': report_data['clarity_month'],
+        'period_display': report_data['period_display'],
+        'stats': report_data['statistics'],
+        'week_labels': [week.strftime('%d %b') for week in report_data['weeks']],
+        'total_label': report_data.get('total_label', 'Month'),
+        'rows': _labour_rows(report_data),
+    }, asset_base)
+
+
+def generate_html_report(report_data: Dict) -> str:
+    """Generate HTML for the labour hours report (CSS inlined, so the document stands alone)."""
+    return ''.join(stream_html_report(report_data))
 
 
 if __name__ == '__main__':
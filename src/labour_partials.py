@@ -0,0 +1,307 @@
+"""
+Multi-month labour hours reports composed from cached month partials.
+
+generate_labour_hours_report() covers one Clarity month and reads that
+month's rows on every call, so a quarter or year view meant 3 or 12 full
+reads. Each Clarity month is now reduced to a partial - person x week hours
+and zero-hour flags - cached in a ReportCache (report_cache.py) under a
+version stamp:
+
+  - The stamp hashes the month's ROLLUP#PERSON_WEEK items (LastUpdated and
+    counters, which every write path maintains) and the latest tombstone
+    (change_journal.py) for the calendar months the period touches, so
+    writes, corrections and deletes all move it. Corrections that leave the
+    counters unchanged still touch the rollups' LastUpdated
+    (corrections_importer.py).
+  - Tombstone keys start with the delete time, not the month, so the
+    journal is read once per report (latest_deletes()) and shared by every
+    month's stamp
+  - Before the rollups are seeded there is no stamp and partials are
+    always recomputed (never cached)
+
+generate_labour_hours_range_report() merges the partials of any run of
+Clarity months, recomputing only the months whose stamp changed. Week
+columns are the months' weeks side by side, so the totals always equal the
+sum of the monthly reports.
+
+Usage:
+    months = clarity_months_for_quarter(2025, 4)
+    report = generate_labour_hours_range_report(months)
+    html = generate_html_report(report)
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import boto3
+from boto3.dynamodb.conditions import Key
+from change_journal import JOURNAL_PARTITION
+from labour_hours_report import (
+    calculate_weekly_hours,
+    fetch_timesheet_data,
+    get_monday_weeks_in_period,
+    load_clarity_months,
+    load_team_roster,
+    summarize_weekly_hours,
+)
+from report_cache import ReportCache
+from rollups import PERSON_WEEK, rollup_partition
+
+_partial_cache = None
+
+
+def get_partial_cache() -> ReportCache:
+    """Process-wide partial cache (memory LRU plus the REPORT_CACHE_* shared tier)."""
+    global _partial_cache
+    if _partial_cache is None:
+        _partial_cache = ReportCache()
+    return _partial_cache
+
+
+def _query_all(table, **query_kwargs) -> List[Dict]:
+    items = []
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def latest_deletes(table) -> Dict[str, str]:
+    """
+    Read the tombstone journal once.
+
+    Args:
+        table: DynamoDB table resource
+
+    Returns:
+        Dict mapping YYYY-MM -> sort key of the month's latest tombstone
+    """
+    latest = {}
+    for tombstone in _query_all(
+        table,
+        KeyConditionExpression=Key('ResourceName').eq(JOURNAL_PARTITION),
+        ProjectionExpression='DateProjectCode, DeletedYearMonth'
+    ):
+        month = tombstone.get('DeletedYearMonth')
+        if month:
+            latest[month] = max(latest.get(month, ''), tombstone['DateProjectCode'])
+    return latest
+
+
+def month_data_version(table, start_date: datetime, end_date: datetime,
+                       deletes: Dict[str, str] = None) -> Optional[str]:
+    """
+    Get the data version of a Clarity month's period.
+
+    Args:
+        table: DynamoDB table resource
+        start_date: Period start
+        end_date: Period end
+        deletes: Output of latest_deletes() (read here when not given)
+
+    Returns:
+        Version string, or None when no PERSON_WEEK rollups cover the period
+    """
+    first_monday = (start_date - timedelta(days=start_date.weekday())).strftime('%Y-%m-%d')
+    rollups = _query_all(
+        table,
+        KeyConditionExpression=Key('ResourceName').eq(rollup_partition(PERSON_WEEK))
+        & Key('DateProjectCode').between(first_monday, f"{end_date.strftime('%Y-%m-%d')}#~"),
+        ProjectionExpression='DateProjectCode, LastUpdated, TotalHours, EntryCount, ZeroHourCount'
+    )
+    if not rollups:
+        return None
+
+    digest = hashlib.sha256()
+    for item in sorted(rollups, key=lambda i: i['DateProjectCode']):
+        digest.update('|'.join(str(item.get(attr, '')) for attr in (
+            'DateProjectCode', 'LastUpdated', 'TotalHours', 'EntryCount', 'ZeroHourCount')).encode('utf-8'))
+
+    # Deletes that did not maintain rollups (e.g. flush scripts) still leave a tombstone
+    if deletes is None:
+        deletes = latest_deletes(table)
+    calendar_months = {start_date.strftime('%Y-%m'), end_date.strftime('%Y-%m')}
+    latest_delete = max((deletes.get(month, '') for month in calendar_months), default='')
+
+    return f"{digest.hexdigest()[:24]}|{len(rollups)}|{latest_delete}"
+
+
+def _parse_period(clarity_month: str, clarity_months: Dict) -> Tuple[datetime, datetime]:
+    if clarity_month not in clarity_months:
+        raise ValueError(f"Clarity month '{clarity_month}' not found in clarity_months.json")
+    month_data = clarity_months[clarity_month]
+    return (datetime.strptime(month_data['start'], '%Y-%m-%d'),
+            datetime.strptime(month_data['end'], '%Y-%m-%d'))
+
+
+def compute_month_partial(clarity_month: str, start_date: datetime, end_date: datetime,
+                          table_name: str, profile_name: str = None, region: str = 'us-east-1') -> Dict:
+    """
+    Reduce one Clarity month to its partial aggregate.
+
+    Returns:
+        Dict with clarity_month, start, end, weeks (Monday strings),
+        hours ({person: {week: hours}}) and zero_hour ([[person, week], ...])
+    """
+    weeks = get_monday_weeks_in_period(start_date, end_date)
+    items = fetch_timesheet_data(table_name, profile_name, region, start_date, end_date)
+    weekly_hours, zero_hour_weeks = calculate_weekly_hours(items, start_date, end_date, weeks)
+
+    hours = {}
+    for (person, week_str), value in weekly_hours.items():
+        hours.setdefault(person, {})[week_str] = value
+
+    return {
+        'clarity_month': clarity_month,
+        'start': start_date.strftime('%Y-%m-%d'),
+        'end': end_date.strftime('%Y-%m-%d'),
+        'weeks': [week.strftime('%Y-%m-%d') for week in weeks],
+        'hours': hours,
+        'zero_hour': sorted([person, week_str] for person, week_str in zero_hour_weeks),
+    }
+
+
+def get_month_partial(clarity_month: str, table_name: str = 'TimesheetOCR-dev', profile_name: str = None,
+                      region: str = 'us-east-1', cache: ReportCache = None, table=None,
+                      clarity_months: Dict = None, deletes: Dict[str, str] = None) -> Tuple[Dict, bool]:
+    """
+    Get a month's partial, from the cache when its data version is unchanged.
+
+    Args:
+        clarity_month: Month identifier like "Nov-25"
+        table_name: DynamoDB table name
+        profile_name: AWS profile name (optional)
+        region: AWS region
+        cache: Partial cache (defaults to the process-wide one)
+        table: Optional DynamoDB table resource for the version lookup
+        clarity_months: Month definitions (defaults to clarity_months.json)
+        deletes: Output of latest_deletes(), when the caller already read it
+
+    Returns:
+        Tuple of (partial dict, reused from cache)
+    """
+    clarity_months = clarity_months if clarity_months is not None else load_clarity_months()
+    start_date, end_date = _parse_period(clarity_month, clarity_months)
+    cache = cache or get_partial_cache()
+
+    if table is None:
+        session = boto3.Session(profile_name=profile_name, region_name=region)
+        table = session.resource('dynamodb').Table(table_name)
+
+    version = month_data_version(table, start_date, end_date, deletes)
+    cache_key = f"labour-partial|{table_name}|{clarity_month}|{start_date:%Y-%m-%d}|{end_date:%Y-%m-%d}"
+    if version is not None:
+        entry = cache.get(cache_key, version)
+        if entry is not None:
+            return json.loads(entry['body']), True
+
+    partial = compute_month_partial(clarity_month, start_date, end_date, table_name, profile_name, region)
+    if version is not None:
+        cache.put(cache_key, version, json.dumps(partial), 'application/json')
+    return partial, False
+
+
+def _sorted_month_ids(clarity_months: Dict) -> List[str]:
+    return sorted(clarity_months, key=lambda month_id: clarity_months[month_id]['start'])
+
+
+def clarity_months_between(first_month: str, last_month: str, clarity_months: Dict = None) -> List[str]:
+    """Clarity month ids from first_month to last_month inclusive, in date order."""
+    clarity_months = clarity_months if clarity_months is not None else load_clarity_months()
+    ordered = _sorted_month_ids(clarity_months)
+    for month_id in (first_month, last_month):
+        if month_id not in clarity_months:
+            raise ValueError(f"Clarity month '{month_id}' not found in clarity_months.json")
+    first, last = ordered.index(first_month), ordered.index(last_month)
+    if first > last:
+        raise ValueError(f"{first_month} is after {last_month}")
+    return ordered[first:last + 1]
+
+
+def clarity_months_for_quarter(year: int, quarter: int, clarity_months: Dict = None) -> List[str]:
+    """Clarity months of a calendar quarter (a Clarity month belongs to the month its period ends in)."""
+    if quarter not in (1, 2, 3, 4):
+        raise ValueError(f"Invalid quarter: {quarter}")
+    clarity_months = clarity_months if clarity_months is not None else load_clarity_months()
+    return [
+        month_id for month_id in _sorted_month_ids(clarity_months)
+        if int(clarity_months[month_id]['end'][:4]) == year
+        and (int(clarity_months[month_id]['end'][5:7]) - 1) // 3 + 1 == quarter
+    ]
+
+
+def clarity_months_for_year(year: int, clarity_months: Dict = None) -> List[str]:
+    """Clarity months whose period ends in a calendar year."""
+    clarity_months = clarity_months if clarity_months is not None else load_clarity_months()
+    return [month_id for month_id in _sorted_month_ids(clarity_months)
+            if int(clarity_months[month_id]['end'][:4]) == year]
+
+
+def generate_labour_hours_range_report(month_ids: List[str], table_name: str = 'TimesheetOCR-dev',
+                                       profile_name: str = None, region: str = 'us-east-1',
+                                       cache: ReportCache = None, table=None, title: str = None,
+                                       log_func=print) -> Dict:
+    """
+    Generate a labour hours report over several Clarity months.
+
+    Args:
+        month_ids: Clarity month identifiers (any order; duplicates ignored)
+        table_name: DynamoDB table name
+        profile_name: AWS profile name (optional)
+        region: AWS region
+        cache: Partial cache (defaults to the process-wide one)
+        table: Optional DynamoDB table resource for version lookups
+        title: Report title (defaults to "<first> to <last>")
+        log_func: Logger for progress messages
+
+    Returns:
+        Same dict as generate_labour_hours_report(), plus 'months' (per-month
+        hours and whether the partial was reused) and 'partials' counts
+    """
+    clarity_months = load_clarity_months()
+    month_ids = sorted(set(month_ids), key=lambda m: _parse_period(m, clarity_months)[0])
+    if not month_ids:
+        raise ValueError("No Clarity months in the requested range")
+
+    if table is None:
+        session = boto3.Session(profile_name=profile_name, region_name=region)
+        table = session.resource('dynamodb').Table(table_name)
+
+    weekly_hours = {}
+    zero_hour_weeks = {}
+    week_strs = []
+    months = []
+    deletes = latest_deletes(table)
+    for month_id in month_ids:
+        partial, reused = get_month_partial(month_id, table_name, profile_name, region,
+                                            cache=cache, table=table, clarity_months=clarity_months,
+                                            deletes=deletes)
+        month_hours = 0.0
+        for person, person_weeks in partial['hours'].items():
+            for week_str, hours in person_weeks.items():
+                weekly_hours[(person, week_str)] = weekly_hours.get((person, week_str), 0.0) + hours
+                month_hours += hours
+        for person, week_str in partial['zero_hour']:
+            zero_hour_weeks[(person, week_str)] = True
+        week_strs.extend(w for w in partial['weeks'] if w not in week_strs)
+        months.append({'clarity_month': month_id, 'weeks': len(partial['weeks']),
+                       'total_hours': round(month_hours, 1), 'reused': reused})
+
+    reused_count = sum(1 for m in months if m['reused'])
+    log_func(f"📦 Labour partials: {reused_count} reused, {len(months) - reused_count} recomputed")
+
+    start_date, _ = _parse_period(month_ids[0], clarity_months)
+    _, end_date = _parse_period(month_ids[-1], clarity_months)
+    weeks = [datetime.strptime(w, '%Y-%m-%d') for w in sorted(week_strs)]
+    period_display = f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"
+
+    report = summarize_weekly_hours(
+        title or (month_ids[0] if len(month_ids) == 1 else f"{month_ids[0]} to {month_ids[-1]}"),
+        period_display, start_date, end_date, weeks, load_team_roster(), weekly_hours, zero_hour_weeks
+    )
+    report['total_label'] = 'Period'
+    report['months'] = months
+    report['partials'] = {'reused': reused_count, 'recomputed': len(months) - reused_count}
+    return report
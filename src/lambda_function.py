@@ -22,6 +22,11 @@ from decimal import Decimal
 from datetime import datetime, timedelta
 
 from dynamodb_handler import store_timesheet_entries, store_rejected_timesheet
+from rollups import update_rollups
+from resource_registry import update_resources
+from change_journal import record_deletions
+from query_cache import get_cache_metrics, get_person_week_items, invalidate_keys, reset_query_cache
+from week_document import expand_items
 from duplicate_detection import check_for_existing_entries
 from utils import parse_date_range
 from validation import validate_timesheet_data, format_validation_report
@@ -710,6 +715,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     global perf_metrics
     perf_metrics = PerformanceMetrics()  # Reset for each invocation
 
+    # Cached reads only live for one invocation - other containers may write the same weeks
+    reset_query_cache()
+
     overall_start = time.time()
 
     try:
@@ -1002,28 +1010,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 dynamodb = boto3.resource('dynamodb')
                 table = dynamodb.Table(DYNAMODB_TABLE)
 
-                # Check for entries in this week (Mon-Sun)
-                existing_entries = []
+                # Check for entries in this week (Mon-Sun day rows plus the WEEK#<monday>
+                # zero-hour marker / week document) - one cached range read
+                existing_entries = get_person_week_items(table, resource_name, week_start_date)
                 existing_images = set()
 
-                for day_offset in range(7):
-                    check_date = week_start + timedelta(days=day_offset)
-                    check_date_str = check_date.strftime('%Y-%m-%d')
-
-                    response = table.query(
-                        KeyConditionExpression='ResourceName = :rn AND begins_with(DateProjectCode, :date)',
-                        ExpressionAttributeValues={
-                            ':rn': resource_name,
-                            ':date': check_date_str
-                        }
-                    )
-
-                    items = response.get('Items', [])
-                    existing_entries.extend(items)
-
-                    for item in items:
-                        if 'SourceImage' in item and item['SourceImage'] != key:
-                            existing_images.add(item['SourceImage'])
+                for item in existing_entries:
+                    if 'SourceImage' in item and item['SourceImage'] != key:
+                        existing_images.add(item['SourceImage'])
 
                 if existing_entries:
                     log(f"⚠️  Found {len(existing_entries)} existing entries for this person/week")
@@ -1042,6 +1036,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                             )
 
                     log(f"✅ Deleted {len(existing_entries)} old database entries")
+                    invalidate_keys(DYNAMODB_TABLE, existing_entries)
+                    record_deletions(DYNAMODB_TABLE, existing_entries, source='reprocess')
+
+                    removed_rows = expand_items(existing_entries)
+                    rollup_result = update_rollups(DYNAMODB_TABLE, removed=removed_rows)
+                    update_resources(DYNAMODB_TABLE, removed=removed_rows)
+                    log(f"📈 Rollups decremented: {rollup_result.get('updated', 0)} items")
 
                     # Delete old S3 images
                     s3_client = boto3.client('s3')
@@ -1100,6 +1101,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         log(f"✅ Stored {db_result['entries_stored']} entries in DynamoDB")
 
+        cache_metrics = get_cache_metrics()
+        log(f"📦 Query cache ({cache_metrics['tier']}): {cache_metrics['hits']} hits, "
+            f"{cache_metrics['misses']} misses, hit ratio {cache_metrics['hit_ratio']:.0%}")
+
         # Print performance report
         log("\n")
         perf_metrics.print_report()
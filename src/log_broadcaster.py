@@ -0,0 +1,105 @@
+"""
+Multi-subscriber log broadcaster for the web app's Server-Sent Events stream.
+
+/api/logs used to poll a shared Queue every 100 ms per client and get()
+each message, so with two tabs open each saw about half the log and idle
+connections kept waking up. LogBroadcaster keeps the last LOG_BUFFER_SIZE
+messages in a ring buffer with increasing ids instead:
+
+  - publish() appends and wakes every subscriber (Condition.notify_all)
+  - subscribers block on the condition until there is something newer than
+    the last id they sent, so idle connections use no CPU
+  - every subscriber sees every message; a reconnecting EventSource sends
+    Last-Event-ID and gets exactly what it missed (if still buffered)
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE', '1000'))
+
+# Seconds between SSE comment lines on an idle stream (keeps proxies from
+# closing it and lets the server notice disconnected clients)
+LOG_HEARTBEAT_SECONDS = 15
+
+
+class LogBroadcaster:
+    """Bounded ring buffer of log lines with blocking, replayable reads."""
+
+    def __init__(self, capacity: int = LOG_BUFFER_SIZE):
+        """
+        Args:
+            capacity: Messages kept for replay (older ones are dropped)
+        """
+        self._buffer = deque(maxlen=capacity)   # (id, message)
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self.subscribers = 0
+
+    def publish(self, message: str) -> int:
+        """Append a message and wake all subscribers. Returns its id."""
+        with self._condition:
+            event_id = self._next_id
+            self._next_id += 1
+            self._buffer.append((event_id, message))
+            self._condition.notify_all()
+        return event_id
+
+    def latest_id(self) -> int:
+        """Id of the newest message (0 if nothing was published)."""
+        with self._condition:
+            return self._next_id - 1
+
+    def read(self, after_id: int = 0, timeout: Optional[float] = None) -> List[Tuple[int, str]]:
+        """
+        Get messages newer than after_id, blocking until there are some.
+
+        Args:
+            after_id: Last id the caller has seen (0 for everything buffered)
+            timeout: Seconds to wait before returning an empty list (None waits forever)
+
+        Returns:
+            List of (id, message) in order; messages already dropped from the
+            ring buffer are skipped
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._next_id - 1 > after_id, timeout)
+            return [(event_id, message) for event_id, message in self._buffer if event_id > after_id]
+
+    def stream(self, last_event_id: Optional[str] = None,
+               heartbeat: float = LOG_HEARTBEAT_SECONDS) -> Iterator[str]:
+        """
+        Server-Sent Events generator for one subscriber.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client; a new
+                           client gets the buffered history first
+            heartbeat: Seconds of silence before a keep-alive comment is sent
+
+        Yields:
+            SSE frames ("id: ...\\ndata: {...}\\n\\n")
+        """
+        try:
+            after_id = max(0, int(last_event_id))
+        except (TypeError, ValueError):
+            after_id = 0
+
+        with self._condition:
+            self.subscribers += 1
+            if after_id > self._next_id - 1:
+                # Id from before a server restart - replay what we have
+                after_id = 0
+        try:
+            while True:
+                events = self.read(after_id, timeout=heartbeat)
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                for event_id, message in events:
+                    yield f"id: {event_id}\ndata: {json.dumps({'message': message})}\n\n"
+                after_id = events[-1][0]
+        finally:
+            with self._condition:
+                self.subscribers -= 1
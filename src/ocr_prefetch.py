@@ -0,0 +1,201 @@
+"""
+Background OCR prefetch for the approval queue.
+
+/api/approval/next-image used to download the image and make a synchronous
+RequestResponse Lambda call while the reviewer waited. OCRPrefetcher runs
+that work ahead of the reviewer on a small worker pool: while image N is
+on screen, images N+1..N+depth are downloaded and OCR'd, and next-image
+just picks up the finished result (or waits for the one already in flight).
+
+Each reviewer (approval queue lease holder) has their own look-ahead
+window, and results are kept while any window holds them, so memory is
+bounded by depth + 1 images per reviewer (at most
+APPROVAL_PREFETCH_MAX_REVIEWERS windows; the least recently active one is
+forgotten first). Moving one reviewer's window never drops another
+reviewer's entries, and a fetch that is already running is never dropped
+- cancel() cannot stop it, and fetching the image again would invoke the
+OCR Lambda twice and store its rows twice. Approve / reject / delete drop
+the entry for that image, and a queue reload clears everything.
+
+Note that the OCR Lambda stores its entries as it runs, so prefetched
+images are written to DynamoDB before the reviewer sees them - the same
+thing next-image did on display; reject still deletes them.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+
+APPROVAL_PREFETCH_DEPTH = int(os.environ.get('APPROVAL_PREFETCH_DEPTH', '3'))
+APPROVAL_PREFETCH_WORKERS = int(os.environ.get('APPROVAL_PREFETCH_WORKERS', '2'))
+APPROVAL_PREFETCH_MAX_REVIEWERS = int(os.environ.get('APPROVAL_PREFETCH_MAX_REVIEWERS', '8'))
+
+# Window owner used when callers do not say which reviewer they serve
+DEFAULT_OWNER = 'default'
+
+
+class OCRPrefetcher:
+    """Look-ahead cache of fetch results keyed by image, filled by a worker pool."""
+
+    def __init__(
+        self,
+        fetch_func: Callable[[str], Dict],
+        depth: int = APPROVAL_PREFETCH_DEPTH,
+        workers: int = APPROVAL_PREFETCH_WORKERS,
+        max_reviewers: int = APPROVAL_PREFETCH_MAX_REVIEWERS,
+        log_func=print
+    ):
+        """
+        Args:
+            fetch_func: Does the slow work for one image key (download + OCR)
+            depth: Images to prefetch beyond the current one (0 disables prefetch)
+            workers: Worker threads running fetch_func concurrently
+            max_reviewers: Windows kept at once (least recently active dropped first)
+            log_func: Logger for prefetch messages
+        """
+        self.fetch_func = fetch_func
+        self.depth = max(0, depth)
+        self.workers = max(1, workers)
+        self.max_reviewers = max(1, max_reviewers)
+        self.log = log_func
+
+        self._lock = threading.Lock()
+        self._futures = OrderedDict()   # image_key -> Future
+        self._windows = OrderedDict()   # owner -> image keys, least recently active first
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-prefetch')
+
+        self.stats = {
+            'scheduled': 0,
+            'hits': 0,            # result was ready
+            'waits': 0,           # result was still in flight
+            'misses': 0,          # fetched inline
+            'errors': 0,
+            'evicted': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _run(self, image_key: str) -> Dict:
+        start = time.time()
+        try:
+            result = self.fetch_func(image_key)
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        self.log(f"⚡ Prefetched {image_key} ({time.time() - start:.1f}s)")
+        return result
+
+    def prefetch(self, window: Iterable[str], owner: str = DEFAULT_OWNER):
+        """
+        Set one reviewer's look-ahead window.
+
+        Keys not yet cached are scheduled (in order). Cached keys that no
+        window holds any more are dropped (cancelled if they have not
+        started); running fetches are kept until they finish.
+
+        Args:
+            window: Current image followed by the next `depth` images
+            owner: Reviewer the window belongs to
+        """
+        window = list(window)[:self.depth + 1]
+
+        with self._lock:
+            self._windows.pop(owner, None)
+            self._windows[owner] = window
+            while len(self._windows) > self.max_reviewers:
+                self._windows.popitem(last=False)
+            self._evict()
+
+            if not self.depth:
+                return
+
+            for image_key in window:
+                if image_key not in self._futures:
+                    self._futures[image_key] = self._executor.submit(self._run, image_key)
+                    self.stats['scheduled'] += 1
+
+    def _evict(self):
+        """Drop entries outside every window, except fetches still running (lock held)."""
+        wanted = {image_key for window in self._windows.values() for image_key in window}
+        for image_key in [k for k in self._futures if k not in wanted]:
+            future = self._futures[image_key]
+            if future.running():
+                continue
+            del self._futures[image_key]
+            future.cancel()
+            self.stats['evicted'] += 1
+
+    def release(self, owner: str):
+        """Forget a reviewer's window (e.g. their lease expired)."""
+        with self._lock:
+            self._windows.pop(owner, None)
+            self._evict()
+
+    def get(self, image_key: str) -> Dict:
+        """
+        Get the fetch result for an image, waiting for an in-flight prefetch
+        or fetching inline if it was never scheduled.
+
+        Raises:
+            Whatever fetch_func raised (the entry is dropped so a retry refetches)
+        """
+        with self._lock:
+            future = self._futures.get(image_key)
+
+        if future is None or future.cancelled():
+            with self._lock:
+                self.stats['misses'] += 1
+            return self.fetch_func(image_key)
+
+        ready = future.done()
+        start = time.time()
+        try:
+            result = future.result()
+        except Exception:
+            self.invalidate(image_key)
+            raise
+
+        with self._lock:
+            if ready:
+                self.stats['hits'] += 1
+            else:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] = round(self.stats['wait_seconds'] + time.time() - start, 3)
+        return result
+
+    def invalidate(self, image_key: str):
+        """Drop (and cancel if not started) the entry for one image."""
+        with self._lock:
+            future = self._futures.pop(image_key, None)
+        if future is not None:
+            future.cancel()
+
+    def clear(self):
+        """Drop every entry (e.g. after the queue was reloaded)."""
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), OrderedDict()
+            self._windows = OrderedDict()
+        for future in futures:
+            future.cancel()
+
+    def get_metrics(self) -> Dict:
+        """Get hit/wait/miss counters and current cache contents."""
+        with self._lock:
+            metrics = dict(self.stats)
+            metrics.update({
+                'depth': self.depth,
+                'workers': self.workers,
+                'reviewers': len(self._windows),
+                'cached': sum(1 for f in self._futures.values() if f.done() and not f.cancelled()),
+                'in_flight': sum(1 for f in self._futures.values() if not f.done()),
+            })
+        served = metrics['hits'] + metrics['waits'] + metrics['misses']
+        metrics['hit_ratio'] = round((metrics['hits'] + metrics['waits']) / served, 3) if served else 0.0
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker pool (pending prefetches are cancelled)."""
+        self.clear()
+        self._executor.shutdown(wait=False)
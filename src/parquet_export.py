@@ -0,0 +1,336 @@
+"""
+Partitioned Parquet export for the QuickSight / Athena path.
+
+export_to_s3_for_quicksight.py used to scan the whole table into a list,
+write one CSV and define an Athena TEXTFILE table over it, so every query
+read every row as text. ParquetExporter writes Hive-style partitions instead:
+
+  <prefix>YearMonth=2025-10/timesheet.parquet
+
+  - Typed columns (DATE, DOUBLE, BIGINT, BOOLEAN, TIMESTAMP) with
+    PARQUET_COMPRESSION (snappy by default)
+  - Rows are consumed as a stream and buffered per month in column lists;
+    a month's buffer is written as a row group when it reaches
+    PARQUET_ROW_GROUP_SIZE rows, and the largest buffer is flushed early
+    whenever PARQUET_MAX_BUFFERED_ROWS rows are held in total, so memory
+    stays bounded whatever the table size
+  - athena_ddl() declares the YearMonth partition (with partition
+    projection, so new months need no MSCK REPAIR) and queries filtering on
+    YearMonth read only those months' files
+
+pyarrow is only needed to write files; the row conversion and buffering
+work without it. It is listed in requirements-export.txt rather than
+src/requirements.txt so the Lambda packages do not carry it.
+"""
+import os
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from record_types import is_timesheet_row
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+PARQUET_ROW_GROUP_SIZE = int(os.environ.get('PARQUET_ROW_GROUP_SIZE', '50000'))
+PARQUET_MAX_BUFFERED_ROWS = int(os.environ.get('PARQUET_MAX_BUFFERED_ROWS', '200000'))
+PARQUET_COMPRESSION = os.environ.get('PARQUET_COMPRESSION', 'snappy')
+
+PARTITION_COLUMN = 'YearMonth'
+PARQUET_FILE_NAME = 'timesheet.parquet'
+
+# (column, Athena type) - YearMonth is the partition, not a file column
+COLUMNS: List[Tuple[str, str]] = [
+    ('ResourceName', 'STRING'),
+    ('ResourceNameDisplay', 'STRING'),
+    ('Date', 'DATE'),
+    ('ProjectCode', 'STRING'),
+    ('ProjectName', 'STRING'),
+    ('Hours', 'DOUBLE'),
+    ('IsZeroHourTimesheet', 'BOOLEAN'),
+    ('ZeroHourReason', 'STRING'),
+    ('WeekStartDate', 'DATE'),
+    ('WeekEndDate', 'DATE'),
+    ('SourceImage', 'STRING'),
+    ('ProcessingTimestamp', 'TIMESTAMP'),
+    ('ProcessingTimeSeconds', 'DOUBLE'),
+    ('ModelId', 'STRING'),
+    ('InputTokens', 'BIGINT'),
+    ('OutputTokens', 'BIGINT'),
+    ('CostEstimateUSD', 'DOUBLE'),
+]
+
+
+def _to_date(value) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _to_timestamp(value) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Athena TIMESTAMP has no zone - store UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value) -> Optional[bool]:
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def _to_str(value) -> Optional[str]:
+    return str(value)
+
+
+_CONVERTERS = {
+    'STRING': _to_str,
+    'DATE': _to_date,
+    'DOUBLE': _to_float,
+    'BIGINT': _to_int,
+    'BOOLEAN': _to_bool,
+    'TIMESTAMP': _to_timestamp,
+}
+
+
+def partition_of(row: Dict) -> Optional[str]:
+    """YearMonth partition of a row (from YearMonth, else Date), or None if unknown."""
+    year_month = row.get(PARTITION_COLUMN) or str(row.get('Date', ''))[:7]
+    if len(year_month) == 7 and year_month[4] == '-' and year_month[:4].isdigit() and year_month[5:].isdigit():
+        return year_month
+    return None
+
+
+def convert_row(row: Dict) -> List:
+    """Convert a row into typed column values in COLUMNS order (None for missing/unparseable)."""
+    values = []
+    for column, athena_type in COLUMNS:
+        value = row.get(column)
+        values.append(None if value is None or value == '' else _CONVERTERS[athena_type](value))
+    return values
+
+
+def arrow_schema():
+    """pyarrow schema matching COLUMNS."""
+    types = {
+        'STRING': pa.string(),
+        'DATE': pa.date32(),
+        'DOUBLE': pa.float64(),
+        'BIGINT': pa.int64(),
+        'BOOLEAN': pa.bool_(),
+        'TIMESTAMP': pa.timestamp('ms'),
+    }
+    return pa.schema([(column, types[athena_type]) for column, athena_type in COLUMNS])
+
+
+class ParquetFileWriter:
+    """One Parquet file; every write_columns() call becomes one row group."""
+
+    def __init__(self, path: str, compression: str = PARQUET_COMPRESSION):
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for Parquet export (pip install -r requirements-export.txt)")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.schema = arrow_schema()
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write_columns(self, columns: Dict[str, List]):
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class ParquetExporter:
+    """Streams rows into one Parquet file per YearMonth partition with bounded buffers."""
+
+    def __init__(
+        self,
+        directory: str,
+        row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+        max_buffered_rows: int = PARQUET_MAX_BUFFERED_ROWS,
+        compression: str = PARQUET_COMPRESSION,
+        writer_factory: Callable[[str], object] = None,
+        log_func=print
+    ):
+        """
+        Args:
+            directory: Local directory the partition folders are written to
+            row_group_size: Rows per row group
+            max_buffered_rows: Rows held in memory across all partitions
+            compression: Parquet codec (snappy, zstd, gzip, none)
+            writer_factory: Creates a writer for a path (replaced in tests)
+            log_func: Logger for progress messages
+        """
+        self.directory = directory
+        self.row_group_size = max(1, row_group_size)
+        self.max_buffered_rows = max(self.row_group_size, max_buffered_rows)
+        self.writer_factory = writer_factory or (lambda path: ParquetFileWriter(path, compression))
+        self.log = log_func
+
+        self._writers = {}
+        self._buffers = {}      # year_month -> list of column lists
+        self._buffered = 0
+        self.report = {'rows': 0, 'skipped': 0, 'row_groups': 0, 'partitions': {}}
+
+    def path_for(self, year_month: str) -> str:
+        return os.path.join(self.directory, f"{PARTITION_COLUMN}={year_month}", PARQUET_FILE_NAME)
+
+    def add(self, row: Dict):
+        """Buffer one (expanded) row; derived records and rows without a month are skipped."""
+        year_month = partition_of(row) if is_timesheet_row(row) else None
+        if year_month is None:
+            self.report['skipped'] += 1
+            return
+
+        buffer = self._buffers.get(year_month)
+        if buffer is None:
+            buffer = self._buffers[year_month] = [[] for _ in COLUMNS]
+        for column_values, value in zip(buffer, convert_row(row)):
+            column_values.append(value)
+        self._buffered += 1
+        self.report['rows'] += 1
+
+        if len(buffer[0]) >= self.row_group_size:
+            self._flush(year_month)
+        elif self._buffered >= self.max_buffered_rows:
+            self._flush(max(self._buffers, key=lambda month: len(self._buffers[month][0])))
+
+    def _flush(self, year_month: str):
+        buffer = self._buffers.pop(year_month, None)
+        if not buffer or not buffer[0]:
+            return
+        writer = self._writers.get(year_month)
+        if writer is None:
+            writer = self._writers[year_month] = self.writer_factory(self.path_for(year_month))
+            self.report['partitions'][year_month] = {'rows': 0, 'row_groups': 0, 'path': self.path_for(year_month)}
+
+        writer.write_columns({column: values for (column, _), values in zip(COLUMNS, buffer)})
+        partition = self.report['partitions'][year_month]
+        partition['rows'] += len(buffer[0])
+        partition['row_groups'] += 1
+        self.report['row_groups'] += 1
+        self._buffered -= len(buffer[0])
+
+    def close(self) -> Dict:
+        """Flush every buffer and close the files. Returns the report."""
+        for year_month in sorted(self._buffers):
+            self._flush(year_month)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        return self.report
+
+    def export(self, rows: Iterable[Dict], progress_every: int = 50000) -> Dict:
+        """
+        Export a stream of expanded rows.
+
+        Returns:
+            Dict with rows, skipped, row_groups and per-partition rows / row_groups / path
+        """
+        for row in rows:
+            self.add(row)
+            if progress_every and self.report['rows'] and self.report['rows'] % progress_every == 0:
+                self.log(f"  ... {self.report['rows']} rows, {len(self.report['partitions'])} partitions written")
+        return self.close()
+
+
+def upload_partitions(report: Dict, s3_client, bucket: str, prefix: str,
+                      months: Optional[Iterable[str]] = None, log_func=print) -> Dict:
+    """
+    Upload the exported partition files and remove partitions that no longer exist.
+
+    Args:
+        report: ParquetExporter report
+        s3_client: boto3 S3 client
+        bucket: Target bucket
+        prefix: Table location prefix (e.g. "quicksight-data/timesheet_parquet/")
+        months: Months that were re-exported (incremental run) - only their
+                partitions are checked for removal. None = the whole table was
+                exported
+
+    Returns:
+        Dict with uploaded keys and deleted stale keys
+    """
+    uploaded = []
+    for year_month, partition in sorted(report['partitions'].items()):
+        key = f"{prefix}{PARTITION_COLUMN}={year_month}/{PARQUET_FILE_NAME}"
+        s3_client.upload_file(partition['path'], bucket, key,
+                              ExtraArgs={'ContentType': 'application/vnd.apache.parquet'})
+        os.remove(partition['path'])
+        uploaded.append(key)
+    log_func(f"📤 Uploaded {len(uploaded)} partitions to s3://{bucket}/{prefix}")
+
+    # Months deleted from the table since the last export must not linger in Athena
+    stale = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    prefixes = [prefix] if months is None else [f"{prefix}{PARTITION_COLUMN}={m}/" for m in sorted(months)]
+    for list_prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=list_prefix):
+            stale.extend(obj['Key'] for obj in page.get('Contents', [])
+                         if obj['Key'].endswith('.parquet') and obj['Key'] not in uploaded)
+    for start in range(0, len(stale), 1000):
+        s3_client.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': k} for k in stale[start:start + 1000]]})
+    if stale:
+        log_func(f"🗑️  Removed {len(stale)} stale partition files")
+
+    return {'uploaded': uploaded, 'deleted': stale}
+
+
+def athena_ddl(location: str, table_name: str = 'timesheet_data', first_month: str = '2020-01',
+               compression: str = PARQUET_COMPRESSION) -> str:
+    """
+    Athena DDL for the partitioned Parquet table.
+
+    Partition projection enumerates YearMonth from first_month to NOW, so
+    new months are queryable without MSCK REPAIR TABLE.
+
+    Args:
+        location: s3:// location of the table prefix (ending in '/')
+        table_name: Athena table name
+        first_month: Earliest YearMonth (YYYY-MM)
+        compression: Codec the files were written with
+    """
+    columns = ',\n'.join(f"    {column} {athena_type}" for column, athena_type in COLUMNS)
+    return f"""
+-- Run this in Amazon Athena to create a queryable table
+
+CREATE EXTERNAL TABLE IF NOT EXISTS {table_name} (
+{columns}
+)
+PARTITIONED BY ({PARTITION_COLUMN} STRING)
+STORED AS PARQUET
+LOCATION '{location}'
+TBLPROPERTIES (
+    'parquet.compression'='{compression.upper()}',
+    'projection.enabled'='true',
+    'projection.yearmonth.type'='date',
+    'projection.yearmonth.format'='yyyy-MM',
+    'projection.yearmonth.range'='{first_month},NOW',
+    'projection.yearmonth.interval'='1',
+    'projection.yearmonth.interval.unit'='MONTHS',
+    'storage.location.template'='{location}{PARTITION_COLUMN}=${{yearmonth}}/'
+);
+"""
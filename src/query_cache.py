@@ -0,0 +1,429 @@
+"""
+Read-through cache for person-week range queries.
+
+The same person-week partitions are read repeatedly: the Lambda's dedupe
+step and check_existing_entries(), the approval UI, get_resource_week_summary()
+and the coverage checks. Results are cached per
+(table, ResourceName, sort-key range) with a TTL and LRU eviction.
+
+Tiers (QUERY_CACHE_TIER):
+  - memory:   in-process OrderedDict (default)
+  - file:     pickle files in QUERY_CACHE_DIR, shared by processes on one host
+  - dynamodb: QCACHE#<ResourceName> partitions in the queried table, shared
+              by every process (entries carry an ExpiresAt epoch for DynamoDB TTL)
+  - off:      every call goes straight to DynamoDB
+
+Writes and deletes made through the storage layer (BatchWritePipeline, the
+web app delete paths, the Lambda's replace step) call invalidate() for the
+keys they touch, which drops every cached range containing that sort key.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import boto3
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from record_types import QUERY_CACHE
+from week_document import week_document_key
+
+QUERY_CACHE_TIER = os.environ.get('QUERY_CACHE_TIER', 'memory').lower()
+QUERY_CACHE_TTL = int(os.environ.get('QUERY_CACHE_TTL', '300'))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', '1024'))
+QUERY_CACHE_DIR = os.environ.get('QUERY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'timesheet_query_cache'))
+
+QUERY_CACHE_RECORD_TYPE = QUERY_CACHE
+QUERY_CACHE_PARTITION_PREFIX = 'QCACHE#'
+
+# Upper bound appended to a date so BETWEEN covers every project on that day
+_RANGE_END_SUFFIX = '#~'
+
+
+def _in_range(sort_keys, start: str, end: str) -> bool:
+    """Check whether any sort key falls inside a cached range (None = all keys, '' = unbounded)."""
+    if sort_keys is None:
+        return True
+    return any((not start or sk >= start) and (not end or sk <= end) for sk in sort_keys)
+
+
+class MemoryTier:
+    """Per-process LRU tier (shared by Flask request threads and background workers)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()   # key -> (expires_at, items)
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, items = entry
+            if expires_at < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return items
+
+    def set(self, key: Tuple, items: List[Dict], ttl: int):
+        with self._lock:
+            self.entries[key] = (time.time() + ttl, items)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table_name: str, resource_key: str, sort_keys=None) -> int:
+        with self._lock:
+            stale = [
+                key for key in self.entries
+                if key[0] == table_name and key[1] == resource_key and _in_range(sort_keys, key[2], key[3])
+            ]
+            for key in stale:
+                del self.entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+class FileTier:
+    """Pickle files shared by processes on the same host (web app + scripts + UI)."""
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _resource_dir(self, table_name: str, resource_key: str) -> str:
+        return os.path.join(self.directory, table_name, resource_key)
+
+    def _path(self, key: Tuple) -> str:
+        digest = hashlib.sha1(f"{key[2]}|{key[3]}".encode('utf-8')).hexdigest()
+        return os.path.join(self._resource_dir(key[0], key[1]), f"{digest}.pkl")
+
+    def _load(self, path: str):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        path = self._path(key)
+        entry = self._load(path)
+        if entry is None:
+            return None
+        if entry['expires_at'] < time.time():
+            self._remove(path)
+            return None
+        # mtime doubles as the LRU clock
+        os.utime(path, None)
+        return entry['items']
+
+    def set(self, key: Tuple, items: List[Dict], ttl: int):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {'start': key[2], 'end': key[3], 'expires_at': time.time() + ttl, 'items': items}
+
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        paths = []
+        for root, _, files in os.walk(self.directory):
+            paths.extend(os.path.join(root, name) for name in files if name.endswith('.pkl'))
+        if len(paths) <= self.max_entries:
+            return
+        paths.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        for path in paths[:len(paths) - self.max_entries]:
+            self._remove(path)
+            self.evictions += 1
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def invalidate(self, table_name: str, resource_key: str, sort_keys=None) -> int:
+        resource_dir = self._resource_dir(table_name, resource_key)
+        if not os.path.isdir(resource_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(resource_dir):
+            path = os.path.join(resource_dir, name)
+            entry = self._load(path) if sort_keys is not None else None
+            if entry is None or _in_range(sort_keys, entry['start'], entry['end']):
+                self._remove(path)
+                removed += 1
+        return removed
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                self._remove(os.path.join(root, name))
+
+
+class DynamoDBTier:
+    """Cache entries stored in QCACHE#<ResourceName> partitions, shared across processes."""
+
+    def __init__(self, resource=None):
+        self.resource = resource or boto3.resource('dynamodb', region_name='us-east-1')
+        self.evictions = 0
+
+    def _key(self, key: Tuple) -> Dict:
+        return {
+            'ResourceName': f"{QUERY_CACHE_PARTITION_PREFIX}{key[1]}",
+            'DateProjectCode': f"{key[2]}|{key[3]}"
+        }
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        item = self.resource.Table(key[0]).get_item(Key=self._key(key)).get('Item')
+        if not item or int(item.get('ExpiresAt', 0)) < time.time():
+            return None
+        return item.get('Items', [])
+
+    def set(self, key: Tuple, items: List[Dict], ttl: int):
+        entry = self._key(key)
+        entry.update({
+            'RecordType': QUERY_CACHE_RECORD_TYPE,
+            'RangeStart': key[2],
+            'RangeEnd': key[3],
+            'ExpiresAt': int(time.time() + ttl),
+            'Items': items,
+        })
+        try:
+            self.resource.Table(key[0]).put_item(Item=entry)
+        except Exception as e:
+            # Usually a range too large for one item (400KB) - just don't cache it
+            print(f"⚠️  Query cache write skipped: {e}")
+
+    def invalidate(self, table_name: str, resource_key: str, sort_keys=None) -> int:
+        table = self.resource.Table(table_name)
+        query_kwargs = {
+            'KeyConditionExpression': 'ResourceName = :pk',
+            'ExpressionAttributeValues': {':pk': f"{QUERY_CACHE_PARTITION_PREFIX}{resource_key}"},
+            'ProjectionExpression': 'ResourceName, DateProjectCode, RangeStart, RangeEnd'
+        }
+        removed = 0
+        while True:
+            response = table.query(**query_kwargs)
+            for item in response.get('Items', []):
+                if _in_range(sort_keys, item.get('RangeStart', ''), item.get('RangeEnd', '')):
+                    table.delete_item(Key={
+                        'ResourceName': item['ResourceName'],
+                        'DateProjectCode': item['DateProjectCode']
+                    })
+                    removed += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return removed
+
+    def clear(self):
+        # Entries expire through ExpiresAt; there is no cheap way to enumerate them all
+        pass
+
+
+class QueryCache:
+    """Read-through cache in front of ResourceName + sort-key range queries."""
+
+    def __init__(self, tier: str = QUERY_CACHE_TIER, ttl: int = QUERY_CACHE_TTL,
+                 max_entries: int = QUERY_CACHE_MAX_ENTRIES, directory: str = QUERY_CACHE_DIR):
+        """
+        Args:
+            tier: memory, file, dynamodb or off
+            ttl: Seconds a cached range stays valid
+            max_entries: LRU bound (memory and file tiers)
+            directory: Cache directory for the file tier
+        """
+        self.tier_name = tier
+        self.ttl = ttl
+        if tier == 'memory':
+            self.tier = MemoryTier(max_entries)
+        elif tier == 'file':
+            self.tier = FileTier(directory, max_entries)
+        elif tier == 'dynamodb':
+            self.tier = DynamoDBTier()
+        elif tier == 'off':
+            self.tier = None
+        else:
+            raise ValueError(f"Unknown query cache tier: {tier}")
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def query_range(self, table, resource_key: str, start: str = None, end: str = None) -> List[Dict]:
+        """
+        Get all items of a partition within a sort-key range (read-through).
+
+        Args:
+            table: DynamoDB table resource
+            resource_key: ResourceName (e.g., "Nik_Coultas")
+            start: Inclusive lower sort-key bound (None = partition start)
+            end: Inclusive upper sort-key bound (None = partition end)
+
+        Returns:
+            Raw items (week documents are not expanded)
+        """
+        key = (table.name, resource_key, start or '', end or '')
+
+        if self.tier is not None:
+            try:
+                items = self.tier.get(key)
+            except Exception as e:
+                print(f"⚠️  Query cache read failed (non-fatal): {e}")
+                items = None
+            if items is not None:
+                self.hits += 1
+                # Callers get their own list so cached entries are never mutated
+                return list(items)
+
+        self.misses += 1
+        items = _query_partition(table, resource_key, start, end)
+
+        if self.tier is not None:
+            try:
+                self.tier.set(key, items, self.ttl)
+            except Exception as e:
+                print(f"⚠️  Query cache write failed (non-fatal): {e}")
+
+        return list(items)
+
+    def invalidate(self, table_name: str, resource_key: str, sort_keys=None):
+        """Drop cached ranges of a partition containing any of sort_keys (all ranges if None)."""
+        if self.tier is None:
+            return
+        try:
+            self.invalidations += self.tier.invalidate(table_name, resource_key, sort_keys)
+        except Exception as e:
+            print(f"⚠️  Query cache invalidation failed (non-fatal): {e}")
+
+    def invalidate_keys(self, table_name: str, keys: Iterable[Dict]):
+        """Invalidate for a batch of {'ResourceName', 'DateProjectCode'} keys (one pass per person)."""
+        by_resource = defaultdict(list)
+        for key in keys:
+            by_resource[key['ResourceName']].append(key['DateProjectCode'])
+        for resource_key, sort_keys in by_resource.items():
+            self.invalidate(table_name, resource_key, sort_keys)
+
+    def clear(self):
+        """Drop every cached range this process can see."""
+        if self.tier is not None:
+            self.tier.clear()
+
+    def get_metrics(self) -> Dict:
+        """Get hit/miss counters and hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            'tier': self.tier_name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'evictions': getattr(self.tier, 'evictions', 0),
+            'entries': len(self.tier.entries) if isinstance(self.tier, MemoryTier) else None,
+        }
+
+
+def _query_partition(table, resource_key: str, start: str = None, end: str = None) -> List[Dict]:
+    """Query a partition (optionally a sort-key range), following pagination."""
+    values = {':rn': resource_key}
+    condition = 'ResourceName = :rn'
+    if start and end:
+        condition += ' AND DateProjectCode BETWEEN :start AND :end'
+        values[':start'] = start
+        values[':end'] = end
+    elif start:
+        condition += ' AND DateProjectCode >= :start'
+        values[':start'] = start
+    elif end:
+        condition += ' AND DateProjectCode <= :end'
+        values[':end'] = end
+
+    query_kwargs = {
+        'KeyConditionExpression': condition,
+        'ExpressionAttributeValues': values
+    }
+
+    items = []
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return items
+
+
+_query_cache = None
+
+
+def get_query_cache() -> QueryCache:
+    """Get the process-wide cache configured from the environment."""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = QueryCache()
+    return _query_cache
+
+
+def cached_query(table, resource_key: str, start: str = None, end: str = None) -> List[Dict]:
+    """Read-through range query using the process-wide cache."""
+    return get_query_cache().query_range(table, resource_key, start, end)
+
+
+def get_person_week_items(table, resource_key: str, week_start: str) -> List[Dict]:
+    """
+    Get every stored item for a person-week: day rows plus the WEEK#<monday> item.
+
+    Args:
+        table: DynamoDB table resource
+        resource_key: ResourceName (e.g., "Nik_Coultas")
+        week_start: Monday in YYYY-MM-DD format
+
+    Returns:
+        Raw items (week documents are not expanded)
+    """
+    sunday = (datetime.strptime(week_start, '%Y-%m-%d') + timedelta(days=6)).strftime('%Y-%m-%d')
+    week_key = week_document_key(week_start)
+
+    items = list(cached_query(table, resource_key, week_start, f"{sunday}{_RANGE_END_SUFFIX}"))
+    items.extend(cached_query(table, resource_key, week_key, week_key))
+    return items
+
+
+def invalidate(table_name: str, resource_key: str, sort_keys=None):
+    """Invalidate a person's cached ranges (all of them if sort_keys is None)."""
+    get_query_cache().invalidate(table_name, resource_key, sort_keys)
+
+
+def invalidate_keys(table_name: str, keys: Iterable[Dict]):
+    """Invalidate cached ranges after writes/deletes of the given primary keys."""
+    get_query_cache().invalidate_keys(table_name, keys)
+
+
+def get_cache_metrics() -> Dict:
+    """Get metrics of the process-wide cache."""
+    return get_query_cache().get_metrics()
+
+
+def reset_query_cache():
+    """Clear the process-wide in-process cache and its counters (e.g. per Lambda invocation)."""
+    global _query_cache
+    if _query_cache is not None and _query_cache.tier_name == 'memory':
+        _query_cache.clear()
+    _query_cache = None
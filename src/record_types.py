@@ -0,0 +1,45 @@
+"""
+Record types stored alongside timesheet rows in the main table.
+
+Besides the per-day timesheet rows (and week documents), the table holds
+derived items that scans must not treat as timesheet data:
+
+  - COVERAGE_TRACKER items inside each person's partition (coverage_tracker.py)
+  - ROLLUP items in dedicated ROLLUP#... partitions (rollups.py)
+  - QUERY_CACHE items in QCACHE#... partitions (query_cache.py, dynamodb tier)
+  - TOMBSTONE items in the JOURNAL#DELETES partition (change_journal.py)
+  - REGISTRY items in the REGISTRY#RESOURCES partition (resource_registry.py)
+"""
+from typing import Dict
+
+COVERAGE_TRACKER = 'COVERAGE_TRACKER'
+ROLLUP = 'ROLLUP'
+QUERY_CACHE = 'QUERY_CACHE'
+TOMBSTONE = 'TOMBSTONE'
+REGISTRY = 'REGISTRY'
+
+# RecordType values that never represent timesheet rows
+DERIVED_RECORD_TYPES = {COVERAGE_TRACKER, ROLLUP, QUERY_CACHE, TOMBSTONE, REGISTRY}
+
+# ResourceName prefixes used by partitions that do not belong to a person
+SYSTEM_PARTITION_PREFIXES = ('ROLLUP#', 'QCACHE#', 'JOURNAL#', 'REGISTRY#')
+
+
+def is_system_partition(resource_name: str) -> bool:
+    """Check whether a ResourceName value is a system partition rather than a person."""
+    return bool(resource_name) and resource_name.startswith(SYSTEM_PARTITION_PREFIXES)
+
+
+def is_timesheet_row(item: Dict) -> bool:
+    """
+    Check whether a scanned item is timesheet data (not a derived record).
+
+    Args:
+        item: Item from a scan or query (after expand_items())
+
+    Returns:
+        True for timesheet rows and zero-hour markers
+    """
+    if item.get('RecordType') in DERIVED_RECORD_TYPES:
+        return False
+    return not is_system_partition(item.get('ResourceName', ''))
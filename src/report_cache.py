@@ -0,0 +1,238 @@
+"""
+Versioned response cache for the report Lambda.
+
+report_lambda re-ran get_all_resources() (a full scan) for /resources and
+generate_resource_calendar_report() (a whole-partition query) for every
+/report/{name} hit. Responses are now cached per route, resource and date
+range, tagged with a data version:
+
+  - a person's version comes from their ROLLUP#PERSON item: its LastUpdated
+    is set by every write path in the same step that stores the rows (and so
+    their ProcessingTimestamp), and also moves on deletes and corrections.
+    Before rebuild_rollups.py has seeded the rollups, the version is the
+    latest ProcessingTimestamp in the partition plus its item count
+  - /resources uses the ROLLUP#TOTALS item the same way
+
+The ETag is a hash of the cache key and the version, so If-None-Match can be
+answered with 304 after one GetItem, before any body is read or built.
+
+Tiers, checked in order:
+  - memory: per-container LRU, reused by warm invocations
+  - shared: S3 objects under REPORT_CACHE_PREFIX in REPORT_CACHE_BUCKET, or
+            files in REPORT_CACHE_DIR (local runs and tests), shared by
+            every container. An entry only counts if its stored version
+            matches, so stale bodies are simply overwritten
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from rollups import PERSON, TOTALS, TOTALS_KEY, rollup_partition
+
+REPORT_CACHE_BUCKET = os.environ.get('REPORT_CACHE_BUCKET', '')
+REPORT_CACHE_PREFIX = os.environ.get('REPORT_CACHE_PREFIX', 'report-cache/')
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', '')
+REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', '256'))
+
+
+def _rollup_version(item: Dict) -> str:
+    return '|'.join(str(item.get(attr, '')) for attr in ('LastUpdated', 'EntryCount', 'ZeroHourCount', 'TotalHours'))
+
+
+def resource_data_version(table, resource_key: str) -> Optional[str]:
+    """
+    Get the data version of one person's partition.
+
+    Args:
+        table: DynamoDB table resource
+        resource_key: ResourceName (e.g., "Nik_Coultas")
+
+    Returns:
+        Version string, or None if the person has no data
+    """
+    item = table.get_item(
+        Key={'ResourceName': rollup_partition(PERSON), 'DateProjectCode': resource_key}
+    ).get('Item')
+    if item:
+        return 'rollup:' + _rollup_version(item)
+
+    # Rollups not seeded yet - latest ProcessingTimestamp and item count of the partition
+    latest = ''
+    count = 0
+    query_kwargs = {
+        'KeyConditionExpression': 'ResourceName = :pk',
+        'ExpressionAttributeValues': {':pk': resource_key},
+        'ProjectionExpression': 'ProcessingTimestamp',
+    }
+    while True:
+        response = table.query(**query_kwargs)
+        for row in response.get('Items', []):
+            count += 1
+            latest = max(latest, str(row.get('ProcessingTimestamp', '')))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return f"ts:{latest}|{count}" if count else None
+
+
+def table_data_version(table) -> Optional[str]:
+    """
+    Get the data version of the whole table (ROLLUP#TOTALS).
+
+    Returns:
+        Version string, or None until the rollups are seeded
+    """
+    item = table.get_item(
+        Key={'ResourceName': rollup_partition(TOTALS), 'DateProjectCode': TOTALS_KEY}
+    ).get('Item')
+    return 'rollup:' + _rollup_version(item) if item else None
+
+
+def make_etag(cache_key: str, version: str) -> str:
+    """Strong ETag for a cached response (quoted, as sent in the header)."""
+    return '"' + hashlib.sha256(f"{cache_key}\n{version}".encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def body_etag(body: str) -> str:
+    """ETag of an uncached (unversioned) body."""
+    return '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (list, weak validators and * allowed) against an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ReportCache:
+    """Memory LRU in front of an optional S3 or disk tier, keyed by cache key and version."""
+
+    def __init__(
+        self,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        bucket: str = REPORT_CACHE_BUCKET,
+        prefix: str = REPORT_CACHE_PREFIX,
+        directory: str = REPORT_CACHE_DIR,
+        s3_client=None
+    ):
+        """
+        Args:
+            max_entries: Memory-tier LRU bound
+            bucket: S3 bucket for the shared tier ('' = no S3 tier)
+            prefix: Key prefix of cache objects in the bucket
+            directory: Local directory for the shared tier when no bucket is set
+            s3_client: Optional boto3 S3 client
+        """
+        self.max_entries = max_entries
+        self.bucket = bucket
+        self.prefix = prefix
+        self.directory = directory
+        self._s3_client = s3_client
+        self.entries = OrderedDict()   # cache key -> entry dict
+        self.stats = {'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'errors': 0}
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client('s3')
+        return self._s3_client
+
+    def _name(self, cache_key: str) -> str:
+        return hashlib.sha256(cache_key.encode('utf-8')).hexdigest() + '.json'
+
+    def _read_shared(self, cache_key: str) -> Optional[Dict]:
+        if self.bucket:
+            try:
+                response = self.s3_client.get_object(Bucket=self.bucket, Key=self.prefix + self._name(cache_key))
+            except self.s3_client.exceptions.NoSuchKey:
+                return None
+            return json.loads(response['Body'].read())
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, self._name(cache_key)), 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return None
+        return None
+
+    def _write_shared(self, cache_key: str, entry: Dict):
+        data = json.dumps(entry)
+        if self.bucket:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.prefix + self._name(cache_key),
+                Body=data.encode('utf-8'),
+                ContentType='application/json'
+            )
+        elif self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, self._name(cache_key))
+            # Write-then-rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def _remember(self, cache_key: str, entry: Dict):
+        self.entries[cache_key] = entry
+        self.entries.move_to_end(cache_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, cache_key: str, version: str) -> Optional[Dict]:
+        """
+        Get a cached response for a data version.
+
+        Returns:
+            Dict with body, content_type, etag and version, or None
+        """
+        entry = self.entries.get(cache_key)
+        if entry is not None and entry['version'] == version:
+            self.entries.move_to_end(cache_key)
+            self.stats['memory_hits'] += 1
+            return entry
+
+        try:
+            entry = self._read_shared(cache_key)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️  Report cache read failed (non-fatal): {e}")
+            entry = None
+
+        if entry is not None and entry.get('version') == version:
+            self._remember(cache_key, entry)
+            self.stats['shared_hits'] += 1
+            return entry
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, cache_key: str, version: str, body: str, content_type: str) -> Dict:
+        """Store a response for a data version in every tier. Returns the entry."""
+        entry = {
+            'version': version,
+            'etag': make_etag(cache_key, version),
+            'content_type': content_type,
+            'body': body,
+            'stored_at': time.time(),
+        }
+        self._remember(cache_key, entry)
+        try:
+            self._write_shared(cache_key, entry)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️  Report cache write failed (non-fatal): {e}")
+        return entry
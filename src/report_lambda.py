@@ -1,19 +1,98 @@
 """
 AWS Lambda function for generating timesheet reports.
+
+Responses are cached per route, resource and date range in report_cache.py,
+keyed by the data version, and carry an ETag: a matching If-None-Match gets
+a 304 without the report being rebuilt or read back. Cache keys (and so
+ETags) also carry the render version, so bodies cached by an earlier
+deploy are never served.
 """
 import json
 import os
-from typing import Dict, Any
+from datetime import datetime
+from typing import Callable, Dict, Any, Optional, Tuple
 from reporting import (
+    dynamodb,
     get_all_resources,
     generate_resource_calendar_report
 )
 from report_html import generate_html_calendar_report
+from report_render import render_version
+from query_cache import invalidate
+from report_cache import (
+    ReportCache,
+    body_etag,
+    etag_matches,
+    make_etag,
+    resource_data_version,
+    table_data_version
+)
 
 
 # Environment variables
 DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE', '')
 
+# Kept across warm invocations of the same container
+report_cache = ReportCache()
+
+
+def cached_response(cache_key: str, version: Optional[str], if_none_match: Optional[str],
+                    render: Callable[[], Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Serve a response from the report cache, or render and cache it.
+
+    Args:
+        cache_key: Route, resource and date range (the render version is prepended)
+        version: Data version (None = not cacheable; the body hash is the ETag)
+        if_none_match: Request's If-None-Match header
+        render: Builds (body, content_type) on a miss
+
+    Returns:
+        API Gateway response (304 when the client's copy is current)
+    """
+    if version is None:
+        body, content_type = render()
+        etag, cache_status = body_etag(body), 'BYPASS'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    else:
+        # The ETag only depends on key and version - answer 304 before reading any body
+        cache_key = f"{render_version()}|{cache_key}"
+        etag = make_etag(cache_key, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        entry, cache_status = report_cache.get(cache_key, version), 'HIT'
+        if entry is None:
+            body, content_type = render()
+            entry, cache_status = report_cache.put(cache_key, version, body, content_type), 'MISS'
+        body, content_type = entry['body'], entry['content_type']
+
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': content_type,
+            'Access-Control-Allow-Origin': '*',
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'X-Cache': cache_status
+        },
+        'body': body
+    }
+
+
+def not_modified(etag: str) -> Dict[str, Any]:
+    """304 response for a current If-None-Match."""
+    return {
+        'statusCode': 304,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'ETag': etag,
+            'Cache-Control': 'no-cache'
+        },
+        'body': ''
+    }
+
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -24,6 +103,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     - GET /report/{resource_name} - Get calendar report for resource
     - GET /report/{resource_name}/html - Get HTML calendar report
 
+    Every route answers If-None-Match with 304 when the data is unchanged.
+
     Args:
         event: API Gateway event
         context: Lambda context
@@ -36,23 +117,22 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         path = event.get('path', '')
         http_method = event.get('httpMethod', 'GET')
         query_params = event.get('queryStringParameters', {}) or {}
+        headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+        if_none_match = headers.get('if-none-match')
+        table = dynamodb.Table(DYNAMODB_TABLE)
 
         print(f"Processing {http_method} {path}")
 
         # Route: List all resources
         if path == '/resources' and http_method == 'GET':
-            resources = get_all_resources(DYNAMODB_TABLE)
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
+            def render_resources():
+                resources = get_all_resources(DYNAMODB_TABLE)
+                return json.dumps({
                     'resources': resources,
                     'count': len(resources)
-                })
-            }
+                }), 'application/json'
+
+            return cached_response('resources', table_data_version(table), if_none_match, render_resources)
 
         # Route: Get calendar report for resource
         if path.startswith('/report/'):
@@ -74,34 +154,30 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if end_date:
                 print(f"  End date: {end_date}")
 
-            # Generate report
-            report = generate_resource_calendar_report(
-                resource_name=resource_name,
-                table_name=DYNAMODB_TABLE,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            # Return HTML or JSON
-            if is_html:
-                html = generate_html_calendar_report(report)
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'text/html',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': html
-                }
-            else:
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps(report, default=str)
-                }
+            def render_report():
+                # The data version moved on - don't build the new body from a cached partition read
+                invalidate(DYNAMODB_TABLE, resource_key)
+                report = generate_resource_calendar_report(
+                    resource_name=resource_name,
+                    table_name=DYNAMODB_TABLE,
+                    start_date=start_date,
+                    end_date=end_date
+                )
+                # Return HTML or JSON
+                if is_html:
+                    return generate_html_calendar_report(report), 'text/html'
+                return json.dumps(report, default=str), 'application/json'
+
+            # An open-ended range runs to today, so the day is part of the key
+            resource_key = resource_name.replace(' ', '_')
+            cache_key = '|'.join([
+                'report-html' if is_html else 'report',
+                resource_key,
+                start_date or '',
+                end_date or 'today=' + datetime.now().strftime('%Y-%m-%d')
+            ])
+            version = resource_data_version(table, resource_key)
+            return cached_response(cache_key, version, if_none_match, render_report)
 
         # Route not found
         return error_response(404, 'Route not found')
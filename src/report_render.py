@@ -0,0 +1,131 @@
+"""
+Template-compiled, streamed HTML report rendering.
+
+The calendar, labour-hours, coverage and main-projects reports were built by
+concatenating f-strings in Python loops, re-inlining several KB of CSS into
+every document. They are now Jinja templates in report_templates/:
+
+  - Templates are compiled once per process (the Environment keeps them)
+  - The CSS lives in report_templates/assets/*.css. Pages served by the web
+    app link it with a content-hash query string (cache it forever);
+    standalone documents - downloads, Lambda responses, snapshots - inline
+    it instead, from memory
+  - stream() yields the document in chunks as the template runs. Rows come
+    from generators, so a 500-person table is never held as one string and
+    the header reaches the browser before the last row is rendered
+
+Values are HTML-escaped by the templates (the old f-strings did not escape).
+
+render_version() fingerprints the templates, the assets and
+REPORT_RENDER_SCHEMA, so caches keyed on it (report_lambda.py) drop bodies
+rendered by an earlier deploy.
+"""
+import hashlib
+import os
+from typing import Dict, Iterator, Optional
+
+try:
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    from markupsafe import Markup
+    HAS_JINJA = True
+except ImportError:
+    HAS_JINJA = False
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_templates')
+ASSET_DIR = os.path.join(TEMPLATE_DIR, 'assets')
+
+# Template output events buffered per yielded chunk
+REPORT_STREAM_BUFFER = int(os.environ.get('REPORT_STREAM_BUFFER', '64'))
+
+# Bump when report bodies change without a template change (view models, JSON shape)
+REPORT_RENDER_SCHEMA = 2
+
+environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+) if HAS_JINJA else None
+
+_assets = {}
+_render_version = None
+
+
+def asset(name: str) -> str:
+    """
+    Get a static asset's content (read once per process).
+
+    Raises:
+        KeyError: For names outside the asset directory
+    """
+    if name not in _assets:
+        if os.path.basename(name) != name or not name.endswith('.css'):
+            raise KeyError(name)
+        try:
+            with open(os.path.join(ASSET_DIR, name), 'r', encoding='utf-8') as f:
+                _assets[name] = f.read()
+        except FileNotFoundError:
+            raise KeyError(name)
+    return _assets[name]
+
+
+def asset_version(name: str) -> str:
+    """Short content hash of an asset, used to bust caches when it changes."""
+    return hashlib.sha256(asset(name).encode('utf-8')).hexdigest()[:12]
+
+
+def render_version() -> str:
+    """Short hash of REPORT_RENDER_SCHEMA and every template and asset file (computed once)."""
+    global _render_version
+    if _render_version is None:
+        digest = hashlib.sha256(str(REPORT_RENDER_SCHEMA).encode('utf-8'))
+        for root, dirs, files in os.walk(TEMPLATE_DIR):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, TEMPLATE_DIR).encode('utf-8'))
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        _render_version = f"r{REPORT_RENDER_SCHEMA}-{digest.hexdigest()[:12]}"
+    return _render_version
+
+
+def stylesheet(name: str, asset_base: Optional[str] = None) -> 'Markup':
+    """
+    Stylesheet for a report: a link to the cacheable asset, or inline CSS.
+
+    Args:
+        name: Asset file name (e.g. "labour_hours.css")
+        asset_base: URL prefix the assets are served under; None inlines the CSS
+    """
+    if asset_base is not None:
+        return Markup(f'<link rel="stylesheet" href="{asset_base.rstrip("/")}/{name}?v={asset_version(name)}">')
+    return Markup(f"<style>\n{asset(name)}</style>")
+
+
+def stream(template_name: str, context: Dict, asset_base: Optional[str] = None,
+           buffer_size: int = REPORT_STREAM_BUFFER) -> Iterator[str]:
+    """
+    Render a report template as a stream of chunks.
+
+    Args:
+        template_name: File in report_templates/
+        context: Template variables (iterables are consumed lazily)
+        asset_base: URL prefix for linked CSS; None inlines it
+        buffer_size: Output events per chunk
+
+    Returns:
+        Iterator of HTML strings
+    """
+    if not HAS_JINJA:
+        raise RuntimeError("Jinja2 is required for HTML reports (pip install Jinja2)")
+    template = environment.get_template(template_name)
+    template_stream = template.stream(dict(context, stylesheet=lambda name: stylesheet(name, asset_base)))
+    template_stream.enable_buffering(buffer_size)
+    return iter(template_stream)
+
+
+def render(template_name: str, context: Dict, asset_base: Optional[str] = None) -> str:
+    """Render a report template to one string (standalone documents)."""
+    return ''.join(stream(template_name, context, asset_base))
@@ -0,0 +1,458 @@
+"""
+Precomputed report snapshots for Clarity months.
+
+The labour hours, coverage and main-projects reports were rendered inside
+the Flask request that asked for them, each reading the table again.
+ReportSnapshots renders them ahead of time instead:
+
+  - Builders (one per report kind) return the JSON payload and the HTML for
+    a Clarity month. Both are written to S3 (REPORT_SNAPSHOT_BUCKET) or the
+    local filesystem (REPORT_SNAPSHOT_DIR) as <kind>/<month>.json/.html
+  - notify() marks the months containing newly stored dates dirty; a
+    debounce timer (REPORT_SNAPSHOT_DEBOUNCE_SECONDS, at most
+    REPORT_SNAPSHOT_MAX_DELAY_SECONDS after the first change) then rebuilds
+    each dirty month once, so a burst of uploads triggers one rebuild
+  - start_watcher() polls for writes made by other processes (the OCR
+    Lambda): the ROLLUP#TOTALS item first (one GetItem), and when it moved,
+    the PERSON_WEEK rollups of each open month for a LastUpdated newer than
+    the watermark. The watermark is the TOTALS LastUpdated observed by the
+    previous poll (writer clocks, not the watcher's) less
+    REPORT_SNAPSHOT_WATERMARK_OVERLAP_SECONDS, so a write whose stamp was
+    taken before an earlier poll but landed after it is still seen. The
+    first observation is taken when the watcher starts, not after the
+    first sleep
+  - get() serves the latest snapshot straight away (with its age and
+    whether a rebuild is pending); rebuild() builds synchronously when a
+    caller asks for it
+
+A month is open from its start until REPORT_SNAPSHOT_OPEN_DAYS after its
+end; months that already have a snapshot are rebuilt on local changes too.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from rollups import PERSON_WEEK, TOTALS, TOTALS_KEY, rollup_partition
+
+REPORT_SNAPSHOT_BUCKET = os.environ.get('REPORT_SNAPSHOT_BUCKET', '')
+REPORT_SNAPSHOT_PREFIX = os.environ.get('REPORT_SNAPSHOT_PREFIX', 'report-snapshots/')
+REPORT_SNAPSHOT_DIR = os.environ.get(
+    'REPORT_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'timesheet_report_snapshots')
+)
+REPORT_SNAPSHOT_DEBOUNCE_SECONDS = float(os.environ.get('REPORT_SNAPSHOT_DEBOUNCE_SECONDS', '30'))
+REPORT_SNAPSHOT_MAX_DELAY_SECONDS = float(os.environ.get('REPORT_SNAPSHOT_MAX_DELAY_SECONDS', '300'))
+REPORT_SNAPSHOT_POLL_SECONDS = int(os.environ.get('REPORT_SNAPSHOT_POLL_SECONDS', '60'))
+REPORT_SNAPSHOT_OPEN_DAYS = int(os.environ.get('REPORT_SNAPSHOT_OPEN_DAYS', '31'))
+REPORT_SNAPSHOT_WATERMARK_OVERLAP_SECONDS = int(os.environ.get('REPORT_SNAPSHOT_WATERMARK_OVERLAP_SECONDS', '300'))
+
+# (JSON payload, HTML) for one Clarity month
+Builder = Callable[[str], Tuple[Dict, str]]
+
+
+def _month_id(month: Dict) -> str:
+    return month.get('id') or month.get('month', '')
+
+
+def open_months(clarity_months: List[Dict], today: datetime = None,
+                open_days: int = REPORT_SNAPSHOT_OPEN_DAYS) -> List[str]:
+    """
+    Get the Clarity months that can still receive timesheets.
+
+    Args:
+        clarity_months: Month dicts with start_date/end_date (YYYY-MM-DD)
+        today: Reference date (defaults to now)
+        open_days: Days after a month's end it stays open for late timesheets
+
+    Returns:
+        Month ids, in the order given
+    """
+    today = (today or datetime.now()).strftime('%Y-%m-%d')
+    months = []
+    for month in clarity_months:
+        closes = (datetime.strptime(month['end_date'], '%Y-%m-%d') + timedelta(days=open_days)).strftime('%Y-%m-%d')
+        if month['start_date'] <= today <= closes:
+            months.append(_month_id(month))
+    return months
+
+
+def months_for_dates(clarity_months: List[Dict], dates: Iterable[str]) -> Set[str]:
+    """Get the Clarity months containing any of the dates (YYYY-MM-DD)."""
+    dates = set(dates)
+    return {
+        _month_id(month) for month in clarity_months
+        if any(month['start_date'] <= date_str <= month['end_date'] for date_str in dates)
+    }
+
+
+def key_dates(keys: Iterable[Dict]) -> Set[str]:
+    """Dates of stored keys: day rows (YYYY-MM-DD#CODE) and WEEK#<monday> items."""
+    dates = set()
+    for key in keys:
+        sort_key = key.get('DateProjectCode', '')
+        if sort_key.startswith('WEEK#'):
+            sort_key = sort_key[len('WEEK#'):]
+        if len(sort_key) >= 10:
+            dates.add(sort_key[:10])
+    return dates
+
+
+def changed_months(table, clarity_months: List[Dict], month_ids: Iterable[str], since: str) -> Set[str]:
+    """
+    Find months whose PERSON_WEEK rollups were updated after a timestamp.
+
+    Args:
+        table: DynamoDB table resource
+        clarity_months: Month dicts with start_date/end_date
+        month_ids: Months to check
+        since: ISO timestamp (rollups' LastUpdated format)
+
+    Returns:
+        Ids of the months with at least one newer rollup
+    """
+    by_id = {_month_id(month): month for month in clarity_months}
+    changed = set()
+    for month_id in month_ids:
+        month = by_id.get(month_id)
+        if not month:
+            continue
+        start = datetime.strptime(month['start_date'], '%Y-%m-%d')
+        first_monday = (start - timedelta(days=start.weekday())).strftime('%Y-%m-%d')
+        query_kwargs = {
+            'KeyConditionExpression': 'ResourceName = :pk AND DateProjectCode BETWEEN :low AND :high',
+            'FilterExpression': 'LastUpdated > :since',
+            'ExpressionAttributeValues': {
+                ':pk': rollup_partition(PERSON_WEEK),
+                ':low': first_monday,
+                ':high': f"{month['end_date']}#~",
+                ':since': since,
+            },
+            'Select': 'COUNT',
+        }
+        while True:
+            response = table.query(**query_kwargs)
+            if response.get('Count', 0):
+                changed.add(month_id)
+                break
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return changed
+
+
+class SnapshotStore:
+    """Snapshot files on S3 or the local filesystem."""
+
+    def __init__(self, bucket: str = REPORT_SNAPSHOT_BUCKET, prefix: str = REPORT_SNAPSHOT_PREFIX,
+                 directory: str = REPORT_SNAPSHOT_DIR, s3_client=None):
+        """
+        Args:
+            bucket: S3 bucket ('' = local filesystem)
+            prefix: Key prefix in the bucket
+            directory: Local directory when no bucket is set
+            s3_client: Optional boto3 S3 client
+        """
+        self.bucket = bucket
+        self.prefix = prefix
+        self.directory = directory
+        self._s3_client = s3_client
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client('s3')
+        return self._s3_client
+
+    def _read(self, name: str) -> Optional[str]:
+        if self.bucket:
+            try:
+                response = self.s3_client.get_object(Bucket=self.bucket, Key=self.prefix + name)
+            except self.s3_client.exceptions.NoSuchKey:
+                return None
+            return response['Body'].read().decode('utf-8')
+        try:
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, body: str, content_type: str):
+        if self.bucket:
+            self.s3_client.put_object(Bucket=self.bucket, Key=self.prefix + name,
+                                      Body=body.encode('utf-8'), ContentType=content_type)
+            return
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def read(self, kind: str, month: str) -> Optional[Dict]:
+        """Read a snapshot (metadata, data and html), or None if never built."""
+        meta = self._read(f"{kind}/{month}.json")
+        if meta is None:
+            return None
+        snapshot = json.loads(meta)
+        snapshot['html'] = self._read(f"{kind}/{month}.html") or ''
+        return snapshot
+
+    def write(self, kind: str, month: str, snapshot: Dict):
+        """Write a snapshot: the HTML first, then the JSON that makes it visible."""
+        self._write(f"{kind}/{month}.html", snapshot['html'], 'text/html; charset=utf-8')
+        meta = {k: v for k, v in snapshot.items() if k != 'html'}
+        self._write(f"{kind}/{month}.json", json.dumps(meta, default=str), 'application/json')
+
+
+class ReportSnapshots:
+    """Debounced background rebuilds of report snapshots per Clarity month."""
+
+    def __init__(
+        self,
+        builders: Dict[str, Builder],
+        months_func: Callable[[], List[Dict]],
+        store: SnapshotStore = None,
+        debounce_seconds: float = REPORT_SNAPSHOT_DEBOUNCE_SECONDS,
+        max_delay_seconds: float = REPORT_SNAPSHOT_MAX_DELAY_SECONDS,
+        log_func=print,
+        timer_factory=threading.Timer
+    ):
+        """
+        Args:
+            builders: Report kind -> function rendering (JSON payload, HTML) for a month
+            months_func: Returns the Clarity month dicts (id, start_date, end_date)
+            store: Where snapshots are written (defaults to S3 / local per environment)
+            debounce_seconds: Quiet time after the last change before rebuilding
+            max_delay_seconds: Longest a change waits during a continuous burst
+            log_func: Logger for build messages
+            timer_factory: threading.Timer-compatible factory (replaced in tests)
+        """
+        self.builders = builders
+        self.months_func = months_func
+        self.store = store or SnapshotStore()
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.log = log_func
+        self.timer_factory = timer_factory
+
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._snapshots = {}          # (kind, month) -> snapshot
+        self._dirty = set()
+        self._first_dirty_at = None
+        self._timer = None
+        self._building = set()
+        self._watcher = None
+        self.stats = {'builds': 0, 'errors': 0, 'last_error': None, 'notifications': 0}
+
+    def _has_snapshot(self, month: str) -> bool:
+        return any((kind, month) in self._snapshots for kind in self.builders)
+
+    def notify(self, dates: Iterable[str] = None, months: Iterable[str] = None):
+        """
+        Record that entries were stored or removed, and schedule a debounced rebuild.
+
+        Args:
+            dates: Dates (YYYY-MM-DD) of the changed entries
+            months: Month ids to rebuild directly. With neither argument,
+                    every open month is marked dirty
+        """
+        clarity_months = self.months_func()
+        if dates is None and months is None:
+            targets = set(open_months(clarity_months))
+        else:
+            targets = set(months or ())
+            if dates is not None:
+                candidates = months_for_dates(clarity_months, dates)
+                still_open = set(open_months(clarity_months))
+                with self._lock:
+                    targets |= {m for m in candidates if m in still_open or self._has_snapshot(m)}
+        if not targets:
+            return
+
+        with self._lock:
+            self.stats['notifications'] += 1
+            self._dirty |= targets
+            now = time.time()
+            if self._first_dirty_at is None:
+                self._first_dirty_at = now
+            delay = min(self.debounce_seconds, max(0.0, self._first_dirty_at + self.max_delay_seconds - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self.timer_factory(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Rebuild every dirty month now (what the debounce timer runs)."""
+        with self._lock:
+            months = sorted(self._dirty)
+            self._dirty = set()
+            self._first_dirty_at = None
+            self._timer = None
+        for month in months:
+            self.rebuild(month)
+
+    def rebuild(self, month: str, kinds: Iterable[str] = None) -> Dict[str, Dict]:
+        """
+        Build snapshots for a month synchronously.
+
+        Args:
+            month: Clarity month id
+            kinds: Report kinds to build (defaults to all)
+
+        Returns:
+            Dict of kind -> snapshot for the kinds that built successfully
+        """
+        built = {}
+        with self._build_lock:
+            with self._lock:
+                self._building.add(month)
+            try:
+                for kind in (kinds or self.builders):
+                    start = time.time()
+                    try:
+                        data, html = self.builders[kind](month)
+                    except Exception as e:
+                        with self._lock:
+                            self.stats['errors'] += 1
+                            self.stats['last_error'] = f"{kind} {month}: {e}"
+                        self.log(f"⚠️  Snapshot build failed for {kind} {month}: {e}")
+                        continue
+
+                    snapshot = {
+                        'kind': kind,
+                        'month': month,
+                        'built_at': datetime.now().isoformat(timespec='seconds'),
+                        'built_epoch': time.time(),
+                        'seconds': round(time.time() - start, 3),
+                        'data': data,
+                        'html': html,
+                    }
+                    try:
+                        self.store.write(kind, month, snapshot)
+                    except Exception as e:
+                        self.log(f"⚠️  Snapshot write failed for {kind} {month} (served from memory): {e}")
+                    with self._lock:
+                        self._snapshots[(kind, month)] = snapshot
+                        self.stats['builds'] += 1
+                    built[kind] = snapshot
+            finally:
+                with self._lock:
+                    self._building.discard(month)
+
+        if built:
+            self.log(f"📸 Rebuilt {', '.join(built)} snapshot(s) for {month}")
+        return built
+
+    def get(self, kind: str, month: str) -> Optional[Dict]:
+        """
+        Get the latest snapshot without building.
+
+        Returns:
+            Snapshot dict (data, html, built_at, ...) plus age_seconds and
+            pending (a rebuild is scheduled or running), or None if never built
+        """
+        with self._lock:
+            snapshot = self._snapshots.get((kind, month))
+        if snapshot is None:
+            try:
+                snapshot = self.store.read(kind, month)
+            except Exception as e:
+                self.log(f"⚠️  Snapshot read failed for {kind} {month}: {e}")
+                snapshot = None
+            if snapshot is None:
+                return None
+            with self._lock:
+                self._snapshots.setdefault((kind, month), snapshot)
+
+        result = dict(snapshot)
+        result['age_seconds'] = round(time.time() - snapshot.get('built_epoch', time.time()), 1)
+        with self._lock:
+            result['pending'] = month in self._dirty or month in self._building
+        return result
+
+    def get_or_build(self, kind: str, month: str, rebuild: bool = False) -> Dict:
+        """Serve the latest snapshot, building synchronously if there is none or when asked."""
+        snapshot = None if rebuild else self.get(kind, month)
+        if snapshot is None:
+            self.rebuild(month, [kind])
+            snapshot = self.get(kind, month)
+            if snapshot is None:
+                raise RuntimeError(self.stats['last_error'] or f"Could not build {kind} for {month}")
+        return snapshot
+
+    def poll_changes(self, table, state: Optional[Dict] = None,
+                     overlap_seconds: int = REPORT_SNAPSHOT_WATERMARK_OVERLAP_SECONDS) -> Dict:
+        """
+        One watcher poll: notify the open months changed since the last one.
+
+        Args:
+            table: DynamoDB table resource
+            state: Previous poll's result (None on the first poll, which only observes)
+            overlap_seconds: Subtracted from the observed LastUpdated
+
+        Returns:
+            State for the next poll: the TOTALS version and its LastUpdated
+        """
+        totals = table.get_item(
+            Key={'ResourceName': rollup_partition(TOTALS), 'DateProjectCode': TOTALS_KEY}
+        ).get('Item') or {}
+        current = {
+            'version': '|'.join(str(totals.get(attr, '')) for attr in
+                                ('LastUpdated', 'EntryCount', 'ZeroHourCount', 'TotalHours')),
+            'last_updated': str(totals.get('LastUpdated', '')),
+        }
+        if state is None or current['version'] == state['version']:
+            return current if state is None else state
+
+        since = ''
+        if state['last_updated']:
+            since = (datetime.fromisoformat(state['last_updated'])
+                     - timedelta(seconds=overlap_seconds)).isoformat()
+        months = changed_months(table, self.months_func(), open_months(self.months_func()), since)
+        if months:
+            self.notify(months=months)
+        return current
+
+    def start_watcher(self, table, poll_seconds: int = REPORT_SNAPSHOT_POLL_SECONDS) -> bool:
+        """
+        Watch for writes made by other processes (e.g. the OCR Lambda).
+
+        Returns:
+            False if a watcher is already running
+        """
+        if self._watcher is not None:
+            return False
+
+        def watch():
+            state = None
+            while True:
+                try:
+                    state = self.poll_changes(table, state)
+                except Exception as e:
+                    self.log(f"⚠️  Snapshot watcher error: {e}")
+                time.sleep(poll_seconds)
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+        return True
+
+    def status(self) -> Dict:
+        """Snapshots held, dirty/building months and build counters."""
+        now = time.time()
+        with self._lock:
+            return {
+                'snapshots': [
+                    {'kind': kind, 'month': month, 'built_at': s['built_at'],
+                     'age_seconds': round(now - s.get('built_epoch', now), 1), 'seconds': s['seconds']}
+                    for (kind, month), s in sorted(self._snapshots.items())
+                ],
+                'dirty': sorted(self._dirty),
+                'building': sorted(self._building),
+                **self.stats,
+            }
@@ -5,6 +5,9 @@ import boto3
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 from collections import defaultdict
+from week_document import expand_items
+from query_cache import cached_query
+from resource_registry import list_resources, scan_resources
 
 dynamodb = boto3.resource('dynamodb')
 
@@ -13,46 +16,21 @@ def get_all_resources(table_name: str) -> List[Dict]:
     """
     Get all unique resources from the database.
 
+    Reads the resource registry (a single Query). Until rebuild_rollups.py
+    has seeded the registry it falls back to a scan.
+
     Args:
         table_name: DynamoDB table name
 
     Returns:
         List of dictionaries with resource information
     """
-    table = dynamodb.Table(table_name)
-
-    # Scan table to get all unique resources
-    response = table.scan(
-        ProjectionExpression='ResourceName, ResourceNameDisplay'
-    )
+    resources = list_resources(table_name)
+    if resources is not None:
+        return resources
 
-    items = response.get('Items', [])
-
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(
-            ProjectionExpression='ResourceName, ResourceNameDisplay',
-            ExclusiveStartKey=response['LastEvaluatedKey']
-        )
-        items.extend(response.get('Items', []))
-
-    # Get unique resources
-    seen = set()
-    unique_resources = []
-
-    for item in items:
-        resource_key = item.get('ResourceName')
-        if resource_key and resource_key not in seen:
-            seen.add(resource_key)
-            unique_resources.append({
-                'resource_key': resource_key,
-                'resource_name': item.get('ResourceNameDisplay', resource_key.replace('_', ' '))
-            })
-
-    # Sort by name
-    unique_resources.sort(key=lambda x: x['resource_name'])
-
-    return unique_resources
+    print("⚠️  Resource registry not seeded - scanning (run rebuild_rollups.py to seed it)")
+    return scan_resources(table_name)
 
 
 def get_resource_week_summary(
@@ -76,26 +54,8 @@ def get_resource_week_summary(
     table = dynamodb.Table(table_name)
     resource_key = resource_name.replace(' ', '_')
 
-    # Query all entries for this resource
-    response = table.query(
-        KeyConditionExpression='ResourceName = :rn',
-        ExpressionAttributeValues={
-            ':rn': resource_key
-        }
-    )
-
-    items = response.get('Items', [])
-
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.query(
-            KeyConditionExpression='ResourceName = :rn',
-            ExpressionAttributeValues={
-                ':rn': resource_key
-            },
-            ExclusiveStartKey=response['LastEvaluatedKey']
-        )
-        items.extend(response.get('Items', []))
+    # Query all entries for this resource (read-through cache)
+    items = expand_items(cached_query(table, resource_key))
 
     if not items:
         return {
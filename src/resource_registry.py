@@ -0,0 +1,401 @@
+"""
+Resource registry - one item per person, so listing people is a single Query.
+
+get_all_resources() used to scan the whole table with
+ProjectionExpression='ResourceName, ResourceNameDisplay' and dedupe in
+Python on every /resources call (and the maintenance scripts did the same).
+The registry lives in a dedicated partition of the main timesheet table:
+
+  Partition Key (ResourceName)   Sort Key (DateProjectCode)
+  REGISTRY#RESOURCES             <ResourceName>
+
+  Attributes:
+    - RecordType: REGISTRY
+    - DisplayName: Name as read from the timesheet (ResourceNameDisplay)
+    - FirstWeek / LastWeek: Earliest and latest week commencing seen
+    - EntryCount: Number of day-project rows
+    - ZeroHourCount: Number of zero-hour timesheets
+    - LastUpdated: Timestamp of last update
+
+store_timesheet_entries() queues the rows it wrote and replaced on the
+batch write pipeline, which applies one UpdateItem per person on flush:
+counters use ADD, and FirstWeek/LastWeek are widened with conditional
+updates so concurrent writers never narrow them. Every delete path that
+maintains rollups subtracts from the registry too (update_resources()), and
+people whose counters reach zero are no longer listed. When removed rows
+fall in a boundary week that no added row covers, that end of the range is
+recomputed from the person's ROLLUP#PERSON_WEEK items (which writers update
+before the registry). Removals for people with no registry item are skipped
+rather than creating items with negative counts.
+
+Items written after a deploy do not make the registry complete, so
+readers only trust it once rebuild_rollups.py has recomputed it from the
+raw rows and written the #SEEDED marker; until then list_resources()
+returns None and callers fall back to scan_resources().
+"""
+import boto3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from coverage_tracker import get_week_commencing
+from record_types import REGISTRY, is_system_partition, is_timesheet_row
+from rollups import PERSON_WEEK, rollup_partition
+
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+
+REGISTRY_PARTITION = 'REGISTRY#RESOURCES'
+
+# Sort key of the marker written by rebuild_rollups.py (never a ResourceName)
+REGISTRY_SEEDED_KEY = '#SEEDED'
+
+_COUNTERS = ('EntryCount', 'ZeroHourCount')
+
+
+def compute_registry_deltas(added: Iterable[Dict] = (), removed: Iterable[Dict] = ()) -> Dict[str, Dict]:
+    """
+    Compute registry changes for rows written and rows overwritten/deleted.
+
+    Args:
+        added: Day-layout rows that were stored (use expand_items() on week documents)
+        removed: Day-layout rows that were overwritten or deleted
+
+    Returns:
+        Dict mapping ResourceName -> DisplayName, FirstWeek, LastWeek
+        (from added rows), RemovedFirstWeek, RemovedLastWeek (from removed
+        rows) and counter deltas
+    """
+    deltas = {}
+
+    for rows, sign in ((added, 1), (removed, -1)):
+        for row in rows:
+            if not is_timesheet_row(row):
+                continue
+            resource = row.get('ResourceName', '')
+            date_str = row.get('Date')
+            if not resource or not date_str:
+                continue
+
+            delta = deltas.setdefault(resource, {
+                'DisplayName': None, 'FirstWeek': None, 'LastWeek': None,
+                'RemovedFirstWeek': None, 'RemovedLastWeek': None,
+                'EntryCount': 0, 'ZeroHourCount': 0,
+            })
+            delta['ZeroHourCount' if row.get('IsZeroHourTimesheet') else 'EntryCount'] += sign
+
+            week = get_week_commencing(date_str)
+            if sign > 0:
+                delta['DisplayName'] = row.get('ResourceNameDisplay') or delta['DisplayName']
+                delta['FirstWeek'] = min(filter(None, (delta['FirstWeek'], week)))
+                delta['LastWeek'] = max(filter(None, (delta['LastWeek'], week)))
+            else:
+                delta['RemovedFirstWeek'] = min(filter(None, (delta['RemovedFirstWeek'], week)))
+                delta['RemovedLastWeek'] = max(filter(None, (delta['RemovedLastWeek'], week)))
+
+    return deltas
+
+
+def merge_registry_deltas(*delta_sets: Dict) -> Dict[str, Dict]:
+    """Merge several delta dicts (later display names win)."""
+    merged = {}
+    for deltas in delta_sets:
+        for resource, delta in deltas.items():
+            if resource not in merged:
+                merged[resource] = dict(delta)
+                continue
+            current = merged[resource]
+            for attr in _COUNTERS:
+                current[attr] += delta[attr]
+            current['DisplayName'] = delta['DisplayName'] or current['DisplayName']
+            for first, last in (('FirstWeek', 'LastWeek'), ('RemovedFirstWeek', 'RemovedLastWeek')):
+                if delta.get(first):
+                    current[first] = min(filter(None, (current.get(first), delta[first])))
+                    current[last] = max(filter(None, (current.get(last), delta[last])))
+    return merged
+
+
+def _is_condition_failure(error: Exception) -> bool:
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+def _widen_week(table, resource: str, attr: str, week: str, comparison: str):
+    """Move FirstWeek earlier / LastWeek later unless another writer already did."""
+    try:
+        table.update_item(
+            Key={'ResourceName': REGISTRY_PARTITION, 'DateProjectCode': resource},
+            UpdateExpression='SET #week = :week',
+            ConditionExpression=f'#week {comparison} :week',
+            ExpressionAttributeNames={'#week': attr},
+            ExpressionAttributeValues={':week': week}
+        )
+    except Exception as e:
+        if not _is_condition_failure(e):
+            raise
+
+
+def _narrow_week(table, resource: str, attr: str, old_week: str, first: str, last: str):
+    """
+    Move FirstWeek / LastWeek to the nearest week the PERSON_WEEK rollups
+    still hold rows for, unless another writer changed it meanwhile.
+    """
+    query_kwargs = {
+        'KeyConditionExpression': 'ResourceName = :pk AND DateProjectCode BETWEEN :start AND :end',
+        'FilterExpression': '#resource = :resource',
+        'ExpressionAttributeNames': {'#resource': 'Resource'},
+        'ExpressionAttributeValues': {':pk': rollup_partition(PERSON_WEEK), ':start': first,
+                                      ':end': f"{last}#~", ':resource': resource},
+        'ScanIndexForward': attr == 'FirstWeek',
+    }
+    while True:
+        response = table.query(**query_kwargs)
+        week = next((item['WeekStart'] for item in response.get('Items', [])
+                     if item.get('EntryCount', 0) + item.get('ZeroHourCount', 0) > 0), None)
+        if week or 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    # No rows left: the counters hide the person, the range is left as it was
+    if not week or week == old_week:
+        return
+    try:
+        table.update_item(
+            Key={'ResourceName': REGISTRY_PARTITION, 'DateProjectCode': resource},
+            UpdateExpression='SET #week = :week',
+            ConditionExpression='#week = :old',
+            ExpressionAttributeNames={'#week': attr},
+            ExpressionAttributeValues={':week': week, ':old': old_week}
+        )
+    except Exception as e:
+        if not _is_condition_failure(e):
+            raise
+
+
+def apply_registry_deltas(table_name: str, deltas: Dict[str, Dict], table=None) -> Dict:
+    """
+    Apply registry deltas, one UpdateItem per person (plus a conditional
+    update when the stored week range has to widen, or narrow after a
+    boundary week lost its rows).
+
+    Args:
+        table_name: DynamoDB table name (main timesheet table)
+        deltas: Output of compute_registry_deltas() / merge_registry_deltas()
+        table: Optional table resource
+
+    Returns:
+        Dict with counts of updated, failed and skipped (removals for
+        people with no registry item) registry items
+    """
+    table = table or dynamodb.Table(table_name)
+    now = datetime.utcnow().isoformat()
+    updated = 0
+    failed = 0
+    skipped = 0
+
+    for resource, delta in sorted(deltas.items()):
+        values = {
+            ':entries': delta['EntryCount'],
+            ':zero': delta['ZeroHourCount'],
+            ':rt': REGISTRY,
+            ':now': now,
+        }
+        set_clauses = ['RecordType = :rt', 'LastUpdated = :now']
+        if delta['DisplayName']:
+            values[':display'] = delta['DisplayName']
+            set_clauses.append('DisplayName = :display')
+        if delta['FirstWeek']:
+            values[':first'] = delta['FirstWeek']
+            values[':last'] = delta['LastWeek']
+            set_clauses.append('FirstWeek = if_not_exists(FirstWeek, :first)')
+            set_clauses.append('LastWeek = if_not_exists(LastWeek, :last)')
+
+        update_kwargs = {}
+        if not delta['FirstWeek']:
+            # Removals only: never create an item with negative counters
+            update_kwargs['ConditionExpression'] = 'attribute_exists(DateProjectCode)'
+
+        try:
+            response = table.update_item(
+                Key={'ResourceName': REGISTRY_PARTITION, 'DateProjectCode': resource},
+                UpdateExpression='ADD EntryCount :entries, ZeroHourCount :zero SET ' + ', '.join(set_clauses),
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW',
+                **update_kwargs
+            )
+            stored = response.get('Attributes', {})
+            first, last = stored.get('FirstWeek'), stored.get('LastWeek')
+            if delta['FirstWeek'] and (first or '') > delta['FirstWeek']:
+                _widen_week(table, resource, 'FirstWeek', delta['FirstWeek'], '>')
+            elif (first and last and delta.get('RemovedFirstWeek') and delta['RemovedFirstWeek'] <= first
+                  and not (delta['FirstWeek'] and delta['FirstWeek'] <= first)):
+                _narrow_week(table, resource, 'FirstWeek', first, first, last)
+            if delta['LastWeek'] and (last or '') < delta['LastWeek']:
+                _widen_week(table, resource, 'LastWeek', delta['LastWeek'], '<')
+            elif (first and last and delta.get('RemovedLastWeek') and delta['RemovedLastWeek'] >= last
+                  and not (delta['LastWeek'] and delta['LastWeek'] >= last)):
+                _narrow_week(table, resource, 'LastWeek', last, first, last)
+            updated += 1
+        except Exception as e:
+            if update_kwargs and _is_condition_failure(e):
+                skipped += 1
+                continue
+            print(f"⚠️  Registry update failed for {resource}: {e}")
+            failed += 1
+
+    return {'updated': updated, 'failed': failed, 'skipped': skipped}
+
+
+def update_resources(table_name: str, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()) -> Dict:
+    """
+    Maintain the registry for rows that were written and/or removed.
+
+    Called next to update_rollups() by paths that bypass the write
+    pipeline. Failures are reported but never raised - rebuild_rollups.py
+    repairs drift.
+
+    Args:
+        table_name: DynamoDB table name
+        added: Rows that were stored
+        removed: Rows that were overwritten or deleted
+
+    Returns:
+        Dict with counts of updated and failed registry items
+    """
+    try:
+        deltas = compute_registry_deltas(added, removed)
+        if not deltas:
+            return {'updated': 0, 'failed': 0, 'skipped': 0}
+        return apply_registry_deltas(table_name, deltas)
+    except Exception as e:
+        print(f"⚠️  Registry maintenance error (non-fatal): {e}")
+        return {'updated': 0, 'failed': 0, 'skipped': 0, 'error': str(e)}
+
+
+def seeded_marker() -> Dict:
+    """Marker item recording that the registry was rebuilt from the raw rows."""
+    return {
+        'ResourceName': REGISTRY_PARTITION,
+        'DateProjectCode': REGISTRY_SEEDED_KEY,
+        'RecordType': REGISTRY,
+        'SeededAt': datetime.utcnow().isoformat(),
+    }
+
+
+def registry_items(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Build complete registry items from all of the table's rows (for rebuilds).
+
+    Args:
+        rows: Day-layout rows (use expand_items() on week documents first)
+
+    Returns:
+        List of items ready for put_item()
+    """
+    now = datetime.utcnow().isoformat()
+    items = []
+    for resource, delta in sorted(compute_registry_deltas(rows).items()):
+        items.append({
+            'ResourceName': REGISTRY_PARTITION,
+            'DateProjectCode': resource,
+            'RecordType': REGISTRY,
+            'DisplayName': delta['DisplayName'] or resource.replace('_', ' '),
+            'FirstWeek': delta['FirstWeek'],
+            'LastWeek': delta['LastWeek'],
+            'EntryCount': delta['EntryCount'],
+            'ZeroHourCount': delta['ZeroHourCount'],
+            'LastUpdated': now,
+        })
+    return items
+
+
+def query_registry(table_name: str, table=None) -> List[Dict]:
+    """
+    Read every registry item (a single Query of the registry partition).
+
+    Args:
+        table_name: DynamoDB table name
+        table: Optional table resource (e.g. from a profile session)
+
+    Returns:
+        List of registry items (including the #SEEDED marker, if written)
+    """
+    table = table or dynamodb.Table(table_name)
+    query_kwargs = {
+        'KeyConditionExpression': 'ResourceName = :pk',
+        'ExpressionAttributeValues': {':pk': REGISTRY_PARTITION}
+    }
+
+    items = []
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return items
+
+
+def list_resources(table_name: str, table=None) -> Optional[List[Dict]]:
+    """
+    List registered people, sorted by display name.
+
+    Args:
+        table_name: DynamoDB table name
+        table: Optional table resource
+
+    Returns:
+        List of dicts with resource_key, resource_name, first_week,
+        last_week, entry_count and zero_hour_count, leaving out people
+        with no rows left; None until the registry has been seeded
+    """
+    items = query_registry(table_name, table=table)
+    if not any(item['DateProjectCode'] == REGISTRY_SEEDED_KEY for item in items):
+        return None
+
+    resources = [
+        {
+            'resource_key': item['DateProjectCode'],
+            'resource_name': item.get('DisplayName') or item['DateProjectCode'].replace('_', ' '),
+            'first_week': item.get('FirstWeek'),
+            'last_week': item.get('LastWeek'),
+            'entry_count': int(item.get('EntryCount', 0)),
+            'zero_hour_count': int(item.get('ZeroHourCount', 0)),
+        }
+        for item in items
+        if item['DateProjectCode'] != REGISTRY_SEEDED_KEY
+        and item.get('EntryCount', 0) + item.get('ZeroHourCount', 0) > 0
+    ]
+    resources.sort(key=lambda x: x['resource_name'])
+    return resources
+
+
+def scan_resources(table_name: str, table=None) -> List[Dict]:
+    """
+    List people by scanning the whole table (the fallback until the registry is seeded).
+
+    Rollup, cache, journal and registry partitions are skipped.
+
+    Args:
+        table_name: DynamoDB table name
+        table: Optional table resource
+
+    Returns:
+        List of dicts with resource_key and resource_name, sorted by name
+    """
+    table = table or dynamodb.Table(table_name)
+    scan_kwargs = {'ProjectionExpression': 'ResourceName, ResourceNameDisplay'}
+
+    resources = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            resource_key = item.get('ResourceName')
+            if resource_key and not is_system_partition(resource_key) and resource_key not in resources:
+                resources[resource_key] = {
+                    'resource_key': resource_key,
+                    'resource_name': item.get('ResourceNameDisplay', resource_key.replace('_', ' '))
+                }
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return sorted(resources.values(), key=lambda x: x['resource_name'])
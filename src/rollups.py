@@ -0,0 +1,380 @@
+"""
+Materialized weekly and monthly rollups.
+
+Rollup items live in dedicated partitions of the main timesheet table, so a
+report can fetch a whole range of totals with a single Query instead of
+scanning every day-project row:
+
+  Partition Key (ResourceName)   Sort Key (DateProjectCode)
+  ROLLUP#PERSON_WEEK             <monday>#<ResourceName>
+  ROLLUP#PERSON_MONTH_PROJECT    <YYYY-MM>#<ResourceName>#<ProjectCode>
+  ROLLUP#PROJECT_WEEK            <monday>#<ProjectCode>
+  ROLLUP#PERSON                  <ResourceName>
+  ROLLUP#TOTALS                  ALL
+
+  Attributes:
+    - RecordType: ROLLUP
+    - RollupType: PERSON_WEEK / PERSON_MONTH_PROJECT / PROJECT_WEEK / PERSON / TOTALS
+    - TotalHours: Sum of Hours
+    - EntryCount: Number of day-project rows
+    - ZeroHourCount: Number of zero-hour timesheets (PERSON_WEEK, PERSON, TOTALS)
+    - Resource, WeekStart, YearMonth, ProjectCode: identifying fields
+
+Counters are maintained with ADD expressions so concurrent Lambda
+invocations never lose updates. Every update also sets LastUpdated, and a
+person's PERSON item (and the TOTALS item) is updated whenever any of their
+rollups changes, so its LastUpdated doubles as the person's data version
+(report_cache.py). Writers pass the rows they stored and the
+rows they overwrote or deleted; rebuild_rollups.py recomputes everything
+from the raw rows and can check stored rollups for drift.
+"""
+import boto3
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+from coverage_tracker import get_week_commencing
+from record_types import ROLLUP, is_timesheet_row
+
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+
+PERSON_WEEK = 'PERSON_WEEK'
+PERSON_MONTH_PROJECT = 'PERSON_MONTH_PROJECT'
+PROJECT_WEEK = 'PROJECT_WEEK'
+PERSON = 'PERSON'
+TOTALS = 'TOTALS'
+ROLLUP_TYPES = (PERSON_WEEK, PERSON_MONTH_PROJECT, PROJECT_WEEK, PERSON, TOTALS)
+
+# Sort key of the single TOTALS item
+TOTALS_KEY = 'ALL'
+
+_COUNTERS = ('TotalHours', 'EntryCount', 'ZeroHourCount')
+
+
+def rollup_partition(rollup_type: str) -> str:
+    """Get the partition key value holding a rollup type."""
+    return f"ROLLUP#{rollup_type}"
+
+
+def _new_rollup(rollup_type: str, attrs: Dict) -> Dict:
+    return {
+        'RollupType': rollup_type,
+        'Attributes': attrs,
+        'TotalHours': Decimal('0'),
+        'EntryCount': 0,
+        'ZeroHourCount': 0,
+    }
+
+
+def compute_rollup_deltas(rows: Iterable[Dict], sign: int = 1) -> Dict[Tuple[str, str], Dict]:
+    """
+    Compute rollup contributions of a set of timesheet rows.
+
+    Args:
+        rows: Day-layout rows (use expand_items() on week documents first)
+        sign: 1 for rows being written, -1 for rows being removed, 0 for
+              the buckets alone (zero counters)
+
+    Returns:
+        Dict mapping (partition key, sort key) -> rollup counters and attributes
+    """
+    deltas = {}
+
+    def bucket(rollup_type, sort_key, attrs):
+        key = (rollup_partition(rollup_type), sort_key)
+        if key not in deltas:
+            deltas[key] = _new_rollup(rollup_type, attrs)
+        return deltas[key]
+
+    for row in rows:
+        if not is_timesheet_row(row):
+            continue
+
+        resource = row.get('ResourceName', '')
+        date_str = row.get('Date')
+        if not resource or not date_str:
+            continue
+
+        week_start = get_week_commencing(date_str)
+        person_week = bucket(PERSON_WEEK, f"{week_start}#{resource}", {
+            'Resource': resource,
+            'WeekStart': week_start,
+        })
+        # Whole-table and per-person counters (dashboard stats without scans)
+        person = bucket(PERSON, resource, {'Resource': resource})
+        totals = bucket(TOTALS, TOTALS_KEY, {})
+
+        if row.get('IsZeroHourTimesheet'):
+            for counters in (person_week, person, totals):
+                counters['ZeroHourCount'] += sign
+            continue
+
+        hours = Decimal(str(row.get('Hours', 0))) * sign
+        project_code = row.get('ProjectCode', '')
+        year_month = date_str[:7]
+
+        for counters in (person_week, person, totals):
+            counters['TotalHours'] += hours
+            counters['EntryCount'] += sign
+
+        person_month = bucket(PERSON_MONTH_PROJECT, f"{year_month}#{resource}#{project_code}", {
+            'Resource': resource,
+            'YearMonth': year_month,
+            'ProjectCode': project_code,
+            'ProjectName': row.get('ProjectName', ''),
+        })
+        person_month['TotalHours'] += hours
+        person_month['EntryCount'] += sign
+
+        project_week = bucket(PROJECT_WEEK, f"{week_start}#{project_code}", {
+            'WeekStart': week_start,
+            'ProjectCode': project_code,
+        })
+        project_week['TotalHours'] += hours
+        project_week['EntryCount'] += sign
+
+    return deltas
+
+
+def merge_rollup_deltas(*delta_sets: Dict) -> Dict[Tuple[str, str], Dict]:
+    """
+    Merge several delta dicts, dropping buckets whose counters cancel out.
+
+    PERSON and TOTALS buckets are kept (with zero counters) while any other
+    bucket of the same person survives - e.g. a project code correction - so
+    their LastUpdated still moves.
+    """
+    merged = {}
+    for deltas in delta_sets:
+        for key, delta in deltas.items():
+            if key not in merged:
+                merged[key] = _new_rollup(delta['RollupType'], dict(delta['Attributes']))
+            for counter in _COUNTERS:
+                merged[key][counter] += delta[counter]
+            merged[key]['Attributes'].update(delta['Attributes'])
+
+    kept = {
+        key: delta for key, delta in merged.items()
+        if any(delta[counter] != 0 for counter in _COUNTERS)
+    }
+    changed_resources = {
+        delta['Attributes'].get('Resource') for key, delta in kept.items()
+        if delta['RollupType'] not in (PERSON, TOTALS)
+    }
+    for key, delta in merged.items():
+        if key in kept:
+            continue
+        if (delta['RollupType'] == PERSON and delta['Attributes'].get('Resource') in changed_resources) or \
+                (delta['RollupType'] == TOTALS and changed_resources):
+            kept[key] = delta
+    return kept
+
+
+def apply_rollup_deltas(table_name: str, deltas: Dict[Tuple[str, str], Dict]) -> Dict:
+    """
+    Apply rollup deltas atomically with ADD update expressions.
+
+    Args:
+        table_name: DynamoDB table name (main timesheet table)
+        deltas: Output of compute_rollup_deltas() / merge_rollup_deltas()
+
+    Returns:
+        Dict with counts of updated and failed rollup items
+    """
+    table = dynamodb.Table(table_name)
+    now = datetime.utcnow().isoformat()
+    updated = 0
+    failed = 0
+
+    for (partition, sort_key), delta in deltas.items():
+        names = {'#rt': 'RecordType', '#type': 'RollupType', '#updated': 'LastUpdated'}
+        values = {
+            ':hours': delta['TotalHours'],
+            ':count': delta['EntryCount'],
+            ':zero': delta['ZeroHourCount'],
+            ':rt': ROLLUP,
+            ':type': delta['RollupType'],
+            ':now': now,
+        }
+        set_clauses = ['#rt = :rt', '#type = :type', '#updated = :now']
+        for idx, (attr, value) in enumerate(delta['Attributes'].items()):
+            names[f"#a{idx}"] = attr
+            values[f":a{idx}"] = value
+            set_clauses.append(f"#a{idx} = :a{idx}")
+
+        try:
+            table.update_item(
+                Key={'ResourceName': partition, 'DateProjectCode': sort_key},
+                UpdateExpression=(
+                    'ADD TotalHours :hours, EntryCount :count, ZeroHourCount :zero '
+                    'SET ' + ', '.join(set_clauses)
+                ),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            updated += 1
+        except Exception as e:
+            print(f"⚠️  Rollup update failed for {partition} / {sort_key}: {e}")
+            failed += 1
+
+    return {'updated': updated, 'failed': failed}
+
+
+def update_rollups(table_name: str, added: Iterable[Dict] = (), removed: Iterable[Dict] = (),
+                   touched: Iterable[Dict] = ()) -> Dict:
+    """
+    Maintain rollups for rows that were written and/or removed.
+
+    Overwriting an item counts as removing the old row and adding the new one.
+    Failures are reported but never raised - rebuild_rollups.py repairs drift.
+
+    Args:
+        table_name: DynamoDB table name
+        added: Rows that were stored
+        removed: Rows that were overwritten or deleted
+        touched: Rows whose rollup items (PERSON and TOTALS included) must get
+                 a new LastUpdated even when no counter changes - e.g. a
+                 ProjectName correction - so data versions still move
+
+    Returns:
+        Dict with counts of updated and failed rollup items
+    """
+    try:
+        deltas = merge_rollup_deltas(
+            compute_rollup_deltas(added, 1),
+            compute_rollup_deltas(removed, -1)
+        )
+        # Zero-counter buckets: the ADDs are no-ops, LastUpdated still moves
+        for key, delta in compute_rollup_deltas(touched, 0).items():
+            deltas.setdefault(key, delta)
+        if not deltas:
+            return {'updated': 0, 'failed': 0}
+        return apply_rollup_deltas(table_name, deltas)
+    except Exception as e:
+        print(f"⚠️  Rollup maintenance error (non-fatal): {e}")
+        return {'updated': 0, 'failed': 0, 'error': str(e)}
+
+
+def query_rollups(table_name: str, rollup_type: str, start: str = None, end: str = None,
+                  table=None) -> List[Dict]:
+    """
+    Read rollup items of one type, optionally limited to a sort-key range.
+
+    Args:
+        table_name: DynamoDB table name
+        rollup_type: One of ROLLUP_TYPES
+        start: Inclusive lower bound (e.g. a Monday or YYYY-MM)
+        end: Inclusive upper bound (e.g. a Monday or YYYY-MM)
+        table: Optional table resource (e.g. from a profile session)
+
+    Returns:
+        List of rollup items
+    """
+    table = table or dynamodb.Table(table_name)
+    values = {':pk': rollup_partition(rollup_type)}
+    condition = 'ResourceName = :pk'
+
+    if start and end:
+        condition += ' AND DateProjectCode BETWEEN :start AND :end'
+        values[':start'] = start
+        values[':end'] = f"{end}#~"
+    elif start:
+        condition += ' AND DateProjectCode >= :start'
+        values[':start'] = start
+
+    query_kwargs = {
+        'KeyConditionExpression': condition,
+        'ExpressionAttributeValues': values
+    }
+
+    items = []
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return items
+
+
+def get_person_week_totals(table_name: str, first_week: str, last_week: str,
+                           table=None) -> Dict[Tuple[str, str], Dict]:
+    """
+    Get weekly hour totals for every person between two Mondays.
+
+    Args:
+        table_name: DynamoDB table name
+        first_week: First Monday (YYYY-MM-DD)
+        last_week: Last Monday (YYYY-MM-DD)
+        table: Optional table resource (e.g. from a profile session)
+
+    Returns:
+        Dict mapping (ResourceName, monday) -> {'hours', 'entries', 'zero_hour'}
+    """
+    totals = {}
+    for item in query_rollups(table_name, PERSON_WEEK, first_week, last_week, table=table):
+        totals[(item['Resource'], item['WeekStart'])] = {
+            'hours': float(item.get('TotalHours', 0)),
+            'entries': int(item.get('EntryCount', 0)),
+            'zero_hour': int(item.get('ZeroHourCount', 0)) > 0,
+        }
+    return totals
+
+
+def rollup_items(deltas: Dict[Tuple[str, str], Dict]) -> List[Dict]:
+    """
+    Convert computed rollups into full items (used by rebuilds).
+
+    Args:
+        deltas: Output of compute_rollup_deltas(rows) over the whole table
+
+    Returns:
+        List of items ready for put_item
+    """
+    now = datetime.utcnow().isoformat()
+    items = []
+    for (partition, sort_key), delta in sorted(deltas.items()):
+        item = {
+            'ResourceName': partition,
+            'DateProjectCode': sort_key,
+            'RecordType': ROLLUP,
+            'RollupType': delta['RollupType'],
+            'TotalHours': delta['TotalHours'],
+            'EntryCount': delta['EntryCount'],
+            'ZeroHourCount': delta['ZeroHourCount'],
+            'LastUpdated': now,
+        }
+        item.update(delta['Attributes'])
+        items.append(item)
+    return items
+
+
+def find_rollup_mismatches(expected: Dict[Tuple[str, str], Dict], stored: Iterable[Dict]) -> List[Dict]:
+    """
+    Compare rollups computed from raw rows with the stored rollup items.
+
+    Args:
+        expected: Output of compute_rollup_deltas(rows) over the whole table
+        stored: Rollup items read from the table
+
+    Returns:
+        List of mismatch dicts with key, expected and stored counters
+    """
+    stored_by_key = {(item['ResourceName'], item['DateProjectCode']): item for item in stored}
+    mismatches = []
+
+    for key in sorted(set(expected) | set(stored_by_key)):
+        want = expected.get(key)
+        have = stored_by_key.get(key)
+
+        want_counters = {c: (want[c] if want else 0) for c in _COUNTERS}
+        have_counters = {c: (have.get(c, 0) if have else 0) for c in _COUNTERS}
+
+        if any(Decimal(str(want_counters[c])) != Decimal(str(have_counters[c])) for c in _COUNTERS):
+            mismatches.append({
+                'key': key,
+                'expected': want_counters,
+                'stored': have_counters,
+            })
+
+    return mismatches
@@ -0,0 +1,206 @@
+"""
+Dashboard counters served from memory.
+
+get_db_count() ran a full Select='COUNT' scan every time the dashboard or
+/about rendered and every time /api/db-count was polled, and /about listed
+the input bucket to count images. StatsCounters keeps the numbers in memory
+and refreshes them in a background thread from cheap sources:
+
+  - entries / people: the ROLLUP#TOTALS item (one GetItem) and the
+    ROLLUP#PERSON partition (one small Query). Both are maintained with ADD
+    updates by every write path via rollups.py, so they are exact; until
+    rebuild_rollups.py has seeded them, DescribeTable's ItemCount is used
+  - images: S3 listing of the input bucket (refreshed less often)
+  - failures: a callable, e.g. the approval queue's failed count (local SQLite)
+
+Readers never wait for a refresh: they get the last values plus their age,
+and a stale read kicks off a refresh in the background. Local writers
+(uploads, deletes, flush) call mark_stale() so the next read refreshes.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from rollups import PERSON, TOTALS, TOTALS_KEY, rollup_partition
+
+STATS_REFRESH_SECONDS = int(os.environ.get('STATS_REFRESH_SECONDS', '60'))
+STATS_IMAGE_REFRESH_SECONDS = int(os.environ.get('STATS_IMAGE_REFRESH_SECONDS', '600'))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+COUNTERS = ('entries', 'zero_hour', 'people', 'images', 'failures')
+
+
+class StatsCounters:
+    """Last-known dashboard counters with background refresh."""
+
+    def __init__(
+        self,
+        table,
+        bucket: str,
+        s3_client,
+        failures_func: Optional[Callable[[], int]] = None,
+        refresh_seconds: int = STATS_REFRESH_SECONDS,
+        image_refresh_seconds: int = STATS_IMAGE_REFRESH_SECONDS,
+        log_func=print
+    ):
+        """
+        Args:
+            table: DynamoDB Table resource of the main timesheet table
+            bucket: Input bucket holding timesheet images
+            s3_client: boto3 S3 client
+            failures_func: Returns the current failure count (optional)
+            refresh_seconds: Age after which entries/people/failures are refreshed
+            image_refresh_seconds: Age after which the bucket is listed again
+            log_func: Logger for refresh messages
+        """
+        self.table = table
+        self.bucket = bucket
+        self.s3_client = s3_client
+        self.failures_func = failures_func
+        self.refresh_seconds = refresh_seconds
+        self.image_refresh_seconds = image_refresh_seconds
+        self.log = log_func
+
+        self._lock = threading.Lock()
+        self._values = {name: None for name in COUNTERS}
+        self._updated = {name: 0.0 for name in COUNTERS}
+        self._sources = {name: None for name in COUNTERS}
+        self._stale = False
+        self._refreshing = False
+        self.stats = {'refreshes': 0, 'errors': 0, 'last_error': None}
+
+    def _set(self, name: str, value: int, source: str):
+        with self._lock:
+            self._values[name] = value
+            self._updated[name] = time.time()
+            self._sources[name] = source
+
+    def _refresh_entries(self):
+        totals = self.table.get_item(
+            Key={'ResourceName': rollup_partition(TOTALS), 'DateProjectCode': TOTALS_KEY}
+        ).get('Item')
+
+        if totals is None:
+            # Rollups not seeded yet - approximate (refreshed by DynamoDB every ~6 hours)
+            description = self.table.meta.client.describe_table(TableName=self.table.name)
+            self._set('entries', int(description['Table'].get('ItemCount', 0)), 'describe_table')
+            self._set('zero_hour', 0, 'describe_table')
+        else:
+            self._set('entries', int(totals.get('EntryCount', 0)), 'rollup')
+            self._set('zero_hour', int(totals.get('ZeroHourCount', 0)), 'rollup')
+
+        people = 0
+        query_kwargs = {
+            'KeyConditionExpression': 'ResourceName = :pk',
+            'ExpressionAttributeValues': {':pk': rollup_partition(PERSON)},
+            'ProjectionExpression': 'EntryCount, ZeroHourCount',
+        }
+        while True:
+            response = self.table.query(**query_kwargs)
+            people += sum(
+                1 for item in response.get('Items', [])
+                if int(item.get('EntryCount', 0)) > 0 or int(item.get('ZeroHourCount', 0)) > 0
+            )
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        self._set('people', people, 'rollup')
+
+    def _refresh_images(self):
+        images = 0
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket):
+            images += sum(1 for obj in page.get('Contents', [])
+                          if obj['Key'].lower().endswith(IMAGE_EXTENSIONS))
+        self._set('images', images, 's3_list')
+
+    def refresh(self, force: bool = False):
+        """
+        Refresh every counter that is stale (all of them when forced).
+
+        Errors are logged and leave the previous values in place.
+        """
+        now = time.time()
+        with self._lock:
+            stale = self._stale or force
+            self._stale = False
+            due = {name: stale or now - self._updated[name] >= self._max_age(name) for name in COUNTERS}
+
+        steps = []
+        if due['entries'] or due['people']:
+            steps.append(self._refresh_entries)
+        if due['images']:
+            steps.append(self._refresh_images)
+        if due['failures'] and self.failures_func:
+            steps.append(lambda: self._set('failures', int(self.failures_func()), 'approval_queue'))
+
+        for step in steps:
+            try:
+                step()
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                    self.stats['last_error'] = str(e)
+                self.log(f"⚠️  Stats refresh failed: {e}")
+
+        with self._lock:
+            self.stats['refreshes'] += 1
+
+    def _max_age(self, name: str) -> int:
+        return self.image_refresh_seconds if name == 'images' else self.refresh_seconds
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_async(self) -> bool:
+        """Start a background refresh unless one is running. Returns True if started."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return True
+
+    def mark_stale(self):
+        """Refresh everything on the next read (after a local write or delete)."""
+        with self._lock:
+            self._stale = True
+
+    def get(self) -> Dict:
+        """
+        Get the current counters without blocking.
+
+        Returns:
+            Dict with one value per counter (None until first loaded), plus
+            age_seconds and source per counter and whether a refresh is running
+        """
+        now = time.time()
+        with self._lock:
+            due = self._stale or any(
+                now - self._updated[name] >= self._max_age(name) for name in COUNTERS
+                if name != 'failures' or self.failures_func
+            )
+            result = dict(self._values)
+            result['age_seconds'] = {
+                name: round(now - self._updated[name], 1) if self._updated[name] else None
+                for name in COUNTERS
+            }
+            result['as_of'] = {
+                name: datetime.fromtimestamp(self._updated[name]).isoformat(timespec='seconds')
+                if self._updated[name] else None
+                for name in COUNTERS
+            }
+            result['sources'] = dict(self._sources)
+            result.update(self.stats)
+
+        if due:
+            self.refresh_async()
+        with self._lock:
+            result['refreshing'] = self._refreshing
+        return result
@@ -3,12 +3,30 @@ Timesheet coverage checker for Clarity months.
 
 Checks which team members have submitted timesheets for each week
 in a Clarity month period.
+
+The coverage matrix is built by fetch_submitted_weeks() in one go: per
+person, one key-only range query over the whole period's day rows and one
+over its WEEK# items (zero-hour markers / week documents), run for
+COVERAGE_WORKERS people at a time. Each sort key is mapped to its week from
+the date ordinal. This replaces a query per person per week, run one after
+another (750+ round trips for 150 people over five weeks).
+
+COVERAGE_TRACKER items are not used: they are keyed by 16th-15th calendar
+periods that do not always match clarity_months.json, and only exist for
+timesheets written since the tracker was introduced.
 """
 import json
-from datetime import datetime, timedelta
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple
 import boto3
+from dynamo_codec import query_items
+from week_document import WEEK_KEY_PREFIX
+
+# People queried concurrently when building a coverage matrix
+COVERAGE_WORKERS = int(os.environ.get('COVERAGE_WORKERS', '16'))
 
 
 def load_clarity_months():
@@ -107,6 +125,79 @@ def parse_clarity_month(month_str: str) -> Tuple[datetime, datetime]:
     return start_date, end_date
 
 
+def _week_index(date_str: str, first_monday: int, week_count: int):
+    try:
+        week = (date.fromisoformat(date_str).toordinal() - first_monday) // 7
+    except ValueError:
+        return None
+    return week if 0 <= week < week_count else None
+
+
+def _person_submitted_weeks(resource_key: str, weeks: List[datetime], dynamodb_table: str, client) -> Set[str]:
+    first_monday = weeks[0].toordinal()
+    last_sunday = (weeks[-1] + timedelta(days=6)).strftime('%Y-%m-%d')
+    week_strs = [week.strftime('%Y-%m-%d') for week in weeks]
+
+    # Day rows Monday..Sunday of the whole period, then the WEEK#<monday> items
+    ranges = [
+        (week_strs[0], f"{last_sunday}#~", 0),
+        (f"{WEEK_KEY_PREFIX}{week_strs[0]}", f"{WEEK_KEY_PREFIX}{week_strs[-1]}", len(WEEK_KEY_PREFIX)),
+    ]
+
+    submitted = set()
+    for low, high, date_offset in ranges:
+        items = query_items(
+            dynamodb_table,
+            client=client,
+            KeyConditionExpression='ResourceName = :pk AND DateProjectCode BETWEEN :low AND :high',
+            ExpressionAttributeValues={':pk': {'S': resource_key}, ':low': {'S': low}, ':high': {'S': high}},
+            ProjectionExpression='DateProjectCode'
+        )
+        for item in items:
+            sort_key = item['DateProjectCode']
+            week = _week_index(sort_key[date_offset:date_offset + 10], first_monday, len(weeks))
+            if week is not None:
+                submitted.add(week_strs[week])
+    return submitted
+
+
+def fetch_submitted_weeks(resource_keys: List[str], weeks: List[datetime],
+                          dynamodb_table: str = 'TimesheetOCR-dev', region: str = 'us-east-1',
+                          client=None, workers: int = COVERAGE_WORKERS) -> Dict[str, Set[str]]:
+    """
+    Find which of the given weeks each person has submitted, for everyone at once.
+
+    A week counts as submitted if ANY item exists for the person in it: a day
+    row Monday to Sunday, a zero-hour marker or a week document.
+
+    Args:
+        resource_keys: ResourceName values (e.g., "Nik_Coultas")
+        weeks: Consecutive Mondays
+        dynamodb_table: DynamoDB table name
+        region: AWS region
+        client: Optional low-level DynamoDB client
+        workers: People queried concurrently
+
+    Returns:
+        Dict of resource key -> set of submitted week starts (YYYY-MM-DD).
+        A person whose queries failed gets an empty set (reported missing).
+    """
+    if not weeks or not resource_keys:
+        return {resource_key: set() for resource_key in resource_keys}
+
+    client = client or boto3.client('dynamodb', region_name=region)
+
+    def fetch(resource_key):
+        try:
+            return resource_key, _person_submitted_weeks(resource_key, weeks, dynamodb_table, client)
+        except Exception as e:
+            print(f"Error querying {resource_key} for coverage: {e}")
+            return resource_key, set()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(pool.map(fetch, resource_keys))
+
+
 def check_timesheet_exists(resource_name: str, week_start: datetime,
                            dynamodb_table: str = 'TimesheetOCR-dev',
                            region: str = 'us-east-1') -> bool:
@@ -124,54 +215,26 @@ def check_timesheet_exists(resource_name: str, week_start: datetime,
     """
     # Convert to ResourceName format (spaces to underscores)
     resource_key = resource_name.replace(' ', '_')
-
-    # Week dates (Monday to Sunday)
-    week_dates = []
-    for i in range(7):
-        week_dates.append(week_start + timedelta(days=i))
-
-    # Query DynamoDB for any entry in this week
-    dynamodb = boto3.client('dynamodb', region_name=region)
-
-    for date in week_dates:
-        date_str = date.strftime('%Y-%m-%d')
-
-        try:
-            # Query for this person on this date
-            response = dynamodb.query(
-                TableName=dynamodb_table,
-                KeyConditionExpression='ResourceName = :rn AND begins_with(DateProjectCode, :date)',
-                ExpressionAttributeValues={
-                    ':rn': {'S': resource_key},
-                    ':date': {'S': date_str}
-                },
-                Select='COUNT',
-                Limit=1
-            )
-
-            if response['Count'] > 0:
-                return True
-
-        except Exception as e:
-            print(f"Error checking {resource_key} for {date_str}: {e}")
-            continue
-
-    return False
+    submitted = fetch_submitted_weeks([resource_key], [week_start], dynamodb_table, region, workers=1)
+    return bool(submitted[resource_key])
 
 
 def generate_coverage_report(clarity_month: str,
                              dynamodb_table: str = 'TimesheetOCR-dev',
-                             region: str = 'us-east-1') -> Dict:
+                             region: str = 'us-east-1',
+                             client=None) -> Dict:
     """
     Generate timesheet coverage report for a Clarity month.
 
-    OPTIMIZED VERSION: Reads from pre-computed coverage tracker data
-    instead of querying each person/week individually.
+    Builds the whole coverage matrix with fetch_submitted_weeks() - two
+    range queries per person, run concurrently - instead of querying each
+    person/week individually.
 
     Args:
         clarity_month: Clarity month like "Sep-25"
         dynamodb_table: DynamoDB table name
         region: AWS region
+        client: Optional low-level DynamoDB client
 
     Returns:
         Dictionary with coverage data
@@ -185,39 +248,17 @@ def generate_coverage_report(clarity_month: str,
     # Load team roster
     team_members = load_team_roster()
 
-    # Query actual timesheet data (since coverage tracker data doesn't exist)
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    table = dynamodb.Table(dynamodb_table)
+    submitted = fetch_submitted_weeks(
+        [person.replace(' ', '_') for person in team_members],
+        weeks, dynamodb_table, region, client=client
+    )
 
-    # Build coverage matrix by querying actual timesheets
+    # Build coverage matrix
     coverage = {}
+    week_strs = [week.strftime('%Y-%m-%d') for week in weeks]
     for person in team_members:
-        resource_name = person.replace(' ', '_')
-        coverage[person] = {}
-
-        # Check each week
-        for week in weeks:
-            week_str = week.strftime('%Y-%m-%d')
-
-            # Query for ANY timesheet entry for this person in this week
-            # DateProjectCode format: YYYY-MM-DD#PROJECT_CODE
-            try:
-                response = table.query(
-                    KeyConditionExpression='ResourceName = :name AND begins_with(DateProjectCode, :week)',
-                    ExpressionAttributeValues={
-                        ':name': resource_name,
-                        ':week': week_str
-                    },
-                    Limit=1  # We just need to know if ANY entry exists
-                )
-
-                # Week is submitted if we found at least one entry
-                has_timesheet = len(response.get('Items', [])) > 0
-                coverage[person][week_str] = has_timesheet
-
-            except Exception as e:
-                print(f"Error querying {person} for week {week_str}: {e}")
-                coverage[person][week_str] = False
+        person_submitted = submitted[person.replace(' ', '_')]
+        coverage[person] = {week_str: week_str in person_submitted for week_str in week_strs}
 
     # Calculate statistics
     total_expected = len(team_members) * len(weeks)
@@ -0,0 +1,276 @@
+"""
+Parallel, streaming uploads of timesheet images to S3.
+
+The web app read every uploaded file fully into memory and called
+put_object one file at a time; the Tk UI did the same with upload_file.
+UploadManager uploads a batch through a bounded thread pool instead:
+
+  - Files are read in chunks (never whole into memory) and uploaded with
+    upload_fileobj, which switches to multipart above
+    UPLOAD_MULTIPART_THRESHOLD_MB
+  - Each file is hashed (SHA-256 + MD5) as it is read; files up to the
+    multipart threshold are uploaded from the chunks already read, so the
+    source is read once (larger files are re-read for the upload).
+  - A content-hash index of marker objects (hashes/<sha256>, metadata
+    key=<image key>) finds the same image uploaded under any name; it is
+    checked before uploading and skipped as duplicate_of the stored key.
+    If the key itself already holds the same content - matching
+    x-amz-meta-sha256, or the ETag for older single-part uploads - the
+    upload is skipped too. Identical files within one batch are uploaded once.
+  - Per-file progress goes to the log function at 25% steps
+
+Usage:
+    manager = UploadManager(bucket, log_func=log_message)
+    results = manager.upload_many([(key, path_or_fileobj), ...])
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', '4'))
+UPLOAD_MULTIPART_THRESHOLD_MB = int(os.environ.get('UPLOAD_MULTIPART_THRESHOLD_MB', '8'))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Marker objects of the content-hash index (no image suffix, so the OCR
+# trigger and the image listings ignore them)
+HASH_INDEX_PREFIX = 'hashes/'
+
+s3_client = boto3.client('s3', region_name='us-east-1')
+
+Source = Union[str, BinaryIO]
+
+
+def hash_index_key(sha256: str) -> str:
+    """Get the S3 key of the content-hash marker for a SHA-256."""
+    return f"{HASH_INDEX_PREFIX}{sha256}"
+
+
+def hash_stream(stream: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE,
+                keep_limit: Optional[int] = None) -> Tuple[str, str, int, Optional[bytes]]:
+    """
+    Hash a file object in chunks and rewind it.
+
+    Args:
+        stream: Seekable file object
+        chunk_size: Bytes read per chunk
+        keep_limit: Keep the content if it is at most this many bytes (None: never)
+
+    Returns:
+        (sha256 hex, md5 hex, size in bytes, content or None)
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    size = 0
+    chunks = [] if keep_limit is not None else None
+    stream.seek(0)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        sha256.update(chunk)
+        md5.update(chunk)
+        size += len(chunk)
+        if chunks is not None and size <= keep_limit:
+            chunks.append(chunk)
+        else:
+            chunks = None
+    stream.seek(0)
+    return sha256.hexdigest(), md5.hexdigest(), size, (b''.join(chunks) if chunks is not None else None)
+
+
+class _Progress:
+    """upload_fileobj callback that logs each 25% step once."""
+
+    def __init__(self, key: str, size: int, log_func):
+        self.key = key
+        self.size = size
+        self.log = log_func
+        self.sent = 0
+        self.next_step = 25
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_sent: int):
+        with self._lock:
+            self.sent += bytes_sent
+            percent = 100 * self.sent // self.size if self.size else 100
+            if percent >= self.next_step and percent < 100:
+                self.log(f"  ⬆️  {self.key}: {percent}%")
+                self.next_step = (percent // 25 + 1) * 25
+
+
+class UploadManager:
+    """Upload files to one bucket in parallel, skipping content already there."""
+
+    def __init__(
+        self,
+        bucket: str,
+        client=None,
+        max_workers: int = UPLOAD_WORKERS,
+        multipart_threshold_mb: int = UPLOAD_MULTIPART_THRESHOLD_MB,
+        log_func=print
+    ):
+        """
+        Args:
+            bucket: Target S3 bucket
+            client: Optional boto3 S3 client (defaults to module client)
+            max_workers: Files uploaded concurrently
+            multipart_threshold_mb: Files larger than this use multipart upload
+            log_func: Logger for progress messages
+        """
+        self.bucket = bucket
+        self.client = client or s3_client
+        self.max_workers = max(1, max_workers)
+        self.log = log_func
+        # Files up to this size are kept from the hashing read and uploaded from memory
+        self.buffer_limit = multipart_threshold_mb * 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold_mb * 1024 * 1024,
+            multipart_chunksize=multipart_threshold_mb * 1024 * 1024,
+            max_concurrency=4
+        )
+
+    def _head(self, key: str) -> Dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def _existing_matches(self, key: str, sha256: str, md5: str) -> bool:
+        head = self._head(key)
+        if head is None:
+            return False
+        if head.get('Metadata', {}).get('sha256'):
+            return head['Metadata']['sha256'] == sha256
+        # Uploaded before hashes were recorded: a single-part ETag is the MD5
+        return head.get('ETag', '').strip('"') == md5
+
+    def _indexed_key(self, sha256: str, md5: str) -> str:
+        """Key already holding this content per the hash index (None if absent or stale)."""
+        marker = self._head(hash_index_key(sha256))
+        original = (marker or {}).get('Metadata', {}).get('key')
+        if original and self._existing_matches(original, sha256, md5):
+            return original
+        return None
+
+    def _index(self, key: str, sha256: str):
+        try:
+            self.client.put_object(Bucket=self.bucket, Key=hash_index_key(sha256), Body=b'',
+                                   Metadata={'key': key})
+        except Exception as e:
+            self.log(f"⚠️  Could not index {key} by content hash (non-fatal): {e}")
+
+    def _read(self, key: str, source: Source) -> Dict:
+        """Hash a source in one chunked read, keeping the bytes if it is small enough to upload from memory."""
+        result = {'filename': key, 'success': False, 'skipped': False, 'source': source, 'body': None}
+        try:
+            stream = open(source, 'rb') if isinstance(source, str) else source
+            try:
+                result['sha256'], result['md5'], result['bytes'], result['body'] = hash_stream(
+                    stream, keep_limit=self.buffer_limit)
+            finally:
+                if isinstance(source, str):
+                    stream.close()
+        except Exception as e:
+            result['error'] = str(e)
+            self.log(f"✗ Could not read {key}: {e}")
+        return result
+
+    def _transfer(self, result: Dict) -> Dict:
+        start = time.time()
+        key, source = result['filename'], result['source']
+        try:
+            original = self._indexed_key(result['sha256'], result['md5'])
+            if original and original != key:
+                result.update({'success': True, 'skipped': True, 'duplicate_of': original})
+                self.log(f"⏭️  Skipped {key} (same content already in S3 as {original})")
+            elif original or self._existing_matches(key, result['sha256'], result['md5']):
+                result.update({'success': True, 'skipped': True})
+                self.log(f"⏭️  Skipped {key} (same content already in S3)")
+                if not original:
+                    self._index(key, result['sha256'])
+            else:
+                if result['body'] is not None:
+                    stream = io.BytesIO(result['body'])
+                else:
+                    stream = open(source, 'rb') if isinstance(source, str) else source
+                try:
+                    self.client.upload_fileobj(
+                        stream,
+                        self.bucket,
+                        key,
+                        ExtraArgs={'Metadata': {'sha256': result['sha256']}},
+                        Config=self.transfer_config,
+                        Callback=_Progress(key, result['bytes'], self.log)
+                    )
+                finally:
+                    if isinstance(source, str) and result['body'] is None:
+                        stream.close()
+                self._index(key, result['sha256'])
+                result['success'] = True
+                self.log(f"✓ Uploaded to S3: {key} ({result['bytes'] / 1024:.0f} KB)")
+        except Exception as e:
+            result['error'] = str(e)
+            self.log(f"✗ Upload failed for {key}: {e}")
+        result['seconds'] = round(time.time() - start, 3)
+        return result
+
+    def upload_many(self, sources: Iterable[Tuple[str, Source]]) -> List[Dict]:
+        """
+        Upload a batch of files through the thread pool.
+
+        Files are hashed as they are read; identical content under two
+        names in one batch is uploaded once, and content already stored -
+        under the same key, or under any key in the hash index - is not
+        uploaded again.
+
+        Args:
+            sources: (key, path or binary file object) pairs
+
+        Returns:
+            One result dict per source, in input order, with filename,
+            success, skipped, sha256, bytes, seconds, and error or
+            duplicate_of where relevant
+        """
+        sources = list(sources)
+        start = time.time()
+        workers = min(self.max_workers, len(sources) or 1)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda pair: self._read(*pair), sources))
+
+            first_by_hash = {}
+            to_send = []
+            for result in results:
+                if 'error' in result:
+                    continue
+                original = first_by_hash.setdefault(result['sha256'], result['filename'])
+                if original != result['filename']:
+                    result.update({'success': True, 'skipped': True, 'duplicate_of': original})
+                    self.log(f"⏭️  Skipped {result['filename']} (same content as {original})")
+                else:
+                    to_send.append(result)
+
+            list(pool.map(self._transfer, to_send))
+
+        for result in results:
+            result.pop('source', None)
+            result.pop('md5', None)
+            result.pop('body', None)
+
+        uploaded = sum(1 for r in results if r['success'] and not r['skipped'])
+        skipped = sum(1 for r in results if r['skipped'])
+        failed = sum(1 for r in results if not r['success'])
+        total_bytes = sum(r.get('bytes', 0) for r in results if r['success'] and not r['skipped'])
+        self.log(f"📦 Upload batch: {uploaded} uploaded, {skipped} skipped, {failed} failed, "
+                 f"{total_bytes / 1024 / 1024:.1f} MB in {time.time() - start:.1f}s")
+        return results
@@ -0,0 +1,251 @@
+"""
+Week-document storage layout for timesheet data.
+
+The default ("day") layout writes one DynamoDB item per person/day/project,
+each repeating the full set of metadata attributes. The "week" layout stores a
+whole timesheet as a single item instead:
+
+  Partition Key: ResourceName (e.g., "Nik_Coultas")
+  Sort Key: WEEK#YYYY-MM-DD (week commencing date)
+  Attributes:
+    - RecordType: WEEK_DOCUMENT
+    - Projects: Map of project code -> {'ProjectName': str, 'Hours': {date: hours},
+      'SourceImages': {date: image key}}
+    - Shared metadata (SourceImage, ProcessingTimestamp, OCR version, ...) stored once
+
+A week can be assembled from several scans (the newest scan wins per day), so
+each project-day keeps the image it came from in SourceImages; the document's
+own SourceImage is the latest scan and the fallback for documents written
+before SourceImages existed. remove_image_entries() takes one image's days out
+of a document without touching the rest.
+
+Zero-hour timesheets already used the WEEK# sort key, so they become week
+documents with an empty Projects map.
+
+expand_week_document() turns a week document back into the per-day rows that
+exports and reports expect, so readers only need to pass their items through
+expand_items().
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STORAGE_LAYOUT_DAY = 'day'
+STORAGE_LAYOUT_WEEK = 'week'
+
+WEEK_DOCUMENT_RECORD_TYPE = 'WEEK_DOCUMENT'
+WEEK_KEY_PREFIX = 'WEEK#'
+
+# Attributes that only make sense on the week document itself
+_DOCUMENT_ONLY_ATTRIBUTES = ('Projects', 'RecordType')
+
+
+def week_document_key(week_start: str) -> str:
+    """
+    Build the sort key for a week document.
+
+    Args:
+        week_start: Week commencing date in YYYY-MM-DD format
+
+    Returns:
+        Sort key like "WEEK#2025-09-29"
+    """
+    return f"{WEEK_KEY_PREFIX}{week_start}"
+
+
+def is_week_document(item: Dict) -> bool:
+    """Check whether an item is stored in the week-document layout."""
+    return item.get('RecordType') == WEEK_DOCUMENT_RECORD_TYPE
+
+
+def build_week_document(metadata: Dict, rows: Iterable[Dict]) -> Dict:
+    """
+    Fold per-day rows for one person-week into a single week document.
+
+    Args:
+        metadata: Shared attributes (keys, source image, OCR version, week context, ...)
+        rows: Per-day items as built for the day layout (Date, ProjectCode,
+              ProjectName, Hours)
+
+    Returns:
+        Week document item ready for put_item
+    """
+    projects = {}
+    for row in rows:
+        project = projects.setdefault(row['ProjectCode'], {
+            'ProjectName': row.get('ProjectName', ''),
+            'Hours': {},
+            'SourceImages': {}
+        })
+        project['Hours'][row['Date']] = row['Hours']
+        project['SourceImages'][row['Date']] = row.get('SourceImage') or metadata.get('SourceImage', '')
+
+    document = dict(metadata)
+    document['RecordType'] = WEEK_DOCUMENT_RECORD_TYPE
+    document['Projects'] = projects
+    return document
+
+
+def _source_images(project: Dict, default_image: str) -> Dict[str, str]:
+    """Image per day of a Projects entry (older documents only have the document's SourceImage)."""
+    images = project.get('SourceImages', {})
+    return {date_str: images.get(date_str) or default_image for date_str in project.get('Hours', {})}
+
+
+def merge_week_projects(existing: Dict, new: Dict, existing_image: str = '') -> Tuple[Dict, int]:
+    """
+    Merge the Projects map of a newer scan over an existing week document.
+
+    Mirrors the day layout's "most recent scan wins" rule: days present in the
+    new scan replace the stored values, days only present in the existing
+    document are kept - together with the image they came from.
+
+    Args:
+        existing: Projects map from the stored week document
+        new: Projects map from the new scan
+        existing_image: SourceImage of the stored document, for days
+                        written before SourceImages was recorded
+
+    Returns:
+        Tuple of (merged Projects map, number of project-days replaced)
+    """
+    merged = {
+        code: {
+            'ProjectName': data.get('ProjectName', ''),
+            'Hours': dict(data.get('Hours', {})),
+            'SourceImages': _source_images(data, existing_image),
+        }
+        for code, data in existing.items()
+    }
+    replaced = 0
+
+    for code, data in new.items():
+        target = merged.setdefault(code, {'ProjectName': data.get('ProjectName', ''), 'Hours': {}, 'SourceImages': {}})
+        if data.get('ProjectName'):
+            target['ProjectName'] = data['ProjectName']
+        images = data.get('SourceImages', {})
+        for date_str, hours in data.get('Hours', {}).items():
+            if date_str in target['Hours']:
+                replaced += 1
+            target['Hours'][date_str] = hours
+            target['SourceImages'][date_str] = images.get(date_str, '')
+
+    return merged, replaced
+
+
+def remove_image_entries(document: Dict, source_image: str) -> Tuple[Optional[Dict], int]:
+    """
+    Take the project-days written by one image out of a week document.
+
+    Args:
+        document: Stored week document
+        source_image: Image whose entries are removed
+
+    Returns:
+        Tuple of (document holding the remaining days, or None when no days
+        from other images are left; number of project-days removed)
+    """
+    default_image = document.get('SourceImage', '')
+    projects = {}
+    removed = 0
+    for code, data in document.get('Projects', {}).items():
+        images = _source_images(data, default_image)
+        keep = [date_str for date_str in data.get('Hours', {}) if images[date_str] != source_image]
+        removed += len(data.get('Hours', {})) - len(keep)
+        if keep:
+            projects[code] = {
+                'ProjectName': data.get('ProjectName', ''),
+                'Hours': {date_str: data['Hours'][date_str] for date_str in keep},
+                'SourceImages': {date_str: images[date_str] for date_str in keep},
+            }
+
+    if not projects:
+        return None, removed
+    remaining = dict(document)
+    remaining['Projects'] = projects
+    return remaining, removed
+
+
+def expand_week_document(item: Dict) -> List[Dict]:
+    """
+    Expand a week document into per-day rows in the day-layout format.
+
+    Args:
+        item: Week document item
+
+    Returns:
+        List of rows with DateProjectCode "YYYY-MM-DD#PROJECT", Date, ProjectCode,
+        ProjectName, Hours and the day's SourceImage, plus the shared metadata. Zero-hour documents
+        expand to the single WEEK# marker row used by the day layout.
+    """
+    metadata = {k: v for k, v in item.items() if k not in _DOCUMENT_ONLY_ATTRIBUTES}
+    metadata['StorageLayout'] = STORAGE_LAYOUT_WEEK
+
+    if item.get('IsZeroHourTimesheet'):
+        return [metadata]
+
+    rows = []
+    for project_code in sorted(item.get('Projects', {})):
+        project = item['Projects'][project_code]
+        images = _source_images(project, item.get('SourceImage', ''))
+        for date_str in sorted(project.get('Hours', {})):
+            row = dict(metadata)
+            row.update({
+                'SourceImage': images[date_str],
+                'DateProjectCode': f"{date_str}#{project_code}",
+                'Date': date_str,
+                'ProjectCode': project_code,
+                'ProjectName': project.get('ProjectName', ''),
+                'Hours': project['Hours'][date_str],
+                'IsZeroHourTimesheet': False,
+                'YearMonth': date_str[:7],
+                'ProjectCodeGSI': project_code,
+            })
+            rows.append(row)
+
+    return rows
+
+
+def expand_items(items: Iterable[Dict]) -> List[Dict]:
+    """
+    Read adapter: expand any week documents, pass every other item through.
+
+    Args:
+        items: Items as returned by a scan or query
+
+    Returns:
+        List of items in the day-layout row format
+    """
+    expanded = []
+    for item in items:
+        if is_week_document(item):
+            expanded.extend(expand_week_document(item))
+        else:
+            expanded.append(item)
+    return expanded
+
+
+def storage_keys(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Get the unique DynamoDB keys behind a set of (possibly expanded) rows.
+
+    Rows expanded from a week document all map back to that document's
+    WEEK# key, so deleting them deletes the document once.
+
+    Args:
+        rows: Items returned by expand_items() or a raw scan
+
+    Returns:
+        List of {'ResourceName', 'DateProjectCode'} key dicts
+    """
+    keys = []
+    seen = set()
+    for row in rows:
+        if row.get('StorageLayout') == STORAGE_LAYOUT_WEEK:
+            sort_key = week_document_key(row.get('WeekStartDate', ''))
+        else:
+            sort_key = row['DateProjectCode']
+
+        key = (row['ResourceName'], sort_key)
+        if key not in seen:
+            seen.add(key)
+            keys.append({'ResourceName': key[0], 'DateProjectCode': key[1]})
+    return keys
@@ -0,0 +1,312 @@
+"""
+Batch write pipeline for bulk timesheet storage.
+
+Collects put/delete requests from many timesheets and sends them as full
+25-item BatchWriteItem requests. UnprocessedItems are retried with
+exponential backoff, and the side updates that store_timesheet_entries()
+makes per timesheet are coalesced:
+
+  - Coverage: one UpdateItem per person + Clarity month (ADD of all weeks)
+  - Rollups: deltas merged across timesheets and applied once per rollup item
+  - Resource registry: one UpdateItem per person (resource_registry.py)
+
+Usage:
+    with BatchWritePipeline(table_name) as pipeline:
+        for image_key, ocr_data in results:
+            store_timesheet_entries(..., table_name=table_name, pipeline=pipeline)
+    print(pipeline.get_metrics())
+"""
+import random
+import time
+import boto3
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from botocore.config import Config
+from coverage_tracker import get_clarity_month, get_week_commencing, update_coverage_weeks
+from performance import PerformanceMetrics
+from query_cache import invalidate, invalidate_keys
+from resource_registry import apply_registry_deltas, compute_registry_deltas, merge_registry_deltas
+from rollups import apply_rollup_deltas, compute_rollup_deltas, merge_rollup_deltas
+
+boto_config = Config(
+    retries={
+        'max_attempts': 10,
+        'mode': 'adaptive'
+    },
+    region_name='us-east-1'
+)
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+
+# DynamoDB limit for a single BatchWriteItem request
+MAX_BATCH_SIZE = 25
+
+
+class BatchWriteError(Exception):
+    """Raised when items are still unprocessed after all retries."""
+
+
+def _item_key(item: Dict) -> Tuple[str, str]:
+    return (item['ResourceName'], item['DateProjectCode'])
+
+
+class BatchWritePipeline:
+    """Buffered BatchWriteItem writer with retry, coalescing and metrics."""
+
+    def __init__(
+        self,
+        table_name: str,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_retries: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 5.0,
+        auto_flush: bool = True,
+        resource=None
+    ):
+        """
+        Args:
+            table_name: DynamoDB table name
+            batch_size: Items per BatchWriteItem request (max 25)
+            max_retries: Retry rounds for UnprocessedItems before giving up
+            base_delay: First backoff delay in seconds (doubles per retry, with jitter)
+            max_delay: Upper bound for a single backoff delay
+            auto_flush: Send full batches as soon as they are buffered
+            resource: Optional boto3 DynamoDB resource (defaults to module resource)
+        """
+        if not table_name:
+            raise ValueError("DynamoDB table name not provided")
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.auto_flush = auto_flush
+        self.resource = resource or dynamodb
+        self.table = self.resource.Table(table_name)
+
+        # Pending requests keyed by primary key - BatchWriteItem rejects
+        # duplicate keys in one request, and the last write wins anyway
+        self._pending = OrderedDict()
+        self._coverage = defaultdict(set)   # (resource, clarity_month) -> weeks
+        self._rollup_deltas = {}
+        self._registry_deltas = {}
+
+        self.performance = PerformanceMetrics()
+        self.counters = {
+            'puts': 0,
+            'deletes': 0,
+            'coalesced': 0,
+            'batch_requests': 0,
+            'retry_rounds': 0,
+            'unprocessed_items': 0,
+            'coverage_updates': 0,
+            'coverage_weeks': 0,
+            'rollup_updates': 0,
+            'registry_updates': 0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Only flush on success - a failed run should not half-apply side updates
+        if exc_type is None:
+            self.flush()
+        return False
+
+    # ------------------------------------------------------------------
+    # Buffering
+    # ------------------------------------------------------------------
+
+    def put(self, item: Dict):
+        """Queue a PutRequest."""
+        self._queue(_item_key(item), {'PutRequest': {'Item': item}})
+        self.counters['puts'] += 1
+
+    def delete(self, key: Dict):
+        """Queue a DeleteRequest for a {'ResourceName', 'DateProjectCode'} key."""
+        self._queue(_item_key(key), {'DeleteRequest': {'Key': dict(key)}})
+        self.counters['deletes'] += 1
+
+    def _queue(self, key: Tuple[str, str], request: Dict):
+        if key in self._pending:
+            self.counters['coalesced'] += 1
+            del self._pending[key]
+        self._pending[key] = request
+
+        if self.auto_flush and len(self._pending) >= self.batch_size:
+            self._send_full_batches()
+
+    def add_coverage(self, resource_key: str, date_str: str):
+        """Queue a coverage update (coalesced per person + Clarity month)."""
+        clarity_month = get_clarity_month(date_str)
+        self._coverage[(resource_key, clarity_month)].add(get_week_commencing(date_str))
+
+    def add_rollups(self, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()):
+        """Queue rollup changes for rows written and rows overwritten/deleted."""
+        self._rollup_deltas = merge_rollup_deltas(
+            self._rollup_deltas,
+            compute_rollup_deltas(added, 1),
+            compute_rollup_deltas(removed, -1)
+        )
+
+    def add_resources(self, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()):
+        """Queue resource registry changes (coalesced per person)."""
+        self._registry_deltas = merge_registry_deltas(
+            self._registry_deltas,
+            compute_registry_deltas(added, removed)
+        )
+
+    def current_item(self, key: Dict) -> Optional[Dict]:
+        """
+        Get the item a key will hold once the pipeline is flushed.
+
+        Pending puts/deletes take precedence over the stored item, so callers
+        that read-before-write see the writes queued by earlier timesheets.
+        """
+        request = self._pending.get(_item_key(key))
+        if request is not None:
+            put = request.get('PutRequest')
+            return put['Item'] if put else None
+
+        response = self.table.get_item(Key={
+            'ResourceName': key['ResourceName'],
+            'DateProjectCode': key['DateProjectCode']
+        })
+        return response.get('Item')
+
+    def pending_writes(self, resource_key: str, prefix: str) -> Dict[str, Optional[Dict]]:
+        """
+        Get queued (unflushed) writes for a person whose sort key starts with prefix.
+
+        Returns:
+            Dict mapping DateProjectCode -> queued item (None for a queued delete)
+        """
+        writes = {}
+        for (resource, sort_key), request in self._pending.items():
+            if resource == resource_key and sort_key.startswith(prefix):
+                put = request.get('PutRequest')
+                writes[sort_key] = put['Item'] if put else None
+        return writes
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+
+    def _send_full_batches(self):
+        while len(self._pending) >= self.batch_size:
+            self._send_batch(self._take(self.batch_size))
+
+    def _take(self, count: int) -> List[Dict]:
+        requests = []
+        for _ in range(min(count, len(self._pending))):
+            _, request = self._pending.popitem(last=False)
+            requests.append(request)
+        return requests
+
+    def _send_batch(self, requests: List[Dict]):
+        """Send one BatchWriteItem request, retrying UnprocessedItems with backoff."""
+        start = time.time()
+        attempt = 0
+        written_keys = [
+            request['PutRequest']['Item'] if 'PutRequest' in request else request['DeleteRequest']['Key']
+            for request in requests
+        ]
+
+        while requests:
+            response = self.resource.batch_write_item(RequestItems={self.table_name: requests})
+            self.counters['batch_requests'] += 1
+
+            requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            if not requests:
+                break
+
+            self.counters['unprocessed_items'] += len(requests)
+            if attempt >= self.max_retries:
+                raise BatchWriteError(
+                    f"{len(requests)} items still unprocessed after {self.max_retries} retries"
+                )
+
+            # Exponential backoff with jitter (throttling is usually per partition)
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            time.sleep(delay * (0.5 + random.random() / 2))
+            attempt += 1
+            self.counters['retry_rounds'] += 1
+
+        self.performance.record('batch_write', time.time() - start)
+
+        # Cached person-week reads of these keys are now stale
+        invalidate_keys(self.table_name, written_keys)
+
+    def flush(self) -> Dict:
+        """
+        Send all buffered requests, then apply coalesced rollups, registry
+        and coverage updates.
+
+        Returns:
+            Metrics dict (see get_metrics())
+        """
+        while self._pending:
+            self._send_batch(self._take(self.batch_size))
+
+        if self._rollup_deltas:
+            start = time.time()
+            result = apply_rollup_deltas(self.table_name, self._rollup_deltas)
+            self.counters['rollup_updates'] += result.get('updated', 0)
+            self.performance.record('rollups', time.time() - start)
+            self._rollup_deltas = {}
+
+        if self._registry_deltas:
+            start = time.time()
+            result = apply_registry_deltas(self.table_name, self._registry_deltas, table=self.table)
+            self.counters['registry_updates'] += result.get('updated', 0)
+            self.performance.record('registry', time.time() - start)
+            self._registry_deltas = {}
+
+        if self._coverage:
+            start = time.time()
+            for (resource_key, clarity_month), weeks in sorted(self._coverage.items()):
+                result = update_coverage_weeks(self.table_name, resource_key, clarity_month, weeks)
+                if result.get('success'):
+                    self.counters['coverage_updates'] += 1
+                    self.counters['coverage_weeks'] += len(weeks)
+                    invalidate(self.table_name, resource_key, [f"{resource_key}#COVERAGE#{clarity_month}"])
+                else:
+                    print(f"⚠️  Coverage tracker update failed: {result.get('error', 'Unknown')}")
+            self.performance.record('coverage', time.time() - start)
+            self._coverage = defaultdict(set)
+
+        return self.get_metrics()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_metrics(self) -> Dict:
+        """Get throughput and retry metrics for this pipeline."""
+        summary = self.performance.get_summary()
+        batch_stats = summary['operations'].get('batch_write', {})
+        write_time = batch_stats.get('total_time', 0)
+        queued = self.counters['puts'] + self.counters['deletes'] - self.counters['coalesced']
+        items_sent = queued - len(self._pending)
+
+        metrics = dict(self.counters)
+        metrics.update({
+            'pending': len(self._pending),
+            'items_sent': items_sent,
+            'write_seconds': write_time,
+            'items_per_second': round(items_sent / write_time, 1) if write_time else 0,
+            'elapsed_seconds': summary['total_elapsed_seconds'],
+        })
+        return metrics
+
+    def print_report(self):
+        """Print a short throughput/retry summary."""
+        m = self.get_metrics()
+        print(f"📦 Batch writes: {m['items_sent']} items in {m['batch_requests']} requests "
+              f"({m['items_per_second']} items/s)")
+        print(f"   Retries: {m['retry_rounds']} rounds, {m['unprocessed_items']} unprocessed items")
+        print(f"   Coalesced: {m['coalesced']} writes, {m['coverage_updates']} coverage updates, "
+              f"{m['rollup_updates']} rollup updates, {m['registry_updates']} registry updates")
@@ -0,0 +1,476 @@
+"""
+In-memory AWS fakes and row builders shared by the unit tests.
+
+FakeTable (table resource), FakeClient (low-level client, wire format) and
+FakeResource (BatchGetItem/BatchWriteItem) all keep items in a dict keyed
+by (ResourceName, DateProjectCode), and evaluate the simple key conditions,
+filters and update expressions the modules under test send. FakeS3 is a
+dict of objects. Tests subclass them for failure injection.
+"""
+import hashlib
+import io
+import re
+import threading
+from decimal import Decimal
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from botocore.exceptions import ClientError
+
+
+def timesheet_row(resource, date_str, code='P1', hours=7.5, **extra):
+    """Day-layout timesheet row; extra attributes are added as given."""
+    row = {
+        'ResourceName': resource,
+        'DateProjectCode': f"{date_str}#{code}",
+        'Date': date_str,
+        'ProjectCode': code,
+        'Hours': hours,
+    }
+    row.update(extra)
+    return row
+
+
+def wire(item):
+    """Flat item -> DynamoDB wire format."""
+    result = {}
+    for k, v in item.items():
+        if isinstance(v, bool):
+            result[k] = {'BOOL': v}
+        elif isinstance(v, (int, float, Decimal)):
+            result[k] = {'N': str(v)}
+        else:
+            result[k] = {'S': v}
+    return result
+
+
+def unwire(item):
+    """Flat wire-format item -> plain values (numbers as Decimal)."""
+    return {k: Decimal(v['N']) if 'N' in v else list(v.values())[0] for k, v in item.items()}
+
+
+def _key(item):
+    return (item['ResourceName'], item['DateProjectCode'])
+
+
+def _conditional_check_failed(operation):
+    return ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, operation)
+
+
+def _path(token, names):
+    """Attribute path of a (possibly dotted) name: 'Projects.#c.Hours' -> ['Projects', 'P1', 'Hours']."""
+    return [names.get(part, part) for part in token.split('.')]
+
+
+def _get_path(item, path):
+    for part in path:
+        if not isinstance(item, dict) or part not in item:
+            return None
+        item = item[part]
+    return item
+
+
+def _set_path(item, path, value):
+    for part in path[:-1]:
+        item = item[part]
+    item[path[-1]] = value
+
+
+_CLAUSE = re.compile(
+    r'([#\w.]+) BETWEEN (:\w+) AND (:\w+)'
+    r'|([#\w.]+) (=|<>|<=|>=|<|>) (:\w+)'
+    r'|(attribute_exists|attribute_not_exists)\(([#\w.]+)\)'
+    r'|begins_with\(([#\w.]+), (:\w+)\)'
+)
+
+
+def _compare(current, op, value):
+    if current is None:
+        return op == '<>'
+    return {'=': current == value, '<>': current != value, '<': current < value,
+            '<=': current <= value, '>': current > value, '>=': current >= value}[op]
+
+
+def matches(expression, item, values=None, names=None):
+    """
+    Evaluate a condition of simple clauses joined by AND or by OR.
+
+    Supports comparisons, BETWEEN, begins_with() and attribute_(not_)exists()
+    on top-level or dotted map paths; anything else raises ValueError so a
+    test never passes on an unread filter.
+    """
+    values = values or {}
+    names = names or {}
+
+    def attr(token):
+        return _get_path(item, _path(token, names))
+
+    if re.sub(_CLAUSE.pattern + r'|\bAND\b|\bOR\b|[()\s]', '', expression):
+        raise ValueError(f"Unsupported expression: {expression}")
+
+    results = []
+    for m in _CLAUSE.finditer(expression):
+        if m.group(1):
+            current = attr(m.group(1))
+            results.append(current is not None and values[m.group(2)] <= current <= values[m.group(3)])
+        elif m.group(4):
+            results.append(_compare(attr(m.group(4)), m.group(5), values[m.group(6)]))
+        elif m.group(7):
+            exists = attr(m.group(8)) is not None
+            results.append(exists if m.group(7) == 'attribute_exists' else not exists)
+        else:
+            current = attr(m.group(9))
+            results.append(isinstance(current, str) and current.startswith(values[m.group(10)]))
+
+    # BETWEEN's own AND is consumed by its clause, so the joiner is the same everywhere
+    return any(results) if re.search(r'\bOR\b', expression) else all(results)
+
+
+def _expression(condition, kwargs, is_key_condition=False):
+    """Expression string, values and names for a string or boto3 condition."""
+    if isinstance(condition, ConditionBase):
+        built = ConditionExpressionBuilder().build_expression(condition, is_key_condition)
+        return built.condition_expression, built.attribute_value_placeholders, built.attribute_name_placeholders
+    return condition, kwargs.get('ExpressionAttributeValues', {}), kwargs.get('ExpressionAttributeNames', {})
+
+
+class FakeTable:
+    """
+    Table resource over a dict of items.
+
+    Queries and scans are paged by position when page_size (or Limit) is
+    set; calls records (operation, partition) for every read and requests
+    the full parameters of every query and scan.
+    """
+
+    INDEXES = {
+        None: ('ResourceName', 'DateProjectCode'),
+        'ProjectCodeIndex': ('ProjectCodeGSI', 'DateProjectCode'),
+        'YearMonthIndex': ('YearMonth', 'ResourceName'),
+    }
+
+    def __init__(self, items=(), page_size=None, name='T'):
+        self.name = name
+        self.items = {}
+        for item in items:
+            self.put(item)
+        self.page_size = page_size
+        self.calls = []
+        self.requests = []
+        self.updates = []
+        self.fail_keys = set()
+        self.lock = threading.Lock()
+
+    # Direct access for test setup
+    def put(self, item):
+        self.items[_key(item)] = dict(item)
+
+    def delete(self, resource, sort_key):
+        self.items.pop((resource, sort_key), None)
+
+    def partition(self, resource):
+        return [item for key, item in sorted(self.items.items()) if key[0] == resource]
+
+    @property
+    def queries(self):
+        return sum(1 for op, _ in self.calls if op == 'query')
+
+    # Paging and projection shared with FakeClient
+    def _start(self, kwargs):
+        return kwargs['ExclusiveStartKey']['pos'] if 'ExclusiveStartKey' in kwargs else 0
+
+    def _next_key(self, position):
+        return {'pos': position}
+
+    def _out(self, item):
+        return dict(item)
+
+    def _read(self, items, kwargs):
+        start = self._start(kwargs)
+        limit = kwargs.get('Limit', self.page_size) or len(items)
+        page = items[start:start + limit]
+        if 'FilterExpression' in kwargs:
+            expression, values, names = _expression(kwargs['FilterExpression'], kwargs)
+            page = [i for i in page if matches(expression, i, values, names)]
+        if kwargs.get('ProjectionExpression'):
+            fields = [f.strip() for f in kwargs['ProjectionExpression'].split(',')]
+            page = [{f: i[f] for f in fields if f in i} for i in page]
+
+        response = {'Count': len(page)}
+        if kwargs.get('Select') != 'COUNT':
+            response['Items'] = [self._out(i) for i in page]
+        if start + limit < len(items):
+            response['LastEvaluatedKey'] = self._next_key(start + limit)
+        return response
+
+    def _values(self, kwargs):
+        return kwargs.get('ExpressionAttributeValues', {})
+
+    # Table API
+    def get_item(self, Key, **kwargs):
+        self.calls.append(('get_item', Key['ResourceName']))
+        item = self.items.get(_key(Key))
+        return {'Item': self._out(item)} if item else {}
+
+    def put_item(self, Item, **kwargs):
+        with self.lock:
+            self._check(_key(Item), kwargs, 'PutItem')
+            self.put(Item)
+        return {}
+
+    def delete_item(self, Key, **kwargs):
+        with self.lock:
+            self._check(_key(Key), kwargs, 'DeleteItem')
+            self.items.pop(_key(Key), None)
+        return {}
+
+    def query(self, **kwargs):
+        self.requests.append(('query', kwargs))
+        pk_name, sk_name = self.INDEXES[kwargs.get('IndexName')]
+        expression, values, names = _expression(kwargs['KeyConditionExpression'],
+                                                dict(kwargs, ExpressionAttributeValues=self._values(kwargs)),
+                                                is_key_condition=True)
+        partition = next(values[v] for n, v in re.findall(r'([#\w]+) = (:\w+)', expression)
+                         if names.get(n, n) == pk_name)
+        self.calls.append(('query', partition))
+
+        items = [i for _, i in sorted(self.items.items())
+                 if pk_name in i and sk_name in i and matches(expression, i, values, names)]
+        items.sort(key=lambda i: i[sk_name], reverse=not kwargs.get('ScanIndexForward', True))
+        return self._read(items, dict(kwargs, ExpressionAttributeValues=values))
+
+    def scan(self, **kwargs):
+        self.requests.append(('scan', kwargs))
+        self.calls.append(('scan', kwargs.get('Segment')))
+        segment, total = kwargs.get('Segment', 0), kwargs.get('TotalSegments', 1)
+        items = [i for n, (_, i) in enumerate(sorted(self.items.items())) if n % total == segment]
+        return self._read(items, dict(kwargs, ExpressionAttributeValues=self._values(kwargs)))
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues=None,
+                    ExpressionAttributeNames=None, ConditionExpression=None, ReturnValues=None):
+        """Applies SET (with if_not_exists, top-level or dotted map paths) and ADD clauses."""
+        key = _key(Key)
+        if key in self.fail_keys:
+            raise RuntimeError(f"Injected failure for {key}")
+        values = ExpressionAttributeValues or {}
+        names = ExpressionAttributeNames or {}
+
+        with self.lock:
+            self.updates.append(key)
+            item = self.items.get(key, dict(Key))
+            if ConditionExpression and not matches(ConditionExpression, item if key in self.items else {},
+                                                   values, names):
+                raise _conditional_check_failed('UpdateItem')
+
+            sections = dict(re.findall(r'(SET|ADD) (.*?)(?= SET | ADD |$)', UpdateExpression))
+            for name, value in re.findall(r'([#\w.]+) = (if_not_exists\([#\w]+, :\w+\)|:\w+)',
+                                          sections.get('SET', '')):
+                path = _path(name, names)
+                if value.startswith('if_not_exists'):
+                    if _get_path(item, path) is None:
+                        _set_path(item, path, values[value.split(', ')[1].rstrip(')')])
+                else:
+                    _set_path(item, path, values[value])
+            for name, value in re.findall(r'([#\w]+) (:\w+)', sections.get('ADD', '')):
+                attr = names.get(name, name)
+                item[attr] = item.get(attr, 0) + values[value]
+            self.items[key] = item
+
+        return {'Attributes': dict(item)} if ReturnValues == 'ALL_NEW' else {}
+
+    def _check(self, key, kwargs, operation):
+        if key in self.fail_keys:
+            raise RuntimeError(f"Injected failure for {key}")
+        condition = kwargs.get('ConditionExpression')
+        if condition and not matches(condition, self.items.get(key, {}), self._values(kwargs),
+                                     kwargs.get('ExpressionAttributeNames')):
+            raise _conditional_check_failed(operation)
+
+
+class FakeClient(FakeTable):
+    """Low-level client over the same store: wire-format values, items and cursors."""
+
+    def __init__(self, items=(), page_size=None):
+        super().__init__(items, page_size)
+        self.batch_sizes = []
+
+    def _start(self, kwargs):
+        return int(kwargs['ExclusiveStartKey']['pos']['N']) if 'ExclusiveStartKey' in kwargs else 0
+
+    def _next_key(self, position):
+        return {'pos': {'N': str(position)}}
+
+    def _out(self, item):
+        return wire(item)
+
+    def _values(self, kwargs):
+        return {k: unwire({'v': v})['v'] for k, v in kwargs.get('ExpressionAttributeValues', {}).items()}
+
+    def get_item(self, TableName, Key, **kwargs):
+        return super().get_item(unwire(Key), **kwargs)
+
+    def put_item(self, TableName, Item, **kwargs):
+        return super().put_item(unwire(Item), **kwargs)
+
+    def delete_item(self, TableName, Key, **kwargs):
+        return super().delete_item(unwire(Key), **kwargs)
+
+    def batch_write_item(self, RequestItems):
+        (table_name, requests), = RequestItems.items()
+        assert len(requests) <= 25
+        with self.lock:
+            self.batch_sizes.append(len(requests))
+            for request in requests:
+                if 'PutRequest' in request:
+                    self.put(unwire(request['PutRequest']['Item']))
+                else:
+                    self.items.pop(_key(unwire(request['DeleteRequest']['Key'])), None)
+        return {'UnprocessedItems': {}}
+
+
+class FakeResource:
+    """
+    Table resource factory over one FakeTable, with batch reads and writes.
+
+    per_call: keys served per BatchGetItem (the rest come back unprocessed)
+    unprocessed_rounds: BatchWriteItem calls that return their first two
+                        requests as unprocessed
+    """
+
+    def __init__(self, items=(), per_call=100, unprocessed_rounds=0):
+        self.table = FakeTable(items)
+        self.per_call = per_call
+        self.unprocessed_rounds = unprocessed_rounds
+        self.batch_gets = []
+        self.batch_writes = []
+
+    def Table(self, name):
+        return self.table
+
+    def batch_get_item(self, RequestItems):
+        (table_name, request), = RequestItems.items()
+        keys = request['Keys']
+        assert len(keys) <= 100
+        assert len({_key(k) for k in keys}) == len(keys)
+        with self.table.lock:
+            self.batch_gets.append(len(keys))
+        served, rest = keys[:self.per_call], keys[self.per_call:]
+        found = [dict(self.table.items[_key(k)]) for k in served if _key(k) in self.table.items]
+        response = {'Responses': {table_name: found}}
+        if rest:
+            response['UnprocessedKeys'] = {table_name: {'Keys': rest}}
+        return response
+
+    def batch_write_item(self, RequestItems):
+        (table_name, requests), = RequestItems.items()
+        requests = list(requests)
+        assert len(requests) <= 25
+        self.batch_writes.append(requests)
+        unprocessed = []
+        if self.unprocessed_rounds > 0:
+            self.unprocessed_rounds -= 1
+            unprocessed, requests = requests[:2], requests[2:]
+        with self.table.lock:
+            for request in requests:
+                if 'PutRequest' in request:
+                    self.table.put(request['PutRequest']['Item'])
+                else:
+                    self.table.items.pop(_key(request['DeleteRequest']['Key']), None)
+        return {'UnprocessedItems': {table_name: unprocessed} if unprocessed else {}}
+
+
+class FakeS3:
+    """
+    S3 client over a dict of objects (key -> bytes, metadata kept aside).
+
+    Listings return page_size keys per call; uploads, deleted and
+    list_calls record what was sent, listings counts paginator runs.
+    """
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    chunk_size = 4
+
+    def __init__(self, objects=None, page_size=1000):
+        self.objects = dict(objects or {})
+        self.metadata = {}
+        self.page_size = page_size
+        self.uploads = []
+        self.deleted = []
+        self.list_calls = []
+        self.listings = 0
+        self.lock = threading.Lock()
+
+    def _store(self, key, body, metadata=None):
+        with self.lock:
+            self.objects[key] = body
+            self.metadata[key] = dict(metadata or {})
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+        return {'Metadata': self.metadata.get(Key, {}),
+                'ETag': f'"{hashlib.md5(self.objects[Key]).hexdigest()}"'}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, Metadata=None):
+        self._store(Key, Body, Metadata)
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, 'rb') as f:
+            self._store(Key, f.read(), (ExtraArgs or {}).get('Metadata'))
+        with self.lock:
+            self.uploads.append(Key)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None, Callback=None):
+        chunks = []
+        while True:
+            chunk = Fileobj.read(self.chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if Callback:
+                Callback(len(chunk))
+        self._store(Key, b''.join(chunks), (ExtraArgs or {}).get('Metadata'))
+        with self.lock:
+            self.uploads.append(Key)
+
+    def list_objects_v2(self, Bucket, Prefix='', StartAfter='', ContinuationToken=None, MaxKeys=1000):
+        self.list_calls.append({'Prefix': Prefix, 'StartAfter': StartAfter, 'ContinuationToken': ContinuationToken})
+        after = ContinuationToken or StartAfter
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > after)
+        limit = min(MaxKeys, self.page_size)
+        page = keys[:limit]
+        response = {'KeyCount': len(page), 'IsTruncated': len(keys) > limit}
+        if page:
+            response['Contents'] = [{'Key': k, 'Size': len(self.objects[k])} for k in page]
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = page[-1]
+        return response
+
+    def get_paginator(self, name):
+        assert name == 'list_objects_v2'
+        s3 = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                s3.listings += 1
+                while True:
+                    response = s3.list_objects_v2(**kwargs)
+                    yield response
+                    if not response['IsTruncated']:
+                        break
+                    kwargs['ContinuationToken'] = response['NextContinuationToken']
+        return Paginator()
+
+    def delete_objects(self, Bucket, Delete):
+        with self.lock:
+            for obj in Delete['Objects']:
+                self.objects.pop(obj['Key'], None)
+                self.metadata.pop(obj['Key'], None)
+                self.deleted.append(obj['Key'])
+        return {'Deleted': [{'Key': obj['Key']} for obj in Delete['Objects']]}
@@ -0,0 +1,125 @@
+"""
+Unit tests for approval_queue module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import time
+from approval_queue import ApprovalQueue
+from tests.fakes import FakeS3
+
+
+class FakeProcessedTable:
+    def __init__(self, keys):
+        self.keys = list(keys)
+
+    def scan(self, **kwargs):
+        return {'Items': [{'ImageKey': k} for k in self.keys]}
+
+
+def _s3(keys):
+    return FakeS3({k: b'' for k in keys}, page_size=2)
+
+
+def _queue(s3, processed=(), **kwargs):
+    return ApprovalQueue('bucket', s3, processed_table=FakeProcessedTable(processed),
+                         db_path=':memory:', log_func=lambda msg: None, **kwargs)
+
+
+class TestSync:
+    def test_full_sync_pages_past_first_listing_and_imports_processed(self):
+        s3 = _s3(['a.png', 'b.png', 'c.jpg', 'd.png', 'e.png', 'notes.txt'])
+        queue = _queue(s3, processed=['b.png'])
+
+        result = queue.sync()
+        assert result['mode'] == 'full'
+        assert result['listed'] == 5
+        assert result['processed'] == 1
+        assert len(s3.list_calls) == 3
+        assert queue.open_keys() == ['a.png', 'c.jpg', 'd.png', 'e.png']
+
+    def test_incremental_sync_lists_only_new_keys(self):
+        s3 = _s3(['a.png', 'b.png'])
+        queue = _queue(s3)
+        queue.sync()
+
+        s3.objects['c.png'] = b''
+        s3.list_calls.clear()
+        result = queue.sync()
+        assert result['mode'] == 'incremental'
+        assert result['added'] == 1
+        assert s3.list_calls[0]['StartAfter'] == 'b.png'
+
+    def test_full_sync_drops_deleted_objects(self):
+        s3 = _s3(['a.png', 'b.png'])
+        queue = _queue(s3)
+        queue.sync()
+
+        del s3.objects['a.png']
+        assert queue.sync(full=True)['removed'] == 1
+        assert queue.open_keys() == ['b.png']
+
+    def test_persisted_across_instances(self, tmp_path):
+        db_path = str(tmp_path / 'queue.db')
+        s3 = _s3(['a.png', 'b.png'])
+        first = ApprovalQueue('bucket', s3, db_path=db_path, log_func=lambda msg: None)
+        first.sync()
+        first.complete('a.png', 'approved')
+
+        second = ApprovalQueue('bucket', s3, db_path=db_path, log_func=lambda msg: None)
+        assert not second.needs_full_sync()
+        assert second.open_keys() == ['b.png']
+
+
+class TestReview:
+    def test_leases_split_work_between_reviewers(self):
+        queue = _queue(_s3(['a.png', 'b.png', 'c.png']))
+        queue.sync()
+
+        assert queue.claim_next('alice') == 'a.png'
+        assert queue.claim_next('alice') == 'a.png'      # refresh keeps the same image
+        assert queue.claim_next('bob') == 'b.png'
+        assert queue.peek('a.png', 5) == ['c.png']       # claimed images are not prefetched
+
+        queue.complete('a.png', 'approved')
+        assert queue.claim_next('alice') == 'c.png'
+        assert queue.claim_next('carol') is None
+
+    def test_claim_specific_image(self):
+        queue = _queue(_s3(['a.png', 'b.png']))
+        queue.sync()
+        assert queue.claim_next('bob') == 'a.png'
+
+        assert not queue.claim('a.png', 'alice')         # leased to bob
+        assert queue.claim('b.png', 'alice')
+        assert queue.claim('b.png', 'alice')             # renewing own lease
+        queue.complete('b.png', 'approved')
+        assert not queue.claim('b.png', 'alice')
+
+    def test_expired_lease_is_reclaimed(self):
+        queue = _queue(_s3(['a.png']), lease_seconds=0.01)
+        queue.sync()
+        assert queue.claim_next('alice') == 'a.png'
+        time.sleep(0.02)
+        assert queue.claim_next('bob') == 'a.png'
+
+    def test_reload_returns_skipped_images_and_counts_pass(self):
+        queue = _queue(_s3(['a.png', 'b.png', 'c.png']))
+        queue.sync()
+        queue.complete(queue.claim_next('alice'), 'approved')
+        queue.complete(queue.claim_next('alice'), 'rejected')
+
+        counts = queue.counts()
+        assert (counts['approved'], counts['rejected'], counts['open']) == (1, 1, 1)
+
+        result = queue.reload(full=False)
+        assert (result['old_count'], result['new_count']) == (1, 2)
+        assert queue.counts()['reviewed'] == 0
+
+    def test_add_and_remove(self):
+        queue = _queue(_s3([]))
+        assert queue.add(['new.png', 'readme.md']) == 1
+        assert queue.open_keys() == ['new.png']
+        queue.remove('new.png')
+        assert queue.open_keys() == []
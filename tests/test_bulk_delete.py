@@ -0,0 +1,132 @@
+"""
+Unit tests for bulk_delete module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import threading
+from botocore.exceptions import ClientError
+import bulk_delete
+from bulk_delete import BulkDeleter, query_partition, segmented_scan
+from change_journal import JOURNAL_PARTITION
+from tests.fakes import FakeClient, timesheet_row, wire
+
+
+class DeleteClient(FakeClient):
+    """Pages of 3; optionally returns some deletes unprocessed or throttles the first batches."""
+
+    def __init__(self, items, unprocessed_first=0, throttle_first=0):
+        super().__init__(items, page_size=3)
+        self.unprocessed_first = unprocessed_first
+        self.throttle_first = throttle_first
+
+    def batch_write_item(self, RequestItems):
+        (table, requests), = RequestItems.items()
+        with self.lock:
+            if self.throttle_first:
+                self.throttle_first -= 1
+                self.batch_sizes.append(len(requests))
+                raise ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'BatchWriteItem')
+            unprocessed = []
+            if self.unprocessed_first:
+                unprocessed, requests = requests[:self.unprocessed_first], requests[self.unprocessed_first:]
+                self.unprocessed_first = 0
+        super().batch_write_item({table: requests})
+        return {'UnprocessedItems': {table: unprocessed} if unprocessed else {}}
+
+    @property
+    def journal(self):
+        return self.partition(JOURNAL_PARTITION)
+
+
+def _items(count, resource='Amy'):
+    return [timesheet_row(resource, f"2025-10-{n:03d}") for n in range(count)]
+
+
+def _deleter(client, **kwargs):
+    return BulkDeleter('T', client=client, writers=3, log_func=lambda msg: None, sleep=lambda s: None, **kwargs)
+
+
+class TestKeySources:
+    def test_segmented_scan_reads_every_segment_keys_only(self):
+        client = DeleteClient(_items(20))
+        keys = list(segmented_scan('T', client=client, segments=4))
+        assert sorted(k['DateProjectCode'] for k in keys) == sorted(i['DateProjectCode'] for i in _items(20))
+        assert {kwargs['Segment'] for _, kwargs in client.requests} == {0, 1, 2, 3}
+        assert all(kwargs['ProjectionExpression'] == 'ResourceName, DateProjectCode' for _, kwargs in client.requests)
+
+    def test_closing_early_stops_segment_threads(self, monkeypatch):
+        monkeypatch.setattr(bulk_delete, 'SCAN_QUEUE_SIZE', 2)
+        client = DeleteClient(_items(60))
+        before = threading.active_count()
+
+        keys = segmented_scan('T', client=client, segments=3)
+        next(keys)
+        keys.close()
+
+        # Threads blocked on the full queue notice the stop event and exit
+        for _ in range(50):
+            if threading.active_count() <= before:
+                break
+            threading.Event().wait(0.05)
+        assert threading.active_count() <= before
+
+    def test_query_partition_pages_and_filters(self):
+        client = DeleteClient(_items(7) + _items(2, resource='Bob') +
+                            [{'ResourceName': 'Amy', 'DateProjectCode': 'x#P2', 'ProjectCode': 'P2'}])
+        items = list(query_partition('T', 'Amy', client=client, FilterExpression='ProjectCode = :code',
+                                     ExpressionAttributeValues={':code': {'S': 'P1'}}))
+        assert len(items) == 7
+
+
+class TestBulkDeleter:
+    def test_deletes_stream_in_batches_of_25(self):
+        client = DeleteClient(_items(60))
+        report = _deleter(client).delete(segmented_scan('T', client=client, segments=2))
+        assert report['deleted'] == 60 and report['failed'] == 0
+        assert sorted(client.batch_sizes) == [10, 25, 25]
+        assert client.partition('Amy') == []
+        assert report['deletes_per_second'] > 0
+
+    def test_dry_run_and_duplicates(self):
+        client = DeleteClient(_items(30))
+        items = _items(30) + _items(5)
+        report = _deleter(client).delete(items, dry_run=True)
+        assert report['requested'] == 30 and report['deleted'] == 0
+        assert client.batch_sizes == [] and len(client.partition('Amy')) == 30
+
+    def test_without_dedupe_keys_are_not_remembered(self):
+        client = DeleteClient(_items(30))
+        report = _deleter(client).delete(segmented_scan('T', client=client), dedupe=False)
+        assert report['deleted'] == 30
+        assert client.journal[0]['DeletedCount'] == 30
+
+    def test_unprocessed_and_throttled_batches_are_retried(self):
+        client = DeleteClient(_items(10), unprocessed_first=4, throttle_first=1)
+        report = _deleter(client).delete(_items(10))
+        assert report['deleted'] == 10
+        assert report['retries'] == 2
+        assert client.partition('Amy') == []
+
+    def test_maintains_rollups_for_deleted_rows(self, monkeypatch):
+        calls = []
+        registry = []
+        monkeypatch.setattr(bulk_delete, 'update_rollups', lambda table, removed: calls.append(removed))
+        monkeypatch.setattr(bulk_delete, 'update_resources', lambda table, removed: registry.append(removed))
+        client = DeleteClient(_items(3))
+        _deleter(client).delete([wire(i) for i in _items(3)], maintain_rollups=True)
+        assert [r['Hours'] for r in calls[0]] == [7.5, 7.5, 7.5]
+        assert registry == calls
+
+    def test_deleted_months_are_journaled(self):
+        client = DeleteClient(_items(30) + _items(2, resource='ROLLUP#PERSON'))
+        _deleter(client).delete(segmented_scan('T', client=client))
+        # One tombstone per month per call; system partitions are not journaled
+        assert len(client.journal) == 1
+        assert client.journal[0]['DeletedYearMonth'] == '2025-10'
+        assert client.journal[0]['DeletedCount'] == 30
+
+        dry_client = DeleteClient(_items(3))
+        _deleter(dry_client).delete(_items(3), dry_run=True)
+        assert dry_client.journal == []
@@ -0,0 +1,129 @@
+"""
+Unit tests for bulk_jobs module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import threading
+import time
+from botocore.exceptions import ClientError
+from bulk_jobs import BulkJobManager, is_throttle_error
+
+
+def _throttle():
+    return ClientError({'Error': {'Code': 'TooManyRequestsException', 'Message': 'Rate exceeded'}}, 'Invoke')
+
+
+def _manager(**kwargs):
+    kwargs.setdefault('log_func', lambda msg: None)
+    return BulkJobManager(**kwargs)
+
+
+class TestIsThrottleError:
+    def test_detects_throttle_codes(self):
+        assert is_throttle_error(_throttle())
+        assert not is_throttle_error(ClientError({'Error': {'Code': 'AccessDenied'}}, 'Invoke'))
+        assert not is_throttle_error(ValueError('boom'))
+
+
+class TestBulkJobManager:
+    def test_runs_in_background_and_records_outcomes(self):
+        release = threading.Event()
+
+        def work(item):
+            release.wait(5)
+            if item == 'bad.png':
+                raise RuntimeError('OCR failed')
+            if item == 'taken.png':
+                return {'status': 'skipped'}
+            return {'entries_stored': 5}
+
+        jobs = _manager(concurrency=2)
+        job_id = jobs.start('auto-approve', ['a.png', 'bad.png', 'taken.png'], work)
+
+        # start() returns before any item has finished
+        status = jobs.get(job_id)
+        assert status['status'] == 'running'
+        assert status['done'] == 0
+        assert jobs.running('auto-approve') == job_id
+
+        release.set()
+        jobs.wait(job_id, 5)
+        status = jobs.get(job_id)
+        assert status['status'] == 'completed'
+        assert (status['succeeded'], status['failed'], status['skipped'], status['percent']) == (1, 1, 1, 100.0)
+        assert status['results']['a.png']['entries_stored'] == 5
+        assert status['results']['bad.png']['error'] == 'OCR failed'
+        assert jobs.running() is None
+
+    def test_concurrency_window_is_respected(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]   # current, peak
+
+        def work(item):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        jobs = _manager(concurrency=3)
+        job_id = jobs.start('bulk', [f"{i}.png" for i in range(12)], work)
+        jobs.wait(job_id, 5)
+        assert jobs.get(job_id)['succeeded'] == 12
+        assert in_flight[1] <= 3
+
+    def test_throttles_back_off_and_retry(self):
+        sleeps = []
+        attempts = {}
+
+        def work(item):
+            attempts[item] = attempts.get(item, 0) + 1
+            if item == 'a.png' and attempts[item] <= 2:
+                raise _throttle()
+            if item == 'b.png':
+                raise _throttle()
+
+        jobs = _manager(concurrency=1, max_retries=3, backoff_seconds=1, sleep=sleeps.append)
+        job_id = jobs.start('bulk', ['a.png', 'b.png'], work)
+        jobs.wait(job_id, 5)
+
+        status = jobs.get(job_id)
+        assert status['results']['a.png']['status'] == 'succeeded'
+        assert status['results']['a.png']['attempts'] == 3
+        assert status['results']['b.png']['status'] == 'failed'
+        assert status['results']['b.png']['attempts'] == 4
+        assert status['throttles'] == 5
+        assert sleeps and all(0 < s <= 60 for s in sleeps)
+
+    def test_cancel_stops_remaining_items(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(item):
+            started.set()
+            release.wait(5)
+
+        jobs = _manager(concurrency=1)
+        job_id = jobs.start('bulk', ['a.png', 'b.png', 'c.png'], work)
+        started.wait(5)
+        assert jobs.cancel(job_id)
+        release.set()
+        jobs.wait(job_id, 5)
+
+        status = jobs.get(job_id)
+        assert status['status'] == 'cancelled'
+        assert status['succeeded'] == 1
+        assert status['skipped'] == 2
+        assert not jobs.cancel(job_id)
+
+    def test_history_is_bounded(self):
+        jobs = _manager(history=2)
+        ids = [jobs.start('bulk', [], lambda item: None) for _ in range(3)]
+        for job_id in ids:
+            jobs.wait(job_id, 5)
+        jobs.start('bulk', [], lambda item: None)
+        assert jobs.get(ids[0]) is None
+        assert len(jobs.list_jobs()) == 2
@@ -0,0 +1,153 @@
+"""
+Unit tests for corrections_importer module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import csv
+import io
+from decimal import Decimal
+import corrections_importer
+from corrections_importer import CorrectionsImporter, compute_changes, failed_rows_csv
+from rollups import compute_rollup_deltas
+from week_document import build_week_document, expand_week_document
+from tests.fakes import FakeResource, timesheet_row
+
+
+def _item(n, hours='7.5'):
+    return timesheet_row('Amy', f"2025-10-{n:02d}", hours=Decimal(hours), IsZeroHourTimesheet=False)
+
+
+def _csv_row(n, hours='7.5', **extra):
+    return timesheet_row('Amy', f"2025-10-{n:02d}", hours=hours, **{'IsZeroHourTimesheet': 'False', **extra})
+
+
+def _importer(resource, **kwargs):
+    return CorrectionsImporter('T', resource=resource, workers=4, log_func=lambda msg: None,
+                               sleep=lambda s: None, **kwargs)
+
+
+class TestComputeChanges:
+    def test_typed_comparison(self):
+        current = _item(1)
+        assert compute_changes(current, _csv_row(1, hours='7.50')) == {}
+        assert compute_changes(current, _csv_row(1, hours='8')) == {'Hours': (Decimal('7.5'), Decimal('8'))}
+        assert compute_changes(current, _csv_row(1, IsZeroHourTimesheet='true'))['IsZeroHourTimesheet'] == (False, True)
+        # Empty cell for an attribute the item does not have is not a change
+        assert compute_changes(current, _csv_row(1, ZeroHourReason='')) == {}
+
+
+class TestCorrectionsImporter:
+    def setup_method(self, method):
+        self.applied_rollups = []
+        self.touched_rollups = []
+        self._original = corrections_importer.update_rollups
+        self._original_resources = corrections_importer.update_resources
+        corrections_importer.update_rollups = lambda table, added, removed, touched: (
+            self.applied_rollups.append((added, removed)), self.touched_rollups.append(touched))
+        corrections_importer.update_resources = lambda table, added, removed: None
+
+    def teardown_method(self, method):
+        corrections_importer.update_rollups = self._original
+        corrections_importer.update_resources = self._original_resources
+
+    def test_batches_fetches_and_applies_only_changes(self):
+        resource = FakeResource([_item(n) for n in range(1, 31)])
+        resource.table.items.update({('Amy', f"X{n}"): {**_item(1), 'DateProjectCode': f"X{n}"} for n in range(220)})
+        rows = [_csv_row(n, hours='8' if n <= 3 else '7.5') for n in range(1, 31)]
+        rows += [{**_csv_row(1), 'DateProjectCode': f"X{n}"} for n in range(220)]
+
+        progress = []
+        report = _importer(resource, progress_func=lambda phase, done, total: progress.append(phase)).run(rows)
+
+        assert sorted(resource.batch_gets) == [50, 100, 100]
+        assert report['updated'] == 3
+        assert report['unchanged'] == 247
+        assert sorted(resource.table.updates) == [('Amy', f"2025-10-{n:02d}#P1") for n in (1, 2, 3)]
+        assert resource.table.items[('Amy', '2025-10-01#P1')]['Hours'] == Decimal('8')
+        assert 'fetch' in progress and 'update' in progress
+
+        added, removed = self.applied_rollups[0]
+        assert [r['Hours'] for r in added] == [Decimal('8')] * 3
+        assert [r['Hours'] for r in removed] == [Decimal('7.5')] * 3
+
+    def test_non_hours_correction_touches_its_month(self):
+        # Incremental exports and labour partials find changes by rollup LastUpdated
+        resource = FakeResource([{**_item(1), 'ProjectName': 'Old name'}])
+        _importer(resource).run([_csv_row(1, ProjectName='New name')])
+
+        touched = compute_rollup_deltas(self.touched_rollups[0], 0)
+        assert ('ROLLUP#PERSON_MONTH_PROJECT', '2025-10#Amy#P1') in touched
+        assert ('ROLLUP#PERSON_WEEK', '2025-09-29#Amy') in touched
+
+    def test_dry_run_writes_nothing(self):
+        resource = FakeResource([_item(1), _item(2)])
+        report = _importer(resource).run([_csv_row(1, hours='4'), _csv_row(2)], dry_run=True)
+
+        assert report['dry_run'] and report['changed'] == 1
+        assert report['diffs'] == [{'row': 2, 'ResourceName': 'Amy', 'DateProjectCode': '2025-10-01#P1',
+                                    'changes': {'Hours': {'old': '7.5', 'new': '4'}}}]
+        assert resource.table.updates == [] and self.applied_rollups == []
+
+    def test_unprocessed_keys_are_retried(self):
+        resource = FakeResource([_item(n) for n in range(1, 6)], per_call=2)
+        plan = _importer(resource).plan([_csv_row(n) for n in range(1, 6)])
+        assert plan['unchanged'] == 5
+        assert resource.batch_gets == [5, 3, 1]
+
+    def test_failed_rows_can_be_reimported(self):
+        resource = FakeResource([_item(1), _item(2), _item(3)])
+        resource.table.fail_keys.add(('Amy', '2025-10-03#P1'))
+        rows = [
+            _csv_row(1, hours='abc'),
+            _csv_row(2, hours='4'),
+            _csv_row(2, hours='5'),
+            _csv_row(3, hours='6'),
+            _csv_row(9),
+            {**_csv_row(4), 'ResourceName': ''},
+        ]
+        report = _importer(resource).run(rows)
+        assert report['updated'] == 1
+        assert report['failed'] == 5
+
+        text = failed_rows_csv(report['failed_rows'])
+        failed = list(csv.DictReader(io.StringIO(text)))
+        assert [r['ImportError'].split(':')[0] for r in failed] == ['Row 7', 'Row 2', 'Row 4', 'Row 6', 'Row 5']
+        assert 'duplicate of row 3' in failed[2]['ImportError']
+
+        # The ImportError column is ignored on re-import
+        resource.table.fail_keys.clear()
+        report = _importer(resource).run([failed[4]])
+        assert report['updated'] == 1 and report['failed'] == 0
+
+    def test_week_document_export_round_trips(self):
+        metadata = {'ResourceName': 'Amy', 'DateProjectCode': 'WEEK#2025-09-29', 'WeekStartDate': '2025-09-29',
+                    'SourceImage': 'a.png', 'IsZeroHourTimesheet': False}
+        doc = build_week_document(metadata, [
+            {'Date': '2025-09-29', 'ProjectCode': 'P1', 'ProjectName': 'One', 'Hours': Decimal('7.5')},
+            {'Date': '2025-09-30', 'ProjectCode': 'P1', 'ProjectName': 'One', 'Hours': Decimal('7.5')},
+            {'Date': '2025-09-29', 'ProjectCode': 'P2', 'ProjectName': 'Two', 'Hours': Decimal('1')},
+        ])
+        resource = FakeResource([doc])
+
+        # Export the expanded rows to CSV and read them back as the importer would
+        exported = expand_week_document(doc)
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(exported[0]))
+        writer.writeheader()
+        writer.writerows(exported)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        rows[1]['Hours'] = '4'
+        rows[2]['SourceImage'] = 'b.png'
+
+        report = _importer(resource).run(rows)
+
+        assert resource.batch_gets == [1]
+        assert report['updated'] == 1 and report['unchanged'] == 1 and report['failed'] == 1
+        assert 'shared by the week document' in report['failed_rows'][0]['ImportError']
+        assert resource.table.updates == [('Amy', 'WEEK#2025-09-29')]
+        stored = resource.table.items[('Amy', 'WEEK#2025-09-29')]
+        assert stored['Projects']['P1']['Hours'] == {'2025-09-29': Decimal('7.5'), '2025-09-30': Decimal('4')}
+        assert ('Amy', '2025-09-30#P1') not in resource.table.items
+        assert report['updated_keys'] == [{'ResourceName': 'Amy', 'DateProjectCode': '2025-09-30#P1'}]
@@ -0,0 +1,69 @@
+"""
+Unit tests for csv_stream module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import gzip
+from csv_stream import (
+    DETAILED_FIELDS, FULL_EXPORT_FIELDS, accepts_gzip, csv_chunks, detailed_row, dict_csv_chunks,
+    gzip_chunks
+)
+
+
+class TestCsvChunks:
+    def test_header_is_first_chunk(self):
+        def rows():
+            raise AssertionError("rows read before header was sent")
+            yield
+
+        chunks = csv_chunks(['A', 'B'], rows())
+        assert next(chunks) == 'A,B\r\n'
+
+    def test_rows_are_chunked(self):
+        rows = ([str(i), 'x' * 10] for i in range(100))
+        chunks = list(csv_chunks(['n', 'pad'], rows, chunk_size=100))
+        assert len(chunks) > 5
+        assert all(len(c) < 200 for c in chunks)
+        text = ''.join(chunks)
+        assert text.count('\r\n') == 101
+        assert text.splitlines()[-1] == '99,xxxxxxxxxx'
+
+    def test_detailed_row_matches_fields(self):
+        row = detailed_row({'ResourceName': 'Amy', 'Date': '2025-10-01', 'Hours': 7.5, 'ZeroHourReason': None})
+        assert len(row) == len(DETAILED_FIELDS)
+        assert row[DETAILED_FIELDS.index('Hours')] == 7.5
+        assert row[DETAILED_FIELDS.index('ZeroHourReason')] == ''
+
+    def test_dict_rows_use_fixed_columns(self):
+        text = ''.join(dict_csv_chunks([{'a': 1, 'b': 2}, {'a': 3, 'c': 4}], ['a', 'c']))
+        assert text == 'a,c\r\n1,\r\n3,4\r\n'
+        assert ''.join(dict_csv_chunks([], ['a', 'c'])) == 'a,c\r\n'
+
+    def test_full_export_header_does_not_depend_on_first_row(self):
+        # A zero-hour marker first used to drop ProjectCode/Hours from every row
+        rows = [{'ResourceName': 'Amy', 'IsZeroHourTimesheet': True, 'Unknown': 'x'},
+                {'ResourceName': 'Bob', 'ProjectCode': 'P1', 'Hours': 7.5, 'ModelId': 'm'}]
+        lines = ''.join(dict_csv_chunks(rows)).splitlines()
+        assert lines[0].split(',') == FULL_EXPORT_FIELDS
+        bob = lines[2].split(',')
+        assert bob[FULL_EXPORT_FIELDS.index('Hours')] == '7.5'
+        assert bob[FULL_EXPORT_FIELDS.index('ModelId')] == 'm'
+
+
+class TestGzip:
+    def test_round_trip_and_early_header(self):
+        chunks = csv_chunks(['A'], ([str(i)] for i in range(1000)))
+        compressed = gzip_chunks(chunks)
+        first = next(compressed)
+        assert first            # header flushed, not held back in the compressor
+        data = first + b''.join(compressed)
+        assert gzip.decompress(data).decode().splitlines()[:2] == ['A', '0']
+
+    def test_accepts_gzip(self):
+        assert accepts_gzip('gzip, deflate, br')
+        assert accepts_gzip('br;q=1.0, gzip;q=0.8')
+        assert not accepts_gzip('gzip;q=0')
+        assert not accepts_gzip('identity')
+        assert not accepts_gzip('')
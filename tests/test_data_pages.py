@@ -0,0 +1,150 @@
+"""
+Unit tests for data_pages module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from data_pages import decode_cursor, encode_cursor, fetch_page, iter_rows, normalize_filters, plan_segments
+from tests.fakes import FakeClient, timesheet_row
+
+
+def _row(resource, date, project, hours=7.5, image='a.png'):
+    return timesheet_row(resource, date, project, hours, ProjectCodeGSI=project, YearMonth=date[:7],
+                         SourceImage=image)
+
+
+def _client(items):
+    return FakeClient(items, page_size=2)
+
+
+def _dates(page):
+    return [r['Date'] for r in page['data']]
+
+
+class TestFilters:
+    def test_normalize(self):
+        filters = normalize_filters({'resource': 'Nik Coultas', 'project': 'pj1', 'limit': '10'})
+        assert filters == {'resource': 'Nik_Coultas', 'project': 'PJ1', 'order': 'asc'}
+
+    def test_rejects_bad_input(self):
+        with pytest.raises(ValueError):
+            normalize_filters({'start': '01/10/2025'})
+        with pytest.raises(ValueError):
+            normalize_filters({'start': '2025-10-02', 'end': '2025-10-01'})
+        with pytest.raises(ValueError):
+            normalize_filters({'order': 'sideways'})
+
+    def test_access_path_choice(self):
+        assert plan_segments(normalize_filters({'resource': 'A', 'project': 'P'}))[0] == 'resource'
+        assert plan_segments(normalize_filters({'project': 'P'}))[0] == 'project'
+        path, segments = plan_segments(normalize_filters({'start': '2025-10-01', 'end': '2025-11-30'}))
+        assert path == 'month'
+        # September included: a week starting 2025-09-29 is stored under that month
+        assert [s['ExpressionAttributeValues'][':pk']['S'] for s in segments] == ['2025-09', '2025-10', '2025-11']
+        assert plan_segments(normalize_filters({'source_image': 'x.png'}))[0] == 'scan'
+
+    def test_cursor_round_trip_and_filter_binding(self):
+        filters = normalize_filters({'resource': 'A'})
+        cursor = encode_cursor(1, {'pos': {'N': '5'}}, filters)
+        assert decode_cursor(cursor, filters) == (1, {'pos': {'N': '5'}})
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, normalize_filters({'resource': 'B'}))
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor', filters)
+
+
+class TestFetchPage:
+    def setup_method(self):
+        self.items = [_row('Amy', f"2025-10-{d:02d}", 'P1') for d in range(1, 8)]
+        self.items += [_row('Bob', '2025-10-03', 'P2', image='b.png')]
+        self.items += [{'ResourceName': 'ROLLUP#PERSON_WEEK', 'DateProjectCode': 'Amy#2025-09-29',
+                        'RecordType': 'ROLLUP', 'YearMonth': '2025-09'}]
+
+    def test_resource_pages_follow_cursor(self):
+        client = _client(self.items)
+        first = fetch_page('T', {'resource': 'Amy', 'limit': '3'}, client=client)
+        assert first['access_path'] == 'resource'
+        assert _dates(first) == ['2025-10-01', '2025-10-02', '2025-10-03']
+        assert first['next_cursor']
+
+        seen = _dates(first)
+        cursor = first['next_cursor']
+        while cursor:
+            page = fetch_page('T', {'resource': 'Amy', 'limit': '3', 'cursor': cursor}, client=client)
+            seen += _dates(page)
+            cursor = page['next_cursor']
+        assert seen == [f"2025-10-{d:02d}" for d in range(1, 8)]
+
+    def test_descending_with_date_range(self):
+        page = fetch_page('T', {'resource': 'Amy', 'start': '2025-10-03', 'end': '2025-10-05', 'order': 'desc'},
+                          client=_client(self.items))
+        assert _dates(page) == ['2025-10-05', '2025-10-04', '2025-10-03']
+        assert page['next_cursor'] is None
+
+    def test_project_index_and_residual_filters(self):
+        client = _client(self.items)
+        page = fetch_page('T', {'project': 'P1', 'source_image': 'a.png', 'end': '2025-10-02'}, client=client)
+        assert page['access_path'] == 'project'
+        assert client.requests[0][1]['IndexName'] == 'ProjectCodeIndex'
+        assert _dates(page) == ['2025-10-01', '2025-10-02']
+
+    def test_scan_skips_system_rows_and_caps_reads(self):
+        client = _client(self.items)
+        page = fetch_page('T', {'source_image': 'b.png', 'limit': '500'}, client=client, max_items_read=4)
+        assert page['access_path'] == 'scan'
+        assert page['sorted_by'] is None
+        assert page['items_read'] == 4
+        assert page['data'] == [] and page['next_cursor']
+
+        rest = fetch_page('T', {'source_image': 'b.png', 'cursor': page['next_cursor']}, client=client)
+        assert [r['ResourceName'] for r in rest['data']] == ['Bob']
+        assert all(r['ResourceName'] != 'ROLLUP#PERSON_WEEK' for r in rest['data'])
+
+    def test_limit_is_capped(self):
+        page = fetch_page('T', {'limit': '100000'}, client=_client(self.items))
+        assert page['limit'] == 500
+
+    def test_week_document_rows_are_expanded(self):
+        week_doc = {
+            'ResourceName': 'Amy', 'DateProjectCode': 'WEEK#2025-10-13', 'RecordType': 'WEEK_DOCUMENT',
+            'WeekStartDate': '2025-10-13', 'YearMonth': '2025-10', 'SourceImage': 'w.png',
+        }
+        client = _client(self.items + [week_doc])
+
+        # wire() only handles flat items, so add the nested Projects map to the response
+        original_query = client.query
+
+        def query(**kwargs):
+            response = original_query(**kwargs)
+            for item in response['Items']:
+                if item['DateProjectCode']['S'].startswith('WEEK#'):
+                    item['Projects'] = {'M': {'P9': {'M': {
+                        'ProjectName': {'S': 'Nine'},
+                        'Hours': {'M': {'2025-10-13': {'N': '8'}, '2025-10-14': {'N': '4'}}}
+                    }}}}
+            return response
+        client.query = query
+
+        page = fetch_page('T', {'resource': 'Amy', 'start': '2025-10-14'}, client=client)
+        assert [(r['Date'], r['ProjectCode'], r['Hours']) for r in page['data']] == [('2025-10-14', 'P9', 4)]
+
+
+class TestIterRows:
+    def test_streams_every_matching_row_across_pages(self):
+        items = [_row('Amy', f"2025-10-{d:02d}", 'P1') for d in range(1, 8)]
+        items += [_row('Bob', '2025-09-30', 'P1')]
+        client = _client(items)
+
+        rows = iter_rows('T', {'start': '2025-10-02', 'end': '2025-10-06'}, client=client)
+        assert [r['Date'] for r in rows] == [f"2025-10-{d:02d}" for d in range(2, 7)]
+        # September partition read too (week documents), Amy's October rows paged 2 at a time
+        assert [c[1]['ExpressionAttributeValues'][':pk']['S'] for c in client.requests] == \
+            ['2025-09'] + ['2025-10'] * 4
+
+    def test_invalid_filters_fail_before_reading(self):
+        client = _client([])
+        with pytest.raises(ValueError):
+            iter_rows('T', {'start': 'yesterday'}, client=client)
+        assert client.requests == []
@@ -0,0 +1,157 @@
+"""
+Unit tests for dataset_cache module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dataset_cache import DatasetCache
+from tests.fakes import FakeClient, timesheet_row
+
+
+def _row(resource, date, project, hours, ts):
+    return timesheet_row(resource, date, project, hours, ProcessingTimestamp=ts)
+
+
+def _person_week(resource, week_start, ts):
+    return {
+        'ResourceName': 'ROLLUP#PERSON_WEEK',
+        'DateProjectCode': f"{week_start}#{resource}",
+        'RecordType': 'ROLLUP',
+        'Resource': resource,
+        'WeekStart': week_start,
+        'LastUpdated': ts,
+    }
+
+
+def _scans(client):
+    return [kwargs for op, kwargs in client.requests if op == 'scan']
+
+
+def _cache(client, **kwargs):
+    kwargs.setdefault('refresh_seconds', 0)
+    return DatasetCache('T', client=client, log_func=lambda msg: None, **kwargs)
+
+
+class TestDatasetCache:
+    def test_full_load_sorted_and_served_from_cache(self):
+        client = FakeClient([
+            _row('Zoe', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _row('Amy', '2025-09-30', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _row('Amy', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+        ])
+        cache = _cache(client, refresh_seconds=3600)
+
+        rows = cache.get_rows()
+        assert [(r['Date'], r['ResourceName']) for r in rows] == [
+            ('2025-09-29', 'Amy'), ('2025-09-29', 'Zoe'), ('2025-09-30', 'Amy')
+        ]
+        assert rows[0]['Hours'] == 7.5
+
+        assert cache.get_rows() is rows
+        assert len(_scans(client)) == 1
+        assert cache.get_status()['served_from_cache'] == 1
+
+    def test_delta_adds_new_rows_and_drops_replaced_week_rows(self):
+        client = FakeClient([
+            _row('Amy', '2025-09-29', 'OLD', 7.5, '2025-10-01T10:00:00'),
+            _row('Bob', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+        ])
+        cache = _cache(client)
+        cache.get_rows()
+
+        # Lambda replaces Amy's week: old project row deleted, new one written
+        client.delete('Amy', '2025-09-29#OLD')
+        client.put(_row('Amy', '2025-09-30', 'NEW', 8, '2025-10-02T09:00:00'))
+
+        rows = cache.get_rows()
+        assert sorted(r['DateProjectCode'] for r in rows if r['ResourceName'] == 'Amy') == ['2025-09-30#NEW']
+        assert any(r['ResourceName'] == 'Bob' for r in rows)
+
+        delta = _scans(client)[-1]
+        assert delta['ExpressionAttributeValues'][':wm']['S'] == '2025-10-01T09:58:00'
+        status = cache.get_status()
+        assert status['delta_refreshes'] == 1
+        # Bob's row falls inside the overlap window, so his week is re-read too
+        assert status['weeks_requeried'] == 2
+        assert status['watermark'] == '2025-10-02T09:00:00'
+
+    def test_external_delete_picked_up_by_full_refresh(self):
+        client = FakeClient([_row('Amy', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00')])
+        cache = _cache(client)
+        cache.get_rows()
+
+        client.delete('Amy', '2025-09-29#P1')
+        assert len(cache.get_rows()) == 1       # delta cannot see deletes
+
+        assert cache.get_rows(force='full') == []
+
+    def test_local_discard_invalidate_and_clear(self):
+        client = FakeClient([
+            _row('Amy', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _row('Amy', '2025-09-30', 'P1', 7.5, '2025-10-01T10:00:00'),
+        ])
+        cache = _cache(client, refresh_seconds=3600)
+        cache.get_rows()
+
+        cache.discard([{'ResourceName': 'Amy', 'DateProjectCode': '2025-09-29#P1'}])
+        assert [r['Date'] for r in cache.get_rows()] == ['2025-09-30']
+
+        cache.invalidate()
+        assert len(cache.get_rows()) == 2
+        assert cache.get_status()['full_refreshes'] == 2
+
+        cache.clear()
+        assert cache.get_rows() == []
+        assert cache.get_status()['full_refreshes'] == 2
+
+
+class TestRollupDelta:
+    def test_changed_weeks_come_from_person_week_rollups(self):
+        client = FakeClient([
+            _row('Amy', '2025-09-29', 'OLD', 7.5, '2025-10-01T10:00:00'),
+            _row('Bob', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _person_week('Amy', '2025-09-29', '2025-10-01T10:00:00'),
+            _person_week('Bob', '2025-09-29', '2025-09-01T10:00:00'),
+        ])
+        cache = _cache(client)
+        cache.get_rows()
+
+        client.delete('Amy', '2025-09-29#OLD')
+        client.put(_row('Amy', '2025-09-30', 'NEW', 8, '2025-10-02T09:00:00'))
+        client.put(_person_week('Amy', '2025-09-29', '2025-10-02T09:00:01'))
+
+        rows = cache.get_rows()
+        assert sorted(r['DateProjectCode'] for r in rows if r['ResourceName'] == 'Amy') == ['2025-09-30#NEW']
+
+        # No scan after the initial load; Bob's week was not re-read
+        assert len(_scans(client)) == 1
+        status = cache.get_status()
+        assert status['delta_scans'] == 0
+        assert status['weeks_requeried'] == 1
+        assert status['watermark'] == '2025-10-02T09:00:01'
+
+    def test_tombstoned_month_rereads_cached_weeks(self):
+        client = FakeClient([
+            _row('Amy', '2025-09-29', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _row('Bob', '2025-08-04', 'P1', 7.5, '2025-10-01T10:00:00'),
+            _person_week('Amy', '2025-09-29', '2025-10-01T10:00:00'),
+        ])
+        cache = _cache(client)
+        cache.get_rows()
+
+        # A delete path that did not maintain the rollups, only the journal
+        client.delete('Amy', '2025-09-29#P1')
+        client.put({
+            'ResourceName': 'JOURNAL#DELETES',
+            'DateProjectCode': '2025-10-02T09:00:00#2025-09#abcd1234',
+            'RecordType': 'TOMBSTONE',
+            'DeletedYearMonth': '2025-09',
+            'DeletedAt': '2025-10-02T09:00:00',
+        })
+
+        rows = cache.get_rows()
+        assert not any(r['ResourceName'] == 'Amy' and r.get('Date') == '2025-09-29' for r in rows)
+        assert any(r['ResourceName'] == 'Bob' for r in rows)
+        assert len(_scans(client)) == 1
+        assert cache.get_status()['weeks_requeried'] == 1
@@ -0,0 +1,76 @@
+"""
+Unit tests for dynamo_codec module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from decimal import Decimal
+from dynamo_codec import decode_item, decode_number, scan_items
+
+
+class TestDecodeNumber:
+    def test_integers_and_floats(self):
+        assert decode_number('40') == 40
+        assert isinstance(decode_number('40'), int)
+        assert decode_number('7.5') == 7.5
+        assert decode_number('1E+2') == 100.0
+
+    def test_high_precision_keeps_decimal(self):
+        value = decode_number('0.12345678901234567890')
+        assert isinstance(value, Decimal)
+        assert value == Decimal('0.12345678901234567890')
+
+
+class TestDecodeItem:
+    def test_timesheet_row(self):
+        item = decode_item({
+            'ResourceName': {'S': 'Nik_Coultas'},
+            'Hours': {'N': '7.5'},
+            'InputTokens': {'N': '3120'},
+            'IsZeroHourTimesheet': {'BOOL': False},
+            'ZeroHourReason': {'NULL': True},
+        })
+        assert item == {
+            'ResourceName': 'Nik_Coultas',
+            'Hours': 7.5,
+            'InputTokens': 3120,
+            'IsZeroHourTimesheet': False,
+            'ZeroHourReason': None,
+        }
+
+    def test_nested_week_document_and_sets(self):
+        item = decode_item({
+            'Projects': {'M': {'PJ021931': {'M': {
+                'ProjectName': {'S': 'Core'},
+                'Hours': {'M': {'2025-09-29': {'N': '7.5'}}},
+            }}}},
+            'WeeksSubmitted': {'SS': ['2025-09-29', '2025-10-06']},
+            'Tags': {'L': [{'S': 'a'}, {'N': '2'}]},
+        })
+        assert item['Projects']['PJ021931']['Hours'] == {'2025-09-29': 7.5}
+        assert item['WeeksSubmitted'] == ['2025-09-29', '2025-10-06']
+        assert item['Tags'] == ['a', 2]
+
+
+class FakeClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def scan(self, **kwargs):
+        self.calls.append(dict(kwargs))
+        return self.pages[len(self.calls) - 1]
+
+
+class TestScanItems:
+    def test_follows_pagination(self):
+        client = FakeClient([
+            {'Items': [{'Hours': {'N': '1'}}], 'LastEvaluatedKey': {'k': {'S': '1'}}},
+            {'Items': [{'Hours': {'N': '2.5'}}]},
+        ])
+        items = list(scan_items('TimesheetOCR-test', client=client))
+
+        assert items == [{'Hours': 1}, {'Hours': 2.5}]
+        assert client.calls[1]['ExclusiveStartKey'] == {'k': {'S': '1'}}
+        assert client.calls[0]['TableName'] == 'TimesheetOCR-test'
@@ -0,0 +1,121 @@
+"""
+Unit tests for incremental_export and change_journal modules.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+from datetime import datetime
+import incremental_export
+from change_journal import JOURNAL_PARTITION, deleted_months_since, months_of_key, record_deletions
+from incremental_export import export_changes
+from rollups import PERSON_MONTH_PROJECT, rollup_partition
+from tests.fakes import FakeClient, FakeS3, timesheet_row
+
+
+def _dynamo(rollups=(), journal=()):
+    return FakeClient([dict(i, ResourceName=rollup_partition(PERSON_MONTH_PROJECT)) for i in rollups] +
+                      [dict(i, ResourceName=JOURNAL_PARTITION) for i in journal])
+
+
+class FakeWriter:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+
+    def write_columns(self, columns):
+        pass
+
+    def close(self):
+        pass
+
+
+def _row(day, stamp='2025-10-01T08:00:00Z'):
+    return timesheet_row('Amy', day, YearMonth=day[:7], ProcessingTimestamp=stamp)
+
+
+STATE_KEY = 'state.json'
+NOW = datetime(2025, 10, 20, 2, 0)
+
+
+def _state(watermark):
+    return {STATE_KEY: json.dumps({'watermark': watermark}).encode('utf-8')}
+
+
+def _export(tmp_path, dynamo, s3, **kwargs):
+    return export_changes('T', 'bucket', 'tp/', str(tmp_path), s3, client=dynamo, state_key=STATE_KEY,
+                          writer_factory=FakeWriter, log_func=lambda m: None, now=NOW, **kwargs)
+
+
+class TestChangeJournal:
+    """Tests for tombstones."""
+
+    def test_months_of_key(self):
+        assert months_of_key('Amy', '2025-10-03#P1') == {'2025-10'}
+        assert months_of_key('Amy', 'WEEK#2025-09-29') == {'2025-09', '2025-10'}
+        assert months_of_key('ROLLUP#PERSON', 'Amy') == set()
+
+    def test_one_tombstone_per_month(self):
+        dynamo = _dynamo()
+        written = record_deletions('T', [('Amy', '2025-10-03#P1'), ('Amy', '2025-10-04#P1'),
+                                         {'ResourceName': 'Bob', 'DateProjectCode': '2025-11-03#P1'}],
+                                   client=dynamo)
+        assert written == 2
+        assert deleted_months_since('T', '2000-01-01', client=dynamo) == {'2025-10', '2025-11'}
+        assert deleted_months_since('T', '2999-01-01', client=dynamo) == set()
+
+
+class TestExportChanges:
+    """Tests for the watermark-driven export."""
+
+    def test_first_run_is_full_and_saves_watermark(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(incremental_export, 'segmented_scan',
+                            lambda *a, **k: iter([_row('2025-09-30'), _row('2025-10-01')]))
+        s3 = FakeS3()
+        result = _export(tmp_path, _dynamo(), s3)
+
+        assert result['mode'] == 'full'
+        assert result['months'] == ['2025-09', '2025-10']
+        assert json.loads(s3.objects[STATE_KEY])['watermark'] == NOW.isoformat()
+
+    def test_only_changed_months_are_read_and_rewritten(self, tmp_path, monkeypatch):
+        reads = []
+
+        def fake_iter_rows(table, period, client):
+            reads.append(period)
+            return iter([_row('2025-09-30'), _row('2025-10-01', '2025-10-19T10:00:00Z'), _row('2025-10-02')])
+        monkeypatch.setattr(incremental_export, 'iter_rows', fake_iter_rows)
+
+        dynamo = _dynamo(
+            rollups=[{'DateProjectCode': '2025-10#Amy#P1', 'YearMonth': '2025-10', 'LastUpdated': '2025-10-19T10:00:00'},
+                     {'DateProjectCode': '2025-08#Amy#P1', 'YearMonth': '2025-08', 'LastUpdated': '2025-08-31T10:00:00'}],
+            journal=[{'DateProjectCode': '2025-10-19T11:00:00#2025-06#ab', 'DeletedYearMonth': '2025-06'}]
+        )
+        s3 = FakeS3(dict(_state('2025-10-19T02:00:00'), **{
+            'tp/YearMonth=2025-06/timesheet.parquet': b'old',
+            'tp/YearMonth=2025-08/timesheet.parquet': b'old',
+        }))
+        result = _export(tmp_path, dynamo, s3)
+
+        assert result['mode'] == 'incremental'
+        assert result['months'] == ['2025-06', '2025-10']
+        assert reads == [{'start': '2025-06-01', 'end': '2025-06-30'}, {'start': '2025-10-01', 'end': '2025-10-31'}]
+        # 2025-09-30 comes back with each read but belongs to another partition
+        assert result['rows'] == 2
+        assert result['changed_rows'] == 1
+        assert result['uploaded'] == ['tp/YearMonth=2025-10/timesheet.parquet']
+        # June lost all its rows; August was untouched
+        assert result['deleted'] == ['tp/YearMonth=2025-06/timesheet.parquet']
+        assert 'tp/YearMonth=2025-08/timesheet.parquet' in s3.objects
+
+    def test_nothing_changed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(incremental_export, 'iter_rows', lambda *a: iter(()))
+        dynamo = _dynamo(rollups=[{'DateProjectCode': 'x', 'YearMonth': '2025-08', 'LastUpdated': '2025-08-01T00:00:00'}])
+        s3 = FakeS3(_state('2025-10-19T02:00:00'))
+        result = _export(tmp_path, dynamo, s3)
+
+        assert result['mode'] == 'unchanged'
+        assert result['months'] == [] and result['uploaded'] == []
+        assert json.loads(s3.objects[STATE_KEY])['watermark'] == NOW.isoformat()
@@ -0,0 +1,71 @@
+"""
+Unit tests for labour_hours_report module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from labour_hours_report import calculate_weekly_hours, get_monday_weeks_in_period
+from tests.fakes import timesheet_row
+
+
+def _row(person, date_str, hours, project='P1'):
+    return timesheet_row(person, date_str, project, hours)
+
+
+class TestCalculateWeeklyHours:
+    def setup_method(self):
+        # Clarity month starting mid-week: entries before the first Monday are not in any week
+        self.start = datetime(2025, 10, 29)
+        self.end = datetime(2025, 11, 25)
+        self.weeks = get_monday_weeks_in_period(self.start, self.end)
+
+    def test_buckets_entries_into_their_monday(self):
+        items = [
+            _row('Amy_Lee', '2025-11-03', Decimal('7.5')),
+            _row('Amy_Lee', '2025-11-09', 2, project='P2'),
+            _row('Amy_Lee', '2025-11-10', 7.5),
+            _row('Bob', '2025-11-25', Decimal('4')),
+        ]
+        weekly_hours, zero_hour_weeks = calculate_weekly_hours(items, self.start, self.end, self.weeks)
+        assert dict(weekly_hours) == {
+            ('Amy Lee', '2025-11-03'): 9.5,
+            ('Amy Lee', '2025-11-10'): 7.5,
+            ('Bob', '2025-11-24'): 4.0,
+        }
+        assert zero_hour_weeks == {}
+
+    def test_skips_out_of_period_and_bad_dates(self):
+        items = [
+            _row('Amy', '2025-10-30', 7.5),    # in period, before first Monday
+            _row('Amy', '2025-11-26', 7.5),    # after period
+            _row('Amy', 'not-a-date', 7.5),
+            {'ResourceName': 'Amy', 'Hours': 7.5},
+        ]
+        weekly_hours, _ = calculate_weekly_hours(items, self.start, self.end, self.weeks)
+        assert dict(weekly_hours) == {}
+
+    def test_zero_hour_weeks(self):
+        items = [
+            {'ResourceName': 'Amy_Lee', 'Date': '2025-11-17', 'IsZeroHourTimesheet': True,
+             'DateProjectCode': 'WEEK#2025-11-17'},
+            {'ResourceName': 'Amy_Lee', 'Date': '2025-12-01', 'IsZeroHourTimesheet': True},
+        ]
+        weekly_hours, zero_hour_weeks = calculate_weekly_hours(items, self.start, self.end, self.weeks)
+        assert zero_hour_weeks == {('Amy Lee', '2025-11-17'): True}
+        assert dict(weekly_hours) == {}
+
+    def test_year_of_data_for_500_people(self):
+        start, end = datetime(2025, 1, 6), datetime(2026, 1, 4)
+        weeks = get_monday_weeks_in_period(start, end)
+        days = [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(364) if d % 7 < 5]
+        items = [_row(f"Person_{p}", day, Decimal('7.5')) for p in range(500) for day in days]
+
+        weekly_hours, _ = calculate_weekly_hours(items, start, end, weeks)
+
+        assert len(weekly_hours) == 500 * 52
+        assert set(weekly_hours.values()) == {37.5}
+        assert sum(weekly_hours.values()) == 500 * 52 * 37.5
+        assert weekly_hours[('Person 499', '2025-12-29')] == 37.5
@@ -0,0 +1,127 @@
+"""
+Unit tests for labour_partials module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from datetime import timedelta
+import labour_partials
+from change_journal import JOURNAL_PARTITION
+from labour_partials import (
+    clarity_months_between,
+    clarity_months_for_quarter,
+    clarity_months_for_year,
+    generate_labour_hours_range_report,
+)
+from report_cache import ReportCache
+from rollups import PERSON_WEEK, rollup_partition
+from tests.fakes import FakeTable
+
+CLARITY_MONTHS = {
+    'Oct-25': {'start': '2025-09-16', 'end': '2025-10-15', 'display': 'Oct-25'},
+    'Nov-25': {'start': '2025-10-16', 'end': '2025-11-15', 'display': 'Nov-25'},
+    'Dec-25': {'start': '2025-11-16', 'end': '2025-12-15', 'display': 'Dec-25'},
+    'Jan-26': {'start': '2025-12-16', 'end': '2026-01-15', 'display': 'Jan-26'},
+}
+
+
+def _person_week(monday, updated):
+    return {'ResourceName': rollup_partition(PERSON_WEEK), 'DateProjectCode': f"{monday}#Amy",
+            'LastUpdated': updated, 'TotalHours': 37.5}
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    fetches = []
+
+    def fake_fetch(table_name, profile_name, region, start_date, end_date):
+        fetches.append(start_date.strftime('%Y-%m-%d'))
+        # Amy logs 7.5h every weekday of the period
+        rows, day = [], start_date
+        while day <= end_date:
+            if day.weekday() < 5:
+                rows.append({'ResourceName': 'Amy', 'Date': day.strftime('%Y-%m-%d'), 'Hours': 7.5})
+            day += timedelta(days=1)
+        return rows
+
+    monkeypatch.setattr(labour_partials, 'load_clarity_months', lambda: dict(CLARITY_MONTHS))
+    monkeypatch.setattr(labour_partials, 'load_team_roster', lambda: ['Amy'])
+    monkeypatch.setattr(labour_partials, 'fetch_timesheet_data', fake_fetch)
+
+    table = FakeTable([_person_week(monday, '2025-12-01T00:00:00') for monday in (
+        '2025-09-15', '2025-09-22', '2025-10-13', '2025-10-20', '2025-11-17', '2025-12-08')])
+    return table, fetches, ReportCache(bucket='', directory='')
+
+
+def _report(setup, months):
+    table, _, cache = setup
+    return generate_labour_hours_range_report(months, cache=cache, table=table, log_func=lambda m: None)
+
+
+class TestMonthSelection:
+    """Tests for choosing Clarity months."""
+
+    def test_between_quarter_year(self):
+        assert clarity_months_between('Oct-25', 'Dec-25', CLARITY_MONTHS) == ['Oct-25', 'Nov-25', 'Dec-25']
+        assert clarity_months_for_quarter(2025, 4, CLARITY_MONTHS) == ['Oct-25', 'Nov-25', 'Dec-25']
+        assert clarity_months_for_year(2026, CLARITY_MONTHS) == ['Jan-26']
+        with pytest.raises(ValueError):
+            clarity_months_between('Dec-25', 'Oct-25', CLARITY_MONTHS)
+
+
+class TestRangeReport:
+    """Tests for composing cached partials."""
+
+    def test_sums_months_and_reuses_partials(self, setup):
+        table, fetches, _ = setup
+        report = _report(setup, ['Dec-25', 'Oct-25', 'Nov-25'])
+
+        assert fetches == ['2025-09-16', '2025-10-16', '2025-11-16']
+        assert report['partials'] == {'reused': 0, 'recomputed': 3}
+        assert [m['clarity_month'] for m in report['months']] == ['Oct-25', 'Nov-25', 'Dec-25']
+        assert report['statistics']['total_hours_logged'] == sum(m['total_hours'] for m in report['months'])
+        assert report['weeks'] == sorted(report['weeks'])
+        assert report['clarity_month'] == 'Oct-25 to Dec-25'
+
+        again = _report(setup, ['Oct-25', 'Nov-25', 'Dec-25'])
+        assert again['partials'] == {'reused': 3, 'recomputed': 0}
+        assert len(fetches) == 3
+        assert again['weekly_hours'] == report['weekly_hours']
+
+    def test_only_changed_month_is_recomputed(self, setup):
+        table, fetches, _ = setup
+        _report(setup, ['Oct-25', 'Nov-25', 'Dec-25'])
+
+        # A write to a November week moves only November's version
+        table.put(_person_week('2025-10-20', '2025-12-02T09:00:00'))
+        report = _report(setup, ['Oct-25', 'Nov-25', 'Dec-25'])
+        assert report['partials'] == {'reused': 2, 'recomputed': 1}
+        assert fetches[3:] == ['2025-10-16']
+
+        # A delete journaled against December's calendar months
+        table.put({'ResourceName': JOURNAL_PARTITION, 'DateProjectCode': '2025-12-03T10:00:00#2025-12#ab',
+                   'DeletedYearMonth': '2025-12'})
+        report = _report(setup, ['Oct-25', 'Nov-25', 'Dec-25'])
+        assert [m['reused'] for m in report['months']] == [True, True, False]
+
+    def test_journal_read_once_per_report(self, setup):
+        table, _, _ = setup
+        _report(setup, ['Oct-25', 'Nov-25', 'Dec-25', 'Jan-26'])
+        assert table.calls.count(('query', JOURNAL_PARTITION)) == 1
+
+    def test_touched_rollup_moves_the_version(self, setup):
+        table, fetches, _ = setup
+        _report(setup, ['Nov-25'])
+
+        # A non-hours correction: counters unchanged, LastUpdated moved
+        table.put(_person_week('2025-10-20', '2025-12-05T08:00:00'))
+        assert _report(setup, ['Nov-25'])['partials'] == {'reused': 0, 'recomputed': 1}
+
+    def test_no_rollups_means_no_caching(self, setup):
+        table, fetches, _ = setup
+        table.items.clear()
+        _report(setup, ['Jan-26'])
+        _report(setup, ['Jan-26'])
+        assert fetches == ['2025-12-16', '2025-12-16']
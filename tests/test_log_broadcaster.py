@@ -0,0 +1,67 @@
+"""
+Unit tests for log_broadcaster module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+import threading
+import time
+from log_broadcaster import LogBroadcaster
+
+
+def _messages(frames):
+    return [json.loads(f.split('data: ', 1)[1])['message'] for f in frames if 'data: ' in f]
+
+
+class TestLogBroadcaster:
+    def test_every_subscriber_gets_every_message(self):
+        broadcaster = LogBroadcaster()
+        first = broadcaster.stream(heartbeat=0.01)
+        second = broadcaster.stream(heartbeat=0.01)
+
+        broadcaster.publish('one')
+        broadcaster.publish('two')
+
+        assert _messages([next(first), next(first)]) == ['one', 'two']
+        assert _messages([next(second), next(second)]) == ['one', 'two']
+
+    def test_resume_from_last_event_id(self):
+        broadcaster = LogBroadcaster()
+        for i in range(5):
+            broadcaster.publish(f"line {i}")
+
+        frames = broadcaster.stream(last_event_id='3', heartbeat=0.01)
+        first = next(frames)
+        assert first.startswith('id: 4\n')
+        assert _messages([first, next(frames)]) == ['line 3', 'line 4']
+
+    def test_unknown_future_id_replays_buffer(self):
+        broadcaster = LogBroadcaster()
+        broadcaster.publish('after restart')
+        frames = broadcaster.stream(last_event_id='999', heartbeat=0.01)
+        assert _messages([next(frames)]) == ['after restart']
+
+    def test_buffer_is_bounded(self):
+        broadcaster = LogBroadcaster(capacity=3)
+        for i in range(10):
+            broadcaster.publish(str(i))
+        assert [m for _, m in broadcaster.read(0, timeout=0)] == ['7', '8', '9']
+        assert broadcaster.latest_id() == 10
+
+    def test_read_blocks_until_publish(self):
+        broadcaster = LogBroadcaster()
+        threading.Timer(0.05, broadcaster.publish, args=('late',)).start()
+
+        start = time.time()
+        assert broadcaster.read(0, timeout=5) == [(1, 'late')]
+        assert time.time() - start < 2
+
+    def test_idle_stream_sends_heartbeat_and_tracks_subscribers(self):
+        broadcaster = LogBroadcaster()
+        frames = broadcaster.stream(heartbeat=0.01)
+        assert next(frames) == ': keepalive\n\n'
+        assert broadcaster.subscribers == 1
+        frames.close()
+        assert broadcaster.subscribers == 0
@@ -0,0 +1,136 @@
+"""
+Unit tests for ocr_prefetch module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import threading
+import pytest
+from ocr_prefetch import OCRPrefetcher
+
+
+class RecordingFetch:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, image_key):
+        self.release.wait(5)
+        with self._lock:
+            self.calls.append(image_key)
+        if image_key in self.fail:
+            raise RuntimeError(f"OCR failed for {image_key}")
+        return {'image_key': image_key}
+
+
+def _prefetcher(fetch, **kwargs):
+    kwargs.setdefault('depth', 2)
+    kwargs.setdefault('workers', 2)
+    return OCRPrefetcher(fetch, log_func=lambda msg: None, **kwargs)
+
+
+class TestOCRPrefetcher:
+    def test_window_is_prefetched_and_served(self):
+        fetch = RecordingFetch()
+        prefetcher = _prefetcher(fetch)
+        queue = ['a.png', 'b.png', 'c.png', 'd.png']
+
+        prefetcher.prefetch(queue[0:3])
+        assert prefetcher.get('a.png') == {'image_key': 'a.png'}
+        assert prefetcher.get('b.png') == {'image_key': 'b.png'}
+        assert prefetcher.get('c.png') == {'image_key': 'c.png'}
+        assert sorted(fetch.calls) == ['a.png', 'b.png', 'c.png']   # d.png beyond depth
+
+        metrics = prefetcher.get_metrics()
+        assert metrics['scheduled'] == 3
+        assert metrics['misses'] == 0
+        assert metrics['hit_ratio'] == 1.0
+        prefetcher.shutdown()
+
+    def test_in_flight_result_is_awaited(self):
+        fetch = RecordingFetch()
+        fetch.release.clear()
+        prefetcher = _prefetcher(fetch)
+        prefetcher.prefetch(['a.png'])
+
+        threading.Timer(0.05, fetch.release.set).start()
+        assert prefetcher.get('a.png') == {'image_key': 'a.png'}
+        assert prefetcher.get_metrics()['waits'] == 1
+        prefetcher.shutdown()
+
+    def test_unscheduled_key_is_fetched_inline(self):
+        fetch = RecordingFetch()
+        prefetcher = _prefetcher(fetch, depth=0)
+        prefetcher.prefetch(['a.png', 'b.png'])      # depth 0: nothing scheduled
+
+        assert prefetcher.get('a.png') == {'image_key': 'a.png'}
+        assert fetch.calls == ['a.png']
+        assert prefetcher.get_metrics()['misses'] == 1
+        prefetcher.shutdown()
+
+    def test_window_moves_and_invalidate_refetches(self):
+        fetch = RecordingFetch()
+        prefetcher = _prefetcher(fetch)
+        prefetcher.prefetch(['a.png', 'b.png', 'c.png'])
+        prefetcher.get('a.png')
+
+        prefetcher.prefetch(['b.png', 'c.png', 'd.png'])
+        assert prefetcher.get_metrics()['evicted'] == 1      # a.png dropped
+
+        prefetcher.get('b.png')
+        prefetcher.invalidate('b.png')
+        prefetcher.get('b.png')                              # refetched inline
+        assert fetch.calls.count('b.png') == 2
+        prefetcher.shutdown()
+
+    def test_failed_prefetch_raises_then_retries(self):
+        fetch = RecordingFetch(fail={'bad.png'})
+        prefetcher = _prefetcher(fetch)
+        prefetcher.prefetch(['bad.png'])
+
+        with pytest.raises(RuntimeError):
+            prefetcher.get('bad.png')
+        assert prefetcher.get_metrics()['errors'] == 1
+
+        fetch.fail.clear()
+        assert prefetcher.get('bad.png') == {'image_key': 'bad.png'}
+        prefetcher.shutdown()
+
+    def test_reviewers_keep_separate_windows(self):
+        fetch = RecordingFetch()
+        prefetcher = _prefetcher(fetch)
+        prefetcher.prefetch(['a.png', 'b.png'], owner='amy')
+        prefetcher.prefetch(['x.png', 'y.png'], owner='bob')
+        prefetcher.get('a.png')
+        prefetcher.get('b.png')
+
+        # Amy moving on does not evict Bob's entries
+        prefetcher.prefetch(['c.png'], owner='amy')
+        assert prefetcher.get_metrics()['evicted'] == 2
+        prefetcher.get('x.png')
+        prefetcher.get('y.png')
+        assert sorted(fetch.calls) == ['a.png', 'b.png', 'c.png', 'x.png', 'y.png']
+
+        prefetcher.release('bob')
+        assert prefetcher.get_metrics()['reviewers'] == 1
+        prefetcher.shutdown()
+
+    def test_running_fetch_is_never_dropped(self):
+        fetch = RecordingFetch()
+        fetch.release.clear()
+        prefetcher = _prefetcher(fetch, workers=1)
+        prefetcher.prefetch(['a.png'])
+        while not prefetcher._futures['a.png'].running():
+            pass
+
+        # The window moves on while a.png is still being OCR'd
+        prefetcher.prefetch(['b.png'])
+        assert 'a.png' in prefetcher._futures
+        fetch.release.set()
+        assert prefetcher.get('a.png') == {'image_key': 'a.png'}
+        assert fetch.calls.count('a.png') == 1
+        prefetcher.shutdown()
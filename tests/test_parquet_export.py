@@ -0,0 +1,137 @@
+"""
+Unit tests for parquet_export module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from datetime import date, datetime
+from parquet_export import (
+    COLUMNS,
+    ParquetExporter,
+    athena_ddl,
+    convert_row,
+    partition_of,
+    upload_partitions,
+)
+from tests.fakes import FakeS3, timesheet_row
+
+
+def make_row(day, code='PJ001', hours=7.5, resource='Nik_Coultas'):
+    return timesheet_row(resource, day, code, hours, YearMonth=day[:7],
+                         ProcessingTimestamp='2025-10-03T09:15:00+01:00', InputTokens='1200')
+
+
+class FakeWriter:
+    """Records the row groups written to one partition file."""
+    created = {}
+
+    def __init__(self, path):
+        self.path = path
+        self.row_groups = []
+        self.closed = False
+        FakeWriter.created[path] = self
+
+    def write_columns(self, columns):
+        self.row_groups.append(columns)
+
+    def close(self):
+        self.closed = True
+
+
+class TestConversion:
+    """Tests for typed row conversion."""
+
+    def test_types(self):
+        values = dict(zip([c for c, _ in COLUMNS], convert_row(make_row('2025-10-01'))))
+        assert values['Date'] == date(2025, 10, 1)
+        assert values['Hours'] == 7.5
+        assert values['InputTokens'] == 1200
+        # Converted to naive UTC for Athena TIMESTAMP
+        assert values['ProcessingTimestamp'] == datetime(2025, 10, 3, 8, 15)
+        assert values['ProjectName'] is None
+
+    def test_partition(self):
+        assert partition_of({'YearMonth': '2025-10'}) == '2025-10'
+        assert partition_of({'Date': '2025-11-03'}) == '2025-11'
+        assert partition_of({'YearMonth': 'UNKNOWN'}) is None
+
+
+class TestParquetExporter:
+    """Tests for streaming, bounded buffering and partitioning."""
+
+    def setup_method(self):
+        FakeWriter.created = {}
+
+    def test_rows_partitioned_by_month(self, tmp_path):
+        rows = [make_row('2025-09-30'), make_row('2025-10-01'), make_row('2025-10-02'),
+                {'ResourceName': 'ROLLUP#PERSON', 'DateProjectCode': 'Nik_Coultas'}]
+        report = ParquetExporter(str(tmp_path), writer_factory=FakeWriter).export(rows)
+
+        assert report['rows'] == 3
+        assert report['skipped'] == 1
+        assert sorted(report['partitions']) == ['2025-09', '2025-10']
+        writer = FakeWriter.created[os.path.join(str(tmp_path), 'YearMonth=2025-10', 'timesheet.parquet')]
+        assert writer.closed
+        assert writer.row_groups[0]['Date'] == [date(2025, 10, 1), date(2025, 10, 2)]
+        assert 'YearMonth' not in writer.row_groups[0]
+
+    def test_row_groups_of_fixed_size(self, tmp_path):
+        rows = [make_row(f"2025-10-{day:02d}") for day in range(1, 26)]
+        report = ParquetExporter(str(tmp_path), row_group_size=10, writer_factory=FakeWriter).export(rows)
+
+        writer = FakeWriter.created[report['partitions']['2025-10']['path']]
+        assert [len(group['Date']) for group in writer.row_groups] == [10, 10, 5]
+        assert report['row_groups'] == 3
+
+    def test_buffered_rows_bounded(self, tmp_path):
+        # Rows interleaved across months: the total held in memory never exceeds the bound
+        exporter = ParquetExporter(str(tmp_path), row_group_size=10, max_buffered_rows=12,
+                                   writer_factory=FakeWriter)
+        for day in range(1, 29):
+            for month in ('2025-08', '2025-09', '2025-10'):
+                exporter.add(make_row(f"{month}-{day:02d}"))
+                assert exporter._buffered < 12
+        report = exporter.close()
+
+        assert report['rows'] == 84
+        assert sum(p['rows'] for p in report['partitions'].values()) == 84
+
+
+class TestUploadAndDdl:
+    """Tests for the S3 upload and Athena DDL."""
+
+    def test_upload_removes_stale_partitions(self, tmp_path):
+        path = tmp_path / 'timesheet.parquet'
+        path.write_bytes(b'PAR1')
+        report = {'partitions': {'2025-10': {'path': str(path)}}}
+        s3 = FakeS3({'tp/YearMonth=2025-10/timesheet.parquet': b'old', 'tp/YearMonth=2024-01/timesheet.parquet': b'old'})
+
+        result = upload_partitions(report, s3, 'bucket', 'tp/', log_func=lambda m: None)
+
+        assert result['uploaded'] == ['tp/YearMonth=2025-10/timesheet.parquet']
+        assert s3.deleted == ['tp/YearMonth=2024-01/timesheet.parquet']
+        assert s3.objects['tp/YearMonth=2025-10/timesheet.parquet'] == b'PAR1'
+        assert not path.exists()
+
+    def test_ddl_declares_partition(self):
+        ddl = athena_ddl('s3://bucket/tp/')
+        assert 'PARTITIONED BY (YearMonth STRING)' in ddl
+        assert 'STORED AS PARQUET' in ddl
+        assert "'storage.location.template'='s3://bucket/tp/YearMonth=${yearmonth}/'" in ddl
+        # The partition column is not repeated in the column list
+        assert 'YearMonth STRING,' not in ddl
+
+
+class TestParquetFiles:
+    """Round trip through real Parquet files (needs pyarrow)."""
+
+    def test_round_trip(self, tmp_path):
+        pq = pytest.importorskip('pyarrow.parquet')
+        rows = [make_row(f"2025-10-{day:02d}") for day in range(1, 8)]
+        report = ParquetExporter(str(tmp_path), row_group_size=3).export(rows)
+
+        parquet_file = pq.ParquetFile(report['partitions']['2025-10']['path'])
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.read().column('Hours').to_pylist() == [7.5] * 7
@@ -0,0 +1,116 @@
+"""
+Unit tests for query_cache module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import threading
+import pytest
+from query_cache import DynamoDBTier, MemoryTier, QueryCache
+from tests.fakes import FakeTable
+
+
+def _items():
+    return [
+        {'ResourceName': 'Nik_Coultas', 'DateProjectCode': '2025-09-29#PJ021931'},
+        {'ResourceName': 'Nik_Coultas', 'DateProjectCode': '2025-10-06#PJ021931'},
+        {'ResourceName': 'Neil_Pomfret', 'DateProjectCode': '2025-09-29#PJ021931'},
+    ]
+
+
+@pytest.fixture(params=['memory', 'file'])
+def cache(request, tmp_path):
+    return QueryCache(tier=request.param, ttl=60, max_entries=2, directory=str(tmp_path))
+
+
+class TestReadThrough:
+    def test_second_read_is_a_hit(self, cache):
+        table = FakeTable(_items())
+        first = cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+        second = cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+
+        assert first == second == [_items()[0]]
+        assert table.queries == 1
+        assert cache.get_metrics()['hit_ratio'] == 0.5
+
+    def test_lru_eviction(self, cache):
+        table = FakeTable(_items())
+        cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+        cache.query_range(table, 'Nik_Coultas', '2025-10-06', '2025-10-12#~')
+        cache.query_range(table, 'Neil_Pomfret', '2025-09-29', '2025-10-05#~')
+
+        # Oldest range was evicted
+        cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+        assert table.queries == 4
+
+
+class TestInvalidation:
+    def test_write_drops_only_ranges_containing_the_key(self, cache):
+        table = FakeTable(_items())
+        cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+        cache.query_range(table, 'Nik_Coultas', '2025-10-06', '2025-10-12#~')
+
+        cache.invalidate_keys(table.name, [{'ResourceName': 'Nik_Coultas', 'DateProjectCode': '2025-10-01#PJ000001'}])
+
+        cache.query_range(table, 'Nik_Coultas', '2025-10-06', '2025-10-12#~')
+        assert table.queries == 2
+        cache.query_range(table, 'Nik_Coultas', '2025-09-29', '2025-10-05#~')
+        assert table.queries == 3
+
+    def test_tier_off_never_caches(self):
+        cache = QueryCache(tier='off')
+        table = FakeTable(_items())
+        cache.query_range(table, 'Nik_Coultas')
+        cache.query_range(table, 'Nik_Coultas')
+        assert table.queries == 2
+
+
+class TestConcurrency:
+    def test_memory_tier_invalidates_while_others_write(self):
+        tier = MemoryTier(max_entries=10000)
+        stop = threading.Event()
+
+        def writer():
+            n = 0
+            while not stop.is_set():
+                tier.set(('T', 'Amy', f'2025-{n % 12 + 1:02d}-01', ''), [], 60)
+                n += 1
+
+        threads = [threading.Thread(target=writer) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(300):
+                tier.invalidate('T', 'Amy', ['2025-06-15#P1'])   # raised "mutated during iteration"
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
+class TestDynamoDBTier:
+    def test_invalidate_reads_every_page(self):
+        class PagedTable:
+            def __init__(self):
+                self.deleted = []
+
+            def query(self, **kwargs):
+                page = int(kwargs.get('ExclusiveStartKey', {}).get('page', 0))
+                response = {'Items': [{'ResourceName': 'QCACHE#Amy', 'DateProjectCode': f'{page}|',
+                                       'RangeStart': '', 'RangeEnd': ''}]}
+                if page < 2:
+                    response['LastEvaluatedKey'] = {'page': page + 1}
+                return response
+
+            def delete_item(self, Key):
+                self.deleted.append(Key['DateProjectCode'])
+
+        table = PagedTable()
+
+        class Resource:
+            def Table(self, name):
+                return table
+
+        assert DynamoDBTier(resource=Resource()).invalidate('T', 'Amy') == 3
+        assert table.deleted == ['0|', '1|', '2|']
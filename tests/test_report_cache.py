@@ -0,0 +1,128 @@
+"""
+Unit tests for report_cache module and report_lambda's cached routes.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import report_lambda
+from report_cache import ReportCache, etag_matches, make_etag, resource_data_version, table_data_version
+from tests.fakes import FakeTable, timesheet_row
+
+
+def _rollup(partition, key, updated, count=3):
+    return {'ResourceName': partition, 'DateProjectCode': key,
+            'LastUpdated': updated, 'EntryCount': count, 'ZeroHourCount': 0, 'TotalHours': 22.5}
+
+
+class TestDataVersions:
+    def test_resource_version_from_person_rollup(self):
+        table = FakeTable([_rollup('ROLLUP#PERSON', 'Amy', '2025-11-01T10:00:00')])
+        assert resource_data_version(table, 'Amy') == 'rollup:2025-11-01T10:00:00|3|0|22.5'
+        assert table.queries == 0
+
+    def test_resource_version_falls_back_to_processing_timestamp(self):
+        table = FakeTable([timesheet_row('Amy', '2025-10-01', ProcessingTimestamp='2025-11-01T09:00:00'),
+                           timesheet_row('Amy', '2025-10-02', ProcessingTimestamp='2025-11-02T09:00:00')])
+        assert resource_data_version(table, 'Amy') == 'ts:2025-11-02T09:00:00|2'
+        assert resource_data_version(table, 'Nobody') is None
+
+    def test_table_version(self):
+        assert table_data_version(FakeTable()) is None
+        table = FakeTable([_rollup('ROLLUP#TOTALS', 'ALL', '2025-11-01T10:00:00', 40)])
+        assert table_data_version(table).startswith('rollup:2025-11-01T10:00:00|40')
+
+
+class TestReportCache:
+    def test_etag_matching(self):
+        etag = make_etag('report|Amy', 'v1')
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches(make_etag('report|Amy', 'v2'), etag)
+        assert not etag_matches(None, etag)
+
+    def test_disk_tier_is_shared_and_versioned(self, tmp_path):
+        first = ReportCache(directory=str(tmp_path))
+        first.put('report|Amy', 'v1', '<html>', 'text/html')
+
+        second = ReportCache(directory=str(tmp_path))
+        entry = second.get('report|Amy', 'v1')
+        assert entry['body'] == '<html>' and entry['etag'] == make_etag('report|Amy', 'v1')
+        assert second.stats['shared_hits'] == 1
+        assert second.get('report|Amy', 'v1')['body'] == '<html>'
+        assert second.stats['memory_hits'] == 1
+        assert second.get('report|Amy', 'v2') is None
+
+    def test_memory_lru(self):
+        cache = ReportCache(max_entries=2, bucket='', directory='')
+        for name in ('a', 'b', 'c'):
+            cache.put(name, 'v', name, 'text/plain')
+        assert cache.get('a', 'v') is None
+        assert cache.get('c', 'v')['body'] == 'c'
+
+
+class TestReportLambdaCaching:
+    def _setup(self, monkeypatch, tmp_path, table):
+        renders = []
+
+        def fake_report(resource_name, table_name, start_date=None, end_date=None):
+            renders.append((resource_name, start_date, end_date))
+            return {'resource_name': resource_name, 'has_data': True}
+
+        class FakeResource:
+            def Table(self, name):
+                return table
+
+        monkeypatch.setattr(report_lambda, 'dynamodb', FakeResource())
+        monkeypatch.setattr(report_lambda, 'generate_resource_calendar_report', fake_report)
+        monkeypatch.setattr(report_lambda, 'get_all_resources', lambda table_name: [{'resource_key': 'Amy'}])
+        monkeypatch.setattr(report_lambda, 'invalidate', lambda *args: None)
+        monkeypatch.setattr(report_lambda, 'report_cache', ReportCache(directory=str(tmp_path)))
+        return renders
+
+    def test_report_cached_then_304(self, monkeypatch, tmp_path):
+        table = FakeTable([_rollup('ROLLUP#PERSON', 'Amy_Lee', '2025-11-01T10:00:00')])
+        renders = self._setup(monkeypatch, tmp_path, table)
+        event = {'path': '/report/Amy_Lee', 'httpMethod': 'GET',
+                 'queryStringParameters': {'start_date': '2025-10-01', 'end_date': '2025-10-31'}}
+
+        first = report_lambda.lambda_handler(event, None)
+        assert first['statusCode'] == 200 and first['headers']['X-Cache'] == 'MISS'
+
+        second = report_lambda.lambda_handler(event, None)
+        assert second['headers']['X-Cache'] == 'HIT' and second['body'] == first['body']
+
+        conditional = dict(event, headers={'If-None-Match': first['headers']['ETag']})
+        assert report_lambda.lambda_handler(conditional, None)['statusCode'] == 304
+        assert len(renders) == 1
+
+        # A write moves the person's rollup - the old ETag no longer matches
+        table.put(_rollup('ROLLUP#PERSON', 'Amy_Lee', '2025-11-02T10:00:00', 4))
+        third = report_lambda.lambda_handler(conditional, None)
+        assert third['statusCode'] == 200 and third['headers']['X-Cache'] == 'MISS'
+        assert third['headers']['ETag'] != first['headers']['ETag']
+        assert len(renders) == 2
+
+    def test_new_render_version_misses_old_bodies(self, monkeypatch, tmp_path):
+        table = FakeTable([_rollup('ROLLUP#PERSON', 'Amy_Lee', '2025-11-01T10:00:00')])
+        renders = self._setup(monkeypatch, tmp_path, table)
+        event = {'path': '/report/Amy_Lee', 'httpMethod': 'GET',
+                 'queryStringParameters': {'start_date': '2025-10-01', 'end_date': '2025-10-31'}}
+        first = report_lambda.lambda_handler(event, None)
+
+        # Same data, new templates: neither the cached body nor the old ETag is reused
+        monkeypatch.setattr(report_lambda, 'render_version', lambda: 'r99-deployed')
+        conditional = dict(event, headers={'If-None-Match': first['headers']['ETag']})
+        again = report_lambda.lambda_handler(conditional, None)
+        assert again['statusCode'] == 200 and again['headers']['X-Cache'] == 'MISS'
+        assert len(renders) == 2
+
+    def test_resources_without_rollups_use_body_etag(self, monkeypatch, tmp_path):
+        self._setup(monkeypatch, tmp_path, FakeTable())
+        event = {'path': '/resources', 'httpMethod': 'GET'}
+        first = report_lambda.lambda_handler(event, None)
+        assert first['headers']['X-Cache'] == 'BYPASS'
+        again = report_lambda.lambda_handler(dict(event, headers={'if-none-match': first['headers']['ETag']}), None)
+        assert again['statusCode'] == 304
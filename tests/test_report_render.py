@@ -0,0 +1,122 @@
+"""
+Unit tests for report_render and the templated report generators.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from datetime import datetime, timedelta
+
+pytest.importorskip('jinja2')
+
+from labour_hours_report import generate_html_report, stream_html_report
+from report_html import generate_html_calendar_report
+from report_render import asset, asset_version, render, stylesheet
+
+
+def _labour_report(people=3, weeks=4):
+    first = datetime(2025, 10, 20)
+    week_list = [first + timedelta(weeks=n) for n in range(weeks)]
+    members = [f"Person {n:03d}" for n in range(people)]
+    weekly_hours = {(p, w.strftime('%Y-%m-%d')): 37.5 for p in members for w in week_list[1:]}
+    return {
+        'clarity_month': 'Nov-25',
+        'period_display': '16 Oct 2025 - 15 Nov 2025',
+        'weeks': week_list,
+        'team_members': members,
+        'weekly_hours': weekly_hours,
+        'zero_hour_weeks': {(members[0], week_list[0].strftime('%Y-%m-%d')): True},
+        'month_totals': {p: 37.5 * (weeks - 1) for p in members},
+        'month_totals_days': {p: 5.0 * (weeks - 1) for p in members},
+        'statistics': {'total_team_members': people, 'total_weeks': weeks,
+                       'total_hours_logged': 37.5 * (weeks - 1) * people, 'average_hours_per_person': 112.5},
+    }
+
+
+class TestAssets:
+    """Tests for stylesheet assets."""
+
+    def test_inline_or_linked(self):
+        inline = stylesheet('labour_hours.css')
+        assert inline.startswith('<style>') and '.month-total' in inline
+        linked = stylesheet('labour_hours.css', '/report-assets/')
+        assert linked == f'<link rel="stylesheet" href="/report-assets/labour_hours.css?v={asset_version("labour_hours.css")}">'
+
+    def test_rejects_unknown_and_traversal(self):
+        for name in ('missing.css', '../report_html.py', 'assets/../x.css'):
+            with pytest.raises(KeyError):
+                asset(name)
+
+
+class TestLabourHoursHtml:
+    """Tests for the labour hours template."""
+
+    def test_cells_and_totals(self):
+        html = generate_html_report(_labour_report())
+        assert '<td class="hours-cell zero-hours">0.0</td>' in html
+        assert '<td class="hours-cell has-hours">37.5</td>' in html
+        assert '<td class="month-total"><strong>112.5</strong></td>' in html
+        assert '<th class="week-header">20 Oct</th>' in html
+        assert '<style>' in html
+
+    def test_streams_rows_lazily(self):
+        # 500 people x 13 weeks arrives in many chunks, head first
+        chunks = stream_html_report(_labour_report(people=500, weeks=13), asset_base='/report-assets')
+        first = next(chunks)
+        assert first.startswith('<!DOCTYPE html>')
+        assert 'Person 499' not in first
+        rest = list(chunks)
+        assert len(rest) > 50
+        assert max(len(c) for c in rest) < 64 * 1024
+        assert 'Person 499' in ''.join(rest)
+        assert '<link rel="stylesheet"' in first
+
+    def test_values_are_escaped(self):
+        report = _labour_report(people=1)
+        report['team_members'] = ['<script>x</script>']
+        assert '&lt;script&gt;' in generate_html_report(report)
+
+
+class TestCalendarHtml:
+    """Tests for the calendar template."""
+
+    def test_cards(self):
+        report = {
+            'has_data': True,
+            'resource_name': 'Nik Coultas',
+            'statistics': {'total_weeks': 3, 'weeks_present': 2, 'weeks_missing': 1,
+                           'zero_hour_weeks': 1, 'completion_percentage': 66.7},
+            'date_range': {'start': '2025-09-29', 'end': '2025-10-19'},
+            'calendar': [
+                {'week_start': '2025-09-29', 'week_end': '2025-10-05', 'iso_week': 40, 'status': 'present',
+                 'total_hours': 37.5, 'projects_count': 4, 'project_codes': ['A', 'B', 'C', 'D']},
+                {'week_start': '2025-10-06', 'week_end': '2025-10-12', 'iso_week': 41, 'status': 'present',
+                 'is_zero_hour': True, 'zero_hour_reason': 'ANNUAL_LEAVE'},
+                {'week_start': '2025-10-13', 'week_end': '2025-10-19', 'iso_week': 42, 'status': 'missing'},
+            ],
+        }
+        html = generate_html_calendar_report(report)
+        # Newest month first
+        assert html.index('October 2025') < html.index('September 2025')
+        assert '<strong>37.5h</strong>' in html
+        assert 'A, B, C +1 more' in html
+        assert 'Zero Hour (ANNUAL_LEAVE)' in html and 'Annual Leave / Absence' in html
+        assert 'No Submission' in html
+
+    def test_no_data(self):
+        html = generate_html_calendar_report({'has_data': False, 'resource_name': 'Nobody', 'message': 'Nothing here'})
+        assert 'No Data Found' in html and 'Nothing here' in html
+
+
+class TestMainProjectsHtml:
+    """Tests for the main projects template."""
+
+    def test_rows_are_escaped(self):
+        # Names and project names come from OCR
+        html = render('main_projects.html', {'clarity_month': 'Nov-25', 'rows': [
+            ['Amy Ash', 'PJ021931', '<img src=x onerror=alert(1)>', '37.50'],
+        ]})
+        assert '<td>Amy Ash</td><td>PJ021931</td><td>&lt;img src=x onerror=alert(1)&gt;</td>' in html
+        assert '<img' not in html
+        assert '<style>' in html and '<h1>Main Projects - Nov-25</h1>' in html
@@ -0,0 +1,172 @@
+"""
+Unit tests for report_snapshots module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from datetime import datetime
+import report_snapshots
+from report_snapshots import (
+    ReportSnapshots,
+    SnapshotStore,
+    changed_months,
+    key_dates,
+    months_for_dates,
+    open_months,
+)
+from tests.fakes import FakeTable
+
+MONTHS = [
+    {'id': 'Sep-25', 'start_date': '2025-08-16', 'end_date': '2025-09-15'},
+    {'id': 'Oct-25', 'start_date': '2025-09-16', 'end_date': '2025-10-15'},
+    {'id': 'Nov-25', 'start_date': '2025-10-16', 'end_date': '2025-11-15'},
+]
+
+
+def _person_week(monday, updated):
+    return {'ResourceName': 'ROLLUP#PERSON_WEEK', 'DateProjectCode': f"{monday}#Amy", 'LastUpdated': updated}
+
+
+class FakeTimer:
+    """threading.Timer stand-in that only records what was scheduled."""
+    created = []
+
+    def __init__(self, delay, func):
+        self.delay = delay
+        self.func = func
+        self.cancelled = False
+        FakeTimer.created.append(self)
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _snapshots(tmp_path, builds):
+    def build(kind):
+        def builder(month):
+            builds.append((kind, month))
+            return {'stats': {'month': month}}, f"<h1>{kind} {month}</h1>"
+        return builder
+
+    FakeTimer.created = []
+    return ReportSnapshots(
+        {'labour-hours': build('labour-hours'), 'coverage': build('coverage')},
+        lambda: MONTHS,
+        store=SnapshotStore(bucket='', directory=str(tmp_path)),
+        debounce_seconds=30,
+        max_delay_seconds=300,
+        log_func=lambda msg: None,
+        timer_factory=FakeTimer
+    )
+
+
+class TestMonths:
+    def test_open_months(self):
+        assert open_months(MONTHS, today=datetime(2025, 10, 20)) == ['Oct-25', 'Nov-25']
+        assert open_months(MONTHS, today=datetime(2025, 10, 20), open_days=0) == ['Nov-25']
+
+    def test_months_for_dates_and_key_dates(self):
+        keys = [{'DateProjectCode': '2025-09-15#P1'}, {'DateProjectCode': 'WEEK#2025-10-20'}]
+        assert key_dates(keys) == {'2025-09-15', '2025-10-20'}
+        assert months_for_dates(MONTHS, key_dates(keys)) == {'Sep-25', 'Nov-25'}
+
+
+class TestReportSnapshots:
+    def test_burst_of_notifications_rebuilds_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('report_snapshots.open_months', lambda months: ['Oct-25', 'Nov-25'])
+        builds = []
+        snapshots = _snapshots(tmp_path, builds)
+
+        for _ in range(5):
+            snapshots.notify(['2025-10-20'])
+        snapshots.notify(['2025-08-20'])   # closed month without a snapshot - ignored
+
+        assert len(FakeTimer.created) == 5
+        assert all(t.cancelled for t in FakeTimer.created[:-1])
+        assert snapshots.status()['dirty'] == ['Nov-25']
+        assert snapshots.get('coverage', 'Nov-25') is None
+
+        FakeTimer.created[-1].func()
+        assert sorted(builds) == [('coverage', 'Nov-25'), ('labour-hours', 'Nov-25')]
+        snapshot = snapshots.get('coverage', 'Nov-25')
+        assert snapshot['html'] == '<h1>coverage Nov-25</h1>' and snapshot['pending'] is False
+
+    def test_snapshots_are_shared_through_the_store(self, tmp_path):
+        builds = []
+        _snapshots(tmp_path, builds).rebuild('Oct-25')
+
+        other = _snapshots(tmp_path, builds)
+        snapshot = other.get('labour-hours', 'Oct-25')
+        assert snapshot['data'] == {'stats': {'month': 'Oct-25'}}
+        assert snapshot['html'] == '<h1>labour-hours Oct-25</h1>'
+        assert len(builds) == 2
+
+    def test_get_or_build(self, tmp_path):
+        builds = []
+        snapshots = _snapshots(tmp_path, builds)
+        snapshots.get_or_build('coverage', 'Sep-25')
+        snapshots.get_or_build('coverage', 'Sep-25')
+        assert builds == [('coverage', 'Sep-25')]
+        snapshots.get_or_build('coverage', 'Sep-25', rebuild=True)
+        assert len(builds) == 2
+
+    def test_failed_builder_keeps_previous_snapshot(self, tmp_path):
+        builds = []
+        snapshots = _snapshots(tmp_path, builds)
+        snapshots.rebuild('Oct-25')
+
+        def broken(month):
+            raise RuntimeError('table unavailable')
+        snapshots.builders['coverage'] = broken
+
+        assert 'coverage' not in snapshots.rebuild('Oct-25')
+        assert snapshots.get('coverage', 'Oct-25')['html'] == '<h1>coverage Oct-25</h1>'
+        assert 'table unavailable' in snapshots.status()['last_error']
+
+
+class TestChangedMonths:
+    def test_queries_person_week_rollups_per_month(self):
+        table = FakeTable([_person_week('2025-10-20', '2025-10-21T08:00:00'),
+                           _person_week('2025-09-22', '2025-09-23T08:00:00')])
+
+        changed = changed_months(table, MONTHS, ['Oct-25', 'Nov-25'], '2025-10-20T10:00:00')
+        assert changed == {'Nov-25'}
+        values = table.requests[1][1]['ExpressionAttributeValues']
+        assert (values[':low'], values[':high'], values[':since']) == \
+            ('2025-10-13', '2025-11-15#~', '2025-10-20T10:00:00')
+
+
+class TestWatcherPoll:
+    def test_watermark_is_the_observed_last_updated_with_overlap(self, tmp_path, monkeypatch):
+        snapshots = _snapshots(tmp_path, [])
+        notified = []
+        monkeypatch.setattr(snapshots, 'notify', lambda months: notified.append(months))
+        monkeypatch.setattr(report_snapshots, 'open_months', lambda months: ['Nov-25'])
+        table = FakeTable([
+            {'ResourceName': 'ROLLUP#TOTALS', 'DateProjectCode': 'ALL',
+             'LastUpdated': '2025-10-20T10:00:00', 'EntryCount': 5},
+            _person_week('2025-10-20', '2025-10-20T09:59:30'),
+        ])
+
+        def since():
+            return [kwargs['ExpressionAttributeValues'][':since'] for _, kwargs in table.requests]
+
+        # The first poll only observes (the watcher takes it before sleeping)
+        state = snapshots.poll_changes(table, None, overlap_seconds=60)
+        assert since() == [] and notified == []
+
+        # Unchanged totals: one GetItem, no rollup queries
+        assert snapshots.poll_changes(table, state, overlap_seconds=60) == state
+        assert since() == []
+
+        # The writer's clock, not the watcher's, sets the watermark
+        table.put({'ResourceName': 'ROLLUP#TOTALS', 'DateProjectCode': 'ALL',
+                   'LastUpdated': '2025-10-20T09:59:30', 'EntryCount': 6})
+        state = snapshots.poll_changes(table, state, overlap_seconds=60)
+        assert since() == ['2025-10-20T09:59:00']
+        assert notified == [{'Nov-25'}]
+        assert state['last_updated'] == '2025-10-20T09:59:30'
@@ -0,0 +1,160 @@
+"""
+Unit tests for resource_registry module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from decimal import Decimal
+from resource_registry import (
+    REGISTRY_PARTITION,
+    apply_registry_deltas,
+    compute_registry_deltas,
+    list_resources,
+    merge_registry_deltas,
+    registry_items,
+    scan_resources,
+    seeded_marker
+)
+from tests.fakes import FakeTable, timesheet_row
+
+
+def _row(date_str, code='PJ021931', resource='Nik_Coultas', display='Nik Coultas', **extra):
+    return timesheet_row(resource, date_str, code, Decimal('7.5'), ResourceNameDisplay=display, **extra)
+
+
+def _table(stored=None):
+    """Table holding Nik_Coultas's registry item (when given)."""
+    items = [dict(stored, ResourceName=REGISTRY_PARTITION, DateProjectCode='Nik_Coultas')] if stored else []
+    return FakeTable(items)
+
+
+def _stored(table):
+    return table.items[(REGISTRY_PARTITION, 'Nik_Coultas')]
+
+
+class TestRegistryDeltas:
+    def test_counts_weeks_and_display_name(self):
+        deltas = compute_registry_deltas(
+            added=[_row('2025-09-29'), _row('2025-10-08'),
+                   {'ResourceName': 'Nik_Coultas', 'Date': '2025-10-13', 'IsZeroHourTimesheet': True}],
+            removed=[_row('2025-01-06'), {'ResourceName': 'ROLLUP#PERSON', 'Date': '2025-10-13'}]
+        )
+
+        # Removed rows are kept apart from the added range
+        assert deltas == {'Nik_Coultas': {
+            'DisplayName': 'Nik Coultas', 'FirstWeek': '2025-09-29', 'LastWeek': '2025-10-13',
+            'RemovedFirstWeek': '2025-01-06', 'RemovedLastWeek': '2025-01-06',
+            'EntryCount': 1, 'ZeroHourCount': 1,
+        }}
+
+    def test_merge_widens_range_and_sums(self):
+        first = compute_registry_deltas(added=[_row('2025-10-06')])
+        second = compute_registry_deltas(added=[_row('2025-09-15', display='Nik  Coultas')])
+        merged = merge_registry_deltas(first, second, compute_registry_deltas(removed=[_row('2025-10-06')]))
+
+        assert merged['Nik_Coultas']['FirstWeek'] == '2025-09-15'
+        assert merged['Nik_Coultas']['LastWeek'] == '2025-10-06'
+        assert merged['Nik_Coultas']['EntryCount'] == 1
+        assert merged['Nik_Coultas']['DisplayName'] == 'Nik  Coultas'
+
+
+class TestApplyRegistryDeltas:
+    def test_new_person_is_one_update(self):
+        table = _table()
+        result = apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(added=[_row('2025-09-29')]), table=table)
+
+        assert result == {'updated': 1, 'failed': 0, 'skipped': 0}
+        assert len(table.updates) == 1
+        assert _stored(table)['FirstWeek'] == '2025-09-29' and _stored(table)['EntryCount'] == 1
+
+    def test_week_range_only_widens(self):
+        table = _table({'FirstWeek': '2025-06-02', 'LastWeek': '2025-09-29', 'EntryCount': 10, 'ZeroHourCount': 0})
+        apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(
+            added=[_row('2025-05-05'), _row('2025-07-07')]), table=table)
+
+        assert _stored(table)['FirstWeek'] == '2025-05-05'
+        assert _stored(table)['LastWeek'] == '2025-09-29'
+        assert _stored(table)['EntryCount'] == 12
+        assert len(table.updates) == 2
+
+    def test_lost_race_is_not_a_failure(self):
+        table = _table({'FirstWeek': '2025-06-02', 'LastWeek': '2025-09-29', 'EntryCount': 1, 'ZeroHourCount': 0})
+        update_item = table.update_item
+
+        def racing_update(**kwargs):
+            response = update_item(**kwargs)
+            if 'ConditionExpression' not in kwargs:
+                # Another writer moves FirstWeek even earlier in between
+                _stored(table)['FirstWeek'] = '2025-01-06'
+            return response
+        table.update_item = racing_update
+
+        result = apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(
+            added=[_row('2025-05-05')]), table=table)
+
+        assert result == {'updated': 1, 'failed': 0, 'skipped': 0}
+        assert _stored(table)['FirstWeek'] == '2025-01-06'
+
+    def test_removing_a_boundary_week_narrows_from_rollups(self):
+        table = _table({'FirstWeek': '2025-06-02', 'LastWeek': '2025-09-29', 'EntryCount': 6, 'ZeroHourCount': 0})
+        # PERSON_WEEK rollups as left by update_rollups() for the same removal
+        for week, resource, entries in (('2025-06-02', 'Nik_Coultas', 0), ('2025-06-02', 'Zoe_Ash', 5),
+                                        ('2025-06-09', 'Nik_Coultas', 3), ('2025-09-29', 'Nik_Coultas', 2)):
+            table.put({'ResourceName': 'ROLLUP#PERSON_WEEK', 'DateProjectCode': f"{week}#{resource}",
+                       'Resource': resource, 'WeekStart': week, 'EntryCount': entries, 'ZeroHourCount': 0})
+
+        apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(removed=[_row('2025-06-03')]), table=table)
+        assert _stored(table)['FirstWeek'] == '2025-06-09'
+        assert _stored(table)['LastWeek'] == '2025-09-29'
+        assert _stored(table)['EntryCount'] == 5
+
+        # Re-storing the last week's rows keeps the range without reading rollups
+        queries = table.queries
+        apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(
+            added=[_row('2025-09-29')], removed=[_row('2025-09-29')]), table=table)
+        assert table.queries == queries
+        assert _stored(table)['LastWeek'] == '2025-09-29'
+
+    def test_removal_for_unknown_person_is_skipped(self):
+        table = _table()
+        result = apply_registry_deltas('TimesheetOCR-test', compute_registry_deltas(
+            removed=[_row('2025-09-29')]), table=table)
+
+        assert result == {'updated': 0, 'failed': 0, 'skipped': 1}
+        assert table.items == {}
+
+
+class TestListResources:
+    def test_single_query_sorted_by_name(self):
+        items = registry_items([_row('2025-09-29', resource='Zoe_Ash', display='Zoe Ash'),
+                                _row('2025-09-29'), _row('2025-10-06')])
+        table = FakeTable([seeded_marker()] + items, page_size=2)
+
+        resources = list_resources('TimesheetOCR-test', table=table)
+        assert [r['resource_key'] for r in resources] == ['Nik_Coultas', 'Zoe_Ash']
+        assert resources[0] == {
+            'resource_key': 'Nik_Coultas', 'resource_name': 'Nik Coultas',
+            'first_week': '2025-09-29', 'last_week': '2025-10-06',
+            'entry_count': 2, 'zero_hour_count': 0,
+        }
+
+    def test_unseeded_registry_is_not_trusted(self):
+        # Written since deploy, but never rebuilt from the raw rows
+        items = registry_items([_row('2025-09-29')])
+        assert list_resources('TimesheetOCR-test', table=FakeTable(items)) is None
+
+    def test_people_with_no_rows_left_are_hidden(self):
+        items = registry_items([_row('2025-09-29'), _row('2025-09-29', resource='Nik_Coutlas')])
+        items[0]['EntryCount'] = 0
+        resources = list_resources('TimesheetOCR-test', table=FakeTable(items + [seeded_marker()]))
+        assert [r['resource_key'] for r in resources] == ['Nik_Coutlas']
+
+    def test_scan_fallback_skips_system_partitions(self):
+        items = [_row('2025-09-29'), _row('2025-09-29', resource='Zoe_Ash', display='Zoe Ash'),
+                 _row('2025-10-06'), seeded_marker(),
+                 {'ResourceName': 'ROLLUP#PERSON_WEEK', 'DateProjectCode': '2025-09-29#Nik_Coultas'},
+                 {'ResourceName': 'JOURNAL#DELETES', 'DateProjectCode': 'x'}]
+        resources = scan_resources('TimesheetOCR-test', table=FakeTable(items, page_size=2))
+        assert resources == [{'resource_key': 'Nik_Coultas', 'resource_name': 'Nik Coultas'},
+                             {'resource_key': 'Zoe_Ash', 'resource_name': 'Zoe Ash'}]
@@ -0,0 +1,125 @@
+"""
+Unit tests for rollups module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from decimal import Decimal
+import rollups
+from rollups import (
+    compute_rollup_deltas,
+    find_rollup_mismatches,
+    merge_rollup_deltas,
+    rollup_items
+)
+from tests.fakes import timesheet_row
+
+
+def _row(date_str, code, hours, resource='Nik_Coultas'):
+    return timesheet_row(resource, date_str, code, Decimal(hours), ProjectName=f'Project {code}')
+
+
+class TestComputeRollupDeltas:
+    def test_person_week_month_and_project_buckets(self):
+        deltas = compute_rollup_deltas([
+            _row('2025-09-29', 'PJ021931', '7.5'),
+            _row('2025-09-30', 'PJ021931', '7.5'),
+            _row('2025-10-01', 'PJ021931', '3'),
+        ])
+
+        week = deltas[('ROLLUP#PERSON_WEEK', '2025-09-29#Nik_Coultas')]
+        assert week['TotalHours'] == Decimal('18')
+        assert week['EntryCount'] == 3
+
+        # Months are calendar months, so the week splits across Sep and Oct
+        sep = deltas[('ROLLUP#PERSON_MONTH_PROJECT', '2025-09#Nik_Coultas#PJ021931')]
+        oct_ = deltas[('ROLLUP#PERSON_MONTH_PROJECT', '2025-10#Nik_Coultas#PJ021931')]
+        assert sep['TotalHours'] == Decimal('15')
+        assert oct_['TotalHours'] == Decimal('3')
+
+        project = deltas[('ROLLUP#PROJECT_WEEK', '2025-09-29#PJ021931')]
+        assert project['EntryCount'] == 3
+
+    def test_skips_derived_records_and_counts_zero_hour(self):
+        deltas = compute_rollup_deltas([
+            {'ResourceName': 'Nik_Coultas', 'RecordType': 'COVERAGE_TRACKER', 'Date': '2025-09-29'},
+            {'ResourceName': 'Nik_Coultas', 'Date': '2025-09-29', 'IsZeroHourTimesheet': True},
+        ])
+
+        assert set(deltas) == {
+            ('ROLLUP#PERSON_WEEK', '2025-09-29#Nik_Coultas'),
+            ('ROLLUP#PERSON', 'Nik_Coultas'),
+            ('ROLLUP#TOTALS', 'ALL'),
+        }
+        assert deltas[('ROLLUP#PERSON_WEEK', '2025-09-29#Nik_Coultas')]['ZeroHourCount'] == 1
+        assert deltas[('ROLLUP#TOTALS', 'ALL')]['ZeroHourCount'] == 1
+        assert deltas[('ROLLUP#TOTALS', 'ALL')]['EntryCount'] == 0
+
+    def test_person_and_table_totals(self):
+        deltas = compute_rollup_deltas([
+            _row('2025-09-29', 'PJ021931', '7.5'),
+            _row('2025-09-29', 'PJ021931', '7.5', resource='Amy_Smith'),
+            _row('2025-10-06', 'PJ000001', '2'),
+        ])
+        assert deltas[('ROLLUP#PERSON', 'Nik_Coultas')]['EntryCount'] == 2
+        assert deltas[('ROLLUP#PERSON', 'Amy_Smith')]['TotalHours'] == Decimal('7.5')
+        assert deltas[('ROLLUP#TOTALS', 'ALL')]['EntryCount'] == 3
+        assert deltas[('ROLLUP#TOTALS', 'ALL')]['TotalHours'] == Decimal('17')
+
+
+class TestMergeRollupDeltas:
+    def test_overwrite_with_same_hours_cancels_out(self):
+        row = _row('2025-09-29', 'PJ021931', '7.5')
+        merged = merge_rollup_deltas(compute_rollup_deltas([row], 1), compute_rollup_deltas([row], -1))
+        assert merged == {}
+
+    def test_overwrite_applies_difference(self):
+        merged = merge_rollup_deltas(
+            compute_rollup_deltas([_row('2025-09-29', 'PJ021931', '5')], 1),
+            compute_rollup_deltas([_row('2025-09-29', 'PJ021931', '7.5')], -1)
+        )
+        week = merged[('ROLLUP#PERSON_WEEK', '2025-09-29#Nik_Coultas')]
+        assert week['TotalHours'] == Decimal('-2.5')
+        assert week['EntryCount'] == 0
+
+    def test_project_change_keeps_person_and_totals(self):
+        merged = merge_rollup_deltas(
+            compute_rollup_deltas([_row('2025-09-29', 'PJ000002', '7.5')], 1),
+            compute_rollup_deltas([_row('2025-09-29', 'PJ021931', '7.5')], -1)
+        )
+        assert ('ROLLUP#PERSON_WEEK', '2025-09-29#Nik_Coultas') not in merged
+        assert merged[('ROLLUP#PERSON', 'Nik_Coultas')]['EntryCount'] == 0
+        assert merged[('ROLLUP#TOTALS', 'ALL')]['TotalHours'] == Decimal('0')
+
+
+class TestFindRollupMismatches:
+    def test_detects_drift_and_orphans(self):
+        expected = compute_rollup_deltas([_row('2025-09-29', 'PJ021931', '7.5')])
+        stored = rollup_items(expected)
+        stored[0]['TotalHours'] = Decimal('1')
+        stored.append({'ResourceName': 'ROLLUP#PROJECT_WEEK', 'DateProjectCode': '2025-09-22#PJ000001',
+                       'TotalHours': Decimal('4'), 'EntryCount': 1, 'ZeroHourCount': 0})
+
+        mismatches = find_rollup_mismatches(expected, stored)
+        keys = [m['key'] for m in mismatches]
+        assert (stored[0]['ResourceName'], stored[0]['DateProjectCode']) in keys
+        assert ('ROLLUP#PROJECT_WEEK', '2025-09-22#PJ000001') in keys
+        assert len(mismatches) == 2
+
+
+class TestTouchedRows:
+    def test_non_hours_correction_still_moves_last_updated(self, monkeypatch):
+        applied = []
+        monkeypatch.setattr(rollups, 'apply_rollup_deltas', lambda table, deltas: applied.append(deltas) or {})
+        before = _row('2025-09-29', 'PJ021931', '7.5')
+        after = dict(before, ProjectName='Renamed project')
+
+        # Counters cancel out - without touched rows nothing would be written
+        assert merge_rollup_deltas(compute_rollup_deltas([after], 1), compute_rollup_deltas([before], -1)) == {}
+
+        rollups.update_rollups('T', added=[after], removed=[before], touched=[after])
+        deltas = applied[0]
+        assert ('ROLLUP#PERSON', 'Nik_Coultas') in deltas and ('ROLLUP#TOTALS', 'ALL') in deltas
+        assert all(d['EntryCount'] == 0 and d['TotalHours'] == 0 for d in deltas.values())
+        assert deltas[('ROLLUP#PERSON_MONTH_PROJECT', '2025-09#Nik_Coultas#PJ021931')]['Attributes']['ProjectName'] == 'Renamed project'
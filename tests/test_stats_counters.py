@@ -0,0 +1,107 @@
+"""
+Unit tests for stats_counters module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from decimal import Decimal
+from types import SimpleNamespace
+from rollups import PERSON, TOTALS, TOTALS_KEY, rollup_partition
+from stats_counters import StatsCounters
+from tests.fakes import FakeS3, FakeTable
+
+
+class CountersTable(FakeTable):
+    """Rollup items plus describe_table; counters must never scan."""
+
+    def __init__(self, totals=None, people=()):
+        items = [dict(p, ResourceName=rollup_partition(PERSON), DateProjectCode=f"Person{n}")
+                 for n, p in enumerate(people)]
+        if totals:
+            items.append(dict(totals, ResourceName=rollup_partition(TOTALS), DateProjectCode=TOTALS_KEY))
+        super().__init__(items)
+        self.meta = SimpleNamespace(client=SimpleNamespace(
+            describe_table=lambda TableName: self.calls.append(('describe', None)) or {'Table': {'ItemCount': 999}}
+        ))
+
+    def scan(self, **kwargs):
+        raise AssertionError('counters must never scan')
+
+
+def _s3(keys):
+    return FakeS3({k: b'' for k in keys}, page_size=2)
+
+
+def _counters(table, s3=None, **kwargs):
+    s3 = s3 or _s3(['a.png', 'b.JPG', 'notes.txt'])
+    return StatsCounters(table, 'bucket', s3, failures_func=lambda: 2, log_func=lambda msg: None, **kwargs)
+
+
+class TestStatsCounters:
+    def test_refresh_reads_rollups_and_bucket(self):
+        table = CountersTable(
+            totals={'EntryCount': Decimal('120'), 'ZeroHourCount': Decimal('3')},
+            people=[{'EntryCount': Decimal('5'), 'ZeroHourCount': 0},
+                    {'EntryCount': Decimal('0'), 'ZeroHourCount': Decimal('1')},
+                    {'EntryCount': Decimal('0'), 'ZeroHourCount': 0}]
+        )
+        counters = _counters(table)
+        counters.refresh()
+
+        stats = counters.get()
+        assert (stats['entries'], stats['zero_hour'], stats['people'], stats['images'], stats['failures']) == \
+            (120, 3, 2, 2, 2)
+        assert stats['sources']['entries'] == 'rollup'
+        assert stats['age_seconds']['entries'] < 5
+        assert ('query', 'ROLLUP#PERSON') in table.calls
+
+    def test_falls_back_to_describe_table_before_rollups_exist(self):
+        table = CountersTable()
+        counters = _counters(table)
+        counters.refresh()
+        stats = counters.get()
+        assert stats['entries'] == 999
+        assert stats['sources']['entries'] == 'describe_table'
+
+    def test_fresh_values_are_served_without_refreshing(self):
+        s3 = _s3([])
+        table = CountersTable(totals={'EntryCount': 1})
+        counters = _counters(table, s3)
+        counters.refresh()
+        calls = len(table.calls)
+
+        counters.refresh()
+        assert len(table.calls) == calls and s3.listings == 1
+
+        counters.mark_stale()
+        counters.refresh()
+        assert len(table.calls) > calls and s3.listings == 2
+
+    def test_images_refresh_on_their_own_schedule(self):
+        s3 = _s3([])
+        counters = _counters(CountersTable(totals={'EntryCount': 1}), s3, refresh_seconds=0)
+        counters.refresh()
+        counters.refresh()
+        assert s3.listings == 1
+
+    def test_first_read_does_not_block(self):
+        counters = _counters(CountersTable(totals={'EntryCount': 1}))
+        stats = counters.get()
+        assert stats['entries'] is None
+        assert stats['age_seconds']['entries'] is None
+
+    def test_errors_keep_previous_values(self):
+        table = CountersTable(totals={'EntryCount': 7})
+        counters = _counters(table)
+        counters.refresh()
+
+        def broken(**kwargs):
+            raise RuntimeError('throttled')
+        table.get_item = broken
+        counters.mark_stale()
+        counters.refresh()
+
+        stats = counters.get()
+        assert stats['entries'] == 7
+        assert stats['last_error'] == 'throttled'
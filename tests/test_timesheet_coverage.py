@@ -0,0 +1,76 @@
+"""
+Unit tests for timesheet_coverage module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from datetime import datetime
+import timesheet_coverage
+from tests.fakes import FakeClient
+from timesheet_coverage import fetch_submitted_weeks, generate_coverage_report, get_monday_weeks_in_period
+
+
+class CoverageClient(FakeClient):
+    """Key-range queries over bare keys (pages of 2); failing partitions raise."""
+
+    def __init__(self, keys, failing=()):
+        super().__init__([{'ResourceName': pk, 'DateProjectCode': sk} for pk, sk in keys], page_size=2)
+        self.failing = set(failing)
+
+    def query(self, **kwargs):
+        response = super().query(**kwargs)
+        if kwargs['ExpressionAttributeValues'][':pk']['S'] in self.failing:
+            raise RuntimeError('boom')
+        return response
+
+    @property
+    def queries(self):
+        return [tuple(kwargs['ExpressionAttributeValues'][v]['S'] for v in (':pk', ':low', ':high'))
+                for _, kwargs in self.requests]
+
+
+WEEKS = get_monday_weeks_in_period(datetime(2025, 10, 16), datetime(2025, 11, 15))
+
+KEYS = [
+    ('Amy_Lee', '2025-10-20#P1'),
+    ('Amy_Lee', '2025-10-22#P1'),
+    ('Amy_Lee', '2025-10-22#P2'),
+    ('Amy_Lee', '2025-11-16#P1'),           # Sunday of the last week
+    ('Amy_Lee', 'Amy_Lee#COVERAGE#2025-10'),
+    ('Bob', 'WEEK#2025-10-27'),              # zero-hour marker / week document
+    ('Bob', '2025-10-13#P1'),                # before the period
+    ('Bob', '2025-11-17#P1'),                # after the period
+]
+
+
+class TestFetchSubmittedWeeks:
+    def test_builds_matrix_with_two_queries_per_person(self):
+        assert [w.strftime('%Y-%m-%d') for w in WEEKS] == ['2025-10-20', '2025-10-27', '2025-11-03', '2025-11-10']
+        client = CoverageClient(KEYS)
+        submitted = fetch_submitted_weeks(['Amy_Lee', 'Bob', 'Cat'], WEEKS, 'T', client=client, workers=3)
+        assert submitted == {'Amy_Lee': {'2025-10-20', '2025-11-10'}, 'Bob': {'2025-10-27'}, 'Cat': set()}
+        assert len({q for q in client.queries if q[0] == 'Amy_Lee'}) == 2
+        assert ('Bob', 'WEEK#2025-10-20', 'WEEK#2025-11-10') in client.queries
+
+    def test_failed_person_is_reported_missing(self):
+        submitted = fetch_submitted_weeks(['Amy_Lee', 'Bob'], WEEKS, 'T', client=CoverageClient(KEYS, failing={'Bob'}))
+        assert submitted['Bob'] == set()
+        assert submitted['Amy_Lee'] == {'2025-10-20', '2025-11-10'}
+
+
+class TestGenerateCoverageReport:
+    def test_report_structure(self, monkeypatch):
+        monkeypatch.setattr(timesheet_coverage, 'parse_clarity_month',
+                            lambda month: (datetime(2025, 10, 16), datetime(2025, 11, 15)))
+        monkeypatch.setattr(timesheet_coverage, 'load_team_roster', lambda: ['Amy Lee', 'Bob'])
+
+        report = generate_coverage_report('Oct-25', 'T', client=CoverageClient(KEYS))
+
+        assert report['weeks'] == ['2025-10-20', '2025-10-27', '2025-11-03', '2025-11-10']
+        assert report['coverage']['Amy Lee'] == {
+            '2025-10-20': True, '2025-10-27': False, '2025-11-03': False, '2025-11-10': True
+        }
+        assert report['statistics']['total_expected'] == 8
+        assert report['statistics']['total_submitted'] == 3
+        assert report['person_stats']['Bob']['missing'] == 3
@@ -0,0 +1,132 @@
+"""
+Unit tests for upload_manager module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import hashlib
+import io
+from tests.fakes import FakeS3
+from upload_manager import UploadManager, hash_index_key, hash_stream
+
+
+class CountingStream(io.BytesIO):
+    """Counts the bytes read, to check the source is only read once."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _manager(s3, logs=None):
+    return UploadManager('bucket', client=s3, max_workers=3,
+                         log_func=(logs.append if logs is not None else lambda msg: None))
+
+
+class TestHashStream:
+    def test_hashes_and_rewinds(self):
+        stream = io.BytesIO(b'timesheet')
+        sha256, md5, size, body = hash_stream(stream, chunk_size=4)
+        assert sha256 == hashlib.sha256(b'timesheet').hexdigest()
+        assert md5 == hashlib.md5(b'timesheet').hexdigest()
+        assert size == 9 and body is None
+        assert stream.tell() == 0
+
+    def test_keeps_content_up_to_limit(self):
+        assert hash_stream(io.BytesIO(b'timesheet'), chunk_size=4, keep_limit=9)[3] == b'timesheet'
+        assert hash_stream(io.BytesIO(b'timesheet'), chunk_size=4, keep_limit=8)[3] is None
+
+
+class TestUploadManager:
+    def test_uploads_in_order_with_hash_metadata(self):
+        s3 = FakeS3()
+        results = _manager(s3).upload_many([
+            ('a.png', io.BytesIO(b'aaaa')),
+            ('b.png', io.BytesIO(b'bbbbbbbb')),
+        ])
+        assert [r['filename'] for r in results] == ['a.png', 'b.png']
+        assert all(r['success'] and not r['skipped'] for r in results)
+        assert s3.objects['b.png'] == b'bbbbbbbb'
+        assert s3.metadata['b.png'] == {'sha256': hashlib.sha256(b'bbbbbbbb').hexdigest()}
+
+    def test_paths_are_streamed(self, tmp_path):
+        path = tmp_path / 'c.png'
+        path.write_bytes(b'from disk')
+        s3 = FakeS3()
+        results = _manager(s3).upload_many([('c.png', str(path))])
+        assert results[0]['bytes'] == 9
+        assert s3.objects['c.png'] == b'from disk'
+
+    def test_same_content_in_bucket_is_skipped(self):
+        s3 = FakeS3()
+        s3.put_object(Bucket='bucket', Key='a.png', Body=b'aaaa', Metadata={'sha256': hashlib.sha256(b'aaaa').hexdigest()})
+        s3.put_object(Bucket='bucket', Key='old.png', Body=b'legacy')     # pre-hash upload, matched by ETag
+        s3.put_object(Bucket='bucket', Key='c.png', Body=b'old', Metadata={'sha256': hashlib.sha256(b'old').hexdigest()})
+
+        results = _manager(s3).upload_many([
+            ('a.png', io.BytesIO(b'aaaa')),
+            ('old.png', io.BytesIO(b'legacy')),
+            ('c.png', io.BytesIO(b'new content')),
+        ])
+        assert [r['skipped'] for r in results] == [True, True, False]
+        assert s3.uploads == ['c.png']
+        # Skipped content is indexed, so a copy under another name is found next time
+        assert s3.metadata[hash_index_key(hashlib.sha256(b'legacy').hexdigest())] == {'key': 'old.png'}
+
+    def test_duplicate_content_in_batch_uploaded_once(self):
+        s3 = FakeS3()
+        results = _manager(s3).upload_many([
+            ('first.png', io.BytesIO(b'same')),
+            ('second.png', io.BytesIO(b'same')),
+        ])
+        assert results[1]['duplicate_of'] == 'first.png'
+        assert s3.uploads == ['first.png']
+
+    def test_progress_logged_and_failures_reported(self):
+        s3 = FakeS3()
+        logs = []
+
+        def broken_upload(*args, **kwargs):
+            raise RuntimeError('network down')
+
+        results = _manager(s3, logs).upload_many([('big.png', io.BytesIO(b'x' * 40))])
+        assert any('big.png: 50%' in line for line in logs)
+        assert results[0]['success']
+
+        s3.upload_fileobj = broken_upload
+        results = _manager(s3, logs).upload_many([('bad.png', io.BytesIO(b'y'))])
+        assert not results[0]['success']
+        assert results[0]['error'] == 'network down'
+
+
+class TestHashIndex:
+    def test_same_content_under_another_name_is_skipped(self):
+        s3 = FakeS3()
+        _manager(s3).upload_many([('2025-10-06_scan.png', io.BytesIO(b'timesheet'))])
+
+        results = _manager(s3).upload_many([('renamed copy.png', io.BytesIO(b'timesheet'))])
+        assert results[0]['skipped']
+        assert results[0]['duplicate_of'] == '2025-10-06_scan.png'
+        assert s3.uploads == ['2025-10-06_scan.png']
+
+    def test_stale_marker_does_not_block_upload(self):
+        s3 = FakeS3()
+        _manager(s3).upload_many([('gone.png', io.BytesIO(b'timesheet'))])
+        del s3.objects['gone.png']
+
+        results = _manager(s3).upload_many([('again.png', io.BytesIO(b'timesheet'))])
+        assert not results[0]['skipped']
+        assert s3.metadata[hash_index_key(results[0]['sha256'])] == {'key': 'again.png'}
+
+    def test_source_is_read_once(self):
+        s3 = FakeS3()
+        stream = CountingStream(b'x' * 1000)
+        _manager(s3).upload_many([('once.png', stream)])
+        assert stream.bytes_read == 1000
+        assert s3.objects['once.png'] == b'x' * 1000
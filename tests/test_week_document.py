@@ -0,0 +1,147 @@
+"""
+Unit tests for week_document module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from decimal import Decimal
+from week_document import (
+    build_week_document,
+    expand_items,
+    expand_week_document,
+    merge_week_projects,
+    remove_image_entries,
+    storage_keys,
+    week_document_key
+)
+from tests.fakes import timesheet_row
+
+
+def _metadata():
+    return {
+        'ResourceName': 'Nik_Coultas',
+        'DateProjectCode': week_document_key('2025-09-29'),
+        'Date': '2025-09-29',
+        'ResourceNameDisplay': 'Nik Coultas',
+        'IsZeroHourTimesheet': False,
+        'SourceImage': 'scan.png',
+        'WeekStartDate': '2025-09-29',
+        'WeekEndDate': '2025-10-05',
+        'YearMonth': '2025-09',
+    }
+
+
+def _row(date_str, code, hours, **extra):
+    return timesheet_row('Nik_Coultas', date_str, code, Decimal(hours), ProjectName=f'Project {code}', **extra)
+
+
+class TestBuildWeekDocument:
+    def test_groups_hours_by_project(self):
+        doc = build_week_document(_metadata(), [
+            _row('2025-09-29', 'PJ021931', '7.5'),
+            _row('2025-09-30', 'PJ021931', '7.5'),
+            _row('2025-09-30', 'PJ024300', '2'),
+        ])
+        assert doc['RecordType'] == 'WEEK_DOCUMENT'
+        assert doc['DateProjectCode'] == 'WEEK#2025-09-29'
+        assert doc['Projects']['PJ021931']['Hours'] == {
+            '2025-09-29': Decimal('7.5'),
+            '2025-09-30': Decimal('7.5'),
+        }
+        assert doc['Projects']['PJ024300']['ProjectName'] == 'Project PJ024300'
+
+
+class TestExpandWeekDocument:
+    def test_round_trip_to_day_rows(self):
+        doc = build_week_document(_metadata(), [
+            _row('2025-09-30', 'PJ021931', '7.5'),
+            _row('2025-10-01', 'PJ024300', '3'),
+        ])
+        rows = expand_week_document(doc)
+
+        assert [r['DateProjectCode'] for r in rows] == ['2025-09-30#PJ021931', '2025-10-01#PJ024300']
+        assert rows[1]['Date'] == '2025-10-01'
+        assert rows[1]['YearMonth'] == '2025-10'
+        assert rows[1]['Hours'] == Decimal('3')
+        assert rows[0]['SourceImage'] == 'scan.png'
+        assert 'Projects' not in rows[0]
+        assert 'RecordType' not in rows[0]
+
+    def test_zero_hour_document_expands_to_marker(self):
+        metadata = _metadata()
+        metadata['IsZeroHourTimesheet'] = True
+        rows = expand_week_document(build_week_document(metadata, []))
+
+        assert len(rows) == 1
+        assert rows[0]['DateProjectCode'] == 'WEEK#2025-09-29'
+        assert rows[0]['IsZeroHourTimesheet'] is True
+
+    def test_expand_items_passes_day_rows_through(self):
+        day_row = {'ResourceName': 'Neil_Pomfret', 'DateProjectCode': '2025-09-29#PJ021931'}
+        doc = build_week_document(_metadata(), [_row('2025-09-29', 'PJ021931', '7.5')])
+
+        items = expand_items([day_row, doc])
+        assert items[0] is day_row
+        assert items[1]['DateProjectCode'] == '2025-09-29#PJ021931'
+
+
+class TestMergeWeekProjects:
+    def test_new_scan_wins_and_keeps_other_days(self):
+        existing = {'PJ021931': {'ProjectName': 'Old', 'Hours': {'2025-09-29': 7, '2025-09-30': 7}}}
+        new = {'PJ021931': {'ProjectName': 'New', 'Hours': {'2025-09-30': 5}}}
+
+        merged, replaced = merge_week_projects(existing, new)
+        assert replaced == 1
+        assert merged['PJ021931']['ProjectName'] == 'New'
+        assert merged['PJ021931']['Hours'] == {'2025-09-29': 7, '2025-09-30': 5}
+        # Inputs are not mutated
+        assert existing['PJ021931']['Hours']['2025-09-30'] == 7
+
+
+class TestSourceImagePerDay:
+    def _merged_document(self):
+        # Monday/Tuesday from the first scan, Tuesday rescanned later
+        first = build_week_document(_metadata(), [
+            _row('2025-09-29', 'PJ021931', '7.5'),
+            _row('2025-09-30', 'PJ021931', '7.5'),
+        ])
+        metadata = dict(_metadata(), SourceImage='rescan.png')
+        second = build_week_document(metadata, [_row('2025-09-30', 'PJ021931', '6', SourceImage='rescan.png')])
+        second['Projects'], _ = merge_week_projects(first['Projects'], second['Projects'], first['SourceImage'])
+        return second
+
+    def test_expanded_rows_keep_the_image_they_came_from(self):
+        rows = expand_week_document(self._merged_document())
+        assert [(r['Date'], r['SourceImage']) for r in rows] == [
+            ('2025-09-29', 'scan.png'), ('2025-09-30', 'rescan.png')
+        ]
+
+    def test_documents_without_source_images_fall_back_to_the_document(self):
+        existing = {'PJ021931': {'ProjectName': 'Old', 'Hours': {'2025-09-29': 7}}}
+        merged, _ = merge_week_projects(existing, {}, 'old.png')
+        assert merged['PJ021931']['SourceImages'] == {'2025-09-29': 'old.png'}
+
+    def test_remove_image_entries_keeps_other_scans(self):
+        document = self._merged_document()
+        remaining, removed = remove_image_entries(document, 'scan.png')
+        assert removed == 1
+        assert remaining['Projects']['PJ021931']['Hours'] == {'2025-09-30': Decimal('6')}
+        assert document['Projects']['PJ021931']['Hours']['2025-09-29'] == Decimal('7.5')
+
+        assert remove_image_entries(remaining, 'rescan.png') == (None, 1)
+
+
+class TestStorageKeys:
+    def test_expanded_rows_map_to_one_document_key(self):
+        doc = build_week_document(_metadata(), [
+            _row('2025-09-29', 'PJ021931', '7.5'),
+            _row('2025-09-30', 'PJ021931', '7.5'),
+        ])
+        day_row = {'ResourceName': 'Neil_Pomfret', 'DateProjectCode': '2025-09-29#PJ021931'}
+
+        keys = storage_keys(expand_items([doc, day_row]))
+        assert keys == [
+            {'ResourceName': 'Nik_Coultas', 'DateProjectCode': 'WEEK#2025-09-29'},
+            {'ResourceName': 'Neil_Pomfret', 'DateProjectCode': '2025-09-29#PJ021931'},
+        ]
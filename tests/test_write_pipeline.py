@@ -0,0 +1,99 @@
+"""
+Unit tests for write_pipeline module.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from tests.fakes import FakeResource
+from write_pipeline import BatchWritePipeline, BatchWriteError
+
+
+def _item(n, resource='Nik_Coultas'):
+    return {'ResourceName': resource, 'DateProjectCode': f'2025-09-{n:02d}#PJ021931', 'Hours': 7}
+
+
+def _pipeline(resource, **kwargs):
+    return BatchWritePipeline('TimesheetOCR-test', base_delay=0, resource=resource, **kwargs)
+
+
+class TestBatching:
+    def test_sends_full_batches_of_25(self):
+        resource = FakeResource()
+        pipeline = _pipeline(resource)
+        for n in range(1, 31):
+            pipeline.put(_item(n))
+
+        # First 25 go out as soon as the batch is full
+        assert [len(c) for c in resource.batch_writes] == [25]
+
+        metrics = pipeline.flush()
+        assert [len(c) for c in resource.batch_writes] == [25, 5]
+        assert metrics['items_sent'] == 30
+        assert metrics['pending'] == 0
+
+    def test_duplicate_keys_are_coalesced(self):
+        resource = FakeResource()
+        pipeline = _pipeline(resource)
+        pipeline.put(_item(1))
+        pipeline.put(dict(_item(1), Hours=5))
+        pipeline.flush()
+
+        assert len(resource.batch_writes) == 1
+        assert resource.batch_writes[0] == [{'PutRequest': {'Item': dict(_item(1), Hours=5)}}]
+        assert pipeline.get_metrics()['coalesced'] == 1
+
+
+class TestRetry:
+    def test_unprocessed_items_are_retried(self):
+        resource = FakeResource(unprocessed_rounds=2)
+        pipeline = _pipeline(resource)
+        for n in range(1, 6):
+            pipeline.put(_item(n))
+        metrics = pipeline.flush()
+
+        assert [len(c) for c in resource.batch_writes] == [5, 2, 2]
+        assert metrics['retry_rounds'] == 2
+        assert metrics['unprocessed_items'] == 4
+
+    def test_gives_up_after_max_retries(self):
+        resource = FakeResource(unprocessed_rounds=10)
+        pipeline = _pipeline(resource, max_retries=2)
+        pipeline.put(_item(1))
+        pipeline.put(_item(2))
+
+        with pytest.raises(BatchWriteError):
+            pipeline.flush()
+
+
+class TestPendingView:
+    def test_pending_writes_overlay(self):
+        pipeline = _pipeline(FakeResource())
+        pipeline.put(_item(1))
+        pipeline.delete({'ResourceName': 'Nik_Coultas', 'DateProjectCode': '2025-09-02#PJ021931'})
+
+        writes = pipeline.pending_writes('Nik_Coultas', '2025-09-0')
+        assert writes['2025-09-01#PJ021931'] == _item(1)
+        assert writes['2025-09-02#PJ021931'] is None
+        assert pipeline.current_item(_item(1)) == _item(1)
+        assert pipeline.current_item(_item(3)) is None
+
+
+class TestRegistry:
+    def test_registry_is_one_update_per_person(self):
+        pipeline = _pipeline(FakeResource())
+        updates = []
+
+        def update_item(**kwargs):
+            updates.append(kwargs)
+            return {'Attributes': {'FirstWeek': '2025-09-01', 'LastWeek': '2025-09-08'}}
+
+        pipeline.table.update_item = update_item
+        for n in (1, 8):
+            pipeline.add_resources(added=[dict(_item(n), Date=f'2025-09-{n:02d}')])
+        metrics = pipeline.flush()
+
+        assert [u['Key'] for u in updates] == [{'ResourceName': 'REGISTRY#RESOURCES', 'DateProjectCode': 'Nik_Coultas'}]
+        assert updates[0]['ExpressionAttributeValues'][':entries'] == 2
+        assert metrics['registry_updates'] == 1
@@ -22,6 +22,9 @@ from collections import defaultdict
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from team_manager import TeamManager
+from upload_manager import UploadManager
+from corrections_importer import ERROR_FIELD, CorrectionsImporter, failed_rows_csv
+from record_types import is_timesheet_row
 
 # AWS Configuration
 INPUT_BUCKET = "timesheetocr-input-dev-016164185850"
@@ -613,14 +616,26 @@ class TimesheetOCRApp:
         results = []
 
         try:
-            for i, file_path in enumerate(self.selected_files):
-                filename = Path(file_path).name
-                self.log(f"Processing {i+1}/{len(self.selected_files)}: {filename}")
+            # Upload everything first, in parallel (unchanged files are skipped)
+            self.log(f"⬆️  Uploading {len(self.selected_files)} file(s) to S3...")
+            uploads = UploadManager(INPUT_BUCKET, client=s3_client, log_func=self.log).upload_many(
+                (Path(file_path).name, file_path) for file_path in self.selected_files
+            )
+            self.log("")
 
-                # Upload to S3
-                self.log(f"  ⬆️  Uploading to S3...")
-                s3_client.upload_file(file_path, INPUT_BUCKET, filename)
-                self.log(f"  ✓ Uploaded to s3://{INPUT_BUCKET}/{filename}")
+            for i, upload in enumerate(uploads):
+                filename = upload['filename']
+                self.log(f"Processing {i+1}/{len(uploads)}: {filename}")
+
+                if not upload['success']:
+                    self.log(f"  ✗ Upload failed: {upload.get('error', 'Unknown error')}")
+                    results.append((filename, "Failed", upload.get('error', 'Upload failed')))
+                    self.log("")
+                    continue
+                if upload.get('duplicate_of'):
+                    self.log(f"  ⏭️  Same content as {upload['duplicate_of']} - not processed again")
+                    self.log("")
+                    continue
 
                 # Trigger Lambda
                 self.log(f"  🚀 Triggering Lambda function...")
@@ -868,6 +883,9 @@ class TimesheetOCRApp:
                 response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
 
+            # Rollup, registry, cache and journal items share the table
+            items = [item for item in items if is_timesheet_row(item)]
+
             if not items:
                 self.log("No data found in DynamoDB table")
                 messagebox.showinfo("No Data", "No timesheet data found in DynamoDB.\n\n"
@@ -919,6 +937,9 @@ class TimesheetOCRApp:
                 response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
 
+            # Rollup, registry, cache and journal items share the table
+            items = [item for item in items if is_timesheet_row(item)]
+
             if not items:
                 self.log("No data found in DynamoDB table")
                 messagebox.showinfo("No Data", "No timesheet data found.\n\nProcess some timesheets first!")
@@ -1068,108 +1089,41 @@ class TimesheetOCRApp:
 
             self.log("✓ CSV format validated")
 
-            # Process each row
-            rows_checked = 0
-            rows_updated = 0
-            rows_skipped = 0
-            errors = []
-
-            for idx, csv_row in enumerate(csv_rows, start=1):
-                try:
-                    # Extract primary key
-                    resource_name = csv_row.get('ResourceName', '').strip()
-                    date_project_code = csv_row.get('DateProjectCode', '').strip()
-
-                    if not resource_name or not date_project_code:
-                        errors.append(f"Row {idx}: Missing primary key (ResourceName or DateProjectCode)")
-                        rows_skipped += 1
-                        continue
-
-                    # Fetch existing item from DynamoDB
-                    response = table.get_item(
-                        Key={
-                            'ResourceName': resource_name,
-                            'DateProjectCode': date_project_code
-                        }
-                    )
-
-                    existing_item = response.get('Item')
-
-                    if not existing_item:
-                        # Item doesn't exist in database - skip it
-                        errors.append(f"Row {idx}: No matching record found for {resource_name} / {date_project_code}")
-                        rows_skipped += 1
-                        continue
-
-                    rows_checked += 1
-
-                    # Compare fields to detect changes
-                    has_changes = False
-                    updates = {}
-
-                    for field in expected_fields:
-                        # Skip primary keys (can't update those)
-                        if field in ['ResourceName', 'DateProjectCode']:
-                            continue
-
-                        csv_value = csv_row.get(field, '').strip()
-                        existing_value = existing_item.get(field, '')
-
-                        # Convert existing value to string for comparison
-                        if isinstance(existing_value, Decimal):
-                            existing_value = str(float(existing_value))
-                        elif isinstance(existing_value, bool):
-                            existing_value = str(existing_value)
-                        else:
-                            existing_value = str(existing_value) if existing_value else ''
-
-                        # Compare values
-                        if csv_value != existing_value:
-                            has_changes = True
-
-                            # Convert CSV value to appropriate type
-                            if field == 'Hours':
-                                # Convert to Decimal for DynamoDB
-                                updates[field] = Decimal(str(csv_value)) if csv_value else Decimal('0')
-                            elif field == 'IsZeroHourTimesheet':
-                                # Convert to boolean
-                                updates[field] = csv_value.lower() in ['true', '1', 'yes']
-                            else:
-                                # Keep as string
-                                updates[field] = csv_value
-
-                    # Update item if changes detected
-                    if has_changes:
-                        # Build update expression
-                        update_expr = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
-                        expr_attr_names = {f"#{k}": k for k in updates.keys()}
-                        expr_attr_values = {f":{k}": v for k, v in updates.items()}
-
-                        # Update in DynamoDB
-                        table.update_item(
-                            Key={
-                                'ResourceName': resource_name,
-                                'DateProjectCode': date_project_code
-                            },
-                            UpdateExpression=update_expr,
-                            ExpressionAttributeNames=expr_attr_names,
-                            ExpressionAttributeValues=expr_attr_values
-                        )
+            # Fetch current items in batches and diff locally (no writes yet)
+            importer = CorrectionsImporter(DYNAMODB_TABLE, resource=dynamodb, log_func=self.log)
+            plan = importer.plan({field: row.get(field, '') for field in expected_fields} for row in csv_rows)
+
+            if plan['changed'] == 0:
+                self.log("No changes to apply")
+            elif not messagebox.askyesno(
+                "Apply Corrections?",
+                f"{plan['changed']} of {len(csv_rows)} rows will be updated "
+                f"({plan['unchanged']} unchanged, {len(plan['failed_rows'])} cannot be imported).\n\n"
+                f"Apply the changes?"
+            ):
+                self.log("Import cancelled - no changes written")
+                return
 
-                        rows_updated += 1
-                        self.log(f"  → Updated: {resource_name} / {date_project_code}")
+            report = importer.apply(plan)
+            rows_updated = report['updated']
+            errors = [row[ERROR_FIELD] for row in report['failed_rows']]
 
-                except Exception as e:
-                    errors.append(f"Row {idx}: {str(e)}")
-                    rows_skipped += 1
+            # Failed rows can be fixed and imported again
+            failed_path = None
+            if report['failed_rows']:
+                failed_path = os.path.splitext(file_path)[0] + '_failed_rows.csv'
+                with open(failed_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(failed_rows_csv(report['failed_rows']))
+                self.log(f"📝 Wrote {len(report['failed_rows'])} failed rows to {failed_path}")
 
             # Build result message
             result_msg = (
                 f"Import Complete!\n\n"
                 f"Rows in CSV: {len(csv_rows)}\n"
-                f"Rows checked: {rows_checked}\n"
+                f"Rows checked: {report['checked']}\n"
                 f"Rows updated: {rows_updated}\n"
-                f"Rows skipped: {rows_skipped}\n"
+                f"Rows unchanged: {report['unchanged']}\n"
+                f"Rows failed: {report['failed']}\n"
             )
 
             if errors:
@@ -1178,8 +1132,7 @@ class TimesheetOCRApp:
                     result_msg += "\n" + "\n".join(errors)
                 else:
                     result_msg += "\n" + "\n".join(errors[:10]) + f"\n... and {len(errors) - 10} more"
-
-            self.log(f"✓ Import complete: {rows_updated} rows updated, {rows_skipped} skipped")
+                result_msg += f"\n\nFailed rows saved to:\n{failed_path}"
 
             if errors:
                 messagebox.showwarning("Import Complete (with errors)", result_msg)
@@ -1245,6 +1198,8 @@ class TimesheetOCRApp:
         except Exception as e:
             self.log(f"⚠️  Warning: Could not create lock file: {e}")
 
+        pipeline = None
+
         try:
             self.interactive_mode = interactive_mode
             self.stop_scan = False  # Flag to stop scanning
@@ -1339,6 +1294,10 @@ class TimesheetOCRApp:
             # Track successfully processed images in this session to avoid re-scanning
             newly_processed_images = set()
 
+            # Approved timesheets are written in shared 25-item batches
+            from src.write_pipeline import BatchWritePipeline
+            pipeline = BatchWritePipeline(DYNAMODB_TABLE)
+
             for i, image_key in enumerate(failed_images, 1):
                 # Check if user requested stop
                 if self.stop_scan:
@@ -1419,13 +1378,13 @@ class TimesheetOCRApp:
                             self.log("  → Switching to automatic mode")
                             self.interactive_mode = False
                             # Save to database
-                            self._save_ocr_to_database(image_key, ocr_data)
+                            self._save_ocr_to_database(image_key, ocr_data, pipeline)
                             self.log(f"  ✓ Success: {ocr_data.get('resource_name', 'Unknown')}")
                             newly_processed_images.add(image_key)  # Mark as processed
                             success_count += 1
                         elif approval == 'approve':
                             # Save to database
-                            self._save_ocr_to_database(image_key, ocr_data)
+                            self._save_ocr_to_database(image_key, ocr_data, pipeline)
                             self.log(f"  ✓ Approved: {ocr_data.get('resource_name', 'Unknown')}")
                             newly_processed_images.add(image_key)  # Mark as processed
                             success_count += 1
@@ -1476,6 +1435,9 @@ class TimesheetOCRApp:
                 if i % 10 == 0:
                     time.sleep(1)
 
+            # Write any remaining batched entries before reporting
+            self._flush_write_pipeline(pipeline)
+
             # Show summary
             final_success_rate = (success_count / len(failed_images) * 100) if failed_images else 0
 
@@ -1503,6 +1465,10 @@ class TimesheetOCRApp:
             self.log(f"✗ Error during re-scan: {str(e)}")
             messagebox.showerror("Re-scan Error", f"Failed to re-scan images:\n{str(e)}")
 
+            # Don't lose timesheets that were already approved
+            if pipeline is not None:
+                self._flush_write_pipeline(pipeline)
+
         finally:
             # Always clean up lock file
             try:
@@ -1805,6 +1771,9 @@ class TimesheetOCRApp:
                 response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
 
+            # Rollup, registry, cache and journal items share the table
+            items = [item for item in items if is_timesheet_row(item)]
+
             if not items:
                 self.log("No data found in database")
                 messagebox.showinfo("No Data", "No timesheet data found in database")
@@ -1976,6 +1945,9 @@ class TimesheetOCRApp:
                 response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
 
+            # Rollup, registry, cache and journal items share the table
+            items = [item for item in items if is_timesheet_row(item)]
+
             if not items:
                 self.log("No data found in database")
                 messagebox.showinfo("No Data", "No timesheet data found in database")
@@ -2419,13 +2391,13 @@ class TimesheetOCRApp:
 
             # Scan DynamoDB for unique projects
             response = table.scan(
-                ProjectionExpression='ProjectCode, ProjectName, IsZeroHourTimesheet'
+                ProjectionExpression='ResourceName, RecordType, ProjectCode, ProjectName, IsZeroHourTimesheet'
             )
 
             unique_projects = {}
             for item in response.get('Items', []):
-                # Skip zero-hour timesheets (they don't have real projects)
-                if item.get('IsZeroHourTimesheet'):
+                # Skip zero-hour timesheets (they don't have real projects) and derived records
+                if item.get('IsZeroHourTimesheet') or not is_timesheet_row(item):
                     continue
 
                 code = item.get('ProjectCode', '')
@@ -2436,12 +2408,12 @@ class TimesheetOCRApp:
             # Handle pagination
             while 'LastEvaluatedKey' in response:
                 response = table.scan(
-                    ProjectionExpression='ProjectCode, ProjectName, IsZeroHourTimesheet',
+                    ProjectionExpression='ResourceName, RecordType, ProjectCode, ProjectName, IsZeroHourTimesheet',
                     ExclusiveStartKey=response['LastEvaluatedKey']
                 )
                 for item in response.get('Items', []):
-                    # Skip zero-hour timesheets
-                    if item.get('IsZeroHourTimesheet'):
+                    # Skip zero-hour timesheets and derived records
+                    if item.get('IsZeroHourTimesheet') or not is_timesheet_row(item):
                         continue
 
                     code = item.get('ProjectCode', '')
@@ -2493,6 +2465,9 @@ class TimesheetOCRApp:
                 response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
 
+            # Rollup, registry, cache and journal items share the table
+            items = [item for item in items if is_timesheet_row(item)]
+
             self.log(f"✓ Scanned {len(items)} records")
 
             # Find duplicates
@@ -2904,8 +2879,8 @@ class TimesheetOCRApp:
         except Exception as e:
             return {'error': str(e)}
 
-    def _save_ocr_to_database(self, image_key, ocr_data):
-        """Save OCR data to DynamoDB."""
+    def _save_ocr_to_database(self, image_key, ocr_data, pipeline=None):
+        """Save OCR data to DynamoDB (queued on pipeline if given, flushed by the caller)."""
         try:
             from src.dynamodb_handler import store_timesheet_entries
 
@@ -2917,7 +2892,8 @@ class TimesheetOCRApp:
                 input_tokens=0,
                 output_tokens=0,
                 cost_estimate=0.0,
-                table_name=DYNAMODB_TABLE
+                table_name=DYNAMODB_TABLE,
+                pipeline=pipeline
             )
 
             return result
@@ -2932,6 +2908,16 @@ class TimesheetOCRApp:
             self.log(f"✗ Error saving to database: {str(e)}")
             return {'error': str(e)}
 
+    def _flush_write_pipeline(self, pipeline):
+        """Flush a batch write pipeline and log its throughput/retry metrics."""
+        try:
+            metrics = pipeline.flush()
+            if metrics['items_sent']:
+                self.log(f"💾 Wrote {metrics['items_sent']} entries in {metrics['batch_requests']} batch requests "
+                         f"({metrics['items_per_second']} items/s, {metrics['retry_rounds']} retries)")
+        except Exception as e:
+            self.log(f"✗ Error writing batched entries: {str(e)}")
+
     def _show_approval_dialog_blocking(self, image_key, ocr_data):
         """Show approval dialog and return user's choice."""
         try:
@@ -12,13 +12,13 @@ import os
 import sys
 import time
 import subprocess
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from decimal import Decimal
 from collections import defaultdict
 from werkzeug.utils import secure_filename
 import threading
-from queue import Queue
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -30,7 +30,38 @@ from enhanced_coverage import (
     export_missing_timesheets,
     export_failed_validations
 )
-from labour_hours_report import generate_labour_hours_report, generate_html_report as generate_labour_html
+from labour_hours_report import (
+    generate_labour_hours_report,
+    generate_html_report as generate_labour_html,
+    stream_html_report as stream_labour_html
+)
+from labour_partials import (
+    clarity_months_between,
+    clarity_months_for_quarter,
+    clarity_months_for_year,
+    generate_labour_hours_range_report
+)
+from report_render import asset as report_asset, stream as render_report_stream
+from week_document import expand_items, storage_keys
+from dynamodb_handler import release_image_entries
+from rollups import update_rollups
+from resource_registry import update_resources
+from csv_stream import (
+    DETAILED_FIELDS, FULL_EXPORT_FIELDS, accepts_gzip, csv_chunks, detailed_row, dict_csv_chunks, gzip_chunks
+)
+from data_pages import fetch_page, iter_rows
+from ocr_prefetch import OCRPrefetcher
+from approval_queue import ApprovalQueue
+from log_broadcaster import LogBroadcaster
+from upload_manager import UploadManager
+from bulk_jobs import BulkJobManager, is_throttle_error
+from bulk_delete import BulkDeleter, segmented_scan
+from corrections_importer import ERROR_FIELD, CorrectionsImporter, failed_rows_csv
+from dataset_cache import DatasetCache
+from stats_counters import StatsCounters
+from report_snapshots import ReportSnapshots, key_dates
+from query_cache import get_cache_metrics, get_person_week_items, get_query_cache, invalidate, invalidate_keys
+from utils import parse_date_range
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # For session management
@@ -52,7 +83,7 @@ table = dynamodb.Table(DYNAMODB_TABLE)
 team_manager = TeamManager()
 
 # Global state for logs and processing
-log_queue = Queue()
+log_broadcaster = LogBroadcaster()
 processing_status = {'active': False, 'progress': 0, 'total': 0, 'message': ''}
 
 # Load clarity months
@@ -89,7 +120,20 @@ except Exception as e:
 def log_message(message):
     """Add message to log queue with timestamp"""
     timestamp = datetime.now().strftime('%H:%M:%S')
-    log_queue.put(f"[{timestamp}] {message}")
+    log_broadcaster.publish(f"[{timestamp}] {message}")
+
+
+# Background bulk jobs (auto-approve) with throttle-aware pacing
+bulk_jobs = BulkJobManager(log_func=log_message)
+
+# Parallel batch deletes (flush and per-image deletes)
+bulk_deleter = BulkDeleter(DYNAMODB_TABLE, client=dynamodb.meta.client, log_func=log_message)
+
+# Parallel S3 uploads with content-hash dedupe
+upload_manager = UploadManager(INPUT_BUCKET, client=s3_client, log_func=log_message)
+
+# Process-wide copy of the table, kept fresh with delta refreshes
+dataset_cache = DatasetCache(DYNAMODB_TABLE, client=dynamodb.meta.client, log_func=log_message)
 
 
 def decimal_to_float(obj):
@@ -100,281 +144,67 @@ def decimal_to_float(obj):
 
 
 def get_db_count():
-    """Get total count of items in DynamoDB"""
-    try:
-        count = 0
-        response = table.scan(Select='COUNT')
-        count += response['Count']
-
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(
-                Select='COUNT',
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            count += response['Count']
-
-        return count
-    except Exception as e:
-        log_message(f"Error counting database entries: {e}")
-        return 0
+    """Get the number of timesheet entries (served from memory, never scans)"""
+    return stats_counters.get()['entries']
 
 
-def generate_coverage_html(report):
-    """Generate HTML report from enhanced coverage data"""
-    clarity_month = report['clarity_month']
-    period = report['period']
-    weeks = report['weeks']
-    coverage = report['coverage']
-    person_stats = report['person_stats']
-    statistics = report['statistics']
-
-    # Week labels
-    week_labels = [datetime.strptime(w, '%Y-%m-%d').strftime('%d %b') for w in weeks]
-
-    html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Coverage Report - {clarity_month}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: #f9fafb;
-            padding: 30px;
-            margin: 0;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            padding: 40px;
-        }}
-        h1 {{
-            font-size: 32px;
-            margin-bottom: 10px;
-            color: #111827;
-        }}
-        .subtitle {{
-            font-size: 16px;
-            color: #6b7280;
-            margin-bottom: 30px;
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 20px;
-            margin-bottom: 40px;
-        }}
-        .stat-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 12px;
-            text-align: center;
-        }}
-        .stat-value {{
-            font-size: 36px;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        .stat-label {{
-            font-size: 14px;
-            opacity: 0.9;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }}
-        th {{
-            background: #f3f4f6;
-            padding: 12px;
-            text-align: left;
-            font-weight: 600;
-            border-bottom: 2px solid #e5e7eb;
-            position: sticky;
-            top: 0;
-        }}
-        td {{
-            padding: 10px 12px;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        tr:hover {{
-            background: #f9fafb;
-        }}
-        .symbol {{
-            font-size: 18px;
-            font-weight: bold;
-        }}
-        .symbol-complete {{ color: #10b981; }}
-        .symbol-failed {{ color: #ef4444; }}
-        .symbol-missing {{ color: #9ca3af; }}
-        .status-badge {{
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        .status-complete {{ background: #d1fae5; color: #065f46; }}
-        .status-partial {{ background: #fef3c7; color: #92400e; }}
-        .status-missing {{ background: #fee2e2; color: #991b1b; }}
-        .legend {{
-            display: flex;
-            gap: 20px;
-            margin-bottom: 20px;
-            padding: 15px;
-            background: #f9fafb;
-            border-radius: 8px;
-        }}
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        @media print {{
-            body {{ background: white; padding: 0; }}
-            .container {{ box-shadow: none; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 Timesheet Coverage Report - {clarity_month}</h1>
-        <div class="subtitle">
-            Period: {period['start']} to {period['end']} ({report['week_count']} weeks, {report['team_count']} team members)
-        </div>
-
-        <div class="stats-grid">
-            <div class="stat-card">
-                <div class="stat-value">{statistics['total_weeks']}</div>
-                <div class="stat-label">Expected Timesheets</div>
-            </div>
-            <div class="stat-card" style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);">
-                <div class="stat-value">{statistics['complete']}</div>
-                <div class="stat-label">Complete ({statistics['completion_percentage']:.1f}%)</div>
-            </div>
-            <div class="stat-card" style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);">
-                <div class="stat-value">{statistics['failed']}</div>
-                <div class="stat-label">Failed Validation</div>
-            </div>
-            <div class="stat-card" style="background: linear-gradient(135deg, #6b7280 0%, #4b5563 100%);">
-                <div class="stat-value">{statistics['missing']}</div>
-                <div class="stat-label">Missing</div>
-            </div>
-        </div>
-
-        <div class="legend">
-            <div class="legend-item">
-                <span class="symbol symbol-complete">✓</span>
-                <span>Complete</span>
-            </div>
-            <div class="legend-item">
-                <span class="symbol symbol-failed">✗</span>
-                <span>Failed Validation</span>
-            </div>
-            <div class="legend-item">
-                <span class="symbol symbol-missing">-</span>
-                <span>Missing</span>
-            </div>
-        </div>
-
-        <table>
-            <thead>
-                <tr>
-                    <th>Name</th>
-"""
-
-    # Week headers
-    for label in week_labels:
-        html += f"                    <th style='text-align: center;'>{label}</th>\n"
-
-    html += "                    <th>Status</th>\n"
-    html += "                </tr>\n"
-    html += "            </thead>\n"
-    html += "            <tbody>\n"
-
-    # Per person rows
-    for person in sorted(coverage.keys()):
-        person_weeks = coverage[person]
-        stats = person_stats[person]
-
-        html += f"                <tr>\n"
-        html += f"                    <td><strong>{person}</strong></td>\n"
-
-        # Week symbols
-        for week in weeks:
-            status = person_weeks[week]['status']
-            if status == 'COMPLETE':
-                symbol = '<span class="symbol symbol-complete">✓</span>'
-            elif status == 'FAILED':
-                symbol = '<span class="symbol symbol-failed">✗</span>'
-            else:  # MISSING
-                symbol = '<span class="symbol symbol-missing">-</span>'
-            html += f"                    <td style='text-align: center;'>{symbol}</td>\n"
+def _coverage_rows(report):
+    """Coverage table rows, built one person at a time"""
+    symbols = {
+        'COMPLETE': ('symbol-complete', '✓'),
+        'FAILED': ('symbol-failed', '✗'),
+    }
+    for person in sorted(report['coverage'].keys()):
+        person_weeks = report['coverage'][person]
+        stats = report['person_stats'][person]
 
         # Status summary
         if stats['missing'] == 0 and stats['failed'] == 0:
-            status_html = '<span class="status-badge status-complete">✅ All complete</span>'
+            status_class, status_text = 'status-complete', '✅ All complete'
         elif stats['missing'] > 0 and stats['failed'] > 0:
-            status_html = f'<span class="status-badge status-partial">⚠️ {stats["missing"]} missing, {stats["failed"]} failed</span>'
+            status_class, status_text = 'status-partial', f"⚠️ {stats['missing']} missing, {stats['failed']} failed"
         elif stats['missing'] > 0:
-            status_html = f'<span class="status-badge status-missing">📭 {stats["missing"]} missing</span>'
+            status_class, status_text = 'status-missing', f"📭 {stats['missing']} missing"
         elif stats['failed'] > 0:
-            status_html = f'<span class="status-badge status-missing">❌ {stats["failed"]} failed validation</span>'
+            status_class, status_text = 'status-missing', f"❌ {stats['failed']} failed validation"
         else:
-            status_html = '<span class="status-badge">Unknown</span>'
+            status_class, status_text = '', 'Unknown'
+
+        yield {
+            'person': person,
+            'symbols': [symbols.get(person_weeks[week]['status'], ('symbol-missing', '-')) for week in report['weeks']],
+            'status_class': status_class,
+            'status_text': status_text,
+        }
 
-        html += f"                    <td>{status_html}</td>\n"
-        html += "                </tr>\n"
 
-    html += """
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>
-"""
-    return html
+def stream_coverage_html(report, asset_base=None):
+    """Stream the enhanced coverage HTML report in chunks"""
+    return render_report_stream('coverage.html', {
+        'clarity_month': report['clarity_month'],
+        'period': report['period'],
+        'week_count': report['week_count'],
+        'team_count': report['team_count'],
+        'statistics': report['statistics'],
+        'week_labels': [datetime.strptime(w, '%Y-%m-%d').strftime('%d %b') for w in report['weeks']],
+        'rows': _coverage_rows(report),
+    }, asset_base)
 
 
-def load_all_data():
-    """Load all data from DynamoDB"""
+def generate_coverage_html(report):
+    """Generate HTML report from enhanced coverage data (CSS inlined, so the document stands alone)"""
+    return ''.join(stream_coverage_html(report))
+
+
+def generate_main_projects_html(clarity_month, rows):
+    """Generate HTML table of each person's main project (CSS inlined, so the document stands alone)"""
+    return ''.join(render_report_stream('main_projects.html', {'clarity_month': clarity_month, 'rows': rows}))
+
+
+def load_all_data(force=None):
+    """Load all data from the process-wide dataset cache (see dataset_cache.py)"""
     try:
-        log_message("Loading data from DynamoDB...")
-        items = []
-        response = table.scan()
-        items.extend(response.get('Items', []))
-
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
-
-        log_message(f"Loaded {len(items)} raw items from DynamoDB")
-
-        # Sort by Date then ResourceName
-        items.sort(key=lambda x: (x.get('Date', ''), x.get('ResourceName', '')))
-
-        # Convert non-JSON-serializable types
-        clean_items = []
-        for item in items:
-            clean_item = {}
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    clean_item[key] = float(value)
-                elif isinstance(value, set):
-                    clean_item[key] = list(value)
-                elif isinstance(value, bytes):
-                    clean_item[key] = value.decode('utf-8')
-                else:
-                    clean_item[key] = value
-            clean_items.append(clean_item)
-
-        log_message(f"Cleaned and returning {len(clean_items)} items")
-        return clean_items
+        return dataset_cache.get_rows(force)
     except Exception as e:
         log_message(f"✗ Error in load_all_data: {e}")
         import traceback
@@ -389,8 +219,9 @@ def load_all_data():
 @app.route('/')
 def index():
     """Main dashboard"""
-    db_count = get_db_count()
-    return render_template('dashboard.html', db_count=db_count, clarity_months=clarity_months)
+    stats = stats_counters.get()
+    return render_template('dashboard.html', db_count=stats['entries'], stats=stats,
+                           clarity_months=clarity_months)
 
 
 @app.route('/about')
@@ -407,42 +238,79 @@ def about():
     except:
         pass
 
-    # Get statistics
-    total_entries = get_db_count()
-
-    # Count processed images
-    total_images = 0
-    try:
-        response = s3_client.list_objects_v2(Bucket=INPUT_BUCKET)
-        for obj in response.get('Contents', []):
-            if obj['Key'].lower().endswith(('.png', '.jpg', '.jpeg')):
-                total_images += 1
-    except:
-        total_images = 183  # Default fallback
+    # Get statistics (in-memory counters, refreshed in the background)
+    stats = stats_counters.get()
 
     return render_template('about.html',
                          version=version,
-                         total_entries=total_entries,
-                         total_images=total_images)
+                         total_entries=stats['entries'],
+                         total_images=stats['images'],
+                         stats=stats)
 
 
 @app.route('/api/db-count')
 def api_db_count():
-    """Get current database count"""
-    return jsonify({'count': get_db_count()})
+    """Get current database count and its age"""
+    stats = stats_counters.get()
+    return jsonify({'count': stats['entries'], 'age_seconds': stats['age_seconds']['entries']})
+
+
+@app.route('/api/stats')
+def api_stats():
+    """Get entry, people, image and failure counters with their age"""
+    return jsonify(stats_counters.get())
+
+
+@app.route('/api/cache/query-stats')
+def api_query_cache_stats():
+    """Get person-week query cache hit ratio and counters"""
+    return jsonify(get_cache_metrics())
+
+
+@app.route('/api/cache/dataset')
+def api_dataset_cache_status():
+    """Get dataset cache age, size and refresh counters"""
+    return jsonify(dataset_cache.get_status())
+
+
+@app.route('/api/cache/dataset/refresh', methods=['POST'])
+def api_dataset_cache_refresh():
+    """Refresh the dataset cache now (full rescan by default)"""
+    mode = (request.json or {}).get('mode', 'full') if request.is_json else 'full'
+    if mode not in ('full', 'delta'):
+        return jsonify({'success': False, 'error': "mode must be 'full' or 'delta'"}), 400
+
+    dataset_cache.get_rows(force=mode)
+    return jsonify({'success': True, 'status': dataset_cache.get_status()})
+
+
+@app.route('/api/snapshots')
+def api_snapshots():
+    """Report snapshot status (built snapshots, pending rebuilds)"""
+    return jsonify(report_snapshots.status())
+
+
+@app.route('/api/snapshots/rebuild', methods=['POST'])
+def api_snapshots_rebuild():
+    """Schedule a background rebuild of one month's snapshots (all open months by default)"""
+    month = (request.json or {}).get('month') if request.is_json else None
+    if month and not _month_config(month):
+        return jsonify({'success': False, 'error': 'Invalid Clarity month'}), 400
+    report_snapshots.notify(months=[month] if month else None)
+    return jsonify({'success': True, 'status': report_snapshots.status()}), 202
 
 
 @app.route('/api/logs')
 def api_logs():
     """Stream logs via Server-Sent Events"""
-    def generate():
-        while True:
-            if not log_queue.empty():
-                message = log_queue.get()
-                yield f"data: {json.dumps({'message': message})}\n\n"
-            time.sleep(0.1)
+    # EventSource resends the last id it saw when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
 
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(
+        log_broadcaster.stream(last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 # ============================================================================
@@ -459,24 +327,26 @@ def upload_files():
         files = request.files.getlist('files')
         log_message(f"Starting upload of {len(files)} file(s)...")
 
-        results = []
-        for file in files:
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-
-                # Upload to S3 ONLY (no Lambda trigger)
-                file_data = file.read()
-                s3_client.put_object(
-                    Bucket=INPUT_BUCKET,
-                    Key=filename,
-                    Body=file_data
-                )
-                log_message(f"✓ Uploaded to S3: {filename}")
-
-                results.append({'filename': filename, 'success': True})
-
-        log_message(f"✓ Upload complete! {len(results)} files uploaded to S3 (awaiting manual approval)")
-        return jsonify({'success': True, 'results': results, 'message': f'{len(results)} files uploaded. Use Approval Queue to process them.'})
+        # Upload to S3 ONLY (no Lambda trigger) - streamed from werkzeug's
+        # spooled temp files, in parallel, skipping content already stored
+        sources = [
+            (secure_filename(file.filename), file.stream)
+            for file in files if file and file.filename
+        ]
+        results = upload_manager.upload_many(sources)
+
+        approval_queue.add(r['filename'] for r in results if r['success'] and not r['skipped'])
+        stats_counters.mark_stale()
+        uploaded = sum(1 for r in results if r['success'] and not r['skipped'])
+        log_message(f"✓ Upload complete! {uploaded} files uploaded to S3 (awaiting manual approval)")
+        skipped = sum(1 for r in results if r['skipped'])
+        failed = sum(1 for r in results if not r['success'])
+        return jsonify({
+            'success': failed == 0,
+            'results': results,
+            'message': f'{uploaded} files uploaded, {skipped} already in S3, {failed} failed. Use Approval Queue to process them.',
+            'error': f'{failed} of {len(results)} uploads failed' if failed else None
+        })
 
     except Exception as e:
         log_message(f"✗ Upload error: {str(e)}")
@@ -489,27 +359,17 @@ def upload_files():
 
 @app.route('/api/data')
 def api_data():
-    """Get all database data (excluding COVERAGE_TRACKER records)"""
+    """Get one page of timesheet entries (see data_pages.py for filters and cursor)"""
     try:
-        log_message("📊 Loading database data...")
-        data = load_all_data()
-
-        # Filter out COVERAGE_TRACKER records - only show actual timesheets
-        timesheet_data = [item for item in data if item.get('RecordType') != 'COVERAGE_TRACKER']
-        log_message(f"✓ Loaded {len(timesheet_data)} timesheet entries (filtered from {len(data)} total records)")
-
-        # Convert to JSON-safe format
-        safe_data = []
-        for item in timesheet_data:
-            safe_item = {}
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    safe_item[key] = float(value)
-                else:
-                    safe_item[key] = value
-            safe_data.append(safe_item)
-
-        return jsonify({'success': True, 'data': safe_data, 'count': len(safe_data)})
+        page = fetch_page(DYNAMODB_TABLE, request.args, client=dynamodb.meta.client)
+        log_message(f"📊 Loaded {page['count']} timesheet entries via {page['access_path']} "
+                    f"({page['items_read']} items read)")
+
+        # Low-level reads are already JSON-safe
+        page['success'] = True
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'data': [], 'count': 0}), 400
     except Exception as e:
         log_message(f"✗ Error loading data: {str(e)}")
         import traceback
@@ -517,6 +377,31 @@ def api_data():
         return jsonify({'success': False, 'error': str(e), 'data': [], 'count': 0}), 500
 
 
+def _delete_image_entries(image_key, rows):
+    """
+    Delete the entries one image wrote and update every derived view.
+
+    Week documents that also hold other scans' days are rewritten without
+    this image's days rather than deleted (see release_image_entries).
+
+    Returns:
+        (entries deleted, storage keys touched)
+    """
+    delete_keys, rewritten = release_image_entries(DYNAMODB_TABLE, image_key, rows)
+    failed = set(bulk_deleter.delete(delete_keys)['failed_keys'])
+    keys = delete_keys + storage_keys(expand_items(rewritten))
+
+    removed = [row for row in rows if tuple(storage_keys([row])[0].values()) not in failed]
+    update_rollups(DYNAMODB_TABLE, removed=removed)
+    update_resources(DYNAMODB_TABLE, removed=removed)
+    invalidate_keys(DYNAMODB_TABLE, keys)
+    dataset_cache.discard(delete_keys)
+    dataset_cache.update(json.loads(json.dumps(rewritten, default=decimal_to_float)))
+    stats_counters.mark_stale()
+    report_snapshots.notify(key_dates(keys))
+    return len(removed), keys
+
+
 @app.route('/api/data/delete-by-image', methods=['POST'])
 def delete_by_image():
     """Delete all entries from a specific source image"""
@@ -531,16 +416,8 @@ def delete_by_image():
         all_items = load_all_data()
         to_delete = [item for item in all_items if item.get('SourceImage') == source_image]
 
-        # Delete items
-        deleted = 0
-        for item in to_delete:
-            table.delete_item(
-                Key={
-                    'ResourceName': item['ResourceName'],
-                    'DateProjectCode': item['DateProjectCode']
-                }
-            )
-            deleted += 1
+        deleted, keys = _delete_image_entries(source_image, to_delete)
+        ocr_prefetcher.invalidate(source_image)
 
         log_message(f"✓ Deleted {deleted} entries from {source_image}")
         return jsonify({'success': True, 'deleted': deleted})
@@ -554,6 +431,54 @@ def delete_by_image():
 # ROUTES - Export Functions
 # ============================================================================
 
+def _csv_response(chunks, filename, label):
+    """Stream CSV chunks as a download, gzip-encoded when the client accepts it"""
+    def logged():
+        try:
+            yield from chunks
+            log_message(f"✓ Streamed {label}: {filename}")
+        except Exception as e:
+            # Headers are already sent, so the download just ends early
+            log_message(f"✗ {label} failed mid-stream: {str(e)}")
+            raise
+
+    body = logged()
+    headers = {
+        'Content-Disposition': f'attachment; filename={filename}',
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.args.get('gzip', '1') != '0' and accepts_gzip(request.headers.get('Accept-Encoding', '')):
+        headers['Content-Encoding'] = 'gzip'
+        body = gzip_chunks(body)
+
+    return Response(body, mimetype='text/csv', headers=headers)
+
+
+def _stream_range_rows(start_date, end_date):
+    """Stream timesheet rows in a date range (YearMonthIndex, one page in memory at a time)"""
+    return iter_rows(DYNAMODB_TABLE, {'start': start_date, 'end': end_date}, client=dynamodb.meta.client)
+
+
+def _summary_rows(rows):
+    """Per-person total hours; only the totals are held in memory"""
+    summary = defaultdict(float)
+    for item in rows:
+        summary[item['ResourceName']] += float(item.get('Hours', 0))
+
+    for name, hours in sorted(summary.items()):
+        days = hours / 7.5
+        yield [name, f"{hours:.2f}", f"{days:.2f}"]
+
+
+def _period_export_chunks(start_date, end_date, export_type):
+    """CSV chunks for a summary or detailed export of a date range"""
+    rows = _stream_range_rows(start_date, end_date)
+    if export_type == 'summary':
+        return csv_chunks(['Resource Name', 'Total Hours', 'Days (7.5h)'], _summary_rows(rows))
+    return csv_chunks(DETAILED_FIELDS, (detailed_row(item) for item in rows))
+
+
 @app.route('/api/export/period', methods=['POST'])
 def export_period():
     """Export data for a specific period"""
@@ -563,61 +488,13 @@ def export_period():
         end_date = data.get('end_date')
         export_type = data.get('type', 'summary')  # summary or detailed
 
-        all_items = load_all_data()
-        filtered_items = [
-            item for item in all_items
-            if start_date <= item.get('Date', '') <= end_date
-        ]
-
-        # Create CSV
-        output = io.StringIO()
+        if not start_date or not end_date:
+            return jsonify({'success': False, 'error': 'start_date and end_date are required'}), 400
 
-        if export_type == 'summary':
-            # Group by ResourceName and sum hours
-            summary = defaultdict(float)
-            for item in filtered_items:
-                summary[item['ResourceName']] += float(item.get('Hours', 0))
-
-            writer = csv.writer(output)
-            writer.writerow(['Resource Name', 'Total Hours', 'Days (7.5h)'])
-            for name, hours in sorted(summary.items()):
-                days = hours / 7.5
-                writer.writerow([name, f"{hours:.2f}", f"{days:.2f}"])
-        else:
-            # Detailed export
-            writer = csv.DictWriter(output, fieldnames=[
-                'ResourceName', 'ResourceNameDisplay', 'Date', 'WeekStartDate', 'WeekEndDate',
-                'ProjectCode', 'ProjectName', 'Hours', 'IsZeroHourTimesheet', 'ZeroHourReason',
-                'SourceImage', 'ProcessingTimestamp', 'YearMonth', 'DateProjectCode'
-            ])
-            writer.writeheader()
-            for item in filtered_items:
-                writer.writerow({
-                    'ResourceName': item.get('ResourceName', ''),
-                    'ResourceNameDisplay': item.get('ResourceNameDisplay', ''),
-                    'Date': item.get('Date', ''),
-                    'WeekStartDate': item.get('WeekStartDate', ''),
-                    'WeekEndDate': item.get('WeekEndDate', ''),
-                    'ProjectCode': item.get('ProjectCode', ''),
-                    'ProjectName': item.get('ProjectName', ''),
-                    'Hours': float(item.get('Hours', 0)),
-                    'IsZeroHourTimesheet': item.get('IsZeroHourTimesheet', False),
-                    'ZeroHourReason': item.get('ZeroHourReason', ''),
-                    'SourceImage': item.get('SourceImage', ''),
-                    'ProcessingTimestamp': item.get('ProcessingTimestamp', ''),
-                    'YearMonth': item.get('YearMonth', ''),
-                    'DateProjectCode': item.get('DateProjectCode', '')
-                })
-
-        # Return CSV file
-        output.seek(0)
+        chunks = _period_export_chunks(start_date, end_date, export_type)
         filename = f"timesheet_export_{start_date}_to_{end_date}_{export_type}.csv"
 
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return _csv_response(chunks, filename, 'period export')
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -627,32 +504,11 @@ def export_period():
 def export_full():
     """Export full database"""
     try:
-        all_items = load_all_data()
-
-        output = io.StringIO()
-        if all_items:
-            fieldnames = list(all_items[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for item in all_items:
-                # Convert Decimals
-                row = {}
-                for k, v in item.items():
-                    if isinstance(v, Decimal):
-                        row[k] = float(v)
-                    else:
-                        row[k] = v
-                writer.writerow(row)
-
-        output.seek(0)
+        rows = iter_rows(DYNAMODB_TABLE, {}, client=dynamodb.meta.client)
         filename = f"timesheet_full_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        # Fixed columns: the first row may be a zero-hour marker without ProjectCode/Hours
+        return _csv_response(dict_csv_chunks(rows, FULL_EXPORT_FIELDS), filename, 'full export')
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -680,66 +536,10 @@ def export_clarity():
 
         log_message(f"Exporting from {start_date} to {end_date}")
 
-        # Load and filter data
-        all_items = load_all_data()
-        filtered_items = [
-            item for item in all_items
-            if start_date <= item.get('Date', '') <= end_date
-        ]
-
-        log_message(f"Found {len(filtered_items)} items in date range")
-
-        # Create CSV
-        output = io.StringIO()
-
-        if export_type == 'summary':
-            # Group by ResourceName and sum hours
-            summary = defaultdict(float)
-            for item in filtered_items:
-                summary[item['ResourceName']] += float(item.get('Hours', 0))
-
-            writer = csv.writer(output)
-            writer.writerow(['Resource Name', 'Total Hours', 'Days (7.5h)'])
-            for name, hours in sorted(summary.items()):
-                days = hours / 7.5
-                writer.writerow([name, f"{hours:.2f}", f"{days:.2f}"])
-        else:
-            # Detailed export
-            writer = csv.DictWriter(output, fieldnames=[
-                'ResourceName', 'ResourceNameDisplay', 'Date', 'WeekStartDate', 'WeekEndDate',
-                'ProjectCode', 'ProjectName', 'Hours', 'IsZeroHourTimesheet', 'ZeroHourReason',
-                'SourceImage', 'ProcessingTimestamp', 'YearMonth', 'DateProjectCode'
-            ])
-            writer.writeheader()
-            for item in filtered_items:
-                writer.writerow({
-                    'ResourceName': item.get('ResourceName', ''),
-                    'ResourceNameDisplay': item.get('ResourceNameDisplay', ''),
-                    'Date': item.get('Date', ''),
-                    'WeekStartDate': item.get('WeekStartDate', ''),
-                    'WeekEndDate': item.get('WeekEndDate', ''),
-                    'ProjectCode': item.get('ProjectCode', ''),
-                    'ProjectName': item.get('ProjectName', ''),
-                    'Hours': float(item.get('Hours', 0)),
-                    'IsZeroHourTimesheet': item.get('IsZeroHourTimesheet', False),
-                    'ZeroHourReason': item.get('ZeroHourReason', ''),
-                    'SourceImage': item.get('SourceImage', ''),
-                    'ProcessingTimestamp': item.get('ProcessingTimestamp', ''),
-                    'YearMonth': item.get('YearMonth', ''),
-                    'DateProjectCode': item.get('DateProjectCode', '')
-                })
-
-        # Return CSV file
-        output.seek(0)
+        chunks = _period_export_chunks(start_date, end_date, export_type)
         filename = f"clarity_export_{export_type}_{clarity_month}.csv"
 
-        log_message(f"✓ Generated export file: {filename}")
-
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return _csv_response(chunks, filename, 'Clarity export')
 
     except Exception as e:
         log_message(f"✗ Export error: {str(e)}")
@@ -748,6 +548,57 @@ def export_clarity():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _main_project_rows(rows):
+    """Each person's project with the most hours; holds per-person project totals only"""
+    # Group by person and project, sum hours
+    person_projects = defaultdict(lambda: defaultdict(float))
+    for item in rows:
+        if item.get('IsZeroHourTimesheet', False):  # Exclude zero-hour timesheets
+            continue
+        person = item.get('ResourceNameDisplay', item.get('ResourceName', '')).replace('_', ' ')
+        project_code = item.get('ProjectCode', '')
+        project_name = item.get('ProjectName', '')
+        hours = float(item.get('Hours', 0))
+
+        # Store both project code and name
+        key = f"{project_code}|{project_name}"
+        person_projects[person][key] += hours
+
+    # Find main project (most hours) for each person
+    for person, projects in sorted(person_projects.items()):
+        if projects:
+            main_project_key = max(projects.items(), key=lambda x: x[1])[0]
+            project_code, project_name = main_project_key.split('|', 1)
+            yield [person, project_code, project_name, f"{projects[main_project_key]:.2f}"]
+
+
+MAIN_PROJECT_FIELDS = ['Person Name', 'Main Project Code', 'Main Project Name', 'Hours on Main Project']
+
+
+def _month_config(clarity_month):
+    """Clarity month dict for an id, or None"""
+    return next((m for m in clarity_months if m.get('id') == clarity_month), None)
+
+
+def _rebuild_requested(data):
+    """Whether the caller asked for a synchronous rebuild instead of the latest snapshot"""
+    value = request.args.get('rebuild') or str((data or {}).get('rebuild', ''))
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _snapshot_info(snapshot):
+    """Snapshot metadata returned next to a served report"""
+    return {k: snapshot[k] for k in ('built_at', 'age_seconds', 'pending', 'seconds')}
+
+
+def _build_main_projects_snapshot(clarity_month):
+    """Snapshot builder: each person's main project for a Clarity month"""
+    month_config = _month_config(clarity_month)
+    log_message(f"📸 Building main projects snapshot from {month_config['start_date']} to {month_config['end_date']}")
+    rows = list(_main_project_rows(_stream_range_rows(month_config['start_date'], month_config['end_date'])))
+    return {'rows': rows}, generate_main_projects_html(clarity_month, rows)
+
+
 @app.route('/api/export/main-projects', methods=['POST'])
 def export_main_projects():
     """Export each person's main project (most hours) for a Clarity month"""
@@ -764,75 +615,13 @@ def export_main_projects():
             log_message(f"✗ Invalid Clarity month: {clarity_month}")
             return jsonify({'success': False, 'error': f'Invalid Clarity month: {clarity_month}'}), 400
 
-        start_date = month_config['start_date']
-        end_date = month_config['end_date']
-
-        log_message(f"Analyzing projects from {start_date} to {end_date}")
+        snapshot = report_snapshots.get_or_build('main-projects', clarity_month, rebuild=_rebuild_requested(data))
+        log_message(f"Serving main projects snapshot built {snapshot['built_at']}")
 
-        # Load and filter data
-        all_items = load_all_data()
-        filtered_items = [
-            item for item in all_items
-            if start_date <= item.get('Date', '') <= end_date
-            and not item.get('IsZeroHourTimesheet', False)  # Exclude zero-hour timesheets
-        ]
-
-        log_message(f"Found {len(filtered_items)} items in date range")
-
-        # Group by person and project, sum hours
-        person_projects = defaultdict(lambda: defaultdict(float))
-        for item in filtered_items:
-            person = item.get('ResourceNameDisplay', item.get('ResourceName', '')).replace('_', ' ')
-            project_code = item.get('ProjectCode', '')
-            project_name = item.get('ProjectName', '')
-            hours = float(item.get('Hours', 0))
-
-            # Store both project code and name
-            key = f"{project_code}|{project_name}"
-            person_projects[person][key] += hours
-
-        # Find main project (most hours) for each person
-        main_projects = []
-        for person, projects in sorted(person_projects.items()):
-            if projects:
-                # Find project with most hours
-                main_project_key = max(projects.items(), key=lambda x: x[1])[0]
-                project_code, project_name = main_project_key.split('|', 1)
-                total_hours = projects[main_project_key]
-
-                main_projects.append({
-                    'person': person,
-                    'project_code': project_code,
-                    'project_name': project_name,
-                    'hours': total_hours
-                })
-
-        log_message(f"Identified main projects for {len(main_projects)} people")
-
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['Person Name', 'Main Project Code', 'Main Project Name', 'Hours on Main Project'])
-
-        for item in main_projects:
-            writer.writerow([
-                item['person'],
-                item['project_code'],
-                item['project_name'],
-                f"{item['hours']:.2f}"
-            ])
-
-        # Return CSV file
-        output.seek(0)
+        chunks = csv_chunks(MAIN_PROJECT_FIELDS, snapshot['data']['rows'])
         filename = f"main_projects_{clarity_month}.csv"
 
-        log_message(f"✓ Generated main projects export: {filename}")
-
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return _csv_response(chunks, filename, 'main projects export')
 
     except Exception as e:
         log_message(f"✗ Main projects export error: {str(e)}")
@@ -841,6 +630,26 @@ def export_main_projects():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _coverage_report_data(clarity_month):
+    """Enhanced coverage report data for a Clarity month"""
+    log_message(f"📊 Querying database for {clarity_month} coverage data...")
+    report = generate_enhanced_coverage_report(
+        clarity_month=clarity_month,
+        dynamodb_table=DYNAMODB_TABLE,
+        region=AWS_REGION
+    )
+
+    log_message(f"✅ Coverage report generated: {report['statistics']['total_weeks']} timesheets analyzed")
+    log_message(f"   Complete: {report['statistics']['complete']}, Missing: {report['statistics']['missing']}, Failed: {report['statistics']['failed']}")
+    return report
+
+
+def _build_coverage_snapshot(clarity_month):
+    """Snapshot builder: enhanced coverage report for a Clarity month"""
+    report = _coverage_report_data(clarity_month)
+    return {'stats': report['statistics']}, generate_coverage_html(report)
+
+
 @app.route('/api/coverage', methods=['POST'])
 def generate_coverage():
     """Generate enhanced coverage report for Clarity month"""
@@ -855,23 +664,15 @@ def generate_coverage():
             log_message(f"❌ Invalid Clarity month: {clarity_month}")
             return jsonify({'success': False, 'error': 'Invalid Clarity month'}), 400
 
-        # Generate enhanced coverage report
-        log_message("📊 Querying database for coverage data...")
-        report = generate_enhanced_coverage_report(
-            clarity_month=clarity_month,
-            dynamodb_table=DYNAMODB_TABLE,
-            region=AWS_REGION
-        )
-
-        log_message(f"✅ Coverage report generated: {report['statistics']['total_weeks']} timesheets analyzed")
-        log_message(f"   Complete: {report['statistics']['complete']}, Missing: {report['statistics']['missing']}, Failed: {report['statistics']['failed']}")
-
-        # Generate HTML
-        html = generate_coverage_html(report)
+        snapshot = report_snapshots.get_or_build('coverage', clarity_month, rebuild=_rebuild_requested(data))
+        log_message(f"📄 Serving coverage snapshot built {snapshot['built_at']}")
 
-        log_message(f"📄 HTML report generated successfully")
-
-        return jsonify({'success': True, 'html': html, 'stats': report['statistics']})
+        return jsonify({
+            'success': True,
+            'html': snapshot['html'],
+            'stats': snapshot['data']['stats'],
+            'snapshot': _snapshot_info(snapshot)
+        })
 
     except Exception as e:
         log_message(f"❌ Coverage report error: {str(e)}")
@@ -880,6 +681,29 @@ def generate_coverage():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _labour_hours_report_data(clarity_month):
+    """Labour hours report data for a Clarity month"""
+    log_message(f"⏱️  Calculating {clarity_month} weekly hours from database...")
+    report_data = generate_labour_hours_report(
+        clarity_month=clarity_month,
+        table_name=DYNAMODB_TABLE,
+        profile_name=None,  # Using default credentials
+        region=AWS_REGION
+    )
+
+    log_message(f"✅ Labour hours report generated")
+    log_message(f"   Total hours: {report_data['statistics']['total_hours_logged']:.1f}")
+    log_message(f"   Team members: {report_data['statistics']['total_team_members']}")
+    log_message(f"   Weeks: {report_data['statistics']['total_weeks']}")
+    return report_data
+
+
+def _build_labour_hours_snapshot(clarity_month):
+    """Snapshot builder: labour hours report for a Clarity month"""
+    report_data = _labour_hours_report_data(clarity_month)
+    return {'stats': report_data['statistics']}, generate_labour_html(report_data)
+
+
 @app.route('/api/labour-hours', methods=['POST'])
 def generate_labour_hours():
     """Generate labour hours report for Clarity month"""
@@ -894,38 +718,117 @@ def generate_labour_hours():
             log_message(f"❌ Invalid Clarity month: {clarity_month}")
             return jsonify({'success': False, 'error': 'Invalid Clarity month'}), 400
 
-        # Generate labour hours report
-        log_message("⏱️  Calculating weekly hours from database...")
-        report_data = generate_labour_hours_report(
-            clarity_month=clarity_month,
-            table_name=DYNAMODB_TABLE,
-            profile_name=None,  # Using default credentials
-            region=AWS_REGION
-        )
+        snapshot = report_snapshots.get_or_build('labour-hours', clarity_month, rebuild=_rebuild_requested(data))
+        log_message(f"📄 Serving labour hours snapshot built {snapshot['built_at']}")
 
-        log_message(f"✅ Labour hours report generated")
-        log_message(f"   Total hours: {report_data['statistics']['total_hours_logged']:.1f}")
-        log_message(f"   Team members: {report_data['statistics']['total_team_members']}")
-        log_message(f"   Weeks: {report_data['statistics']['total_weeks']}")
+        return jsonify({
+            'success': True,
+            'html': snapshot['html'],
+            'stats': snapshot['data']['stats'],
+            'snapshot': _snapshot_info(snapshot)
+        })
+
+    except Exception as e:
+        log_message(f"❌ Labour hours report error: {str(e)}")
+        import traceback
+        log_message(traceback.format_exc())
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        # Generate HTML
-        html = generate_labour_html(report_data)
 
-        log_message(f"📄 HTML report generated successfully")
+@app.route('/api/labour-hours/range', methods=['POST'])
+def generate_labour_hours_range():
+    """Labour hours over several Clarity months: {start_month, end_month}, {year, quarter} or {year}"""
+    try:
+        data = request.json or {}
+        if data.get('start_month'):
+            month_ids = clarity_months_between(data['start_month'], data.get('end_month') or data['start_month'])
+            title = None
+        elif data.get('year') and data.get('quarter'):
+            month_ids = clarity_months_for_quarter(int(data['year']), int(data['quarter']))
+            title = f"Q{data['quarter']} {data['year']}"
+        elif data.get('year'):
+            month_ids = clarity_months_for_year(int(data['year']))
+            title = str(data['year'])
+        else:
+            return jsonify({'success': False, 'error': 'Provide start_month/end_month, year/quarter or year'}), 400
+
+        log_message(f"📊 Generating labour hours report for {len(month_ids)} Clarity months...")
+        report_data = generate_labour_hours_range_report(
+            month_ids,
+            table_name=DYNAMODB_TABLE,
+            region=AWS_REGION,
+            title=title,
+            log_func=log_message
+        )
+        log_message(f"✅ Labour hours range report: {report_data['statistics']['total_hours_logged']:.1f} hours")
 
         return jsonify({
             'success': True,
-            'html': html,
-            'stats': report_data['statistics']
+            'html': generate_labour_html(report_data),
+            'stats': report_data['statistics'],
+            'months': report_data['months'],
+            'partials': report_data['partials']
         })
 
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
-        log_message(f"❌ Labour hours report error: {str(e)}")
+        log_message(f"❌ Labour hours range report error: {str(e)}")
         import traceback
         log_message(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# URL prefix of the report CSS linked by streamed reports
+REPORT_ASSET_BASE = '/report-assets'
+
+
+@app.route('/report-assets/<name>')
+def report_asset_file(name):
+    """Report stylesheet - linked with a content hash, so cacheable for a year"""
+    try:
+        css = report_asset(name)
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Asset not found'}), 404
+    return Response(css, mimetype='text/css', headers={'Cache-Control': 'public, max-age=31536000, immutable'})
+
+
+@app.route('/reports/<kind>/<clarity_month>')
+def stream_report(kind, clarity_month):
+    """Render a labour-hours or coverage report straight into the response, chunk by chunk"""
+    try:
+        month_config = next((m for m in clarity_months if m['id'] == clarity_month), None)
+        if not month_config:
+            return jsonify({'success': False, 'error': 'Invalid Clarity month'}), 400
+
+        if kind == 'labour-hours':
+            chunks = stream_labour_html(_labour_hours_report_data(clarity_month), REPORT_ASSET_BASE)
+        elif kind == 'coverage':
+            chunks = stream_coverage_html(_coverage_report_data(clarity_month), REPORT_ASSET_BASE)
+        else:
+            return jsonify({'success': False, 'error': f'Unknown report: {kind}'}), 404
+
+        def logged():
+            try:
+                yield from chunks
+                log_message(f"✓ Streamed {kind} report for {clarity_month}")
+            except Exception as e:
+                # Headers are already sent, so the page just ends early
+                log_message(f"✗ {kind} report failed mid-stream: {str(e)}")
+                raise
+
+        body = logged()
+        headers = {'X-Accel-Buffering': 'no', 'Vary': 'Accept-Encoding'}
+        if accepts_gzip(request.headers.get('Accept-Encoding', '')):
+            headers['Content-Encoding'] = 'gzip'
+            body = gzip_chunks(body)
+        return Response(body, mimetype='text/html', headers=headers)
+
+    except Exception as e:
+        log_message(f"❌ {kind} report error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/coverage/missing', methods=['POST'])
 def export_missing_timesheets():
     """Export missing timesheets list"""
@@ -938,7 +841,7 @@ def export_missing_timesheets():
             return jsonify({'success': False, 'error': 'Invalid Clarity month'}), 400
 
         # Generate report
-        report = generate_coverage_report(clarity_month, table, team_manager)
+        report = generate_coverage_report(clarity_month, DYNAMODB_TABLE, AWS_REGION)
 
         # Format as text
         missing_text = format_missing_timesheets(report)
@@ -960,35 +863,32 @@ def export_missing_timesheets():
 
 @app.route('/api/flush-db', methods=['POST'])
 def flush_database():
-    """Delete all items from DynamoDB"""
+    """Delete all items from DynamoDB (?dry_run=1 only counts them)"""
     try:
-        # Scan and delete all items
-        deleted = 0
-        response = table.scan()
-
-        with table.batch_writer() as batch:
-            for item in response.get('Items', []):
-                batch.delete_item(
-                    Key={
-                        'ResourceName': item['ResourceName'],
-                        'DateProjectCode': item['DateProjectCode']
-                    }
-                )
-                deleted += 1
-
-            while 'LastEvaluatedKey' in response:
-                response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-                for item in response.get('Items', []):
-                    batch.delete_item(
-                        Key={
-                            'ResourceName': item['ResourceName'],
-                            'DateProjectCode': item['DateProjectCode']
-                        }
-                    )
-                    deleted += 1
-
-        log_message(f"✓ Flushed database: {deleted} items deleted")
-        return jsonify({'success': True, 'deleted': deleted})
+        dry_run = request.args.get('dry_run', '0').lower() in ('1', 'true', 'yes')
+
+        # Parallel segmented scan of the keys feeding parallel batch writers
+        report = bulk_deleter.delete(
+            segmented_scan(DYNAMODB_TABLE, client=dynamodb.meta.client),
+            dry_run=dry_run,
+            dedupe=False
+        )
+        if dry_run:
+            return jsonify({'success': True, 'dry_run': True, 'would_delete': report['requested']})
+        deleted = report['deleted']
+
+        get_query_cache().clear()
+        dataset_cache.clear()
+        stats_counters.mark_stale()
+        report_snapshots.notify()
+        log_message(f"✓ Flushed database: {deleted} items deleted ({report['deletes_per_second']:.0f}/s)")
+        return jsonify({
+            'success': report['failed'] == 0,
+            'deleted': deleted,
+            'failed': report['failed'],
+            'deletes_per_second': report['deletes_per_second'],
+            'error': f"{report['failed']} items could not be deleted" if report['failed'] else None
+        })
 
     except Exception as e:
         log_message(f"✗ Flush error: {str(e)}")
@@ -1157,9 +1057,36 @@ def remove_alias(ocr_variant):
 # ROUTES - Approval Interface (embedded)
 # ============================================================================
 
-# In-memory queue for approval
-approval_queue = []
-approval_index = 0
+# Persistent approval queue (SQLite, fed incrementally from S3)
+approval_queue = ApprovalQueue(
+    INPUT_BUCKET,
+    s3_client,
+    processed_table=dynamodb.Table('TimesheetOCR-ProcessedImages-dev'),
+    log_func=log_message
+)
+# Dashboard counters (entries, people, images, failures) without COUNT scans
+stats_counters = StatsCounters(
+    table,
+    INPUT_BUCKET,
+    s3_client,
+    failures_func=lambda: approval_queue.counts()['failed'],
+    log_func=log_message
+)
+stats_counters.refresh_async()
+
+# Report snapshots per Clarity month, rebuilt (debounced) when entries change
+report_snapshots = ReportSnapshots(
+    {
+        'labour-hours': _build_labour_hours_snapshot,
+        'coverage': _build_coverage_snapshot,
+        'main-projects': _build_main_projects_snapshot,
+    },
+    lambda: clarity_months,
+    log_func=log_message
+)
+report_snapshots.start_watcher(table)
+
+approval_weeks = {}  # image_key -> (ResourceName, week start) of the stored timesheet
 
 
 def calculate_validation_details(timesheets):
@@ -1235,139 +1162,133 @@ def calculate_validation_details(timesheets):
     return details
 
 
-def load_pending_images():
+def load_pending_images(full=None):
     """
-    Load images that need approval using ProcessedImages tracking table.
+    Sync the approval queue with S3.
 
-    SIMPLE & RELIABLE LOGIC:
-    - Pending = Images in S3 BUT NOT in ProcessedImages table
-    - No timestamp comparisons
-    - No guessing
-    - 100% accurate
+    Pending = images in S3 that are not approved (ProcessedImages is imported
+    on a full sync; see approval_queue.py). Incremental syncs only list keys
+    added since the last one.
     """
-    global approval_queue
     try:
-        log_message("🔍 Loading pending images...")
-
-        # Get ProcessedImages table
-        processed_table_name = 'TimesheetOCR-ProcessedImages-dev'
-        processed_table = dynamodb.Table(processed_table_name)
+        result = approval_queue.sync(full)
+        log_message(f"⏳ Pending for approval: {approval_queue.counts()['open']} images")
+        return result
+    except Exception as e:
+        log_message(f"❌ Error loading approval queue: {e}")
+        import traceback
+        log_message(f"Traceback: {traceback.format_exc()}")
+        return None
 
-        # Get all images from S3
-        response = s3_client.list_objects_v2(Bucket=INPUT_BUCKET)
-        if 'Contents' in response:
-            s3_images = set()
-            for obj in response['Contents']:
-                key = obj['Key']
-                if key.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    s3_images.add(key)
 
-            log_message(f"📁 Found {len(s3_images)} images in S3")
+def _reviewer_id():
+    """Stable per-browser reviewer id used for queue leases."""
+    if 'reviewer_id' not in session:
+        session['reviewer_id'] = uuid.uuid4().hex
+    return session['reviewer_id']
 
-            # Get all processed images from tracking table
-            processed_response = processed_table.scan()
-            processed_images = set()
 
-            for item in processed_response.get('Items', []):
-                processed_images.add(item['ImageKey'])
+def _queue_position():
+    """(index of the image on screen, total) for the current review pass."""
+    counts = approval_queue.counts()
+    return counts['reviewed'] + 1, counts['reviewed'] + counts['open']
 
-            # Handle pagination
-            while 'LastEvaluatedKey' in processed_response:
-                processed_response = processed_table.scan(ExclusiveStartKey=processed_response['LastEvaluatedKey'])
-                for item in processed_response.get('Items', []):
-                    processed_images.add(item['ImageKey'])
 
-            log_message(f"✅ Found {len(processed_images)} processed images in tracking table")
+@app.route('/approval')
+def approval_interface():
+    """Embedded approval interface"""
+    return render_template('approval.html')
 
-            # Pending = S3 - Processed
-            pending_images = sorted(list(s3_images - processed_images))
 
-            log_message(f"⏳ Pending for approval: {len(pending_images)} images")
+def _approval_entries(image_key):
+    """Entries stored for an image in the approval flow (cached person-week read, full scan fallback)."""
+    week = approval_weeks.get(image_key)
+    if week:
+        items = expand_items(get_person_week_items(table, week[0], week[1]))
+    else:
+        items = load_all_data()
+    return [item for item in items if item.get('SourceImage') == image_key]
+
+
+def _fetch_approval_image(image_key):
+    """Download an image and run OCR on it - the slow part of next-image, run on prefetch workers."""
+    # Download image from S3
+    response = s3_client.get_object(Bucket=INPUT_BUCKET, Key=image_key)
+    image_bytes = response['Body'].read()
+
+    # Convert to base64 for HTML display
+    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+
+    # Get file extension for proper MIME type
+    ext = image_key.lower().split('.')[-1]
+    mime_type = f'image/{ext}' if ext in ['png', 'jpg', 'jpeg'] else 'image/png'
+
+    # Call Lambda to get OCR data SYNCHRONOUSLY
+    log_message(f"🔍 Processing OCR for: {image_key}")
+    payload = {
+        "Records": [{
+            "s3": {
+                "bucket": {"name": INPUT_BUCKET},
+                "object": {"key": image_key}
+            }
+        }]
+    }
 
-            if pending_images:
-                for img in pending_images[:10]:  # Show first 10
-                    log_message(f"  → {img}")
-                if len(pending_images) > 10:
-                    log_message(f"  ... and {len(pending_images) - 10} more")
+    lambda_response = lambda_client.invoke(
+        FunctionName=LAMBDA_FUNCTION,
+        InvocationType='RequestResponse',  # Synchronous call
+        Payload=json.dumps(payload).encode()
+    )
 
-            approval_queue = pending_images
-        else:
-            approval_queue = []
-            log_message("📭 No images found in S3")
+    # Parse Lambda response
+    lambda_payload = lambda_response['Payload'].read()
+    lambda_result = json.loads(lambda_payload)
+    log_message(f"✓ OCR complete for: {image_key}")
 
-    except Exception as e:
-        log_message(f"❌ Error loading approval queue: {e}")
-        import traceback
-        log_message(f"Traceback: {traceback.format_exc()}")
-        approval_queue = []
+    return {
+        'image_data': f'data:{mime_type};base64,{image_base64}',
+        'function_error': lambda_response.get('FunctionError'),
+        'lambda_result': lambda_result
+    }
 
 
-@app.route('/approval')
-def approval_interface():
-    """Embedded approval interface"""
-    return render_template('approval.html')
+# Runs OCR for the next few queued images while the current one is reviewed
+ocr_prefetcher = OCRPrefetcher(_fetch_approval_image, log_func=log_message)
 
 
 @app.route('/api/approval/next-image')
 def approval_next_image():
     """Get next image for approval."""
-    global approval_index
-
-    if not approval_queue:
+    if approval_queue.needs_full_sync():
         load_pending_images()
 
-    if approval_index >= len(approval_queue):
+    image_key = approval_queue.claim_next(_reviewer_id())
+    if image_key is None:
         return jsonify({
             'done': True,
             'message': 'No more images to approve'
         })
 
-    image_key = approval_queue[approval_index]
+    index, total = _queue_position()
 
     try:
-        # Download image from S3
-        response = s3_client.get_object(Bucket=INPUT_BUCKET, Key=image_key)
-        image_bytes = response['Body'].read()
-
-        # Convert to base64 for HTML display
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-
-        # Get file extension for proper MIME type
-        ext = image_key.lower().split('.')[-1]
-        mime_type = f'image/{ext}' if ext in ['png', 'jpg', 'jpeg'] else 'image/png'
-
-        # Call Lambda to get OCR data SYNCHRONOUSLY
-        log_message(f"🔍 Processing OCR for: {image_key}")
-        payload = {
-            "Records": [{
-                "s3": {
-                    "bucket": {"name": INPUT_BUCKET},
-                    "object": {"key": image_key}
-                }
-            }]
-        }
-
-        lambda_response = lambda_client.invoke(
-            FunctionName=LAMBDA_FUNCTION,
-            InvocationType='RequestResponse',  # Synchronous call
-            Payload=json.dumps(payload).encode()
-        )
-
-        # Parse Lambda response
-        lambda_payload = lambda_response['Payload'].read()
-        lambda_result = json.loads(lambda_payload)
-        log_message(f"✓ OCR complete for: {image_key}")
+        # Keep the look-ahead window full, then take this image's result
+        # (ready, in flight, or fetched inline)
+        ocr_prefetcher.prefetch([image_key] + approval_queue.peek(image_key, ocr_prefetcher.depth),
+                                owner=_reviewer_id())
+        fetched = ocr_prefetcher.get(image_key)
+        lambda_result = fetched['lambda_result']
 
         # Check for Lambda execution errors
-        if 'FunctionError' in lambda_response:
-            log_message(f"❌ Lambda Function Error: {lambda_response['FunctionError']}")
+        if fetched['function_error']:
+            log_message(f"❌ Lambda Function Error: {fetched['function_error']}")
             error_msg = lambda_result.get('errorMessage', 'Unknown Lambda error')
             return jsonify({
                 'done': False,
                 'image_key': image_key,
-                'image_data': f'data:{mime_type};base64,{image_base64}',
-                'index': approval_index + 1,
-                'total': len(approval_queue),
+                'image_data': fetched['image_data'],
+                'index': index,
+                'total': total,
                 'ocr_data': {'success': False, 'error': error_msg}
             })
 
@@ -1386,9 +1307,17 @@ def approval_next_image():
         if resource_name:
             log_message(f"📊 Querying DynamoDB for {resource_name} timesheets...")
             try:
-                # Query all entries for this resource from this image
-                all_data = load_all_data()
-                timesheets = [item for item in all_data if item.get('SourceImage') == image_key]
+                # Read this person-week only; the Lambda wrote it from another process,
+                # so drop any cached copy first
+                resource_key = resource_name.replace(' ', '_')
+                try:
+                    week_start = parse_date_range(body_data.get('date_range', ''))[0].strftime('%Y-%m-%d')
+                    invalidate(DYNAMODB_TABLE, resource_key)
+                    approval_weeks[image_key] = (resource_key, week_start)
+                except ValueError:
+                    approval_weeks.pop(image_key, None)
+
+                timesheets = json.loads(json.dumps(_approval_entries(image_key), default=decimal_to_float))
                 log_message(f"✓ Found {len(timesheets)} timesheet entries")
 
                 # Use Lambda's actual validation results (don't recalculate)
@@ -1425,22 +1354,22 @@ def approval_next_image():
         return jsonify({
             'done': False,
             'image_key': image_key,
-            'image_data': f'data:{mime_type};base64,{image_base64}',
-            'index': approval_index + 1,
-            'total': len(approval_queue),
+            'image_data': fetched['image_data'],
+            'index': index,
+            'total': total,
             'ocr_data': ocr_response  # Now includes actual timesheet entries!
         })
 
     except Exception as e:
         log_message(f"Error loading image {image_key}: {e}")
-        approval_index += 1
+        ocr_prefetcher.invalidate(image_key)
+        approval_queue.complete(image_key, 'failed')
         return approval_next_image()
 
 
 @app.route('/api/approval/approve', methods=['POST'])
 def approval_approve():
     """Approve image - OCR data already in DB, mark as processed."""
-    global approval_index
 
     data = request.json
     image_key = data.get('image_key')
@@ -1454,8 +1383,7 @@ def approval_approve():
         processed_table = dynamodb.Table(processed_table_name)
 
         # Get entry count from main DB
-        all_data = load_all_data()
-        entries = [item for item in all_data if item.get('SourceImage') == image_key]
+        entries = _approval_entries(image_key)
         entry_count = len(entries)
         resource_name = entries[0].get('ResourceName', 'Unknown') if entries else 'Unknown'
 
@@ -1470,7 +1398,9 @@ def approval_approve():
             }
         )
 
-        approval_index += 1
+        approval_queue.complete(image_key, 'approved')
+        ocr_prefetcher.invalidate(image_key)
+        report_snapshots.notify(item['Date'] for item in entries if item.get('Date'))
         log_message(f"✓ Approved: {image_key} ({entry_count} entries, marked as processed)")
 
         return jsonify({
@@ -1489,7 +1419,6 @@ def approval_approve():
 @app.route('/api/approval/reject', methods=['POST'])
 def approval_reject():
     """Reject image - delete from DB and remove from ProcessedImages so it can be rescanned."""
-    global approval_index
 
     data = request.json
     image_key = data.get('image_key')
@@ -1498,19 +1427,8 @@ def approval_reject():
         from datetime import datetime, timezone
 
         # Delete all entries for this image from DynamoDB
-        all_data = load_all_data()
-        deleted_count = 0
-
-        for item in all_data:
-            if item.get('SourceImage') == image_key:
-                # Delete this entry
-                table.delete_item(
-                    Key={
-                        'ResourceName': item['ResourceName'],
-                        'DateProjectCode': item['DateProjectCode']
-                    }
-                )
-                deleted_count += 1
+        image_items = _approval_entries(image_key)
+        deleted_count, _ = _delete_image_entries(image_key, image_items)
 
         # REMOVE from ProcessedImages table so it appears in queue for rescan
         processed_table_name = 'TimesheetOCR-ProcessedImages-dev'
@@ -1522,7 +1440,8 @@ def approval_reject():
         except:
             pass  # May not exist in table yet
 
-        approval_index += 1
+        approval_queue.complete(image_key, 'rejected')
+        ocr_prefetcher.invalidate(image_key)
         log_message(f"✗ Rejected: {image_key} (deleted {deleted_count} entries, removed from processed)")
 
         return jsonify({
@@ -1541,7 +1460,6 @@ def approval_reject():
 @app.route('/api/approval/delete', methods=['POST'])
 def approval_delete():
     """Delete image from S3."""
-    global approval_index
 
     data = request.json
     image_key = data.get('image_key')
@@ -1550,8 +1468,8 @@ def approval_delete():
         s3_client.delete_object(Bucket=INPUT_BUCKET, Key=image_key)
 
         # Remove from queue
-        if approval_index < len(approval_queue):
-            approval_queue.pop(approval_index)
+        approval_queue.remove(image_key)
+        ocr_prefetcher.invalidate(image_key)
 
         log_message(f"✓ Deleted: {image_key}")
 
@@ -1571,25 +1489,30 @@ def approval_delete():
 @app.route('/api/approval/queue-status')
 def approval_queue_status():
     """Get current approval queue status."""
-    global approval_index, approval_queue
+    counts = approval_queue.counts()
 
     return jsonify({
-        'total': len(approval_queue),
-        'current_index': approval_index,
-        'remaining': len(approval_queue) - approval_index,
-        'processed': approval_index
+        'total': counts['reviewed'] + counts['open'],
+        'current_index': counts['reviewed'],
+        'remaining': counts['open'],
+        'processed': counts['reviewed'],
+        'counts': counts
     })
 
+@app.route('/api/approval/prefetch-status')
+def approval_prefetch_status():
+    """Get OCR prefetch hit/wait counters and look-ahead settings."""
+    return jsonify(ocr_prefetcher.get_metrics())
+
+
 @app.route('/api/approval/reload-queue', methods=['POST'])
 def approval_reload_queue():
-    """Force reload the approval queue."""
-    global approval_index, approval_queue
-
+    """Start a new review pass and sync the queue ({"full": true} forces a full resync)."""
     try:
-        old_count = len(approval_queue)
-        approval_index = 0
-        load_pending_images()
-        new_count = len(approval_queue)
+        full = (request.get_json(silent=True) or {}).get('full')
+        ocr_prefetcher.clear()
+        result = approval_queue.reload(full)
+        old_count, new_count = result['old_count'], result['new_count']
 
         log_message(f"🔄 Approval queue reloaded: {old_count} → {new_count} images")
 
@@ -1597,6 +1520,7 @@ def approval_reload_queue():
             'success': True,
             'old_count': old_count,
             'new_count': new_count,
+            'sync': result,
             'message': f'Queue reloaded: {new_count} images pending'
         })
     except Exception as e:
@@ -1606,56 +1530,105 @@ def approval_reload_queue():
             'error': str(e)
         }), 500
 
-@app.route('/api/approval/auto-approve-all', methods=['POST'])
-def approval_auto_approve_all():
-    """Auto-approve all remaining images."""
-    global approval_index
+def _auto_approve_image(image_key, reviewer):
+    """Run OCR for one image and record the outcome (a bulk auto-approve job item)."""
+    if not approval_queue.claim(image_key, reviewer):
+        return {'status': 'skipped', 'reason': 'already decided or claimed by another reviewer'}
 
-    approved_count = 0
-    errors = []
+    payload = {
+        "Records": [{
+            "s3": {
+                "bucket": {"name": INPUT_BUCKET},
+                "object": {"key": image_key}
+            }
+        }]
+    }
 
-    while approval_index < len(approval_queue):
-        image_key = approval_queue[approval_index]
+    try:
+        # Synchronous, so the job's concurrency window bounds Lambda concurrency
+        lambda_response = lambda_client.invoke(
+            FunctionName=LAMBDA_FUNCTION,
+            InvocationType='RequestResponse',
+            Payload=json.dumps(payload).encode()
+        )
+        lambda_result = json.loads(lambda_response['Payload'].read() or b'{}')
+        if lambda_response.get('FunctionError') or lambda_result.get('statusCode', 200) != 200:
+            detail = lambda_result.get('errorMessage') or lambda_result.get('body', '')
+            raise RuntimeError(f"OCR failed: {str(detail)[:500]}")
+    except Exception as e:
+        if is_throttle_error(e):
+            # Retried by the job after backing off
+            approval_queue.release(image_key)
+        else:
+            approval_queue.complete(image_key, 'failed')
+        raise
 
-        try:
-            payload = {
-                "Records": [{
-                    "s3": {
-                        "bucket": {"name": INPUT_BUCKET},
-                        "object": {"key": image_key}
-                    }
-                }]
-            }
+    approval_queue.complete(image_key, 'approved')
+    # Dates are not known here - open months are rebuilt once the job's burst settles
+    report_snapshots.notify()
+    try:
+        return {'entries_stored': json.loads(lambda_result.get('body') or '{}').get('entries_stored', 0)}
+    except (TypeError, ValueError):
+        return None
 
-            lambda_client.invoke(
-                FunctionName=LAMBDA_FUNCTION,
-                InvocationType='Event',  # Async
-                Payload=json.dumps(payload).encode()
-            )
 
-            approved_count += 1
-            approval_index += 1
+@app.route('/api/approval/auto-approve-all', methods=['POST'])
+def approval_auto_approve_all():
+    """Start a background job that auto-approves all remaining images."""
+    running = bulk_jobs.running('auto-approve')
+    if running:
+        return jsonify({'success': False, 'error': 'An auto-approve job is already running', 'job_id': running}), 409
 
-        except Exception as e:
-            errors.append(f"{image_key}: {str(e)}")
-            approval_index += 1
+    # The job redoes any OCR the prefetcher has in hand
+    ocr_prefetcher.clear()
 
-    log_message(f"✓ Auto-approved {approved_count} images")
+    reviewer = _reviewer_id()
+    keys = approval_queue.open_keys(reviewer)
+    concurrency = request.args.get('concurrency', type=int)
+    job_id = bulk_jobs.start('auto-approve', keys, lambda key: _auto_approve_image(key, reviewer),
+                             concurrency=concurrency)
 
     return jsonify({
         'success': True,
-        'approved': approved_count,
-        'errors': errors
-    })
+        'job_id': job_id,
+        'total': len(keys),
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+
+@app.route('/api/jobs')
+def api_jobs():
+    """List recent bulk jobs with their progress"""
+    return jsonify({'jobs': bulk_jobs.list_jobs()})
+
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Get a bulk job's progress (?results=0 omits per-item outcomes)"""
+    status = bulk_jobs.get(job_id, include_results=request.args.get('results', '1') != '0')
+    if status is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    return jsonify(status)
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def api_job_cancel(job_id):
+    """Stop a running bulk job after the items in flight"""
+    return jsonify({'success': bulk_jobs.cancel(job_id)})
 
 
 # ============================================================================
 # ROUTES - Import Corrections
 # ============================================================================
 
+# Rows the last correction import could not apply, as CSV (None if all applied)
+last_failed_corrections = None
+
+
 @app.route('/api/import-corrections', methods=['POST'])
 def import_corrections():
-    """Import corrections from CSV"""
+    """Import corrections from CSV (?dry_run=1 returns the diff without writing)"""
+    global last_failed_corrections
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'No file provided'}), 400
@@ -1664,88 +1637,49 @@ def import_corrections():
         if not file.filename.endswith('.csv'):
             return jsonify({'success': False, 'error': 'Must be CSV file'}), 400
 
-        # Read CSV
-        csv_data = file.read().decode('utf-8')
-        reader = csv.DictReader(io.StringIO(csv_data))
+        dry_run = request.args.get('dry_run', request.form.get('dry_run', '0')).lower() in ('1', 'true', 'yes')
 
-        updated = 0
-        errors = []
+        # Read CSV straight from werkzeug's spooled upload
+        reader = csv.DictReader(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
 
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                # Get primary keys
-                resource_name = row.get('ResourceName')
-                date_project_code = row.get('DateProjectCode')
-
-                if not resource_name or not date_project_code:
-                    continue
-
-                # Get current item
-                response = table.get_item(
-                    Key={
-                        'ResourceName': resource_name,
-                        'DateProjectCode': date_project_code
-                    }
-                )
-
-                if 'Item' not in response:
-                    continue
-
-                current = response['Item']
-
-                # Build update expression
-                update_expr = []
-                expr_values = {}
-                expr_names = {}
-
-                for key, new_value in row.items():
-                    if key in ['ResourceName', 'DateProjectCode']:
-                        continue  # Cannot update primary keys
-
-                    if key not in current or str(current[key]) != new_value:
-                        # Value changed
-                        placeholder = f":val{len(expr_values)}"
-                        attr_name = f"#attr{len(expr_names)}"
-
-                        update_expr.append(f"{attr_name} = {placeholder}")
-                        expr_names[attr_name] = key
-
-                        # Type conversion
-                        if key == 'Hours':
-                            expr_values[placeholder] = Decimal(str(new_value))
-                        elif key == 'IsZeroHourTimesheet':
-                            expr_values[placeholder] = new_value.lower() in ['true', '1', 'yes']
-                        else:
-                            expr_values[placeholder] = new_value
-
-                # Perform update if needed
-                if update_expr:
-                    table.update_item(
-                        Key={
-                            'ResourceName': resource_name,
-                            'DateProjectCode': date_project_code
-                        },
-                        UpdateExpression='SET ' + ', '.join(update_expr),
-                        ExpressionAttributeNames=expr_names,
-                        ExpressionAttributeValues=expr_values
-                    )
-                    updated += 1
+        log_message(f"📥 Importing corrections from {file.filename}{' (dry run)' if dry_run else ''}...")
+        importer = CorrectionsImporter(DYNAMODB_TABLE, resource=dynamodb, log_func=log_message)
+        report = importer.run(reader, dry_run=dry_run)
 
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
+        last_failed_corrections = failed_rows_csv(report['failed_rows']) if report['failed_rows'] else None
+        errors = [row[ERROR_FIELD] for row in report.pop('failed_rows')]
 
-        log_message(f"✓ Import complete: {updated} rows updated")
+        if not dry_run and report['updated']:
+            keys = report.pop('updated_keys')
+            invalidate_keys(DYNAMODB_TABLE, keys)
+            # Updates keep their ProcessingTimestamp, so a delta refresh cannot see them
+            dataset_cache.invalidate()
+            report_snapshots.notify(key_dates(keys))
+        report.pop('updated_keys', None)
 
         return jsonify({
             'success': True,
-            'updated': updated,
-            'errors': errors
+            **report,
+            'errors': errors,
+            'failed_rows_url': '/api/import-corrections/failed.csv' if last_failed_corrections else None
         })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/import-corrections/failed.csv')
+def import_corrections_failed_rows():
+    """Download the rows the last import could not apply (fix and re-import)"""
+    if not last_failed_corrections:
+        return jsonify({'success': False, 'error': 'No failed rows from the last import'}), 404
+    return Response(
+        last_failed_corrections,
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=corrections_failed_rows.csv'}
+    )
+
+
 def find_available_port(start_port=8000, max_attempts=100):
     """Find an available port starting from start_port"""
     import socket